@@ -15,7 +15,7 @@ nyse = mcal.get_calendar("NYSE")
 import numpy as np
 from scipy.signal import argrelextrema
 import mplfinance as mpf
-from ib_insync import IB, Stock, LimitOrder
+from ib_insync import IB, Stock, LimitOrder, util
 import time
 import logging
 from ib_insync import IB
@@ -27,6 +27,9 @@ import pandas_market_calendars as mcal  # Am Anfang des Skripts einfügen
 from ib_insync import MarketOrder
 import yfinance as yf
 import threading
+import asyncio
+import math
+from concurrent.futures import ProcessPoolExecutor
 price_event = threading.Event()
 shared_price = {"price": None, "bid": None, "ask": None}
 import plotly.io as pio
@@ -319,76 +322,153 @@ def update_level_close_short(extended_df, market_df):
 # 7. Tradesimulation (Long und Short) mit dynamischer Ordergröße
 # =============================================================================
 
-def simulate_trades_compound_extended(extended_df, market_df, starting_capital=10000,
-                                        commission_rate=COMMISSION_RATE, min_commission=MIN_COMMISSION,
-                                        round_factor=ORDER_ROUND_FACTOR,
-                                        artificial_close_price=None, artificial_close_date=None):
+def _lookup_close_prices(exec_dates, market_df):
     """
-    Simuliert Long‑Trades basierend auf den Extended-Long-Signalen.
-    Ergänzt offene Trades mit künstlichem Close (z.B. 15:50).
+    Close-Preise zu den Ausführungsterminen (exakter Bar oder nächster Bar danach),
+    NaN für NaT bzw. Termine hinter dem letzten Bar – vektorisiert per searchsorted.
     """
-    extended_df = extended_df.sort_values(by="Long Date detected")
+    index = market_df.index
+    if getattr(index, "tz", None) is not None:
+        index = index.tz_localize(None)
+    dates = pd.DatetimeIndex(pd.to_datetime(pd.Series(exec_dates, dtype=object), errors="coerce"))
+    if dates.tz is not None:
+        dates = dates.tz_localize(None)
+    valid = ~dates.isna()
+    pos = np.full(len(dates), len(index), dtype=np.int64)
+    pos[valid] = index.searchsorted(dates[valid])
+    closes = market_df["Close"].to_numpy(dtype=float)
+    prices = np.full(len(dates), np.nan)
+    found = pos < len(index)
+    prices[found] = closes[pos[found]]
+    return prices
+
+def _compound_kernel(opens, exits, dates, prices, starting_capital, commission_rate, min_commission,
+                     round_factor, side="long", artificial_close_price=None, artificial_close_date=None):
+    """
+    Gemeinsamer Long/Short-Kern: opens/exits sind bool-Arrays (buy/sell bzw. short/cover),
+    prices die Ausführungspreise (NaN = kein Preis). Nur Signalzeilen werden durchlaufen.
+    """
+    long_side = side == "long"
+    entry_key, exit_key = ("buy", "sell") if long_side else ("short", "cover")
     capital = starting_capital
     position_active = False
     trades = []
-    buy_price = buy_date = prev_cap = None
-    for _, row in extended_df.iterrows():
-        action = row.get('Long Action')
-        exec_date = row.get('Long Date detected')
-        if pd.isna(exec_date):
-            continue
-        if exec_date in market_df.index:
-            price = float(market_df.loc[exec_date, "Close"])
+    entry_price = entry_date = prev_cap = shares = None
+
+    def close_trade(exit_price, exit_date):
+        if long_side:
+            profit = (exit_price - entry_price) * shares
         else:
-            idx = market_df.index.searchsorted(exec_date)
-            price = float(market_df.iloc[idx]["Close"]) if idx < len(market_df.index) else None
-        if price is None:
-            continue
-        if action == 'buy' and not position_active:
+            profit = (entry_price - exit_price) * shares
+        turnover = shares * (entry_price + exit_price)
+        fee = max(min_commission, turnover * commission_rate)
+        new_cap = prev_cap + profit - fee
+        trades.append({
+            f'{entry_key}_date': entry_date,
+            f'{exit_key}_date': exit_date,
+            'shares': shares,
+            f'{entry_key}_price': round(entry_price, 2),
+            f'{exit_key}_price': round(exit_price, 2),
+            'fee': round(fee, 2),
+            'pnl': round(new_cap - prev_cap, 3)
+        })
+        return new_cap
+
+    for i in np.flatnonzero((opens | exits) & ~np.isnan(prices)):
+        price = float(prices[i])
+        if opens[i] and not position_active:
             shares = calculate_shares(capital, price, round_factor)
             if shares < 1e-6:
                 continue
-            buy_price = price
-            buy_date = exec_date
+            entry_price = price
+            entry_date = dates[i]
             position_active = True
             prev_cap = capital
-        elif action == 'sell' and position_active:
-            sell_price = price
-            sell_date = exec_date
-            profit = (sell_price - buy_price) * shares
-            turnover = shares * (buy_price + sell_price)
-            fee = max(min_commission, turnover * commission_rate)
-            new_cap = prev_cap + profit - fee
-            trades.append({
-                'buy_date': buy_date,
-                'sell_date': sell_date,
-                'shares': shares,
-                'buy_price': round(buy_price, 2),
-                'sell_price': round(sell_price, 2),
-                'fee': round(fee, 2),
-                'pnl': round(new_cap - prev_cap, 3)
-            })
-            capital = new_cap
+        elif exits[i] and position_active:
+            capital = close_trade(price, dates[i])
             position_active = False
     # Falls noch Position offen, mit künstlichem Close abschließen
     if position_active and artificial_close_price is not None and artificial_close_date is not None:
-        sell_price = artificial_close_price
-        sell_date = artificial_close_date
-        profit = (sell_price - buy_price) * shares
-        turnover = shares * (buy_price + sell_price)
-        fee = max(min_commission, turnover * commission_rate)
-        new_cap = prev_cap + profit - fee
-        trades.append({
-            'buy_date': buy_date,
-            'sell_date': sell_date,
-            'shares': shares,
-            'buy_price': round(buy_price, 2),
-            'sell_price': round(sell_price, 2),
-            'fee': round(fee, 2),
-            'pnl': round(new_cap - prev_cap, 3)
-        })
-        capital = new_cap
+        capital = close_trade(artificial_close_price, artificial_close_date)
     return capital, trades
+
+def _simulate_signal_frame(signals_df, market_df, action_col, date_col, side, starting_capital,
+                           commission_rate, min_commission, round_factor, **close_kwargs):
+    actions = signals_df[action_col].to_numpy(dtype=object)
+    dates = signals_df[date_col].tolist()
+    entry_key, exit_key = ("buy", "sell") if side == "long" else ("short", "cover")
+    return _compound_kernel(actions == entry_key, actions == exit_key, dates,
+                            _lookup_close_prices(dates, market_df), starting_capital,
+                            commission_rate, min_commission, round_factor, side, **close_kwargs)
+
+def _interval_offset(interval, trade_window):
+    """Versatz des Ausführungstermins wie in assign_long_signals/assign_short_signals."""
+    interval_clean = interval.replace(" ", "").lower()
+    if interval_clean in ["1d", "1day"]:
+        return pd.Timedelta(days=trade_window)
+    elif interval_clean.endswith("min"):
+        return pd.Timedelta(minutes=trade_window * int(interval_clean.replace("min", "")))
+    elif interval_clean in ["1h", "1hour"]:
+        return pd.Timedelta(hours=trade_window)
+    raise ValueError(f"Unsupported interval: {interval}")
+
+def simulate_long_short_levels(support, resistance, market_df, trade_window, interval,
+                               capital_long=10000, capital_short=10000,
+                               commission_rate=COMMISSION_RATE, min_commission=MIN_COMMISSION,
+                               round_factor=ORDER_ROUND_FACTOR, long=True, short=True):
+    """
+    Long und Short in EINEM Durchlauf über dieselben Extrema – gleiches Ergebnis wie
+    assign_long_signals + simulate_trades_compound bzw. assign_short_signals +
+    simulate_short_trades_compound. Signale entstehen am Beginn jedes Laufs gleicher
+    Level-Typen: Support -> buy/cover, Resistance -> sell/short.
+    Gibt (long_cap, long_trades, short_cap, short_trades) zurück (None für abgeschaltete Seiten).
+    """
+    if not market_df.index.is_monotonic_increasing:
+        market_df = market_df.sort_index()
+    sup_df = pd.DataFrame({'Date': support.index, 'Type': 0})
+    res_df = pd.DataFrame({'Date': resistance.index, 'Type': 1})
+    levels = pd.concat([sup_df, res_df]).sort_values(by='Date').reset_index(drop=True)
+    types = levels['Type'].to_numpy()
+    if len(types) == 0:
+        return (capital_long if long else None, [] if long else None,
+                capital_short if short else None, [] if short else None)
+    starts = np.flatnonzero(np.r_[True, types[1:] != types[:-1]])
+    is_support = types[starts] == 0
+
+    trade_dates = pd.DatetimeIndex(levels['Date'].iloc[starts]) + _interval_offset(interval, trade_window)
+    pos = market_df.index.searchsorted(trade_dates)
+    found = pos < len(market_df.index)
+    closes = market_df["Close"].to_numpy(dtype=float)
+    prices = np.full(len(starts), np.nan)
+    prices[found] = closes[pos[found]]
+    exec_index = market_df.index[pos[found]]
+    if getattr(exec_index, "tz", None) is not None:
+        exec_index = exec_index.tz_localize(None)
+    dates = np.full(len(starts), pd.NaT, dtype=object)
+    dates[found] = list(exec_index)
+
+    costs = (commission_rate, min_commission, round_factor)
+    long_cap = long_trades = short_cap = short_trades = None
+    if long:
+        long_cap, long_trades = _compound_kernel(is_support, ~is_support, dates, prices, capital_long, *costs, side="long")
+    if short:
+        short_cap, short_trades = _compound_kernel(~is_support, is_support, dates, prices, capital_short, *costs, side="short")
+    return long_cap, long_trades, short_cap, short_trades
+
+def simulate_trades_compound_extended(extended_df, market_df, starting_capital=10000,
+                                        commission_rate=COMMISSION_RATE, min_commission=MIN_COMMISSION,
+                                        round_factor=ORDER_ROUND_FACTOR,
+                                        artificial_close_price=None, artificial_close_date=None):
+    """
+    Simuliert Long‑Trades basierend auf den Extended-Long-Signalen.
+    Ergänzt offene Trades mit künstlichem Close (z.B. 15:50).
+    """
+    extended_df = extended_df.sort_values(by="Long Date detected")
+    return _simulate_signal_frame(extended_df, market_df, 'Long Action', 'Long Date detected', "long",
+                                  starting_capital, commission_rate, min_commission, round_factor,
+                                  artificial_close_price=artificial_close_price,
+                                  artificial_close_date=artificial_close_date)
+
 def simulate_short_trades_compound_extended(extended_df, market_df, starting_capital=10000,
                                              commission_rate=COMMISSION_RATE, min_commission=MIN_COMMISSION,
                                              round_factor=ORDER_ROUND_FACTOR,
@@ -398,67 +478,10 @@ def simulate_short_trades_compound_extended(extended_df, market_df, starting_cap
     Ergänzt offene Trades mit künstlichem Close (z.B. 15:50).
     """
     extended_df = extended_df.sort_values(by="Short Date detected")
-    capital = starting_capital
-    position_active = False
-    trades = []
-    short_price = short_date = prev_cap = None
-    for _, row in extended_df.iterrows():
-        action = row.get('Short Action')
-        exec_date = row.get('Short Date detected')
-        if pd.isna(exec_date):
-            continue
-        if exec_date in market_df.index:
-            price = float(market_df.loc[exec_date, "Close"])
-        else:
-            idx = market_df.index.searchsorted(exec_date)
-            price = float(market_df.iloc[idx]["Close"]) if idx < len(market_df.index) else None
-        if price is None:
-            continue
-        if action == 'short' and not position_active:
-            shares = calculate_shares(capital, price, round_factor)
-            if shares < 1e-6:
-                continue
-            short_price = price
-            short_date = exec_date
-            position_active = True
-            prev_cap = capital
-        elif action == 'cover' and position_active:
-            cover_price = price
-            cover_date = exec_date
-            profit = (short_price - cover_price) * shares
-            turnover = shares * (short_price + cover_price)
-            fee = max(min_commission, turnover * commission_rate)
-            new_cap = prev_cap + profit - fee
-            trades.append({
-                'short_date': short_date,
-                'cover_date': cover_date,
-                'shares': shares,
-                'short_price': round(short_price, 2),
-                'cover_price': round(cover_price, 2),
-                'fee': round(fee, 2),
-                'pnl': round(new_cap - prev_cap, 3)
-            })
-            capital = new_cap
-            position_active = False
-    # Falls noch Position offen, mit künstlichem Close abschließen
-    if position_active and artificial_close_price is not None and artificial_close_date is not None:
-        cover_price = artificial_close_price
-        cover_date = artificial_close_date
-        profit = (short_price - cover_price) * shares
-        turnover = shares * (short_price + cover_price)
-        fee = max(min_commission, turnover * commission_rate)
-        new_cap = prev_cap + profit - fee
-        trades.append({
-            'short_date': short_date,
-            'cover_date': cover_date,
-            'shares': shares,
-            'short_price': round(short_price, 2),
-            'cover_price': round(cover_price, 2),
-            'fee': round(fee, 2),
-            'pnl': round(new_cap - prev_cap, 3)
-        })
-        capital = new_cap
-    return capital, trades
+    return _simulate_signal_frame(extended_df, market_df, 'Short Action', 'Short Date detected', "short",
+                                  starting_capital, commission_rate, min_commission, round_factor,
+                                  artificial_close_price=artificial_close_price,
+                                  artificial_close_date=artificial_close_date)
 
 
 def simulate_trades_compound(signals_df, market_df, starting_capital=10000,
@@ -476,50 +499,8 @@ def simulate_trades_compound(signals_df, market_df, starting_capital=10000,
       
     Gibt das finale Kapital sowie eine Liste der Trades zurück.
     """
-    capital = starting_capital
-    position_active = False
-    trades = []
-    for _, row in signals_df.iterrows():
-        signal = row.get('Long')
-        exec_date = row.get('Long Date')
-        if pd.isna(exec_date):
-            continue
-        # Preis ermitteln und als float interpretieren:
-        if exec_date in market_df.index:
-            price = float(market_df.loc[exec_date, "Close"])
-        else:
-            idx = market_df.index.searchsorted(exec_date)
-            price = float(market_df.iloc[idx]["Close"]) if idx < len(market_df.index) else None
-        if price is None:
-            continue
-        if signal == 'buy' and not position_active:
-            shares = calculate_shares(capital, price, round_factor)
-            # Falls shares (oder ein kleiner Schwellenwert) nicht signifikant > 0 sind, überspringen.
-            if shares < 1e-6:
-                continue
-            buy_price = price
-            buy_date = exec_date
-            position_active = True
-            prev_cap = capital
-        elif signal == 'sell' and position_active:
-            sell_price = price
-            sell_date = exec_date
-            profit = (sell_price - buy_price) * shares
-            turnover = shares * (buy_price + sell_price)
-            fee = max(min_commission, turnover * commission_rate)
-            new_cap = prev_cap + profit - fee
-            trades.append({
-                'buy_date': buy_date,
-                'sell_date': sell_date,
-                'shares': shares,
-                'buy_price': round(buy_price, 2),
-                'sell_price': round(sell_price, 2),
-                'fee': round(fee, 2),
-                'pnl': round(new_cap - prev_cap, 3)
-            })
-            capital = new_cap
-            position_active = False
-    return capital, trades
+    return _simulate_signal_frame(signals_df, market_df, 'Long', 'Long Date', "long",
+                                  starting_capital, commission_rate, min_commission, round_factor)
 
 
 def simulate_short_trades_compound(signals_df, market_df, starting_capital=10000,
@@ -537,49 +518,8 @@ def simulate_short_trades_compound(signals_df, market_df, starting_capital=10000
       
     Gibt das finale Kapital und eine Liste der durchgeführten Short-Trades zurück.
     """
-    capital = starting_capital
-    position_active = False
-    trades = []
-    for _, row in signals_df.iterrows():
-        signal = row.get('Short')
-        exec_date = row.get('Short Date')
-        if pd.isna(exec_date):
-            continue
-        # Preis ermitteln als float:
-        if exec_date in market_df.index:
-            price = float(market_df.loc[exec_date, "Close"])
-        else:
-            idx = market_df.index.searchsorted(exec_date)
-            price = float(market_df.iloc[idx]["Close"]) if idx < len(market_df.index) else None
-        if price is None:
-            continue
-        if signal == 'short' and not position_active:
-            shares = calculate_shares(capital, price, round_factor)
-            if shares < 1e-6:
-                continue  # Überspringe Trade, falls keine signifikante Anzahl an Shares berechnet wurde
-            short_price = price
-            short_date = exec_date
-            position_active = True
-            prev_cap = capital
-        elif signal == 'cover' and position_active:
-            cover_price = price
-            cover_date = exec_date
-            profit = (short_price - cover_price) * shares
-            turnover = shares * (short_price + cover_price)
-            fee = max(min_commission, turnover * commission_rate)
-            new_cap = prev_cap + profit - fee
-            trades.append({
-                'short_date': short_date,
-                'cover_date': cover_date,
-                'shares': shares,
-                'short_price': round(short_price, 2),
-                'cover_price': round(cover_price, 2),
-                'fee': round(fee, 2),
-                'pnl': round(new_cap - prev_cap, 3)
-            })
-            capital = new_cap
-            position_active = False
-    return capital, trades
+    return _simulate_signal_frame(signals_df, market_df, 'Short', 'Short Date', "short",
+                                  starting_capital, commission_rate, min_commission, round_factor)
 
 
 
@@ -1122,7 +1062,8 @@ def get_today_minute_data(ib, contract):
     df = df[(df.index >= today) & (df.index <= end_time)]
     return df
 
-def trading_multi(ib):
+def trading_multi(ib, prices=None):
+    """prices: optional {ticker: (last, bid, ask)}, z.B. parallel vorab geholt (get_realtime_prices_async)."""
     print("=== Trading-Testlauf für Datum:", pd.Timestamp.now(tz=ZoneInfo("America/New_York")).normalize())
     for ticker, config in tickers.items():
         print(f"\n--- {ticker}: Starte Trading-Check ---")
@@ -1152,7 +1093,10 @@ def trading_multi(ib):
 
         # Realtime-Kurs von IB holen (mit Fallback auf Yahoo)
         print(f"{ticker}: Fordere Realtime-Kurs an ...")
-        last_price, bid, ask = get_realtime_price(ticker, contract, ib)
+        if prices and ticker in prices:
+            last_price, bid, ask = prices[ticker]
+        else:
+            last_price, bid, ask = get_realtime_price(ticker, contract, ib)
         print(f"{ticker}: Realtime-Kurse (inkl. Fallback): Last={last_price}, Bid={bid}, Ask={ask}")
 
         if last_price is None or last_price <= 0 or (hasattr(last_price, 'isnan') and last_price.isnan()):
@@ -1260,7 +1204,10 @@ def trading_multi(ib):
 
         # Realtime-Kurs von IB holen (mit Fallback auf Yahoo)
         print(f"{ticker}: Fordere Realtime-Kurs an ...")
-        last_price, bid, ask = get_realtime_price(ticker, contract, ib)
+        if prices and ticker in prices:
+            last_price, bid, ask = prices[ticker]
+        else:
+            last_price, bid, ask = get_realtime_price(ticker, contract, ib)
         print(f"{ticker}: Realtime-Kurse (inkl. Fallback): Last={last_price}, Bid={bid}, Ask={ask}")
 
         if last_price is None or last_price <= 0 or (hasattr(last_price, 'isnan') and last_price.isnan()):
@@ -1354,156 +1301,324 @@ def daytrading_multi(ib, intervals=["5 mins", "15 mins", "30 mins", "1 hour"], d
     """
     Lädt und speichert OHLCV-Daten für verschiedene Zeitintervalle für alle Ticker.
     Nutzt für das letzte Intervall den aktuellen Realtime-Kurs von IB (mit YF-Fallback).
+    Alle (Ticker, Intervall)-Abrufe und die Realtime-Kurse laufen parallel.
     """
-    for ticker, config in tickers.items():
-        contract = Stock(config["symbol"], "SMART", "USD")
-        for interval in intervals:
-            # IB-Parameter
-            bar_size = interval
-            duration = f"{days_back} D"
-            print(f"\n[{ticker}] Lade {bar_size} Daten für {duration} ...")
-            bars = ib.reqHistoricalData(
-                contract,
-                endDateTime="",
-                durationStr=duration,
-                barSizeSetting=bar_size,
-                whatToShow="TRADES",
-                useRTH=True
-            )
-            df = pd.DataFrame(bars)
-            if df.empty:
-                print(f"Keine Daten für {ticker} ({bar_size}) erhalten.")
-                continue
-            df['date'] = pd.to_datetime(df['date'])
-            df.set_index('date', inplace=True)
-            # Einheitliche Spaltennamen
-            df.rename(columns={"open": "Open", "high": "High", "low": "Low", "close": "Close", "volume": "Volume"}, inplace=True)
-            # Speichern
-            fname = f"{ticker}_{bar_size.replace(' ', '').replace('hour','h').replace('min','m')}.csv"
-            df.to_csv(fname)
-            print(f"Gespeichert: {fname} ({len(df)} Zeilen)")
-
-            # --- NEU: Realtime-Kurs für das aktuelle Intervall holen ---
-            last_price, bid, ask = get_realtime_price(ticker, contract, ib)
-            print(f"{ticker} ({interval}): Realtime-Kurse: Last={last_price}, Bid={bid}, Ask={ask}")
-
-            # Intervall-String für Signalzuordnung anpassen
-            interval_str = (
-                bar_size.replace(" ", "")
-                        .replace("mins", "min")
-                        .replace("min", "min")
-                        .replace("hour", "h")
-            )
-            # Beispiel: Berechne Support/Resistance und Signale
-            if len(df) > 10:
-                best_p_long, best_tw_long = berechne_best_p_tw_long(df, config, backtesting_begin, backtesting_end)
-                best_sup_long, best_res_long = calculate_support_resistance(df, best_p_long, best_tw_long)
-                sig_long = assign_long_signals(best_sup_long, best_res_long, df, best_tw_long, interval_str)
-                best_p_short, best_tw_short = berechne_best_p_tw_short(df, config, backtesting_begin, backtesting_end)
-                best_sup_short, best_res_short = calculate_support_resistance(df, best_p_short, best_tw_short)
-                sig_short = assign_short_signals(best_sup_short, best_res_short, df, best_tw_short, interval_str)
-
-                print(f"Long-Signale ({bar_size}):\n", sig_long.tail(3))
-                print(f"Short-Signale ({bar_size}):\n", sig_short.tail(3))
-                
-
-def wait_and_trade_at_1540(ib):
-    print("Warte auf 15:45 New York Zeit für Trading ... (Beenden mit STRG+C)")
-    while True:
-        now = datetime.datetime.now(ZoneInfo("America/New_York"))
-        # Prüfe, ob es 15:40 <= jetzt < 15:50 ist (Trading-Fenster)
-        if now.hour == 15 and 45 <= now.minute < 50 :
-            print(f"{now.strftime('%Y-%m-%d %H:%M:%S')} NY: Starte Trading!")
-            trading_multi(ib)
-            # Warte bis nach 15:45, damit nicht mehrfach getradet wird
-            while True:
-                now2 = datetime.datetime.now(ZoneInfo("America/New_York"))
-                if now2.minute >= 49 or now2.hour > 15:
-                    break
-                time.sleep(10)
-            print("Trading abgeschlossen, warte auf nächsten Tag ...")
-        else:
-            # Noch nicht im Trading-Fenster, warte 30 Sekunden
-            time.sleep(30)
+    return ib.run(daytrading_multi_async(ib, intervals, days_back))
+
+async def daytrading_multi_async(ib, intervals=["5 mins", "15 mins", "30 mins", "1 hour"], days_back=10):
+    contracts = ib_contracts()
+    jobs = [(ticker, interval) for ticker in contracts for interval in intervals]
+    duration = f"{days_back} D"
+    print(f"\nLade {len(jobs)} Datensätze ({', '.join(intervals)}) für {duration} parallel ...")
+    frames, prices = await asyncio.gather(
+        asyncio.gather(*(fetch_bars_async(ib, contracts[ticker], interval, duration) for ticker, interval in jobs),
+                       return_exceptions=True),
+        get_realtime_prices_async(ib, contracts),
+    )
+    loaded = {}
+    for (ticker, bar_size), df in zip(jobs, frames):
+        config = tickers[ticker]
+        if isinstance(df, Exception):
+            print(f"Fehler beim Laden von {ticker} ({bar_size}): {df}")
+            continue
+        if df.empty:
+            print(f"Keine Daten für {ticker} ({bar_size}) erhalten.")
+            continue
+        loaded[(ticker, bar_size)] = df
+        # Speichern
+        fname = f"{ticker}_{bar_size.replace(' ', '').replace('hour','h').replace('min','m')}.csv"
+        df.to_csv(fname)
+        print(f"Gespeichert: {fname} ({len(df)} Zeilen)")
+
+        last_price, bid, ask = prices.get(ticker, (None, None, None))
+        print(f"{ticker} ({bar_size}): Realtime-Kurse: Last={last_price}, Bid={bid}, Ask={ask}")
+
+        # Beispiel: Berechne Support/Resistance und Signale
+        if len(df) > 10:
+            sig_long, sig_short = evaluate_interval_signals(df, config, interval_label(bar_size))
+            print(f"Long-Signale ({bar_size}):\n", sig_long.tail(3))
+            print(f"Short-Signale ({bar_size}):\n", sig_short.tail(3))
+    return loaded
+
+def wait_and_trade_at_1540(ib, order_time="15:45"):
+    print(f"Warte auf {order_time} New York Zeit für Trading ... (Beenden mit STRG+C)")
+    util.patchAsyncio()  # trading_multi nutzt synchrone IB-Aufrufe innerhalb des Event-Loops
+    try:
+        ib.run(eod_trading_worker(ib, ib_contracts(), order_time))
+    except KeyboardInterrupt:
+        print("Trading beendet.")
 
 def live_trading_loop(ib, intervals=["5 mins", "15 mins", "30 mins", "1 hour"], order_time="15:45"):
     """
-    Hält die IB-Verbindung offen und prüft regelmäßig, ob ein neues Intervall abgeschlossen ist
-    oder ob es Zeit für die End-of-Day-Order ist. Holt dann Daten und platziert ggf. Orders.
+    Hält die IB-Verbindung offen und wertet jedes Intervall genau zum Bar-Close aus
+    (asyncio, ein Task pro Intervall); End-of-Day-Orders zur order_time.
     """
     print("Starte Live-Trading-Loop. Beende mit STRG+C.")
-    last_checked = {ticker: {iv: None for iv in intervals} for ticker in tickers}
+    util.patchAsyncio()
     try:
-        while True:
-            now = datetime.datetime.now(ZoneInfo("America/New_York"))
-            # --- End-of-Day-Trading um 15:50 ---
-            if now.strftime("%H:%M") == order_time:
-                print(f"\n[{now.strftime('%H:%M')}] Prüfe End-of-Day-Trading ...")
-                trading_multi(ib)
-                time.sleep(60)  # Warte eine Minute, um Doppel-Orders zu vermeiden
-
-            # --- Daytrading für alle Intervalle ---
-            for ticker, config in tickers.items():
-                contract = Stock(config["symbol"], "SMART", "USD")
-                for interval in intervals:
-                    # Prüfe, ob ein neues Intervall abgeschlossen ist
-                    if interval.endswith("mins"):
-                        interv_min = int(interval.split()[0])
-                        if now.minute % interv_min == 0 and (last_checked[ticker][interval] != now.replace(second=0, microsecond=0)):
-                            print(f"\n[{now.strftime('%H:%M')}] {ticker}: Prüfe {interval} Intervall ...")
-                            bars = ib.reqHistoricalData(
-                                contract,
-                                endDateTime="",
-                                durationStr="2 D",
-                                barSizeSetting=interval,
-                                whatToShow="TRADES",
-                                useRTH=True
-                            )
-                            df = pd.DataFrame(bars)
-                            if not df.empty:
-                                df['date'] = pd.to_datetime(df['date'])
-                                df.set_index('date', inplace=True)
-                                df.rename(columns={"open": "Open", "high": "High", "low": "Low", "close": "Close", "volume": "Volume"}, inplace=True)
-                                best_p_long, best_tw_long = berechne_best_p_tw_long(df, config, backtesting_begin, backtesting_end)
-                                best_sup_long, best_res_long = calculate_support_resistance(df, best_p_long, best_tw_long)
-                                sig_long = assign_long_signals(best_sup_long, best_res_long, df, best_tw_long, replace(" ", ""))
-                                best_p_short, best_tw_short = berechne_best_p_tw_short(df, config, backtesting_begin, backtesting_end)
-                                best_sup_short, best_res_short = calculate_support_resistance(df, best_p_short, best_tw_short)
-                                sig_short = assign_short_signals(best_sup_short, best_res_short, df, best_tw_short, replace(" ", ""))
-
-                                print(f"Long-Signale ({interval}):\n", sig_long.tail(1))
-                                print(f"Short-Signale ({interval}):\n", sig_short.tail(1))
-                            last_checked[ticker][interval] = now.replace(second=0, microsecond=0)
-                    elif interval.endswith("hour"):
-                        if now.minute == 0 and (last_checked[ticker][interval] != now.replace(second=0, microsecond=0)):
-                            print(f"\n[{now.strftime('%H:%M')}] {ticker}: Prüfe {interval} Intervall ...")
-                            bars = ib.reqHistoricalData(
-                                contract,
-                                endDateTime="",
-                                durationStr="2 D",
-                                barSizeSetting=interval,
-                                whatToShow="TRADES",
-                                useRTH=True
-                            )
-                            df = pd.DataFrame(bars)
-                            if not df.empty:
-                                df['date'] = pd.to_datetime(df['date'])
-                                df.set_index('date', inplace=True)
-                                df.rename(columns={"open": "Open", "high": "High", "low": "Low", "close": "Close", "volume": "Volume"}, inplace=True)
-                                best_p_long, best_tw_long = berechne_best_p_tw_long(df, config, backtesting_begin, backtesting_end)
-                                best_sup_long, best_res_long = calculate_support_resistance(df, best_p_long, best_tw_long)
-                                sig_long = assign_long_signals(best_sup_long, best_res_long, df, best_tw_long, replace(" ", ""))
-                                best_p_short, best_tw_short = berechne_best_p_tw_short(df, config, backtesting_begin, backtesting_end)
-                                best_sup_short, best_res_short = calculate_support_resistance(df, best_p_short, best_tw_short)
-                                sig_short = assign_short_signals(best_sup_short, best_res_short, df, best_tw_short, replace(" ", ""))
-                                print(f"Long-Signale ({interval}):\n", sig_long.tail(1))
-                                print(f"Short-Signale ({interval}):\n", sig_short.tail(1))
-                            last_checked[ticker][interval] = now.replace(second=0, microsecond=0)
-            time.sleep(30)  # Prüfe alle 30 Sekunden
+        ib.run(live_trading_async(ib, intervals, order_time))
     except KeyboardInterrupt:
         print("Live-Trading-Loop beendet.")
         ib.disconnect()
 
+# =============================================================================
+# Async-Scheduler: Auswertung exakt zum Bar-Close, Marktdaten parallel
+# =============================================================================
+NY_TZ = ZoneInfo("America/New_York")
+BAR_CLOSE_DELAY = 2.0          # Sekunden nach Bar-Close, bis IB den Bar abgeschlossen liefert
+TRADING_WINDOW_MINUTES = 5     # verspäteter Start innerhalb des Order-Fensters tradet sofort
+RTH_OPEN = datetime.time(9, 30)
+RTH_CLOSE = datetime.time(16, 0)
+
+def ib_contracts():
+    return {ticker: Stock(config["symbol"], "SMART", "USD") for ticker, config in tickers.items()}
+
+def interval_minutes(interval):
+    """'5 mins' -> 5, '1 hour' -> 60"""
+    value, unit = interval.split()[:2]
+    return int(value) * (60 if unit.startswith("hour") else 1)
+
+def interval_label(interval):
+    """Intervall-String für Signalzuordnung: '5 mins' -> '5min', '1 hour' -> '1h'"""
+    return interval.replace(" ", "").replace("mins", "min").replace("hour", "h")
+
+def next_bar_close(now, interval):
+    """Nächste Bar-Grenze nach now (Bars sind an Mitternacht ausgerichtet)."""
+    minutes = interval_minutes(interval)
+    midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    elapsed = (now - midnight).total_seconds() / 60
+    return midnight + datetime.timedelta(minutes=(int(elapsed // minutes) + 1) * minutes)
+
+def next_order_time(now, order_time="15:45"):
+    """Nächster Order-Zeitpunkt; innerhalb des laufenden Fensters ist das heute."""
+    hour, minute = map(int, order_time.split(":"))
+    target = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if now >= target + datetime.timedelta(minutes=TRADING_WINDOW_MINUTES):
+        target += datetime.timedelta(days=1)
+    return target
+
+def is_rth_bar_close(ts):
+    return RTH_OPEN < ts.time() <= RTH_CLOSE and is_trading_day(pd.Timestamp(ts.date()))
+
+async def sleep_until(target):
+    delay = (target - datetime.datetime.now(target.tzinfo)).total_seconds()
+    if delay > 0:
+        await asyncio.sleep(delay)
+
+def bars_to_df(bars):
+    df = pd.DataFrame(bars)
+    if df.empty:
+        return df
+    df['date'] = pd.to_datetime(df['date'])
+    df.set_index('date', inplace=True)
+    # Einheitliche Spaltennamen
+    df.rename(columns={"open": "Open", "high": "High", "low": "Low", "close": "Close", "volume": "Volume"}, inplace=True)
+    return df
+
+async def fetch_bars_async(ib, contract, interval, duration="2 D"):
+    bars = await ib.reqHistoricalDataAsync(
+        contract,
+        endDateTime="",
+        durationStr=duration,
+        barSizeSetting=interval,
+        whatToShow="TRADES",
+        useRTH=True
+    )
+    return bars_to_df(bars)
+
+async def get_realtime_prices_async(ib, contracts):
+    """
+    {ticker: contract} -> {ticker: (last, bid, ask)}.
+    Ein Snapshot-Request für alle Contracts, fehlende Kurse parallel über Yahoo.
+    """
+    prices = {}
+    try:
+        snapshots = await ib.reqTickersAsync(*contracts.values())
+        for ticker, data in zip(contracts, snapshots):
+            last = data.last
+            if last is not None and not math.isnan(last):
+                prices[ticker] = (float(last), float(data.bid), float(data.ask))
+    except Exception as e:
+        print(f"IB Preisfehler (Snapshot): {e}")
+    missing = [ticker for ticker in contracts if ticker not in prices]
+    if missing:
+        fallback = await asyncio.gather(*(asyncio.to_thread(get_yf_price, ticker) for ticker in missing),
+                                        return_exceptions=True)
+        for ticker, result in zip(missing, fallback):
+            if isinstance(result, Exception):
+                print(f"YF Preisfehler für {ticker}: {result}")
+                result = (None, None, None)
+            prices[ticker] = result
+    return prices
+
+def evaluate_interval_signals(df, config, interval_str):
+    best_p_long, best_tw_long = berechne_best_p_tw_long(df, config, backtesting_begin, backtesting_end)
+    best_sup_long, best_res_long = calculate_support_resistance(df, best_p_long, best_tw_long)
+    sig_long = assign_long_signals(best_sup_long, best_res_long, df, best_tw_long, interval_str)
+    best_p_short, best_tw_short = berechne_best_p_tw_short(df, config, backtesting_begin, backtesting_end)
+    best_sup_short, best_res_short = calculate_support_resistance(df, best_p_short, best_tw_short)
+    sig_short = assign_short_signals(best_sup_short, best_res_short, df, best_tw_short, interval_str)
+    return sig_long, sig_short
+
+async def on_bar_close(ib, ticker, contract, interval):
+    """Holt den gerade geschlossenen Bar und wertet die Signale aus (Rechnung im Thread, Loop bleibt frei)."""
+    df = await fetch_bars_async(ib, contract, interval, "2 D")
+    if df.empty:
+        print(f"Keine Daten für {ticker} ({interval}) erhalten.")
+        return None
+    sig_long, sig_short = await asyncio.to_thread(evaluate_interval_signals, df, tickers[ticker], interval_label(interval))
+    print(f"Long-Signale {ticker} ({interval}):\n", sig_long.tail(1))
+    print(f"Short-Signale {ticker} ({interval}):\n", sig_short.tail(1))
+    return sig_long, sig_short
+
+async def bar_close_worker(ib, interval, contracts):
+    """Schläft bis zum nächsten Bar-Close des Intervalls und wertet dann alle Ticker parallel aus."""
+    while True:
+        close = next_bar_close(datetime.datetime.now(NY_TZ), interval)
+        await sleep_until(close + datetime.timedelta(seconds=BAR_CLOSE_DELAY))
+        if not is_rth_bar_close(close):
+            continue
+        print(f"\n[{close.strftime('%H:%M')}] Bar-Close {interval}: werte {len(contracts)} Ticker aus ...")
+        results = await asyncio.gather(*(on_bar_close(ib, ticker, contract, interval) for ticker, contract in contracts.items()),
+                                       return_exceptions=True)
+        for ticker, result in zip(contracts, results):
+            if isinstance(result, Exception):
+                print(f"Fehler bei {ticker} ({interval}): {result}")
+
+async def eod_trading_worker(ib, contracts, order_time="15:45"):
+    """End-of-Day-Trading: Kurse aller Contracts parallel holen, dann trading_multi."""
+    while True:
+        target = next_order_time(datetime.datetime.now(NY_TZ), order_time)
+        await sleep_until(target)
+        now = datetime.datetime.now(NY_TZ)
+        print(f"{now.strftime('%Y-%m-%d %H:%M:%S')} NY: Starte Trading!")
+        prices = await get_realtime_prices_async(ib, contracts)
+        trading_multi(ib, prices=prices)
+        print("Trading abgeschlossen, warte auf nächsten Tag ...")
+        # Nicht mehrfach im selben Fenster traden
+        await sleep_until(target + datetime.timedelta(minutes=TRADING_WINDOW_MINUTES))
+
+async def live_trading_async(ib, intervals=["5 mins", "15 mins", "30 mins", "1 hour"], order_time="15:45"):
+    contracts = ib_contracts()
+    tasks = [asyncio.ensure_future(bar_close_worker(ib, interval, contracts)) for interval in intervals]
+    tasks.append(asyncio.ensure_future(eod_trading_worker(ib, contracts, order_time)))
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+
+# =============================================================================
+# Multi-Timeframe-Backtest: (Ticker x Intervall)-Matrix
+# =============================================================================
+MTF_INTERVALS = ["5 mins", "15 mins", "30 mins", "1 hour", "1 day"]
+MTF_DURATIONS = {"5 mins": "10 D", "15 mins": "20 D", "30 mins": "30 D", "1 hour": "60 D", "1 day": "2 Y"}
+MTF_RESULT_FILE = "multi_timeframe_matrix.csv"
+
+async def load_timeframe_frames_async(ib, intervals=MTF_INTERVALS, durations=MTF_DURATIONS):
+    """Lädt alle (Ticker, Intervall)-Frames parallel -> {(ticker, interval): df}."""
+    contracts = ib_contracts()
+    jobs = [(ticker, interval) for ticker in contracts for interval in intervals]
+    print(f"\nLade {len(jobs)} Datensätze für die Timeframe-Matrix parallel ...")
+    frames = await asyncio.gather(*(fetch_bars_async(ib, contracts[ticker], interval, durations.get(interval, "10 D"))
+                                    for ticker, interval in jobs), return_exceptions=True)
+    loaded = {}
+    for job, df in zip(jobs, frames):
+        if isinstance(df, Exception):
+            print(f"Fehler beim Laden von {job[0]} ({job[1]}): {df}")
+        elif df.empty:
+            print(f"Keine Daten für {job[0]} ({job[1]}) erhalten.")
+        else:
+            loaded[job] = df
+    return loaded
+
+def trades_max_drawdown(trades, starting_capital):
+    """Maximaler Drawdown (%) der Kapitalkurve nach jedem abgeschlossenen Trade."""
+    equity = starting_capital + np.cumsum([0.0] + [t["pnl"] for t in trades])
+    peaks = np.maximum.accumulate(equity)
+    return float(((peaks - equity) / peaks).max() * 100) if len(equity) else 0.0
+
+def backtest_timeframe_cell(ticker, interval, df, config):
+    """Eine Matrix-Zelle: optimierte p/tw (Long + Short) und Ergebnis über den gesamten Frame."""
+    label = interval_label(interval)
+    row = {"ticker": ticker, "interval": interval, "bars": len(df),
+           "start": df.index.min(), "end": df.index.max()}
+    sides = [("long", "initialCapitalLong", berechne_best_p_tw_long, assign_long_signals, simulate_trades_compound),
+             ("short", "initialCapitalShort", berechne_best_p_tw_short, assign_short_signals, simulate_short_trades_compound)]
+    for side, capital_key, optimize, assign, simulate in sides:
+        if not config.get(side, True):
+            continue
+        starting_capital = config.get(capital_key, 10000)
+        p, tw = optimize(df, config, backtesting_begin, backtesting_end)
+        supp, res = calculate_support_resistance(df, p, tw)
+        signals = assign(supp, res, df, tw, label)
+        final_cap, trades = simulate(
+            signals, df,
+            starting_capital=starting_capital,
+            commission_rate=COMMISSION_RATE,
+            min_commission=MIN_COMMISSION,
+            round_factor=config.get("order_round_factor", ORDER_ROUND_FACTOR)
+        )
+        row.update({
+            f"{side}_p": p,
+            f"{side}_tw": tw,
+            f"{side}_final_cap": round(final_cap, 2),
+            f"{side}_return_pct": round((final_cap / starting_capital - 1) * 100, 2),
+            f"{side}_max_dd_pct": round(trades_max_drawdown(trades, starting_capital), 2),
+            f"{side}_trades": len(trades),
+        })
+    return row
+
+def _timeframe_cell_worker(args):
+    ticker, interval, df, config = args
+    try:
+        return backtest_timeframe_cell(ticker, interval, df, config)
+    except Exception as e:
+        return {"ticker": ticker, "interval": interval, "bars": len(df), "error": str(e)}
+
+def run_timeframe_matrix(frames, max_workers=None, result_file=MTF_RESULT_FILE):
+    """
+    Backtestet alle geladenen (Ticker, Intervall)-Frames parallel (ein Prozess pro Zelle)
+    und schreibt die konsolidierte Ergebnistabelle.
+    """
+    jobs = [(ticker, interval, df, tickers[ticker]) for (ticker, interval), df in frames.items()]
+    if not jobs:
+        print("Keine Daten für die Timeframe-Matrix.")
+        return pd.DataFrame()
+    if max_workers == 1:
+        rows = [_timeframe_cell_worker(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            rows = list(pool.map(_timeframe_cell_worker, jobs))
+    matrix = pd.DataFrame(rows)
+    order = {interval: i for i, interval in enumerate(MTF_INTERVALS)}
+    matrix["_order"] = matrix["interval"].map(order)
+    matrix = matrix.sort_values(["ticker", "_order"]).drop(columns="_order").reset_index(drop=True)
+    if result_file:
+        matrix.to_csv(result_file, index=False)
+        print(f"Timeframe-Matrix gespeichert: {result_file} ({len(matrix)} Zellen)")
+    print_timeframe_summary(matrix)
+    return matrix
+
+def print_timeframe_summary(matrix):
+    """Bestes Intervall pro Ticker (nach Rendite) für Long und Short."""
+    for side in ["long", "short"]:
+        column = f"{side}_return_pct"
+        if column not in matrix.columns:
+            continue
+        valid = matrix.dropna(subset=[column])
+        if valid.empty:
+            continue
+        print(f"\nBestes Intervall ({side.capitalize()}):")
+        for ticker, group in valid.groupby("ticker"):
+            best = group.loc[group[column].idxmax()]
+            print(f"  {ticker:8} {best['interval']:8} p={int(best[f'{side}_p'])}, tw={int(best[f'{side}_tw'])}, "
+                  f"Rendite={best[column]:.2f}%, MaxDD={best[f'{side}_max_dd_pct']:.2f}%, Trades={int(best[f'{side}_trades'])}")
+
+def timeframe_matrix_multi(ib, intervals=MTF_INTERVALS, max_workers=None):
+    frames = ib.run(load_timeframe_frames_async(ib, intervals))
+    return run_timeframe_matrix(frames, max_workers=max_workers)
+
 def download_ib_minute_data(ib, symbol, exchange, currency, date, end_time="15:45:00", n_bars=100, filename=None):
     """
     Lädt n_bars Minutendaten für ein Symbol bis zu einer bestimmten Uhrzeit an einem Tag.
@@ -1714,51 +1829,83 @@ def get_backtesting_slice(df, backtesting_begin=0, backtesting_end=50):
     end_idx = int(n * backtesting_end / 100)
     return df.iloc[start_idx:end_idx]
 
-def berechne_best_p_tw_long(df, config, backtesting_begin=0, backtesting_end=50):
+LONG_P_RANGE = range(3, 10)
+LONG_TW_RANGE = range(1, 6)
+SHORT_TW_RANGE = range(1, 4)
+_long_short_cache = {}
+_long_short_cache_lock = threading.Lock()   # to_thread-Worker (evaluate_interval_signals) teilen den Cache
+
+def _long_short_cache_key(df_opt, config, sides):
+    digest = pd.util.hash_pandas_object(df_opt["Close"], index=True).sum()
+    return (int(digest), len(df_opt), config.get("initialCapitalLong"), config.get("initialCapitalShort"),
+            config.get("order_round_factor", ORDER_ROUND_FACTOR), COMMISSION_RATE, MIN_COMMISSION, sides)
+
+def berechne_best_p_tw_long_short(df, config, backtesting_begin=0, backtesting_end=50, sides=("long", "short")):
+    """
+    Optimiert Long und Short gemeinsam: Extrema pro (p, tw) nur einmal, beide Richtungen in
+    einem Durchlauf (simulate_long_short_levels). Ergebnis wird pro Datensatz gecacht, damit
+    berechne_best_p_tw_long/_short direkt hintereinander nur einmal rechnen.
+    Gibt ein Dict mit best_p/best_tw/final_cap je Seite, combined_final_cap und den Ergebnistabellen zurück.
+    """
     df_opt = get_backtesting_slice(df, backtesting_begin, backtesting_end)
-    print(f"Optimierung Long von {df_opt.index.min().date()} bis {df_opt.index.max().date()} "
+    sides = tuple(sides)
+    key = _long_short_cache_key(df_opt, config, sides)
+    with _long_short_cache_lock:
+        cached = _long_short_cache.get(key)
+    if cached is not None:
+        return cached
+    print(f"Optimierung {'/'.join(side.capitalize() for side in sides)} von {df_opt.index.min().date()} bis {df_opt.index.max().date()} "
           f"({len(df_opt)} Zeilen, {backtesting_begin}% bis {backtesting_end}% der Daten)")
-    long_results = []
-    for p in range(3, 10):
-        for tw in range(1, 6):
+    do_long, do_short = "long" in sides, "short" in sides
+    long_results, short_results = [], []
+    round_factor = config.get("order_round_factor", ORDER_ROUND_FACTOR)
+    for p in LONG_P_RANGE:
+        for tw in (LONG_TW_RANGE if do_long else SHORT_TW_RANGE):
+            with_short = do_short and tw in SHORT_TW_RANGE
             supp_temp, res_temp = calculate_support_resistance(df_opt, p, tw)
-            sig = assign_long_signals(supp_temp, res_temp, df_opt, tw, "1d")
-            cap, _ = simulate_trades_compound(
-                sig, df_opt,
-                starting_capital=config["initialCapitalLong"],
+            long_cap, _, short_cap, _ = simulate_long_short_levels(
+                supp_temp, res_temp, df_opt, tw, "1d",
+                capital_long=config.get("initialCapitalLong", 10000),
+                capital_short=config.get("initialCapitalShort", 10000),
                 commission_rate=COMMISSION_RATE,
                 min_commission=MIN_COMMISSION,
-                round_factor=config.get("order_round_factor", ORDER_ROUND_FACTOR)
+                round_factor=round_factor,
+                long=do_long,
+                short=with_short
             )
-            long_results.append({"past_window": p, "trade_window": tw, "final_cap": cap})
-    long_df = pd.DataFrame(long_results)
-    best_long = long_df.loc[long_df["final_cap"].idxmax()]
-    best_p_long = int(best_long["past_window"])
-    best_tw_long = int(best_long["trade_window"])
-    return best_p_long, best_tw_long
+            if do_long:
+                long_results.append({"past_window": p, "trade_window": tw, "final_cap": long_cap})
+            if with_short:
+                short_results.append({"past_window": p, "trade_window": tw, "final_cap": short_cap})
+
+    result = {"combined_final_cap": 0.0}
+    for side, rows in [("long", long_results), ("short", short_results)]:
+        if not rows:
+            continue
+        table = pd.DataFrame(rows)
+        best = table.loc[table["final_cap"].idxmax()]
+        result.update({
+            f"best_p_{side}": int(best["past_window"]),
+            f"best_tw_{side}": int(best["trade_window"]),
+            f"final_cap_{side}": float(best["final_cap"]),
+            f"{side}_table": table,
+        })
+        result["combined_final_cap"] += float(best["final_cap"])
+    with _long_short_cache_lock:
+        while len(_long_short_cache) >= 64:
+            _long_short_cache.pop(next(iter(_long_short_cache)))
+        _long_short_cache[key] = result
+    return result
+
+def berechne_best_p_tw_long(df, config, backtesting_begin=0, backtesting_end=50):
+    sides = ("long", "short") if config.get("short", True) and "initialCapitalShort" in config else ("long",)
+    result = berechne_best_p_tw_long_short(df, config, backtesting_begin, backtesting_end, sides)
+    return result["best_p_long"], result["best_tw_long"]
 
 def berechne_best_p_tw_short(df, config, backtesting_begin=0, backtesting_end=50):
-    df_opt = get_backtesting_slice(df, backtesting_begin, backtesting_end)
-    print(f"Optimierung Short von {df_opt.index.min().date()} bis {df_opt.index.max().date()} "
-          f"({len(df_opt)} Zeilen, {backtesting_begin}% bis {backtesting_end}% der Daten)")
-    short_results = []
-    for p in range(3, 10):
-        for tw in range(1, 4):
-            supp_temp, res_temp = calculate_support_resistance(df_opt, p, tw)
-            sig = assign_short_signals(supp_temp, res_temp, df_opt, tw, "1d")
-            cap, _ = simulate_short_trades_compound(
-                sig, df_opt,
-                starting_capital=config["initialCapitalShort"],
-                commission_rate=COMMISSION_RATE,
-                min_commission=MIN_COMMISSION,
-                round_factor=config.get("order_round_factor", ORDER_ROUND_FACTOR)
-            )
-            short_results.append({"past_window": p, "trade_window": tw, "final_cap": cap})
-    short_df = pd.DataFrame(short_results)
-    best_short = short_df.loc[short_df["final_cap"].idxmax()]
-    best_p_short = int(best_short["past_window"])
-    best_tw_short = int(best_short["trade_window"])
-    return best_p_short, best_tw_short
+    sides = ("long", "short") if config.get("long", True) and "initialCapitalLong" in config else ("short",)
+    result = berechne_best_p_tw_long_short(df, config, backtesting_begin, backtesting_end, sides)
+    return result["best_p_short"], result["best_tw_short"]
 
 # =============================================================================
 # 11. Main: Moduswahl über Kommandozeilenparameter
@@ -1767,7 +1914,7 @@ if __name__ == "__main__":
     if len(sys.argv) > 1:
         mode = sys.argv[1].lower()
     else:
-        print("Bitte 'optimalplot', 'bothbacktesting', 'trading', 'daytrading' oder 'live' als Modus angeben.")
+        print("Bitte 'optimalplot', 'bothbacktesting', 'trading', 'daytrading', 'timeframes' oder 'live' als Modus angeben.")
         sys.exit(1)
     
     ib = IB()
@@ -1786,15 +1933,19 @@ if __name__ == "__main__":
         #trading_multi(ib)
         wait_and_trade_at_1540(ib)
     elif mode == "daytrading":
-        #intervals = sys.argv[2:] if len(sys.argv) > 2 else ["5 mins", "15 mins", "30 mins", "1 hour"]
+        intervals = sys.argv[2:] if len(sys.argv) > 2 else ["5 mins", "15 mins", "30 mins", "1 hour"]
         daytrading_multi(ib, intervals=intervals)
         print("Daytrading abgeschlossen. Verbindung bleibt bestehen. Beenden mit STRG+C.")
         while True:
             time.sleep(60)
+    elif mode == "timeframes":
+        intervals = sys.argv[2:] if len(sys.argv) > 2 else MTF_INTERVALS
+        timeframe_matrix_multi(ib, intervals=intervals)
+        ib.disconnect()
     elif mode == "live":
         intervals = sys.argv[2:] if len(sys.argv) > 2 else ["5 mins", "15 mins", "30 mins", "1 hour"]
         live_trading_loop(ib, intervals=intervals)
         # KEIN ib.disconnect() hier!
     else:
-        print("Unbekannter Modus. Bitte 'optimalplot', 'bothbacktesting', 'trading', 'daytrading' oder 'live' angeben.")
+        print("Unbekannter Modus. Bitte 'optimalplot', 'bothbacktesting', 'trading', 'daytrading', 'timeframes' oder 'live' angeben.")
         ib.disconnect()
\ No newline at end of file
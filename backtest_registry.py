@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+In-Process-Registry für Backtest-Ergebnisse
+- run_backtest / run_live_backtest_analysis tragen ihre Ergebnisse ein
+- SignalTransmitter, LiveStrategyPaperTrader und DailyOpeningTrader lesen sie
+  über crypto_backtesting_module.get_backtest_result statt erneut zu rechnen
+- Key: Symbol + Backtest-Parameter; ein Eintrag gilt nur, solange die
+  Datensatz-Signatur (price_store.dataset_signature) übereinstimmt
+- Ergebnisse werden geteilt, nicht kopiert: Konsumenten dürfen sie nicht verändern
+"""
+
+import os
+import json
+import threading
+
+import config as _cfg
+
+_registry = {}
+_lock = threading.Lock()
+
+
+def backtest_params_key(config):
+    """Alle Parameter, die das Ergebnis von run_backtest bestimmen (außer den Daten)."""
+    params = {
+        "initialCapitalLong": config.get("initialCapitalLong", 10000),
+        "trade_on": str(config.get("trade_on", "close")).lower(),
+        "order_round_factor": config.get("order_round_factor", 0.01),
+        "commission_rate": config.get("commission_rate", 0.0018),
+        "backtest_years": _cfg.backtest_years,
+        "backtesting_begin": _cfg.backtesting_begin,
+        "backtesting_end": _cfg.backtesting_end,
+        "stable": os.environ.get("STABLE_BACKTEST", "0") == "1",
+    }
+    return json.dumps(params, sort_keys=True, default=str)
+
+
+def register_backtest_result(symbol, config, result):
+    """Trägt ein erfolgreiches Ergebnis ein (ersetzt ältere Datensätze desselben Symbols/Parameter)."""
+    if not isinstance(result, dict) or not result.get("success") or not result.get("dataset_signature"):
+        return False
+    with _lock:
+        _registry[(symbol, backtest_params_key(config))] = (result["dataset_signature"], result)
+    return True
+
+
+def lookup_backtest_result(symbol, config, signature):
+    """Ergebnis für Symbol/Parameter, falls es mit diesem Datensatz berechnet wurde, sonst None."""
+    with _lock:
+        entry = _registry.get((symbol, backtest_params_key(config)))
+    if entry is None or entry[0] != signature:
+        return None
+    return entry[1]
+
+
+def clear_backtest_registry():
+    with _lock:
+        _registry.clear()
+
+
+def registry_size():
+    with _lock:
+        return len(_registry)
@@ -7,6 +7,7 @@ Verbindet das Crypto Trading Framework mit Bitpanda Fusion Paper Trading
 import sys
 import os
 import json
+import itertools
 import requests
 import time
 import pandas as pd
@@ -18,6 +19,8 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from crypto_tickers import crypto_tickers
 from crypto_backtesting_module import run_backtest
+from price_feed import get_price_feed
+from trade_ledger import get_trade_ledger
 
 class BitpandaFusionPaperTrader:
     """
@@ -48,6 +51,13 @@ class BitpandaFusionPaperTrader:
         
         # Trade History für Reports
         self.trade_history = []
+        self._order_seq = itertools.count(1)
+        
+        # Optional: lokale Matching-Engine (paper_execution.PaperExecutionSimulator)
+        self.execution_simulator = None
+        
+        # Append-only Journal aller Fills (trade_ledger.TradeLedger)
+        self.ledger = get_trade_ledger()
         
         print(f"🎯 Bitpanda Fusion Paper Trading initialisiert")
         print(f"💰 Startkapital: €{self.paper_portfolio['EUR']:,.2f}")
@@ -247,29 +257,28 @@ class BitpandaFusionPaperTrader:
         """
         Hole aktuelle Marktpreise von Bitpanda
         Fallback auf Yahoo Finance wenn API nicht verfügbar
+        Ticker ohne Preis im Feed fehlen im Ergebnis (kein 0.0-Preis)
         """
         prices = {}
         
-        for ticker_name, config in crypto_tickers.items():
-            symbol = config['symbol']
-            
-            try:
-                # Versuche Bitpanda API (simuliert für Paper Trading)
-                if self.sandbox:
-                    # Paper Trading: Verwende Yahoo Finance als Proxy
-                    import yfinance as yf
-                    ticker = yf.Ticker(symbol)
-                    hist = ticker.history(period="1d", interval="1m")
-                    if not hist.empty:
-                        prices[ticker_name] = float(hist['Close'].iloc[-1])
-                        print(f"   📈 {ticker_name}: €{prices[ticker_name]:.4f}")
-                else:
-                    # Live API Call würde hier stehen
-                    pass
-                    
-            except Exception as e:
-                print(f"   ⚠️ Fehler beim Abrufen von {ticker_name}: {e}")
-                prices[ticker_name] = 0.0
+        if not self.sandbox:
+            # Live API Call würde hier stehen
+            return prices
+        
+        # Paper Trading: Verwende Yahoo Finance als Proxy (ein Abruf für alle Ticker)
+        symbols = {config['symbol']: ticker_name for ticker_name, config in crypto_tickers.items()}
+        try:
+            quotes = get_price_feed().prices(list(symbols))
+        except Exception as e:
+            print(f"   ⚠️ Fehler beim Abrufen der Preise: {e}")
+            quotes = {}
+        
+        for symbol, ticker_name in symbols.items():
+            if symbol in quotes:
+                prices[ticker_name] = quotes[symbol]
+                print(f"   📈 {ticker_name}: €{prices[ticker_name]:.4f}")
+            else:
+                print(f"   ⚠️ Fehler beim Abrufen von {ticker_name}: keine Daten")
         
         return prices
     
@@ -287,7 +296,7 @@ class BitpandaFusionPaperTrader:
         return position_capital
     
     def place_paper_order(self, ticker_name: str, action: str, quantity: float, 
-                         price: float, order_type: str = "LIMIT") -> Dict[str, Any]:
+                         price: float, order_type: str = "LIMIT", timestamp=None) -> Dict[str, Any]:
         """
         Simuliere Order-Platzierung für Paper Trading
         
@@ -297,28 +306,101 @@ class BitpandaFusionPaperTrader:
             quantity: Menge in EUR
             price: Limit-Preis
             order_type: "LIMIT" oder "MARKET"
+            timestamp: Orderzeitpunkt (Replay mit execution_simulator), None = jetzt
         """
-        order_id = f"PAPER_{int(time.time())}_{ticker_name}_{action}"
-        timestamp = datetime.now()
-        
-        # Berechne tatsächliche Coin-Menge
-        config = crypto_tickers[ticker_name]
-        round_factor = config['order_round_factor']
-        coin_quantity = quantity / price
-        coin_quantity = round(coin_quantity / round_factor) * round_factor
+        return self.place_paper_orders([{
+            'ticker_name': ticker_name, 'action': action, 'quantity': quantity,
+            'price': price, 'order_type': order_type, 'timestamp': timestamp,
+        }])[0]
+    
+    def place_paper_orders(self, orders: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Mehrere Paper-Orders in einem Aufruf (Keys wie place_paper_order).
+        Mit self.execution_simulator (paper_execution.PaperExecutionSimulator) werden
+        alle Orders in einem Batch gegen Minutenbars/Quotes gematcht (Slippage, Latenz,
+        Teilausführung); ohne Simulator sofortige Ausführung zum Limit-Preis.
+        """
+        prepared = [self._prepare_paper_order(**order) for order in orders]
+        pending = [order for order in prepared if order['status'] != 'REJECTED']
+        if self.execution_simulator is not None and pending:
+            reports = self.execution_simulator.execute_batch([{
+                'order_id': order['order_id'],
+                'symbol': crypto_tickers[order['ticker']]['symbol'],
+                'action': order['action'].lower(),
+                'quantity': order['quantity_coins'],
+                'limit_price': order['price'] if order['order_type'] == "LIMIT" else None,
+                'timestamp': order['submitted'],
+            } for order in pending])
+            for order, report in zip(pending, reports):
+                self._apply_execution_report(order, report)
+        return [self._book_paper_order(order) for order in prepared]
+    
+    def _prepare_paper_order(self, ticker_name: str, action: str, quantity: float, price: float,
+                             order_type: str = "LIMIT", timestamp=None) -> Dict[str, Any]:
+        """Order-Dict für den Batch; ungültige Orders (unbekannter Ticker, Preis <= 0) als REJECTED."""
+        order_id = f"PAPER_{int(time.time())}_{ticker_name}_{action}_{next(self._order_seq)}"
         
-        order = {
+        try:
+            # Berechne tatsächliche Coin-Menge
+            config = crypto_tickers[ticker_name]
+            round_factor = config['order_round_factor']
+            if not price > 0:
+                raise ValueError(f"Preis {price}")
+            coin_quantity = quantity / price
+            coin_quantity = round(coin_quantity / round_factor) * round_factor
+        except Exception as e:
+            reason = f"Unbekannter Ticker {e}" if isinstance(e, KeyError) else f"Ungültige Order: {e}"
+            return {
+                'order_id': order_id,
+                'timestamp': timestamp if timestamp is not None else datetime.now(),
+                'submitted': timestamp,
+                'ticker': ticker_name,
+                'action': action,
+                'quantity_eur': quantity,
+                'quantity_coins': 0.0,
+                'price': price,
+                'order_type': order_type,
+                'status': 'REJECTED',
+                'reason': reason,
+                'fees': 0.0
+            }
+        
+        return {
             'order_id': order_id,
-            'timestamp': timestamp,
+            'timestamp': timestamp if timestamp is not None else datetime.now(),
+            'submitted': timestamp,
             'ticker': ticker_name,
             'action': action,
             'quantity_eur': quantity,
             'quantity_coins': coin_quantity,
             'price': price,
             'order_type': order_type,
-            'status': 'FILLED',  # Paper Trading = sofort ausgeführt
+            'status': 'FILLED',  # Paper Trading ohne Simulator = sofort ausgeführt
             'fees': quantity * 0.0015  # 0.15% Bitpanda Gebühr
         }
+    
+    def _apply_execution_report(self, order: Dict[str, Any], report: Dict[str, Any]) -> None:
+        """Übernimmt Menge, Durchschnittspreis und Fills der Matching-Engine in die Order."""
+        if report['status'] in ('FILLED', 'PARTIAL'):
+            order['quantity_coins'] = report['filled_quantity']
+            order['quantity_eur'] = report['value']
+            order['price'] = report['avg_price']
+            order['fees'] = report['value'] * 0.0015
+            order['status'] = 'FILLED' if report['status'] == 'FILLED' else 'PARTIALLY_FILLED'
+            order['timestamp'] = report['fills'][-1][0]
+            order['fills'] = report['fills']
+        else:
+            order['status'] = 'REJECTED'
+            order['reason'] = report['reason']
+    
+    def _book_paper_order(self, order: Dict[str, Any]) -> Dict[str, Any]:
+        """Bucht eine ausgeführte Paper-Order ins Portfolio und in die Trade History."""
+        ticker_name, action = order['ticker'], order['action']
+        quantity, coin_quantity, price = order['quantity_eur'], order['quantity_coins'], order['price']
+        
+        if order['status'] == 'REJECTED':
+            print(f"   ❌ {action} Order {ticker_name} nicht ausgeführt: {order.get('reason')}")
+            return order
         
         # Aktualisiere Paper Portfolio
         if action == "BUY":
@@ -362,8 +444,12 @@ class BitpandaFusionPaperTrader:
                 print(f"   ❌ Keine Position in {ticker_name}")
         
         # Speichere in Trade History
-        if order['status'] == 'FILLED':
+        if order['status'] in ('FILLED', 'PARTIALLY_FILLED'):
             self.trade_history.append(order)
+            self.ledger.record_fill(ticker_name, action, coin_quantity, price, 'bitpanda_fusion_paper',
+                                    timestamp=order['timestamp'], value=quantity, fee=order['fees'],
+                                    status=order['status'], order_id=order['order_id'],
+                                    mode='paper' if self.sandbox else 'live')
         
         return order
     
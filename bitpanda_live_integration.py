@@ -18,16 +18,20 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from bitpanda_secure_api import get_api_key_safely, create_secure_api_url, BITPANDA_SECURE_CONFIG
 from crypto_tickers import crypto_tickers
+from price_feed import get_price_feed, parse_ticker_index, lookup_ticker
 
 class BitpandaLiveIntegration:
     """
     Echte Bitpanda API Integration für Paper Trading
     """
     
-    def __init__(self):
+    def __init__(self, debug: bool = None):
         self.api_key = get_api_key_safely()
-        self.session = requests.Session()
-        self.session.headers.update(BITPANDA_SECURE_CONFIG['headers'])
+        # Rohdaten-Ausgaben der Ticker-Antworten nur auf Wunsch (oder BITPANDA_DEBUG=1)
+        self.debug = os.environ.get("BITPANDA_DEBUG", "0") == "1" if debug is None else debug
+        # Gepoolte Sessions + TTL-Cache teilen sich alle Preis-Konsumenten
+        self.price_feed = get_price_feed()
+        self.session = self.price_feed.session_for(BITPANDA_SECURE_CONFIG['base_url'])
         
         # Paper Trading Portfolio
         self.paper_portfolio = {
@@ -52,21 +56,18 @@ class BitpandaLiveIntegration:
         
         try:
             url = create_secure_api_url('ticker', self.api_key)
-            print(f"🌐 API Call: {url[:50]}...")
+            if self.debug:
+                print(f"🌐 API Call: {url[:50]}...")
             
-            response = self.session.get(
+            data = self.price_feed.get_json(
                 url,
+                headers=BITPANDA_SECURE_CONFIG['headers'],
                 timeout=BITPANDA_SECURE_CONFIG['timeout']
             )
             
-            if response.status_code == 200:
-                data = response.json()
+            if data is not None:
                 print(f"✅ Bitpanda API: {len(data)} Ticker empfangen")
-                return data
-            else:
-                print(f"❌ API Error: {response.status_code}")
-                print(f"   Response: {response.text[:200]}...")
-                return None
+            return data
                 
         except Exception as e:
             print(f"❌ Bitpanda API Fehler: {e}")
@@ -85,91 +86,46 @@ class BitpandaLiveIntegration:
         bitpanda_data = self.get_bitpanda_ticker_data()
         
         if bitpanda_data:
-            # Parse Bitpanda Ticker-Daten
-            print(f"🔍 Debug: Bitpanda Data Type: {type(bitpanda_data)}")
-            if isinstance(bitpanda_data, list) and len(bitpanda_data) > 0:
-                print(f"🔍 Debug: First ticker type: {type(bitpanda_data[0])}")
-                print(f"🔍 Debug: First ticker: {str(bitpanda_data[0])[:200]}...")
+            # Einmal normalisieren: {Instrument-Code: Quote}, danach O(1) pro Ticker
+            index = parse_ticker_index(bitpanda_data, debug=self.debug)
             
             for ticker_name, config in crypto_tickers.items():
-                symbol = config['symbol'].replace('-', '_')  # BTC-EUR -> BTC_EUR
-                
-                # Parse verschiedene API-Formate
-                found_ticker = None
-                
-                if isinstance(bitpanda_data, list):
-                    # Format: Liste von Ticker-Objekten
-                    for ticker in bitpanda_data:
-                        if isinstance(ticker, dict):
-                            # Prüfe verschiedene Feld-Namen
-                            ticker_symbol = (ticker.get('instrument_code') or 
-                                           ticker.get('symbol') or 
-                                           ticker.get('pair') or 
-                                           ticker.get('name', ''))
-                            
-                            if ticker_symbol == symbol or ticker_symbol == ticker_name:
-                                found_ticker = ticker
-                                break
-                        elif isinstance(ticker, str):
-                            # Falls ticker nur String ist, überspringe
-                            print(f"   ⚠️ Unerwartetes String-Format: {ticker[:50]}...")
-                            continue
-                
-                elif isinstance(bitpanda_data, dict):
-                    # Format: Dict mit Ticker als Keys
-                    found_ticker = bitpanda_data.get(symbol) or bitpanda_data.get(ticker_name)
+                quote = lookup_ticker(index, config['symbol'], ticker_name)  # BTC-EUR -> BTC_EUR
                 
-                if found_ticker and isinstance(found_ticker, dict):
-                    # Extrahiere Preisdaten mit flexiblen Feldnamen
-                    last = float(found_ticker.get('last') or found_ticker.get('price') or found_ticker.get('close') or 0)
-                    bid = float(found_ticker.get('bid') or last * 0.999)
-                    ask = float(found_ticker.get('ask') or last * 1.001) 
-                    volume = float(found_ticker.get('volume') or found_ticker.get('vol') or 0)
-                    change_24h = float(found_ticker.get('change') or found_ticker.get('change_24h') or 0)
-                    
-                    prices[ticker_name] = {
-                        'last': last,
-                        'bid': bid,
-                        'ask': ask,
-                        'volume': volume,
-                        'change_24h': change_24h,
-                        'source': 'bitpanda_live'
-                    }
-                    print(f"   🟢 {ticker_name}: €{last:.4f} (Bitpanda Live)")
+                if quote is not None:
+                    prices[ticker_name] = dict(quote, source='bitpanda_live')
+                    print(f"   🟢 {ticker_name}: €{quote['last']:.4f} (Bitpanda Live)")
                 else:
                     print(f"   ⚠️ {ticker_name} nicht in Bitpanda Daten gefunden")
         
-        # Yahoo Finance Fallback für fehlende Daten
-        for ticker_name, config in crypto_tickers.items():
-            if ticker_name not in prices:
-                try:
-                    import yfinance as yf
-                    symbol = config['symbol']
-                    ticker = yf.Ticker(symbol)
-                    hist = ticker.history(period="1d", interval="1m")
-                    
-                    if not hist.empty:
-                        last_price = hist['Close'].iloc[-1]
-                        high_price = hist['High'].iloc[-1]
-                        low_price = hist['Low'].iloc[-1]
-                        volume = hist['Volume'].iloc[-1]
-                        
-                        prices[ticker_name] = {
-                            'last': float(last_price),
-                            'bid': float(last_price * 0.999),  # Geschätzter Bid
-                            'ask': float(last_price * 1.001),  # Geschätzter Ask
-                            'volume': float(volume),
-                            'change_24h': 0.0,
-                            'source': 'yahoo_fallback'
-                        }
-                        print(f"   🟡 {ticker_name}: €{prices[ticker_name]['last']:.4f} (Yahoo Fallback)")
-                    
-                except Exception as e:
-                    print(f"   🔴 {ticker_name}: Fehler - {e}")
-                    prices[ticker_name] = {
-                        'last': 0.0, 'bid': 0.0, 'ask': 0.0, 'volume': 0.0,
-                        'change_24h': 0.0, 'source': 'error'
-                    }
+        # Yahoo Finance Fallback für fehlende Daten (alle Symbole in einem Abruf)
+        missing = {config['symbol']: ticker_name for ticker_name, config in crypto_tickers.items()
+                   if ticker_name not in prices}
+        quotes = {}
+        if missing:
+            try:
+                quotes = self.price_feed.quotes(list(missing))
+            except Exception as e:
+                print(f"   🔴 Yahoo Fallback Fehler - {e}")
+        for symbol, ticker_name in missing.items():
+            quote = quotes.get(symbol)
+            if quote is None:
+                print(f"   🔴 {ticker_name}: keine Daten")
+                prices[ticker_name] = {
+                    'last': 0.0, 'bid': 0.0, 'ask': 0.0, 'volume': 0.0,
+                    'change_24h': 0.0, 'source': 'error'
+                }
+                continue
+            last_price = quote['last']
+            prices[ticker_name] = {
+                'last': last_price,
+                'bid': float(last_price * 0.999),  # Geschätzter Bid
+                'ask': float(last_price * 1.001),  # Geschätzter Ask
+                'volume': quote['volume'],
+                'change_24h': 0.0,
+                'source': 'yahoo_fallback'
+            }
+            print(f"   🟡 {ticker_name}: €{prices[ticker_name]['last']:.4f} (Yahoo Fallback)")
         
         return prices
     
@@ -7,7 +7,8 @@ Process manually exported CSV files from Bitpanda for tax purposes
 import pandas as pd
 import os
 from datetime import datetime
-import glob
+
+from file_catalog import get_file_catalog, year_bounds
 
 def find_bitpanda_csv_files():
     """Find potential Bitpanda CSV exports in the directory"""
@@ -22,16 +23,8 @@ def find_bitpanda_csv_files():
         "*history*.csv"
     ]
     
-    found_files = []
-    
-    for pattern in patterns:
-        files = glob.glob(pattern, recursive=False)
-        for file in files:
-            if os.path.getsize(file) > 0:  # Only non-empty files
-                found_files.append(file)
-    
-    # Remove duplicates
-    found_files = list(set(found_files))
+    # Non-empty files whose catalogued date range overlaps 2024 (or without date columns)
+    found_files = get_file_catalog().find(patterns, *year_bounds(2024))
     
     print(f"   📄 Found {len(found_files)} potential CSV files:")
     for i, file in enumerate(found_files, 1):
@@ -17,3 +17,19 @@ backtest_years = 1      # 1 Jahr
 backtesting_begin = 25     # Beginne bei z. B. 25 % der Daten
 backtesting_end = 90       # Ende bei z. B. 98 % der Daten
 
+# ⚡ Paralleler Multi-Ticker-Backtest (run_backtests_parallel)
+BACKTEST_WORKERS = None          # Anzahl Prozesse (None = CPU-Kerne, 1 = seriell wie bisher)
+BACKTEST_TICKER_TIMEOUT = None   # Sekunden pro Ticker (None = kein Timeout)
+
+# 💾 Persistenter Optimierungs-Cache (optimization_cache.py)
+OPT_CACHE_DIR = "optimization_cache"   # Verzeichnis für gecachte Ergebnistabellen
+OPT_CACHE_MAX_MB = 50                  # Größenlimit; älteste Einträge werden zuerst gelöscht
+
+# 🚶 Walk-Forward-Modus (run_backtest(..., walk_forward=True) / BACKTEST_MODE=walk_forward)
+WALK_FORWARD_TRAIN_DAYS = 180         # Bars im Optimierungsfenster
+WALK_FORWARD_TEST_DAYS = 30           # Bars im Out-of-Sample-Fenster (= Schrittweite)
+WALK_FORWARD_ANCHORED = False         # True: Optimierungsfenster beginnt immer am Datenanfang
+
+# 📡 Signal-Daemon-Modus der Runner (live_strategy_paper_trading / daily_opening_trader)
+SIGNAL_DAEMON = False                 # True bzw. env SIGNAL_DAEMON=1: Signale vom laufenden signal_daemon lesen
+SIGNAL_DAEMON_PORT = 8765             # Port der Daemon-API auf localhost (env SIGNAL_DAEMON_PORT)
@@ -8,19 +8,25 @@ import yfinance as yf
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-import hashlib
 import time
 from trade_execution import prepare_orders_from_trades, execute_trade, submit_order_bitpanda, save_all_orders_html_report
 from config import COMMISSION_RATE, MIN_COMMISSION, ORDER_ROUND_FACTOR, backtesting_begin, backtesting_end, backtest_years
 from crypto_tickers import crypto_tickers
+from price_store import load_symbol_frame, dataset_signature
+from minute_pipeline import MinuteBarPipeline, ticks_to_minute_bars
+from optimization_cache import cached_best_p_tw_long
+from backtest_registry import register_backtest_result, lookup_backtest_result
 from signal_utils import (
     calculate_support_resistance,
+    incremental_support_resistance,
     compute_trend,
     assign_long_signals,
     assign_long_signals_extended,
     update_level_close_long,
     simulate_trades_compound_extended,
     berechne_best_p_tw_long,
+    action_codes_from_signals,
+    simulate_matched_trades_arrays,
 )
 from trades_weekly_display import display_weekly_trades_console, create_weekly_trades_html, add_weekly_trades_to_existing_reports
 from plotly_utils import (
@@ -40,14 +46,16 @@ capital_plots = {}
 CSV_PATH = "C:\\Users\\Edgar.000\\Documents\\____Trading strategies\\Crypto_trading1"
 base_dir = "C:/Users/Edgar.000/Documents/____Trading strategies/Crypto_trading1"
 
-def load_crypto_data_yf(symbol, backtest_years=1, max_retries=3):
+def load_crypto_data_yf(symbol, backtest_years=1, max_retries=3, end_date=None):
     """Load OHLCV daily data for a symbol from local CSV (preferred) or yfinance.
-    Trim to the most recent backtest_years years.
+    Trim to the most recent backtest_years years (before end_date if given: bars up to and
+    including that day only, e.g. for replays without lookahead).
     Expected CSV format: <SYMBOL>_daily.csv with columns Date,Open,High,Low,Close,Volume.
 
     Reproducibility features:
       - If env var STABLE_BACKTEST=1 is set, skip generating an artificial partial bar for the current day.
-      - Prints a dataset signature (row count + SHA1 hash of Close series) so results can be compared across runs.
+      - Prints a dataset signature (SHA1 over row count, timestamps and the raw float64 Close buffer) so results
+        can be compared across runs; run_backtest returns it as result['dataset_signature'] (cache key).
     """
     try:
         csv_filename = f"{symbol}_daily.csv"
@@ -56,12 +64,19 @@ def load_crypto_data_yf(symbol, backtest_years=1, max_retries=3):
         if os.path.exists(csv_path):
             file_age = datetime.now() - datetime.fromtimestamp(os.path.getmtime(csv_path))
             print(f"Loading {symbol} from CSV cache ({csv_filename}) - Age: {file_age.days} days")
-            df = pd.read_csv(csv_path)
+            try:
+                # Spalten-Store (price_store) statt CSV-Parsing; synchronisiert nur bei geänderter CSV
+                df = load_symbol_frame(symbol, "1d", csv_path=csv_path).reset_index()
+            except Exception as store_err:
+                print(f"⚠️ Price store unavailable ({store_err}), reading CSV")
+                df = pd.read_csv(csv_path)
         else:
             print(f"CSV {csv_filename} not found. Downloading from yfinance…")
-            end_date = datetime.now()
-            start_date = end_date - timedelta(days=int(backtest_years*365)+5)
-            df = yf.download(symbol, start=start_date.strftime('%Y-%m-%d'), end=end_date.strftime('%Y-%m-%d'), interval='1d', auto_adjust=True, progress=False)
+            # Download bis heute (CSV-Cache), Fenster relativ zu end_date; end_date selbst bleibt der Replay-Cutoff
+            download_end = datetime.now()
+            window_end = min(pd.Timestamp(end_date).to_pydatetime().replace(tzinfo=None), download_end) if end_date is not None else download_end
+            start_date = window_end - timedelta(days=int(backtest_years*365)+5)
+            df = yf.download(symbol, start=start_date.strftime('%Y-%m-%d'), end=download_end.strftime('%Y-%m-%d'), interval='1d', auto_adjust=True, progress=False)
             if df is None or df.empty:
                 print(f"❌ No data downloaded for {symbol}")
                 return None
@@ -78,6 +93,15 @@ def load_crypto_data_yf(symbol, backtest_years=1, max_retries=3):
         df.set_index(date_col, inplace=True)
         df = df.sort_index()
 
+        if end_date is not None:
+            cutoff_end = pd.Timestamp(end_date).normalize() + timedelta(days=1)
+            if df.index.tz is not None:
+                cutoff_end = cutoff_end.tz_localize(df.index.tz)
+            df = df[df.index < cutoff_end]
+            if df.empty:
+                print(f"❌ No data for {symbol} up to {pd.Timestamp(end_date).date()}")
+                return None
+
         # Trim to backtest_years
         cutoff = df.index.max() - timedelta(days=int(backtest_years*365)+2)
         df = df[df.index >= cutoff]
@@ -89,10 +113,9 @@ def load_crypto_data_yf(symbol, backtest_years=1, max_retries=3):
                 print("🧊 STABLE_BACKTEST active -> dropping today's partial bar for reproducibility")
                 df = df[df.index.date < today]
 
-        # Dataset signature
+        # Dataset signature (Roh-Puffer, auch Cache-Key für Optimierung/Reports)
         try:
-            close_bytes = b"|".join([f"{v:.8f}".encode() for v in df['Close'].astype(float).values])
-            sha = hashlib.sha1(close_bytes).hexdigest()[:12]
+            sha = dataset_signature(df)
             print(f"🆔 Dataset signature {symbol}: rows={len(df)}, sha1={sha}")
         except Exception as sig_err:
             print(f"⚠️ Could not compute dataset signature: {sig_err}")
@@ -103,6 +126,116 @@ def load_crypto_data_yf(symbol, backtest_years=1, max_retries=3):
         traceback.print_exc()
         return None
 
+def _run_backtest_worker(symbol, config):
+    """Worker für die Ticker-Prozesse (Modul-Ebene, damit picklebar)."""
+    warnings.filterwarnings("ignore")
+    return run_backtest(symbol, config)
+
+def _backtest_process(backtest_func, symbol, config, result_queue):
+    """Ein Ticker in einem eigenen Prozess; Ergebnis bzw. Fehler über result_queue."""
+    try:
+        result_queue.put((symbol, True, backtest_func(symbol, config)))
+    except Exception as e:
+        result_queue.put((symbol, False, str(e)))
+
+def run_backtests_parallel(tickers=None, max_workers=None, timeout=None, backtest_func=None):
+    """
+    Führt run_backtest für alle Ticker parallel aus, jeden Ticker in einem eigenen
+    multiprocessing.Process (höchstens max_workers gleichzeitig).
+
+    - tickers: dict {symbol: config} (Default: crypto_tickers)
+    - max_workers: Anzahl Prozesse (Default: config.BACKTEST_WORKERS bzw. env BACKTEST_WORKERS,
+      sonst CPU-Kerne); 1 = seriell im aktuellen Prozess wie bisher
+    - timeout: Sekunden pro Ticker (Default: config.BACKTEST_TICKER_TIMEOUT bzw. env
+      BACKTEST_TICKER_TIMEOUT); gezählt ab dem Start des Ticker-Prozesses, Wartezeit auf
+      einen freien Worker zählt nicht. Hängende Ticker werden per terminate() beendet.
+    - backtest_func: Modul-Funktion (symbol, config) -> result (Default: run_backtest)
+
+    Ergebnisse werden in Ticker-Reihenfolge gesammelt, damit all_results für
+    generate_combined_report_from_memory stabil bleibt. Fehler und Timeouts
+    liefern False wie ein fehlgeschlagener run_backtest.
+    """
+    import multiprocessing
+    import queue
+    import config as _cfg
+
+    if tickers is None:
+        tickers = crypto_tickers
+    if max_workers is None:
+        env_workers = os.environ.get("BACKTEST_WORKERS")
+        max_workers = int(env_workers) if env_workers else getattr(_cfg, "BACKTEST_WORKERS", None)
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    max_workers = max(1, min(int(max_workers), len(tickers) or 1))
+    if timeout is None:
+        env_timeout = os.environ.get("BACKTEST_TICKER_TIMEOUT")
+        timeout = float(env_timeout) if env_timeout else getattr(_cfg, "BACKTEST_TICKER_TIMEOUT", None)
+    if backtest_func is None:
+        backtest_func = _run_backtest_worker if max_workers > 1 else run_backtest
+
+    all_results = {}
+    print(f"\n📋 Processing {len(tickers)} tickers ({max_workers} worker{'s' if max_workers > 1 else ''})...")
+
+    if max_workers == 1:
+        for i, (ticker, config) in enumerate(tickers.items(), 1):
+            print(f"\n[{i}/{len(tickers)}] Processing {ticker}...")
+            all_results[ticker] = backtest_func(ticker, config)
+        return all_results
+
+    start = time.time()
+    results = {}
+    waiting = list(tickers)
+    running = {}                     # ticker -> (Process, Startzeit)
+    result_queue = multiprocessing.Queue()
+
+    def finish(ticker, ok, value):
+        proc, _ = running.pop(ticker)
+        proc.join()
+        counter = f"[{len(results) + 1}/{len(tickers)}]"
+        if ok:
+            results[ticker] = value
+            register_backtest_result(ticker, tickers[ticker], value)
+            print(f"✅ {counter} {ticker} fertig ({time.time() - start:.1f}s)")
+        else:
+            results[ticker] = False
+            print(f"❌ {counter} {ticker}: Worker-Fehler: {value}")
+
+    try:
+        while waiting or running:
+            while waiting and len(running) < max_workers:
+                ticker = waiting.pop(0)
+                proc = multiprocessing.Process(target=_backtest_process, daemon=True,
+                                               args=(backtest_func, ticker, tickers[ticker], result_queue))
+                proc.start()
+                running[ticker] = (proc, time.time())
+            try:
+                ticker, ok, value = result_queue.get(timeout=0.1)
+                finish(ticker, ok, value)
+                continue
+            except queue.Empty:
+                pass
+
+            now = time.time()
+            for ticker, (proc, started_at) in list(running.items()):
+                if timeout is not None and now - started_at >= timeout:
+                    proc.terminate()
+                    running.pop(ticker)
+                    proc.join()
+                    results[ticker] = False
+                    print(f"⏱️ [{len(results)}/{len(tickers)}] {ticker}: Timeout nach {timeout}s – übersprungen")
+                elif not proc.is_alive() and proc.exitcode != 0:
+                    # Prozess abgestürzt (z.B. Signal), ohne ein Ergebnis zu liefern
+                    finish(ticker, False, f"Prozess beendet mit Exitcode {proc.exitcode}")
+    finally:
+        for proc, _ in running.values():
+            proc.terminate()
+            proc.join()
+        result_queue.close()
+
+    all_results = {ticker: results.get(ticker, False) for ticker in tickers}
+    print(f"⚡ Parallel backtest: {len(tickers)} tickers in {time.time() - start:.1f}s")
+    return all_results
+
 def run_live_backtest_analysis():
     """
     UNIFIED LIVE BACKTEST ANALYSIS - Kombiniert beide Reports
@@ -141,13 +274,7 @@ def run_live_backtest_analysis():
             print(f"⚠️ Repair step failed: {_rep_err}")
 
         # Run backtests for all tickers
-        all_results = {}
-        
-        print(f"\n📋 Processing {len(crypto_tickers)} tickers...")
-        for i, (ticker, config) in enumerate(crypto_tickers.items(), 1):
-            print(f"\n[{i}/{len(crypto_tickers)}] Processing {ticker}...")
-            result = run_backtest(ticker, config)
-            all_results[ticker] = result
+        all_results = run_backtests_parallel(crypto_tickers)
         
         # Create UNIFIED comprehensive HTML report
         print("\n📝 Creating UNIFIED comprehensive HTML report...")
@@ -610,6 +737,10 @@ def create_backtest_frame(df, begin_percent=None, end_percent=None):
     return df_bt
 
 def load_and_update_daily_crypto(minute_df, symbol, base_dir):
+    """
+    Übernimmt neue Minutenbars in die Minuten-Pipeline und schreibt <SYMBOL>_daily.csv
+    aus dem inkrementell gepflegten Tages-Roll-up (Minutenhistorie wird nicht neu aggregiert).
+    """
     # --- MultiIndex flatten falls nötig ---
     if isinstance(minute_df.columns, pd.MultiIndex):
         minute_df.columns = minute_df.columns.get_level_values(0)
@@ -623,29 +754,19 @@ def load_and_update_daily_crypto(minute_df, symbol, base_dir):
     if not all(r in minute_df.columns for r in required):
         raise ValueError(f"[{symbol}] Minutendaten fehlen Spalten: {set(required) - set(minute_df.columns)}")
 
-    # Datumsspalte erzeugen
-    if "datetime" in minute_df.columns:
-        minute_df['date'] = pd.to_datetime(minute_df['datetime']).dt.date
-    else:
-        minute_df['date'] = pd.to_datetime(minute_df.index).date
-
-    grouped = minute_df.groupby('date')
-    daily = pd.DataFrame({
-        "date": grouped["date"].first(),
-        "Open": grouped["Open"].first(),
-        "High": grouped["High"].max(),
-        "Low": grouped["Low"].min(),
-        "Close": grouped["Close"].last(),
-        "Volume": grouped["Volume"].sum()
-    })
-    daily = daily.sort_values("date").reset_index(drop=True)
+    pipeline = MinuteBarPipeline(symbol, csv_dir=base_dir)
+    new_bars = pipeline.ingest(minute_df)
+    print(f"[{symbol}] ➕ {new_bars} neue Minutenbars übernommen")
+
+    daily = pipeline.daily().reset_index()
+    daily["date"] = daily["Date"].dt.date
 
     daily_path = os.path.join(base_dir, f"{symbol}_daily.csv")
     daily[["date", "Open", "High", "Low", "Close", "Volume"]].to_csv(
         daily_path, index=False, header=True
     )
     print(f"[{symbol}] ✅ Tagesdaten gespeichert unter: {daily_path}")
-    return daily
+    return daily[["date", "Open", "High", "Low", "Close", "Volume"]]
 
 def flatten_and_rename_columns(df, new_columns=None):
     # Flacht MultiIndex ab und setzt neue Spaltennamen
@@ -663,6 +784,15 @@ def load_daily_csv(filename):
     Erwartet: Date,Open,High,Low,Close,Volume als Spalten.
     Gibt DataFrame mit Date als Index zurück.
     """
+    if str(filename).endswith(("_daily.csv", "_minute.csv")) and os.path.exists(filename):
+        try:
+            symbol = os.path.basename(filename).rsplit("_", 1)[0]
+            interval = "1m" if str(filename).endswith("_minute.csv") else "1d"
+            df = load_symbol_frame(symbol, interval, csv_path=filename)
+            if df is not None:
+                return df
+        except Exception as e:
+            print(f"⚠️ Price store unavailable for {filename}: {e}")
     df = pd.read_csv(filename, parse_dates=["Date"])
     df = df.set_index("Date")
     return df
@@ -850,11 +980,12 @@ def backtest_single_ticker(cfg, symbol):
     end_idx = max(0, min(end_idx, n - 1))
 
     # Parameter-Optimierung
-    p, tw = berechne_best_p_tw_long(
+    p, tw = cached_best_p_tw_long(
         df_bt, cfg,
         start_idx, end_idx,
         verbose=False,
-        ticker=symbol
+        ticker=symbol,
+        slice_percent=(start_percent, end_percent)
     )
 
     # Support/Resistance
@@ -964,9 +1095,15 @@ def update_daily_csv(symbol, base_dir, start_date="2024-07-31"):
     return df
 
 def update_minute_csv(symbol, base_dir, start_date):
-    import os
-    import yfinance as yf
-    import pandas as pd
+    """
+    Lädt 1m-Bars ab dem letzten gespeicherten Bar (sonst ab start_date) und hängt nur
+    neue Bars an <SYMBOL>_minute.csv und den Minutenspeicher an; der Tages-Roll-up
+    und die laufende Tageskerze im Tagesdatensatz werden dabei mitgeführt.
+    """
+    pipeline = MinuteBarPipeline(symbol, csv_dir=base_dir)
+    last = pipeline.last_timestamp()
+    if last is not None:
+        start_date = max(pd.Timestamp(start_date), last.normalize()).strftime("%Y-%m-%d")
 
     df = yf.download(symbol, start=start_date, interval="1m", auto_adjust=True, progress=False)
     if df is None or df.empty:
@@ -992,11 +1129,13 @@ def update_minute_csv(symbol, base_dir, start_date):
         print(f"[{symbol}] ⚠️ Volume fehlt, wird mit NaN ergänzt.")
         df["Volume"] = float("nan")
 
-    # Nur gewünschte Spalten und speichern
+    # Nur gewünschte Spalten, nur neue Bars anhängen
     df = df[["DateTime", "Open", "High", "Low", "Close", "Volume"]]
-    out_path = os.path.join(base_dir, f"{symbol}_minute.csv")
-    df.to_csv(out_path, index=False, header=True)
-    print(f"[{symbol}] ✅ Minute CSV gespeichert: {out_path}")
+    os.makedirs(base_dir, exist_ok=True)
+    new_bars = pipeline.ingest(df)
+    published = pipeline.publish_daily()
+    print(f"[{symbol}] ✅ Minutendaten: {new_bars} neue Bars angehängt ({pipeline.csv_path}), "
+          f"{published} Tageskerze(n) aktualisiert")
     return df
 
 def batch_update_all_daily_csv(base_dir, get_minute_df_func):
@@ -1023,8 +1162,8 @@ def get_minute_df_yfinance(symbol):
 
 def update_daily_crypto_with_today1(minute_df, symbol, daily_path):
     """
-    Aggregiert die Minutendaten zu Tagesdaten,
-    entfernt doppelte Headerstufen und sichert das Datum gegen Parsingfehler.
+    Aggregiert die Minutendaten (Ticks mit price/volume) über die Minuten-Pipeline
+    zu Tagesdaten und sichert das Datum gegen Parsingfehler.
     """
     if minute_df is None or minute_df.empty:
         print(f"[{symbol}] ❌ Keine gültigen Minutendaten vorhanden.")
@@ -1032,17 +1171,19 @@ def update_daily_crypto_with_today1(minute_df, symbol, daily_path):
 
     # 🧽 Schritt 1: Datum bereinigen
     minute_df["Date"] = minute_df["Date"].apply(safe_parse_date)
-    minute_df["Date"] = pd.to_datetime(minute_df["Date"]).dt.date
-
-    # 🔁 Schritt 2: Aggregation auf Tagesbasis
-    daily_df_new = minute_df.groupby("Date").agg({
-        "price": ["first", "max", "min", "last"],
-        "volume": "sum"
-    })
+    minute_df = minute_df.dropna(subset=["Date"])
+
+    # 🔁 Schritt 2: Ticks -> Minutenbars, nur neue Bars in die Pipeline; die betroffenen
+    # Tage kommen aus dem inkrementellen Roll-up (keine Neu-Aggregation der Historie)
+    pipeline = MinuteBarPipeline(symbol, csv_dir=os.path.dirname(daily_path) or ".")
+    minute_bars = ticks_to_minute_bars(minute_df)
+    if minute_bars.empty:
+        print(f"[{symbol}] ❌ Keine gültigen Zeitstempel in den Minutendaten.")
+        return
+    pipeline.ingest(minute_bars)
 
-    # 🧹 Schritt 3: Header flatten
-    daily_df_new.columns = ["Open", "High", "Low", "Close", "Volume"]
-    daily_df_new.index = pd.to_datetime(daily_df_new.index)
+    # 🧹 Schritt 3: Tageskerzen der gelieferten Tage
+    daily_df_new = pipeline.daily(since=minute_bars.index.min().normalize())
 
     # 📁 Schritt 4: Vorhandene Datei laden (falls vorhanden)
     if os.path.exists(daily_path):
@@ -1354,10 +1495,19 @@ def get_crypto_data_enhanced(symbol, backtest_years, update_today=True):
 def display_matched_trades_table_enhanced():
     raise NotImplementedError
 
-def run_backtest(symbol, config):
+def run_backtest(symbol, config, walk_forward=None, end_date=None):
     """
     Führt einen vollständigen Backtest für ein Symbol durch
+    walk_forward=True (oder config['walk_forward'] / BACKTEST_MODE=walk_forward):
+    rollierende Optimierung + Out-of-Sample-Fenster (walk_forward.run_walk_forward)
+    end_date: nur Daten bis einschließlich diesem Tag (Replay / historische Signale)
     """
+    if walk_forward is None:
+        walk_forward = bool(config.get('walk_forward')) or os.environ.get("BACKTEST_MODE", "") == "walk_forward"
+    if walk_forward:
+        from walk_forward import run_walk_forward_backtest
+        return run_walk_forward_backtest(symbol, config, end_date=end_date)
+
     try:
         # Konfiguration extrahieren
         initial_capital = config.get('initialCapitalLong', 10000)  # FIXED: Use correct key
@@ -1375,10 +1525,11 @@ def run_backtest(symbol, config):
         # Daten laden - aus config.py
         from config import backtest_years
         print(f"Backtest Zeitraum: {backtest_years} Jahr(e) (aus config.py)")
-        df = load_crypto_data_yf(symbol, backtest_years)
+        df = load_crypto_data_yf(symbol, backtest_years, end_date=end_date)
         if df is None or df.empty:
             print(f"Keine Daten für {symbol}")
             return False
+        data_signature = dataset_signature(df)  # Key für Backtest-Registry / Caches
 
         print(f"Dataset: {len(df)} Zeilen ({df.index[0].date()} bis {df.index[-1].date()})")
         if os.environ.get("STABLE_BACKTEST", "0") == "1":
@@ -1436,8 +1587,9 @@ def run_backtest(symbol, config):
         # PARAMETER ANWENDUNG – VOLLER DATENSATZ
         # ======================================
         print(f"\n🔧 Applying optimal parameters on FULL DATASET (trading over full df)…")
-        supp_full, res_full = calculate_support_resistance(
-            df, optimal_past_window, optimal_trade_window, verbose=False, ticker=symbol
+        # Inkrementell: in den Live-Loops ändert sich meist nur der letzte Bar
+        supp_full, res_full = incremental_support_resistance(
+            symbol, df, optimal_past_window, optimal_trade_window
         )
 
         # 2. BACKTEST RESULTS MIT OPTIMALEN PARAMETERN (FULL)
@@ -1613,6 +1765,7 @@ def run_backtest(symbol, config):
             'slice_matched_trades': matched_trades_slice,
             'slice_trade_statistics': slice_stats,
             'slice_final_capital': slice_final_cap,
+            'dataset_signature': data_signature,
             'dataset_info': {
                 'total_days': len(df),
                 'start_date': df.index[0].date(),
@@ -1642,6 +1795,7 @@ def run_backtest(symbol, config):
         else:
             print("⚠️ Keine Extended Trades verfügbar")
 
+        register_backtest_result(symbol, config, result)
         return result
 
     except Exception as e:
@@ -1649,6 +1803,24 @@ def run_backtest(symbol, config):
         traceback.print_exc()
         return False
 
+def get_backtest_result(symbol, config, end_date=None):
+    """
+    Backtest-Ergebnis aus der In-Process-Registry, wenn es mit denselben
+    Parametern auf demselben Datensatz (Signatur) berechnet wurde – sonst
+    frisch über run_backtest (das Ergebnis wird dabei eingetragen).
+    end_date: Datensatz nur bis einschließlich diesem Tag (Replay)
+    """
+    try:
+        df = load_crypto_data_yf(symbol, backtest_years, end_date=end_date)
+        if df is not None and not df.empty:
+            cached = lookup_backtest_result(symbol, config, dataset_signature(df))
+            if cached is not None:
+                print(f"♻️ Backtest-Registry: {symbol} bereits berechnet (Datensatz {cached['dataset_signature']})")
+                return cached
+    except Exception as e:
+        print(f"⚠️ Backtest-Registry Lookup für {symbol} fehlgeschlagen: {e}")
+    return run_backtest(symbol, config, end_date=end_date)
+
 def optimize_parameters(df, symbol):
     """Runs brute-force optimization on the provided dataframe (slice df_bt).
     Returns optimal past & trade window maximizing final capital.
@@ -1684,7 +1856,8 @@ def optimize_parameters(df, symbol):
 
         start_idx = 0
         end_idx = len(df)
-        p, tw = berechne_best_p_tw_long(df, cfg, start_idx, end_idx, verbose=True, ticker=symbol)
+        p, tw = cached_best_p_tw_long(df, cfg, start_idx, end_idx, verbose=True, ticker=symbol,
+                                      slice_percent=(backtesting_begin, backtesting_end))
         return {
             'optimal_past_window': p,
             'optimal_trade_window': tw,
@@ -1702,70 +1875,48 @@ def simulate_matched_trades(ext_full, initial_capital, commission_rate, data_df=
     """
     Simuliert Matched Trades basierend auf Extended Signals
     Inkludiert offene Trades mit heutigem artificial price
+    (Adapter um signal_utils.simulate_matched_trades_arrays)
     """
     try:
         if ext_full is None or ext_full.empty:
             return pd.DataFrame()
         
-        matched = []
-        position = None
-        capital = initial_capital
-        today = pd.Timestamp.now().date()
-        
         # The 'Level Close' column contains the actual trading price (Open or Close) based on trade_on
         # This is set by update_level_close_long function
         price_column = 'Level Close'
         
-        for idx, row in ext_full.iterrows():
-            if row['Action'] == 'buy' and position is None:
-                # Öffne Long Position
-                position = {
-                    'entry_date': row['Long Date detected'],
-                    'entry_price': row[price_column],
-                    'entry_idx': idx
-                }
-            elif row['Action'] == 'sell' and position is not None:
-                # Schließe Position
-                entry_price = position['entry_price']
-                exit_price = row[price_column]
-                
-                # Calculate quantity using order_round_factor
-                raw_quantity = capital / entry_price
-                quantity = round(raw_quantity / order_round_factor) * order_round_factor
-                
-                pnl = (exit_price - entry_price) * quantity
-                commission = (entry_price + exit_price) * quantity * commission_rate
-                net_pnl = pnl - commission
-                capital += net_pnl
-                
-                matched.append({
-                    'Entry Date': position['entry_date'],
-                    'Entry Price': round(entry_price, 2),
-                    'Exit Date': row['Long Date detected'],
-                    'Exit Price': round(exit_price, 2),
-                    'Quantity': round(quantity, 4),
-                    'PnL': round(pnl, 2),
-                    'Commission': round(commission, 2),
-                    'Net PnL': round(net_pnl, 2),
-                    'Capital': round(capital, 2),
-                    'Status': 'CLOSED'
-                })
-                position = None
+        codes = action_codes_from_signals(ext_full['Action'])
+        prices = ext_full[price_column].to_numpy(dtype=np.float64).tolist()
+        dates = ext_full['Long Date detected'].tolist()
+        sim = simulate_matched_trades_arrays(codes, prices, initial_capital, commission_rate, order_round_factor)
+        
+        matched = []
+        for k in range(len(sim['exit_idx'])):
+            matched.append({
+                'Entry Date': dates[sim['entry_idx'][k]],
+                'Entry Price': round(prices[sim['entry_idx'][k]], 2),
+                'Exit Date': dates[sim['exit_idx'][k]],
+                'Exit Price': round(prices[sim['exit_idx'][k]], 2),
+                'Quantity': round(float(sim['quantity'][k]), 4),
+                'PnL': round(float(sim['pnl'][k]), 2),
+                'Commission': round(float(sim['commission'][k]), 2),
+                'Net PnL': round(float(sim['net_pnl'][k]), 2),
+                'Capital': round(float(sim['capital'][k]), 2),
+                'Status': 'CLOSED'
+            })
         
         # ✅ OFFENE POSITION MIT HEUTIGEM ARTIFICIAL PRICE HINZUFÜGEN
-        if position is not None and data_df is not None:
-            entry_price = position['entry_price']
-            
-            # Calculate quantity using order_round_factor
-            raw_quantity = capital / entry_price
-            quantity = round(raw_quantity / order_round_factor) * order_round_factor
+        if sim['open_entry_idx'] >= 0 and data_df is not None:
+            entry_price = prices[sim['open_entry_idx']]
+            quantity = sim['open_quantity']
+            capital = sim['final_capital']
             
             # Heutigen artificial price finden
-            today_timestamp = pd.Timestamp(today)
-            artificial_price = entry_price  # Fallback
+            today = pd.Timestamp.now().date()
+            today_pos = data_df.index.get_indexer([pd.Timestamp(today)]) if data_df.index.is_unique else [-1]
             
-            if today_timestamp in data_df.index:
-                artificial_price = data_df.loc[today_timestamp, 'Close']
+            if today_pos[0] >= 0:
+                artificial_price = data_df['Close'].iloc[today_pos[0]]
                 print(f"🤖 Offene Position: Heute's artificial price = €{artificial_price:.4f}")
             else:
                 # Letzter verfügbarer Preis
@@ -1778,7 +1929,7 @@ def simulate_matched_trades(ext_full, initial_capital, commission_rate, data_df=
             net_unrealized_pnl = unrealized_pnl - entry_commission
             
             matched.append({
-                'Entry Date': position['entry_date'],
+                'Entry Date': dates[sim['open_entry_idx']],
                 'Entry Price': round(entry_price, 2),
                 'Exit Date': today.strftime('%Y-%m-%d'),
                 'Exit Price': round(artificial_price, 2),
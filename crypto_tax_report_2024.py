@@ -8,12 +8,12 @@ import pandas as pd
 import os
 import sys
 from datetime import datetime, date
-import glob
 
 # Add current directory to path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from crypto_tickers import crypto_tickers
+from file_catalog import get_file_catalog, year_bounds
 
 class CryptoTaxReport2024:
     """Generate comprehensive tax report for 2024 crypto trading"""
@@ -42,21 +42,21 @@ class CryptoTaxReport2024:
             "*backtest_report*.csv"
         ]
         
-        for pattern in trade_files:
-            files = glob.glob(pattern)
-            for file in files:
-                try:
-                    if self._is_2024_file(file):
-                        print(f"   📄 Processing: {file}")
-                        df = pd.read_csv(file)
-                        self._process_trade_file(df, file)
-                except Exception as e:
-                    print(f"   ❌ Error reading {file}: {e}")
+        # Only files whose catalogued date range overlaps the tax year are read
+        catalog = get_file_catalog()
+        year_start, year_end = year_bounds(self.tax_year)
+        for file in catalog.find(trade_files, year_start, year_end):
+            try:
+                print(f"   📄 Processing: {file}")
+                df = pd.read_csv(file)
+                self._process_trade_file(df, file)
+            except Exception as e:
+                print(f"   ❌ Error reading {file}: {e}")
         
         # 2. Look for individual ticker CSV files with 2024 data
         for ticker_name in crypto_tickers.keys():
             csv_file = f"{ticker_name}_daily.csv"
-            if os.path.exists(csv_file):
+            if os.path.exists(csv_file) and catalog.overlaps(csv_file, year_start, year_end):
                 try:
                     print(f"   📈 Processing: {csv_file}")
                     df = pd.read_csv(csv_file)
@@ -66,20 +66,6 @@ class CryptoTaxReport2024:
         
         print(f"\n✅ Collected {len(self.trades_data)} trading records for 2024")
     
-    def _is_2024_file(self, filename):
-        """Check if file contains 2024 data based on filename or modification date"""
-        # Check filename for 2024
-        if '2024' in filename:
-            return True
-        
-        # Check file modification date
-        try:
-            mtime = os.path.getmtime(filename)
-            mod_year = datetime.fromtimestamp(mtime).year
-            return mod_year == 2024
-        except:
-            return False
-    
     def _process_trade_file(self, df, filename):
         """Process trade files and extract 2024 transactions"""
         if df.empty:
@@ -18,16 +18,42 @@ import signal
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from crypto_tickers import crypto_tickers
-from crypto_backtesting_module import run_backtest
+from crypto_backtesting_module import get_backtest_result
 from bitpanda_secure_api import get_api_key_safely
+from price_feed import get_price_feed
+from paper_replay import WallClock
+from trade_ledger import get_trade_ledger
+from signal_daemon import signal_daemon_enabled, daemon_trade_signal
 
 class DailyOpeningTrader:
     """
     Daily Opening Strategy Trader - Runs at market open for 15 minutes
     """
     
-    def __init__(self):
-        """Initialize the daily opening trader"""
+    def __init__(self, clock=None, price_feed=None, tickers=None, output_dir=None, ledger=None,
+                 use_signal_daemon=None):
+        """
+        Initialize the daily opening trader
+        
+        Args:
+            clock: WallClock (default) or paper_replay.ReplayClock for fast-forward replays
+            price_feed: PriceFeed (default: shared live feed)
+            tickers: subset of crypto_tickers (default: all)
+            output_dir: directory for session logs (default: current directory)
+            ledger: TradeLedger for executed orders (default: shared trade ledger)
+            use_signal_daemon: read signals from the running signal_daemon instead of
+                running the backtest each cycle (default: env SIGNAL_DAEMON / config.SIGNAL_DAEMON,
+                never in replays); falls back to the backtest if the daemon is unreachable
+        """
+        self.clock = clock or WallClock()
+        self.price_feed = price_feed or get_price_feed()
+        self.tickers = {t: crypto_tickers[t] for t in tickers} if tickers else crypto_tickers
+        self.output_dir = output_dir
+        self.ledger = ledger or get_trade_ledger()
+        if use_signal_daemon is None:
+            use_signal_daemon = signal_daemon_enabled() and not self.clock.replay
+        self.use_signal_daemon = use_signal_daemon
+        self.last_session_day = None
         self.api_key = get_api_key_safely()
         self.base_url = "https://api.bitpanda.com/v1"
         self.running = False
@@ -40,6 +66,7 @@ class DailyOpeningTrader:
         print("🕐 DAILY OPENING STRATEGY TRADER - SIMPLIFIED")
         print("=" * 60)
         print(f"🔑 API Key: {'✅ Loaded' if self.api_key else '❌ Missing'}")
+        print(f"📡 Signals: {'signal_daemon (fallback: backtest)' if self.use_signal_daemon else 'backtest'}")
         print(f"🕐 Market Open Time: {self.market_open_time} UTC")
         print("💡 Strategy: Run ONCE per day at opening, transmit orders immediately")
         print("=" * 60)
@@ -49,22 +76,16 @@ class DailyOpeningTrader:
         prices = {}
         
         try:
-            # Use Yahoo Finance for reliable opening prices
-            import yfinance as yf
-            for ticker_name, config in crypto_tickers.items():
-                try:
-                    symbol = config['symbol']
-                    ticker = yf.Ticker(symbol)
-                    
-                    # Get today's data for opening price
-                    hist = ticker.history(period="1d", interval="1m")
-                    if not hist.empty:
-                        # Use the most recent price as "opening" price
-                        prices[ticker_name] = float(hist['Open'].iloc[0])  # Today's opening
-                        print(f"📈 {ticker_name}: Opening @ €{prices[ticker_name]:.4f}")
-                    
-                except Exception as e:
-                    print(f"⚠️ Error getting {ticker_name} opening price: {e}")
+            # Use Yahoo Finance for reliable opening prices (ein Abruf für alle Ticker)
+            symbols = {config['symbol']: ticker_name for ticker_name, config in self.tickers.items()}
+            quotes = self.price_feed.quotes(list(symbols))
+            for symbol, ticker_name in symbols.items():
+                quote = quotes.get(symbol)
+                if quote is None:
+                    print(f"⚠️ Error getting {ticker_name} opening price: no data")
+                    continue
+                prices[ticker_name] = quote['open']  # Today's opening
+                print(f"📈 {ticker_name}: Opening @ €{prices[ticker_name]:.4f}")
         
         except Exception as e:
             print(f"⚠️ Error getting opening prices: {e}")
@@ -79,10 +100,17 @@ class DailyOpeningTrader:
             
             print(f"🔍 Analyzing {ticker_name} strategy...")
             
-            # Run backtest to get strategy signals
-            backtest_result = run_backtest(symbol, config)
+            if self.use_signal_daemon:
+                has_position = ticker_name in self.positions and self.positions[ticker_name]['quantity'] > 0
+                signal = daemon_trade_signal(ticker_name, has_position)
+                if signal is not None:
+                    return signal
+                print(f"⚠️ {ticker_name}: signal_daemon not reachable - falling back to backtest")
+            
+            # Backtest-Ergebnis (Registry, sonst frischer run_backtest)
+            backtest_result = get_backtest_result(symbol, config, end_date=self.clock.last_closed_day())
             
-            if not backtest_result or not backtest_result.get('matched_trades'):
+            if not backtest_result or backtest_result.get('matched_trades') is None:
                 return {
                     'signal': 'HOLD', 
                     'strength': 0.0, 
@@ -184,8 +212,8 @@ class DailyOpeningTrader:
         print(f"⚡ TRANSMITTING ORDER: {action} {ticker_name}")
         
         # Create order details
-        order_id = f"OPEN_{int(time.time())}_{ticker_name}_{action}"
-        timestamp = datetime.now()
+        timestamp = self.clock.now()
+        order_id = f"OPEN_{int(timestamp.timestamp())}_{ticker_name}_{action}"
         
         # Calculate coin quantity
         config = crypto_tickers[ticker_name]
@@ -240,13 +268,18 @@ class DailyOpeningTrader:
         
         # Log the order transmission
         self.trade_log.append(order_data)
+        if order_data['status'] != 'REJECTED':
+            self.ledger.record_fill(ticker_name, action, coin_quantity, price, 'daily_opening',
+                                    timestamp=timestamp, value=amount_eur, fee=order_data['fees'],
+                                    status=order_data['status'], order_id=order_id)
         
         return order_data
     
     def execute_daily_opening_session(self):
         """Execute one daily opening trading session - ONCE per day"""
         
-        session_start = datetime.now()
+        session_start = self.clock.now()
+        self.last_session_day = session_start.date()
         
         print(f"\n🚀 DAILY OPENING SESSION")
         print("=" * 60)
@@ -267,7 +300,7 @@ class DailyOpeningTrader:
         print("-" * 50)
         
         # Process each cryptocurrency ONCE
-        for ticker_name in crypto_tickers.keys():
+        for ticker_name in self.tickers.keys():
             try:
                 if ticker_name not in opening_prices:
                     continue
@@ -307,7 +340,7 @@ class DailyOpeningTrader:
                 print(f"❌ Error processing {ticker_name}: {e}")
         
         # Session summary
-        elapsed_time = datetime.now() - session_start
+        elapsed_time = self.clock.now() - session_start
         
         print(f"🏁 DAILY OPENING SESSION COMPLETED")
         print("=" * 60)
@@ -327,6 +360,8 @@ class DailyOpeningTrader:
         if self.trade_log:
             timestamp = session_date.strftime('%Y%m%d_%H%M')
             filename = f"daily_opening_trades_{timestamp}.csv"
+            if self.output_dir:
+                filename = os.path.join(self.output_dir, filename)
             
             df = pd.DataFrame(self.trade_log)
             df.to_csv(filename, index=False)
@@ -349,33 +384,35 @@ class DailyOpeningTrader:
         
         print(f"📋 Total Orders: {len(self.trade_log)}")
     
-    def start_2_week_daily_trading(self):
+    def start_2_week_daily_trading(self, duration_days: int = 14):
         """Start 2-week daily opening trading - Simple approach"""
         
+        self.running = True
+        start_date = self.clock.now()
+        end_date = start_date + timedelta(days=duration_days)
+        
         print("🚀 STARTING 2-WEEK DAILY OPENING TRADING")
         print("=" * 60)
-        print(f"📅 Start Date: {datetime.now().strftime('%Y-%m-%d')}")
-        print(f"📅 End Date: {(datetime.now() + timedelta(days=14)).strftime('%Y-%m-%d')}")
+        print(f"📅 Start Date: {start_date.strftime('%Y-%m-%d')}")
+        print(f"📅 End Date: {end_date.strftime('%Y-%m-%d')}")
         print(f"🕐 Daily Run Time: {self.market_open_time} UTC")
+        if self.clock.replay:
+            print("⏩ REPLAY MODE: simulated clock, stored price history")
         print("=" * 60)
         
-        self.running = True
-        start_date = datetime.now()
-        end_date = start_date + timedelta(days=14)
-        
         total_sessions = 0
         total_orders = 0
         
         try:
             # Simple loop: Wait for opening time, run strategy, wait for next day
-            while self.running and datetime.now() < end_date:
+            while self.running and self.clock.now() < end_date:
                 
                 # Calculate next opening time
-                now = datetime.now()
+                now = self.clock.now()
                 next_open = now.replace(hour=0, minute=0, second=0, microsecond=0)
                 
-                # If we've passed today's opening, move to tomorrow
-                if now.hour > 0 or (now.hour == 0 and now.minute > 30):
+                # If we've passed today's opening (or already traded it), move to tomorrow
+                if now.hour > 0 or (now.hour == 0 and now.minute > 30) or self.last_session_day == now.date():
                     next_open += timedelta(days=1)
                 
                 time_until = (next_open - now).total_seconds()
@@ -387,10 +424,10 @@ class DailyOpeningTrader:
                 
                 # Wait until opening time
                 if time_until > 0:
-                    time.sleep(time_until)
+                    self.clock.sleep(time_until)
                 
                 # Execute opening session
-                if self.running and datetime.now() < end_date:
+                if self.running and self.clock.now() < end_date:
                     print(f"\n🔔 MARKET OPEN - RUNNING STRATEGY")
                     orders = self.execute_daily_opening_session()
                     total_orders += orders
@@ -408,7 +445,7 @@ class DailyOpeningTrader:
             
             print(f"\n🏁 2-WEEK DAILY TRADING COMPLETED!")
             print("=" * 60)
-            print(f"📅 Total Duration: {datetime.now() - start_date}")
+            print(f"📅 Total Duration: {self.clock.now() - start_date}")
             print(f"📊 Sessions Completed: {total_sessions}")
             print(f"📋 Total Orders: {total_orders}")
             print("=" * 60)
@@ -15,6 +15,8 @@ import yfinance as yf
 from datetime import datetime
 import json
 
+from trade_ledger import get_trade_ledger, PREPARED
+
 def main():
     print("🚀 DIREKTE HEUTIGE ORDERS VORBEREITUNG")
     print("="*50)
@@ -214,9 +216,17 @@ def main():
         df_orders = pd.DataFrame(orders)
         df_orders.to_csv(csv_file, index=False)
         
+        # Trade-Ledger: vorbereitete Orders journalisieren (status PREPARED, zählt nicht als Fill)
+        journaled = get_trade_ledger().record_fills([{
+            'ticker': o['pair'], 'action': o['action'], 'quantity': o['quantity'], 'price': o['price'],
+            'value': o['order_value_eur'], 'timestamp': o['timestamp'], 'source': 'direct_today_orders',
+            'status': PREPARED, 'order_id': f"DIRECT_{timestamp}_{i}", 'note': o.get('note'),
+        } for i, o in enumerate(orders, 1) if str(o['action']).upper() in ('BUY', 'SELL')])
+        
         print(f"\n💾 Orders gespeichert:")
         print(f"   📄 {json_file}")
         print(f"   📄 {csv_file}")
+        print(f"   📒 Trade-Ledger: {journaled} Orders")
         
         # ZUSAMMENFASSUNG
         print(f"\n📊 ORDERS ZUSAMMENFASSUNG:")
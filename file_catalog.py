@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+FILE CATALOG - Persistenter Index der Trade-/Export-CSV-Dateien (SQLite)
+- Je Datei: Pfad, mtime, Größe, Schema (Separator, Encoding, Spalten),
+  Datumsspalten, min/max Datum und Zeilenzahl
+- Neu indexiert werden nur neue oder geänderte Dateien (mtime/Größe),
+  unveränderte Dateien kosten nur ein stat()
+- Beim Indexieren werden nur die Datumsspalten gelesen
+- find(patterns, start, end): nur Dateien, deren Datumsbereich den Zeitraum
+  überschneidet (Dateien ohne erkennbare Datumsspalte optional dazu)
+- Gemeinsame Instanz über get_file_catalog() / set_file_catalog()
+"""
+
+import glob
+import json
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime
+
+import pandas as pd
+
+from recent_trades import to_datetime_column
+
+CATALOG_PATH = os.environ.get("FILE_CATALOG_PATH", "file_catalog.sqlite")
+TS_FORMAT = "%Y-%m-%d %H:%M:%S"         # fixe Breite -> lexikografisch = chronologisch
+SEPARATORS = [',', ';', '\t']
+ENCODINGS = ['utf-8', 'iso-8859-1', 'cp1252', 'utf-16']
+DATE_KEYWORDS = ['date', 'time', 'created', 'timestamp', 'datetime']
+NON_DATE_KEYWORDS = ['price']         # z.B. 'Realtime Price Bitpanda'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    sep TEXT,
+    encoding TEXT,
+    columns TEXT,
+    date_columns TEXT,
+    min_date TEXT,
+    max_date TEXT,
+    rows INTEGER,
+    indexed_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_files_dates ON files (min_date, max_date);
+"""
+_FIELDS = ['path', 'mtime_ns', 'size', 'sep', 'encoding', 'columns', 'date_columns', 'min_date', 'max_date',
+           'rows', 'indexed_at']
+
+
+def _name_words(column):
+    """'Created Date' / 'created_at' / 'CreatedDate' -> ganze Wörter in Kleinbuchstaben."""
+    return [word.lower() for word in re.findall(r"[A-Z]?[a-z]+|[A-Z]+(?![a-z])|\d+", str(column))]
+
+
+def date_columns_of(columns):
+    """
+    Datumsspalten nach ganzen Wörtern im Namen (date/time/created/timestamp, ohne
+    Groß-/Kleinschreibung); Spalten mit 'price' im Namen zählen nie als Datum.
+    """
+    found = []
+    for col in columns:
+        words = _name_words(col)
+        if any(word in DATE_KEYWORDS for word in words) and not any(word in NON_DATE_KEYWORDS for word in words):
+            found.append(col)
+    return found
+
+
+def sniff_csv(path):
+    """
+    Separator/Encoding wie die Bitpanda-Prozessoren erkennen (erste Kombination mit
+    mehreren Spalten). Gibt (sep, encoding, columns) zurück, (None, None, None) wenn unlesbar.
+    """
+    single = None
+    for encoding in ENCODINGS:
+        for sep in SEPARATORS:
+            try:
+                head = pd.read_csv(path, sep=sep, encoding=encoding, nrows=5)
+            except Exception:
+                continue
+            if head.shape[1] > 1:
+                return sep, encoding, [str(c) for c in head.columns]
+            if single is None:
+                single = (sep, encoding, [str(c) for c in head.columns])
+    return single or (None, None, None)
+
+
+def scan_file(path, stat=None):
+    """Katalogeintrag für eine Datei (liest nur Kopfzeilen und Datumsspalten)."""
+    stat = stat or os.stat(path)
+    entry = {'path': os.path.abspath(path), 'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size,
+             'sep': None, 'encoding': None, 'columns': None, 'date_columns': None,
+             'min_date': None, 'max_date': None, 'rows': None,
+             'indexed_at': datetime.now().strftime(TS_FORMAT)}
+    if stat.st_size == 0:
+        return entry
+    sep, encoding, columns = sniff_csv(path)
+    if columns is None:
+        return entry
+    dates = date_columns_of(columns)
+    entry.update(sep=sep, encoding=encoding, columns=json.dumps(columns), date_columns=json.dumps(dates))
+    try:
+        frame = pd.read_csv(path, sep=sep, encoding=encoding, usecols=dates or [0], dtype=str)
+        entry['rows'] = len(frame)
+        lows, highs = [], []
+        for col in dates:
+            parsed = to_datetime_column(frame[col]).dropna()
+            if not parsed.empty:
+                lows.append(parsed.min())
+                highs.append(parsed.max())
+        if lows:
+            entry['min_date'] = min(lows).strftime(TS_FORMAT)
+            entry['max_date'] = max(highs).strftime(TS_FORMAT)
+    except Exception as e:
+        print(f"   ⚠️ Katalog: Datumsspalten von {path} nicht lesbar: {e}")
+    return entry
+
+
+def _bound(value):
+    return pd.Timestamp(value).strftime(TS_FORMAT) if value is not None else None
+
+
+class FileCatalog:
+    """
+    Persistenter Katalog von CSV-Dateien (SQLite, path = absoluter Pfad).
+    path: Datei (Default env FILE_CATALOG_PATH bzw. file_catalog.sqlite) oder ":memory:".
+    """
+
+    def __init__(self, path=None):
+        self.path = path or CATALOG_PATH
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connection(self):
+        if self._conn is None:
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            self._conn.row_factory = sqlite3.Row
+            self._conn.executescript(_SCHEMA)
+        return self._conn
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def entry(self, path):
+        """Katalogeintrag (dict, columns/date_columns als Listen) oder None."""
+        with self._lock:
+            row = self._connection().execute("SELECT * FROM files WHERE path = ?",
+                                             (os.path.abspath(path),)).fetchone()
+        return self._decode(row) if row is not None else None
+
+    @staticmethod
+    def _decode(row):
+        entry = dict(row)
+        for key in ('columns', 'date_columns'):
+            entry[key] = json.loads(entry[key]) if entry[key] else []
+        return entry
+
+    def refresh(self, paths):
+        """
+        Katalog für paths aktualisieren: nur neue/geänderte Dateien (mtime, Größe) werden
+        gelesen; nicht mehr vorhandene Dateien fliegen raus. Gibt {abspath: entry} zurück.
+        """
+        stats = {}
+        for path in paths:
+            try:
+                stats[os.path.abspath(path)] = (path, os.stat(path))
+            except OSError:
+                continue
+        with self._lock:
+            conn = self._connection()
+            known = {row['path']: row for row in conn.execute("SELECT * FROM files")}
+            changed = [(path, stat) for key, (path, stat) in stats.items()
+                       if key not in known or known[key]['mtime_ns'] != stat.st_mtime_ns
+                       or known[key]['size'] != stat.st_size]
+            gone = [key for key in known if not os.path.exists(key)]
+
+        fresh = [scan_file(path, stat) for path, stat in changed]
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.executemany(f"INSERT OR REPLACE INTO files ({', '.join(_FIELDS)}) "
+                                 f"VALUES ({', '.join('?' * len(_FIELDS))})",
+                                 [tuple(entry[f] for f in _FIELDS) for entry in fresh])
+                conn.executemany("DELETE FROM files WHERE path = ?", [(key,) for key in gone])
+            if fresh or gone:
+                print(f"   🗂️ Katalog: {len(fresh)} Datei(en) neu indexiert, {len(gone)} entfernt, "
+                      f"{len(stats) - len(fresh)} unverändert")
+            placeholders = ', '.join('?' * len(stats))
+            rows = conn.execute(f"SELECT * FROM files WHERE path IN ({placeholders})", list(stats)).fetchall() \
+                if stats else []
+        return {row['path']: self._decode(row) for row in rows}
+
+    def find(self, patterns, start=None, end=None, include_undated=True, min_size=1, exclude_keywords=()):
+        """
+        Dateien zu glob-patterns (Reihenfolge der Treffer, ohne Duplikate), deren Datumsbereich
+        [min_date, max_date] den Zeitraum [start, end) überschneidet.
+        include_undated: Dateien ohne erkennbare Datumsspalte/-werte mitliefern.
+        exclude_keywords: Dateien mit diesen Wörtern im Namen (klein) überspringen.
+        """
+        matches = []
+        for pattern in patterns:
+            for path in glob.glob(pattern):
+                if path not in matches and not any(k in os.path.basename(path).lower() for k in exclude_keywords):
+                    matches.append(path)
+        entries = self.refresh(matches)
+        start, end = _bound(start), _bound(end)
+
+        found = []
+        for path in matches:
+            entry = entries.get(os.path.abspath(path))
+            if entry is None or entry['size'] < min_size:
+                continue
+            if entry['min_date'] is None:
+                if include_undated:
+                    found.append(path)
+                continue
+            if (start is None or entry['max_date'] >= start) and (end is None or entry['min_date'] < end):
+                found.append(path)
+        return found
+
+    def overlaps(self, path, start=None, end=None):
+        """True, wenn die Datei Daten im Zeitraum [start, end) haben kann (undatiert = True)."""
+        entry = self.refresh([path]).get(os.path.abspath(path))
+        if entry is None:
+            return False
+        if entry['min_date'] is None:
+            return True
+        start, end = _bound(start), _bound(end)
+        return (start is None or entry['max_date'] >= start) and (end is None or entry['min_date'] < end)
+
+
+def year_bounds(year):
+    """[start, end) eines Kalenderjahres für find()/overlaps()."""
+    return f"{year}-01-01", f"{year + 1}-01-01"
+
+
+_catalog = None
+
+
+def get_file_catalog():
+    """Gemeinsamer Datei-Katalog (CATALOG_PATH) für die Report-Generatoren."""
+    global _catalog
+    if _catalog is None:
+        _catalog = FileCatalog()
+    return _catalog
+
+
+def set_file_catalog(catalog):
+    """Ersetzt den gemeinsamen Katalog (z.B. FileCatalog(':memory:') in Tests)."""
+    global _catalog
+    _catalog = catalog
+    return catalog
+
+
+if __name__ == "__main__":
+    import sys
+    catalog = get_file_catalog()
+    year = int(sys.argv[1]) if len(sys.argv) > 1 else datetime.now().year
+    files = catalog.find(["*.csv"], *year_bounds(year))
+    print(f"🗂️ {len(files)} CSV-Dateien mit Daten in {year}:")
+    for path in files:
+        entry = catalog.entry(path)
+        print(f"   {path} ({entry['size'] / 1024:.1f} KB, {entry['rows']} Zeilen, "
+              f"{entry['min_date'] or '-'} .. {entry['max_date'] or '-'})")
@@ -6,7 +6,6 @@
 import sys
 import os
 import pandas as pd
-import yfinance as yf
 from datetime import datetime, timedelta
 import glob
 import builtins
@@ -29,187 +28,54 @@ builtins.print = ascii_print
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from crypto_tickers import crypto_tickers
-from crypto_backtesting_module import run_backtest
+from price_feed import get_price_feed
+from recent_trades import cached_backtest_results, recent_orders_for_results
 
-def get_real_bitpanda_price(symbol):
+def get_real_bitpanda_prices(symbols):
     """
-    Versucht den aktuellen Preis zu holen (Yahoo Finance als Proxy für Bitpanda)
+    Aktuelle Preise für alle Symbole in einem Abruf (gemeinsamer PriceFeed, Yahoo als Proxy für Bitpanda)
     """
     try:
-        ticker = yf.Ticker(symbol)
-        hist = ticker.history(period="1d")
-        if not hist.empty:
-            return hist['Close'].iloc[-1]
+        return get_price_feed().prices(list(symbols))
     except Exception as e:
-        print(f"   ⚠️ Fehler beim Abrufen des Preises für {symbol}: {e}")
-    return 0.0
+        print(f"   ⚠️ Fehler beim Abrufen der Preise: {e}")
+    return {}
 
-def extract_trades_from_backtest_results():
+def extract_trades_from_backtest_results(results=None, days=14):
     """
     Extrahiert echte Trades aus den Backtest-Ergebnissen der letzten 14 Tage
+    results: {ticker: Backtest-Ergebnis} (Default: gecachte Ergebnisse über get_backtest_result)
     """
     print("\nEXTRAHIERE ECHTE TRADES AUS BACKTEST-ERGEBNISSEN")
     print("="*60)
     
-    cutoff_date = datetime.now() - timedelta(days=14)
-    all_trades = []
+    now = datetime.now()
+    cutoff_date = now - timedelta(days=days)
     
     # Header inkl. Action (BUY/SELL) und ArtificialIncluded-Flag
     header = "Date;Ticker;Quantity;Price;Order Type;Limit Price;Open/Close;Action;Realtime Price Bitpanda;ArtificialIncluded"
     
-    for ticker_name, config in crypto_tickers.items():
-        symbol = config.get('symbol', ticker_name)
-        print(f"\nVerarbeite {ticker_name} ({symbol})...")
-        try:
-            # Führe Backtest für diesen Ticker aus
-            backtest_result = run_backtest(symbol, config)
-            
-            if not backtest_result:
-                print(f"   Kein Backtest-Ergebnis fuer {ticker_name}")
-                continue
-                
-            # Extrahiere matched_trades
-            matched_trades = backtest_result.get('matched_trades')
-            if matched_trades is None or matched_trades.empty:
-                print(f"   Keine Trades fuer {ticker_name}")
-                continue
-            # Aufteilen: echte geschlossene Trades vs. künstliche (Artificial)
-            type_col_exists = 'Type' in matched_trades.columns
-            status_col_exists = 'Status' in matched_trades.columns
-
-            # Echte geschlossene Trades (Standardfall)
-            real_closed_trades = matched_trades.copy()
-            if type_col_exists:
-                real_closed_trades = real_closed_trades[real_closed_trades['Type'].fillna('') != 'Artificial']
-            if status_col_exists:
-                before = len(real_closed_trades)
-                real_closed_trades = real_closed_trades[real_closed_trades['Status'].fillna('') == 'CLOSED']
-                after = len(real_closed_trades)
-                if before != after:
-                    print(f"   ✅ Status-Filter: {before - after} nicht-geschlossene Row(s) entfernt")
-
-            # Künstliche Trades (Type == Artificial): jetzt ALLE berücksichtigen (Open immer; Close falls vorhanden)
-            artificial_trades = pd.DataFrame()
-            if type_col_exists:
-                artificial_trades = matched_trades[matched_trades['Type'].fillna('') == 'Artificial'].copy()
-                if not artificial_trades.empty:
-                    print(f"   Artificial Trades erkannt: {len(artificial_trades)} (alle werden berücksichtigt)")
-            
-            # Hole aktuellen Preis
-            current_price = get_real_bitpanda_price(symbol)
-
-            # Verarbeite echte, geschlossene Trades (BUY/SELL nach Cutoff)
-            for _, trade in real_closed_trades.iterrows():
-                entry_date_str = str(trade.get('Entry Date', ''))
-                exit_date_str = str(trade.get('Exit Date', ''))
-                
-                # Parse Daten
-                try:
-                    if 'T' in entry_date_str:
-                        entry_date = datetime.fromisoformat(entry_date_str.replace('T', ' '))
-                    else:
-                        entry_date = pd.to_datetime(entry_date_str)
-                        
-                    if pd.notna(exit_date_str) and exit_date_str != 'nan' and exit_date_str != '':
-                        if 'T' in exit_date_str:
-                            exit_date = datetime.fromisoformat(exit_date_str.replace('T', ' '))
-                        else:
-                            exit_date = pd.to_datetime(exit_date_str)
-                    else:
-                        exit_date = None
-                        
-                except Exception as e:
-                    print(f"     Datum-Parse-Fehler: {e}")
-                    continue
-                
-                # Entry Trade (BUY) hinzufügen wenn in den letzten 14 Tagen
-                if entry_date >= cutoff_date:
-                    entry_price = float(trade.get('Entry Price', 0))
-                    quantity = float(trade.get('Quantity', 0))
-                    
-                    trade_entry = {
-                        'date': entry_date.strftime('%Y-%m-%d'),
-                        'ticker': ticker_name,
-                        'quantity': quantity,
-                        'price': entry_price,
-                        'order_type': 'Limit',
-                        'limit_price': entry_price * 0.999,  # Leicht unter Entry Price
-                        'open_close': 'Open',
-                        'action': 'BUY',
-                        'realtime_price': current_price,
-                        'artificial_included': False
-                    }
-                    all_trades.append(trade_entry)
-                    print(f"     BUY: {entry_date.date()}, {quantity:.6f} @ EUR {entry_price:.4f}")
-                
-                # Exit Trade (SELL) hinzufügen wenn in den letzten 14 Tagen
-                if exit_date and exit_date >= cutoff_date:
-                    exit_price = float(trade.get('Exit Price', 0))
-                    quantity = float(trade.get('Quantity', 0))
-                    
-                    trade_exit = {
-                        'date': exit_date.strftime('%Y-%m-%d'),
-                        'ticker': ticker_name,
-                        'quantity': quantity,
-                        'price': exit_price,
-                        'order_type': 'Limit',
-                        'limit_price': exit_price * 1.001,  # Leicht über Exit Price
-                        'open_close': 'Close',
-                        'action': 'SELL',
-                        'realtime_price': current_price,
-                        'artificial_included': False
-                    }
-                    all_trades.append(trade_exit)
-                    print(f"     SELL: {exit_date.date()}, {quantity:.6f} @ EUR {exit_price:.4f}")
-
-            # Verarbeite künstliche Trades (Open immer; Close falls vorhanden und innerhalb Zeitraum)
-            if not artificial_trades.empty:
-                for _, trade in artificial_trades.iterrows():
-                    entry_date_str = str(trade.get('Entry Date', ''))
-                    exit_date_str = str(trade.get('Exit Date', ''))
-                    status_val = str(trade.get('Status', '')).upper()
-                    try:
-                        entry_date = pd.to_datetime(entry_date_str) if entry_date_str else None
-                    except Exception:
-                        entry_date = None
-                    try:
-                        exit_date = pd.to_datetime(exit_date_str) if exit_date_str else None
-                    except Exception:
-                        exit_date = None
-
-                    quantity = float(trade.get('Quantity', 0))
-                    entry_price = float(trade.get('Entry Price', 0))
-                    exit_price = float(trade.get('Exit Price', 0)) if exit_date is not None else None
-
-                    # ALWAYS include artificial OPEN if within 14-day window
-                    if entry_date and entry_date >= cutoff_date:
-                        trade_entry = {
-                            'date': entry_date.strftime('%Y-%m-%d'),
-                            'ticker': ticker_name,
-                            'quantity': quantity,
-                            'price': entry_price,
-                            'order_type': 'Limit',
-                            'limit_price': entry_price * 0.999,
-                            'open_close': 'Open',
-                            'action': 'BUY',
-                            'realtime_price': current_price,
-                            'artificial_included': True
-                        }
-                        all_trades.append(trade_entry)
-                        print(f"     Artificial BUY: {entry_date.date()}, {quantity:.6f} @ EUR {entry_price:.4f}")
-
-                    # NOTE: Artificial CLOSE legs are intentionally NOT included per user request
-                    # (Only the artificial opening BUY is listed.)
-                    
-        except Exception as e:
-            print(f"   ❌ Fehler bei {ticker_name}: {e}")
+    if results is None:
+        results = cached_backtest_results(crypto_tickers)
+    for ticker_name, result in results.items():
+        if not result:
+            print(f"   Kein Backtest-Ergebnis fuer {ticker_name}")
+    
+    # Hole aktuelle Preise (ein Abruf für alle Ticker)
+    symbols = {crypto_tickers.get(t, {}).get('symbol', t): t for t in results}
+    realtime_prices = {symbols[s]: p for s, p in get_real_bitpanda_prices(symbols).items()}
+    
+    # BUY/SELL-Orders aller Ticker im Fenster (Artificial: nur der eröffnende BUY)
+    orders = recent_orders_for_results(results, days=days, now=now, realtime_prices=realtime_prices)
+    for ticker_name, count in orders['ticker'].value_counts(sort=False).items():
+        artificial = int(orders.loc[orders['ticker'] == ticker_name, 'artificial_included'].sum())
+        print(f"   {ticker_name}: {count} Order(s), davon {artificial} Artificial")
     
-    # Sortiere Trades nach Datum (neueste zuerst)
-    all_trades.sort(key=lambda x: x['date'], reverse=True)
+    all_trades = orders.assign(date=orders['date'].dt.strftime('%Y-%m-%d')).to_dict('records')
     
     # Ausgabe des Reports
     print(f"\n===== 14-TAGE TRADES REPORT (ECHTE DATEN) =====")
-    print(f"Zeitraum: {cutoff_date.date()} bis {datetime.now().date()}")
+    print(f"Zeitraum: {cutoff_date.date()} bis {now.date()}")
     print(f"Trades gefunden: {len(all_trades)}")
     print(f"\n{header}")
     print("-" * 150)
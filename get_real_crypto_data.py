@@ -8,6 +8,7 @@ import os
 import time
 import yfinance as yf
 from typing import Optional
+from price_store import save_csv_and_append
 
 def get_real_crypto_data_coingecko():
     """
@@ -223,10 +224,10 @@ def update_csv_with_real_data(coingecko_data):
                     
                     df = pd.concat([df, new_row], ignore_index=True)
                 
-                # Sortiere und speichere
+                # Sortiere und speichere (Preisspeicher: nur neue Einträge anhängen)
                 df['Date'] = pd.to_datetime(df['Date'])
                 df = df.sort_values('Date')
-                df.to_csv(csv_file, index=False)
+                save_csv_and_append(csv_file, df, pd.DataFrame(new_entries), index=False)
                 
                 print(f"   ✅ {csv_file} aktualisiert")
             else:
@@ -19,16 +19,41 @@ import signal
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from crypto_tickers import crypto_tickers
-from crypto_backtesting_module import run_backtest
+from crypto_backtesting_module import get_backtest_result
 from bitpanda_secure_api import get_api_key_safely
+from price_feed import get_price_feed, lookup_ticker
+from paper_replay import WallClock
+from trade_ledger import get_trade_ledger
+from signal_daemon import signal_daemon_enabled, daemon_trade_signal
 
 class LiveStrategyPaperTrader:
     """
     Live Strategy Execution with Bitpanda Paper Trading
     """
     
-    def __init__(self):
-        """Initialize live trading system"""
+    def __init__(self, clock=None, price_feed=None, tickers=None, output_dir=None, ledger=None,
+                 use_signal_daemon=None):
+        """
+        Initialize live trading system
+        
+        Args:
+            clock: WallClock (default) or paper_replay.ReplayClock for fast-forward replays
+            price_feed: PriceFeed (default: shared live feed)
+            tickers: subset of crypto_tickers (default: all)
+            output_dir: directory for trading logs (default: current directory)
+            ledger: TradeLedger for executed orders (default: shared trade ledger)
+            use_signal_daemon: read signals from the running signal_daemon instead of
+                running the backtest each cycle (default: env SIGNAL_DAEMON / config.SIGNAL_DAEMON,
+                never in replays); falls back to the backtest if the daemon is unreachable
+        """
+        self.clock = clock or WallClock()
+        self.price_feed = price_feed or get_price_feed()
+        self.tickers = {t: crypto_tickers[t] for t in tickers} if tickers else crypto_tickers
+        self.output_dir = output_dir
+        self.ledger = ledger or get_trade_ledger()
+        if use_signal_daemon is None:
+            use_signal_daemon = signal_daemon_enabled() and not self.clock.replay
+        self.use_signal_daemon = use_signal_daemon
         self.api_key = get_api_key_safely()
         self.base_url = "https://api.bitpanda.com/v1"
         self.running = False
@@ -45,56 +70,44 @@ class LiveStrategyPaperTrader:
         
         print("🚀 LIVE STRATEGY PAPER TRADING INITIALIZED")
         print(f"🔑 API Key: {'✅ Loaded' if self.api_key else '❌ Missing'}")
+        print(f"📡 Signals: {'signal_daemon (fallback: backtest)' if self.use_signal_daemon else 'backtest'}")
         print(f"⏰ Check Interval: {self.check_interval} seconds")
         print(f"🕐 Trading Hours: {self.trading_hours['start']} - {self.trading_hours['end']}")
     
     def is_trading_hours(self) -> bool:
         """Check if we're in trading hours"""
-        current_time = datetime.now().time()
+        current_time = self.clock.now().time()
         return self.trading_hours['start'] <= current_time <= self.trading_hours['end']
     
     def get_current_market_prices(self) -> Dict[str, float]:
         """Get current market prices from Bitpanda or fallback"""
         prices = {}
+        feed = self.price_feed
         
         try:
-            # Try Bitpanda API first
+            # Try Bitpanda API first (gepoolte Session, TTL-Cache)
             headers = {'X-API-KEY': self.api_key}
-            response = requests.get(f"{self.base_url}/ticker", headers=headers, timeout=10)
+            index = feed.ticker_index(f"{self.base_url}/ticker", headers=headers, timeout=10)
             
-            if response.status_code == 200:
-                data = response.json()
-                # Parse Bitpanda ticker data
-                for ticker_name in crypto_tickers.keys():
-                    symbol = crypto_tickers[ticker_name]['symbol']
-                    # Find matching ticker in Bitpanda data
-                    for item in data:
-                        if item.get('instrument_code') == symbol:
-                            prices[ticker_name] = float(item.get('last_price', 0))
-                            break
-                    
-                    # Fallback to Yahoo if not found
-                    if ticker_name not in prices:
-                        import yfinance as yf
-                        ticker = yf.Ticker(symbol)
-                        hist = ticker.history(period="1d", interval="1m")
-                        if not hist.empty:
-                            prices[ticker_name] = float(hist['Close'].iloc[-1])
+            if index:
+                # Normalisierter Index {Instrument-Code: Quote} - ein Dict-Zugriff pro Ticker
+                for ticker_name, config in self.tickers.items():
+                    quote = lookup_ticker(index, config['symbol'], ticker_name)
+                    if quote is not None:
+                        prices[ticker_name] = quote['last']
             
         except Exception as e:
             print(f"⚠️ Error getting Bitpanda prices: {e}")
-            
-            # Fallback to Yahoo Finance
-            import yfinance as yf
-            for ticker_name, config in crypto_tickers.items():
-                try:
-                    symbol = config['symbol']
-                    ticker = yf.Ticker(symbol)
-                    hist = ticker.history(period="1d", interval="1m")
-                    if not hist.empty:
-                        prices[ticker_name] = float(hist['Close'].iloc[-1])
-                except Exception as yf_e:
-                    print(f"⚠️ Error getting {ticker_name} price: {yf_e}")
+        
+        # Fallback to Yahoo Finance - alle fehlenden Symbole gemeinsam
+        missing = {config['symbol']: ticker_name for ticker_name, config in self.tickers.items()
+                   if ticker_name not in prices}
+        if missing:
+            try:
+                for symbol, price in feed.prices(list(missing)).items():
+                    prices[missing[symbol]] = price
+            except Exception as yf_e:
+                print(f"⚠️ Error getting Yahoo prices: {yf_e}")
         
         return prices
     
@@ -104,10 +117,17 @@ class LiveStrategyPaperTrader:
             config = crypto_tickers[ticker_name]
             symbol = config['symbol']
             
-            # Run backtest to get strategy signals
-            backtest_result = run_backtest(symbol, config)
+            if self.use_signal_daemon:
+                has_position = ticker_name in self.positions and self.positions[ticker_name]['quantity'] > 0
+                signal = daemon_trade_signal(ticker_name, has_position)
+                if signal is not None:
+                    return signal
+                print(f"⚠️ {ticker_name}: signal_daemon not reachable - falling back to backtest")
+            
+            # Backtest-Ergebnis (Registry, sonst frischer run_backtest)
+            backtest_result = get_backtest_result(symbol, config, end_date=self.clock.last_closed_day())
             
-            if not backtest_result or not backtest_result.get('matched_trades'):
+            if not backtest_result or backtest_result.get('matched_trades') is None:
                 return {'signal': 'HOLD', 'strength': 0.0, 'reason': 'No backtest data'}
             
             # Analyze recent trades for signals
@@ -177,7 +197,8 @@ class LiveStrategyPaperTrader:
             
             # For paper trading, we'll simulate the order
             # In real implementation, you'd use the actual Bitpanda Paper Trading endpoint
-            order_id = f"PAPER_{int(time.time())}_{ticker_name}_{action}"
+            order_time = self.clock.now()
+            order_id = f"PAPER_{int(order_time.timestamp())}_{ticker_name}_{action}"
             
             # Simulate order execution
             order_result = {
@@ -188,7 +209,7 @@ class LiveStrategyPaperTrader:
                 'amount': amount_eur,
                 'price': price,
                 'filled_amount': amount_eur,
-                'timestamp': datetime.now().isoformat()
+                'timestamp': order_time.isoformat()
             }
             
             # Update local positions
@@ -213,7 +234,7 @@ class LiveStrategyPaperTrader:
             
             # Log the trade
             trade_log_entry = {
-                'timestamp': datetime.now(),
+                'timestamp': order_time,
                 'ticker': ticker_name,
                 'action': action,
                 'amount_eur': amount_eur,
@@ -223,6 +244,8 @@ class LiveStrategyPaperTrader:
             }
             
             self.trade_log.append(trade_log_entry)
+            self.ledger.record_fill(ticker_name, action, amount_eur / price, price, 'live_strategy',
+                                    timestamp=order_time, value=amount_eur, order_id=order_id)
             
             print(f"✅ ORDER EXECUTED: {action} {ticker_name} €{amount_eur:.2f} @ €{price:.4f}")
             
@@ -238,7 +261,7 @@ class LiveStrategyPaperTrader:
         if not self.is_trading_hours():
             return
         
-        print(f"\n🔍 CHECKING SIGNALS - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        print(f"\n🔍 CHECKING SIGNALS - {self.clock.now().strftime('%Y-%m-%d %H:%M:%S')}")
         print("-" * 60)
         
         # Get current prices
@@ -249,7 +272,7 @@ class LiveStrategyPaperTrader:
             return
         
         # Process each cryptocurrency
-        for ticker_name in crypto_tickers.keys():
+        for ticker_name in self.tickers.keys():
             try:
                 if ticker_name not in current_prices:
                     continue
@@ -284,7 +307,7 @@ class LiveStrategyPaperTrader:
                         print(f"   ❌ Trade failed: {order_result.get('error', 'Unknown error')}")
                 
                 # Small delay between tickers
-                time.sleep(1)
+                self.clock.sleep(1)
                 
             except Exception as e:
                 print(f"❌ Error processing {ticker_name}: {e}")
@@ -296,14 +319,16 @@ class LiveStrategyPaperTrader:
             return
         
         df = pd.DataFrame(self.trade_log)
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        timestamp = self.clock.now().strftime('%Y%m%d_%H%M%S')
         filename = f"live_paper_trading_log_{timestamp}.csv"
+        if self.output_dir:
+            filename = os.path.join(self.output_dir, filename)
         df.to_csv(filename, index=False)
         print(f"💾 Trading log saved: {filename}")
     
     def show_status(self):
         """Show current trading status"""
-        print(f"\n📊 LIVE TRADING STATUS - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        print(f"\n📊 LIVE TRADING STATUS - {self.clock.now().strftime('%Y-%m-%d %H:%M:%S')}")
         print("=" * 60)
         
         # Portfolio summary
@@ -333,16 +358,18 @@ class LiveStrategyPaperTrader:
         print(f"📅 Duration: {duration_days} days")
         print(f"⏰ Check Interval: {self.check_interval} seconds")
         print(f"🕐 Trading Hours: {self.trading_hours['start']} - {self.trading_hours['end']}")
+        if self.clock.replay:
+            print("⏩ REPLAY MODE: simulated clock, stored price history")
         print("=" * 60)
         
         self.running = True
-        start_time = datetime.now()
+        start_time = self.clock.now()
         end_time = start_time + timedelta(days=duration_days)
         
         cycle_count = 0
         
         try:
-            while self.running and datetime.now() < end_time:
+            while self.running and self.clock.now() < end_time:
                 cycle_count += 1
                 
                 # Process trading signals
@@ -358,7 +385,7 @@ class LiveStrategyPaperTrader:
                 
                 # Wait for next cycle
                 print(f"⏳ Next check in {self.check_interval} seconds... (Cycle {cycle_count})")
-                time.sleep(self.check_interval)
+                self.clock.sleep(self.check_interval)
                 
         except KeyboardInterrupt:
             print("\n🛑 STOPPED BY USER")
@@ -369,7 +396,7 @@ class LiveStrategyPaperTrader:
             self.show_status()
             
             print(f"\n🏁 LIVE TRADING COMPLETED")
-            print(f"📅 Duration: {datetime.now() - start_time}")
+            print(f"📅 Duration: {self.clock.now() - start_time}")
             print(f"📊 Total Cycles: {cycle_count}")
             print(f"📋 Total Trades: {len(self.trade_log)}")
     
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+MINUTEN-PIPELINE MIT TAGES-ROLL-UP
+- Neue 1m-Bars werden nur angehängt (price_store <SYMBOL>/1m); der zuletzt
+  gespeicherte (evtl. noch laufende) Minuten-Bar wird ersetzt, ältere Bars ignoriert
+- Tages-Aggregate (<SYMBOL>/1d_from_1m) werden inkrementell gepflegt: nur die vom
+  Batch betroffenen Tage werden aus dem Minuten-Tail neu aggregiert
+- Die laufende Tageskerze liegt nach jedem ingest im Speicher (current_candle) und
+  wird in den Tagesdatensatz (1d) veröffentlicht, ohne die Minutendaten neu zu lesen
+- <SYMBOL>_minute.csv bleibt als Append-Log erhalten (letzter Wert je Zeitstempel gewinnt)
+"""
+
+import os
+
+import pandas as pd
+
+from price_store import (
+    PRICE_COLUMNS,
+    append_bars,
+    append_csv_and_store,
+    last_bar_time,
+    load_prices,
+    load_since,
+    normalize_ohlcv,
+    sync_from_csv,
+)
+
+MINUTE_INTERVAL = "1m"
+ROLLUP_INTERVAL = "1d_from_1m"
+
+
+def rollup_daily(minutes):
+    """Aggregiert Minutenbars zu Tageskerzen (Open erster, Close letzter gültiger Wert)."""
+    if minutes is None or minutes.empty:
+        return pd.DataFrame(columns=PRICE_COLUMNS, index=pd.DatetimeIndex([], name="Date"), dtype="float64")
+    grouped = minutes.groupby(minutes.index.floor("D"))
+    daily = pd.DataFrame({
+        "Open": grouped["Open"].first(),
+        "High": grouped["High"].max(),
+        "Low": grouped["Low"].min(),
+        "Close": grouped["Close"].last(),
+        "Volume": grouped["Volume"].sum(),
+    })
+    daily.index.name = "Date"
+    return daily.dropna(subset=["Close"])
+
+
+def ticks_to_minute_bars(ticks, time_column="Date", price_column="price", volume_column="volume"):
+    """Tick-/Trade-Liste (Zeit, Preis, Volumen) -> 1m OHLCV-Bars."""
+    minute = pd.to_datetime(ticks[time_column]).dt.floor("min")
+    grouped = ticks.groupby(minute)
+    bars = pd.DataFrame({
+        "Open": grouped[price_column].first(),
+        "High": grouped[price_column].max(),
+        "Low": grouped[price_column].min(),
+        "Close": grouped[price_column].last(),
+        "Volume": grouped[volume_column].sum(),
+    })
+    bars.index.name = "Date"
+    return bars
+
+
+class MinuteBarPipeline:
+    """
+    Append-only Minutenspeicher + inkrementeller Tages-Roll-up für EIN Symbol.
+    csv_dir: Verzeichnis der <SYMBOL>_minute.csv (None = kein CSV-Log).
+    """
+
+    def __init__(self, symbol, csv_dir=None, base_dir=None):
+        self.symbol = symbol
+        self.base_dir = base_dir
+        self.csv_path = os.path.join(csv_dir, f"{symbol}_minute.csv") if csv_dir is not None else None
+        self._current = None
+
+    def last_timestamp(self):
+        """Letzter gespeicherter Minuten-Bar (None wenn noch leer)."""
+        if self.csv_path and os.path.exists(self.csv_path):
+            sync_from_csv(self.csv_path, base_dir=self.base_dir)   # einmalig für alte Voll-CSVs
+        return last_bar_time(self.symbol, MINUTE_INTERVAL, self.base_dir)
+
+    def ingest(self, bars):
+        """
+        Übernimmt neue Minutenbars; gibt die Anzahl übernommener Bars zurück.
+        Nur Bars ab dem letzten gespeicherten Zeitpunkt werden geschrieben.
+        """
+        frame = normalize_ohlcv(bars)
+        last = self.last_timestamp()
+        if last is not None:
+            frame = frame[frame.index >= last]
+        if frame.empty:
+            return 0
+
+        if self.csv_path:
+            append_csv_and_store(self.csv_path, frame, date_column="DateTime", base_dir=self.base_dir)
+        else:
+            append_bars(self.symbol, frame, MINUTE_INTERVAL, self.base_dir)
+
+        # Nur die betroffenen Tage neu aggregieren (Tail ab Tagesbeginn des ersten neuen Bars);
+        # ohne Roll-up (z.B. nach CSV-Migration) einmalig über die gesamte Minutenhistorie
+        first_day = frame.index[0].normalize()
+        rollup_last = last_bar_time(self.symbol, ROLLUP_INTERVAL, self.base_dir)
+        if rollup_last is None:
+            minutes = load_prices(self.symbol, MINUTE_INTERVAL, self.base_dir)
+        else:
+            minutes = load_since(self.symbol, min(first_day, rollup_last), MINUTE_INTERVAL, self.base_dir)
+        daily = rollup_daily(minutes)
+        append_bars(self.symbol, daily, ROLLUP_INTERVAL, self.base_dir)
+        self._current = daily.iloc[-1] if not daily.empty else None
+        return len(frame)
+
+    def current_candle(self):
+        """Laufende (letzte) Tageskerze als Series (name = Tag) oder None."""
+        if self._current is None:
+            last_day = last_bar_time(self.symbol, ROLLUP_INTERVAL, self.base_dir)
+            if last_day is None:
+                return None
+            tail = load_since(self.symbol, last_day, ROLLUP_INTERVAL, self.base_dir)
+            self._current = tail.iloc[-1] if tail is not None and not tail.empty else None
+        return self._current
+
+    def daily(self, since=None):
+        """Tages-Roll-up (komplett oder ab since) ohne die Minutendaten zu lesen."""
+        if since is not None:
+            return load_since(self.symbol, since, ROLLUP_INTERVAL, self.base_dir)
+        return load_prices(self.symbol, ROLLUP_INTERVAL, self.base_dir)
+
+    def publish_daily(self, interval="1d"):
+        """
+        Schreibt die Roll-up-Tage ab dem letzten Tag des Tagesdatensatzes (inkl.
+        der laufenden Kerze) in den Tagesdatensatz; ältere Tage bleiben unverändert.
+        Gibt die Anzahl veröffentlichter Tage zurück (0 wenn kein Tagesdatensatz existiert).
+        """
+        last_daily = last_bar_time(self.symbol, interval, self.base_dir)
+        if last_daily is None:
+            return 0
+        days = self.daily(since=last_daily.normalize())
+        if days is None or days.empty:
+            return 0
+        append_bars(self.symbol, days, interval, self.base_dir)
+        return len(days)
+
+
+if __name__ == "__main__":
+    import sys
+    for symbol in sys.argv[1:]:
+        candle = MinuteBarPipeline(symbol).current_candle()
+        print(f"{symbol}: {candle.name.date() if candle is not None else '-'} {candle.to_dict() if candle is not None else ''}")
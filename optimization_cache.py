@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Persistenter Cache für die Long-Parameter-Optimierung (berechne_best_p_tw_long)
+- Key: Symbol, Datensatz-Signatur des optimierten Slices, Grid-Grenzen,
+  Kapital/Kommission/Mindestprovision/Round-Factor und Slice-Prozent
+- Treffer: Grid-Suche entfällt komplett, (p, tw) + Ergebnistabelle kommen von der Platte
+- Miss: volle Optimierung, die komplette sortierte Ergebnistabelle wird gespeichert
+- Größenbasierte Eviction (älteste zuletzt benutzte Einträge zuerst)
+- OPT_CACHE=0 (env) schaltet den Cache ab
+"""
+
+import os
+import json
+import hashlib
+from datetime import datetime
+
+import pandas as pd
+
+import config
+from price_store import dataset_signature
+from signal_utils import berechne_best_p_tw_long, get_long_param_ranges
+
+RESULT_COLUMNS = ["past_window", "trade_window", "final_cap"]
+
+
+def _cache_dir():
+    return os.environ.get("OPT_CACHE_DIR", getattr(config, "OPT_CACHE_DIR", "optimization_cache"))
+
+
+def _cache_enabled():
+    return os.environ.get("OPT_CACHE", "1") != "0"
+
+
+def optimization_cache_key(symbol, df, cfg, start_idx, end_idx, slice_percent=None):
+    """Key-Dict und Hash für eine Optimierung von df.iloc[start_idx:end_idx]."""
+    past_window_range, tw_range = get_long_param_ranges(symbol)
+    key = {
+        "symbol": symbol,
+        # Die Optimierung sieht nur df.iloc[start_idx:end_idx] -> Signatur des Slices
+        "dataset": dataset_signature(df.iloc[start_idx:end_idx]),
+        "past_window": [past_window_range.start, past_window_range.stop],
+        "trade_window": [tw_range.start, tw_range.stop],
+        "initial_capital": repr(float(cfg.get("initial_capital", 10000))),
+        "commission_rate": repr(float(cfg.get("commission_rate", 0.001))),
+        "min_commission": repr(float(cfg.get("min_commission", 1.0))),
+        "order_round_factor": repr(float(cfg.get("order_round_factor", 1))),
+        "slice_percent": list(slice_percent) if slice_percent is not None else None,
+    }
+    digest = hashlib.sha1(json.dumps(key, sort_keys=True).encode()).hexdigest()[:20]
+    return key, digest
+
+
+def _entry_path(digest):
+    return os.path.join(_cache_dir(), f"{digest}.json")
+
+
+def load_cached_optimization(digest):
+    """(p, tw, df_result) aus dem Cache oder None."""
+    path = _entry_path(digest)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            entry = json.load(f)
+        os.utime(path)  # LRU: Zugriff merken
+        table = pd.DataFrame(entry["table"], columns=RESULT_COLUMNS)
+        if not table.empty:
+            table = table.astype({"past_window": "int64", "trade_window": "int64", "final_cap": "float64"})
+        return int(entry["p"]), int(entry["tw"]), table
+    except Exception as e:
+        print(f"⚠️ Optimierungs-Cache {digest} unlesbar: {e}")
+        return None
+
+
+def store_cached_optimization(digest, key, p, tw, df_result):
+    os.makedirs(_cache_dir(), exist_ok=True)
+    entry = {
+        "key": key,
+        "p": int(p),
+        "tw": int(tw),
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "table": df_result[RESULT_COLUMNS].values.tolist(),
+    }
+    path = _entry_path(digest)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(entry, f)
+    os.replace(tmp_path, path)
+    evict_optimization_cache()
+
+
+def evict_optimization_cache(max_bytes=None):
+    """Löscht die am längsten nicht benutzten Einträge, bis das Größenlimit eingehalten ist."""
+    if max_bytes is None:
+        max_bytes = int(getattr(config, "OPT_CACHE_MAX_MB", 50) * 1024 * 1024)
+    cache_dir = _cache_dir()
+    if not os.path.isdir(cache_dir):
+        return 0
+    entries = []
+    for name in os.listdir(cache_dir):
+        if name.endswith(".json"):
+            try:
+                st = os.stat(os.path.join(cache_dir, name))
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, name))
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    for _, size, name in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(os.path.join(cache_dir, name))
+        except FileNotFoundError:
+            pass  # parallel von einem anderen Prozess entfernt
+        total -= size
+        removed += 1
+    return removed
+
+
+def cached_best_p_tw_long(df, cfg, start_idx, end_idx, verbose=False, ticker=None, slice_percent=None, return_table=False, extrema=None):
+    """
+    Wie berechne_best_p_tw_long, aber mit persistentem Ergebnis-Cache.
+    slice_percent: (begin, end) in Prozent, falls df bereits ein Backtest-Slice ist.
+    extrema: vorberechnete Extrema-Stärken (nur bei Cache-Miss genutzt).
+    """
+    if not _cache_enabled():
+        return berechne_best_p_tw_long(df, cfg, start_idx, end_idx, verbose=verbose, ticker=ticker, return_table=return_table, extrema=extrema)
+
+    key, digest = optimization_cache_key(ticker, df, cfg, start_idx, end_idx, slice_percent)
+    cached = load_cached_optimization(digest)
+    if cached is not None:
+        p, tw, df_result = cached
+        if verbose:
+            print(f"♻️ Optimierungs-Cache Treffer für {ticker or 'Unbekannter Ticker'} (Datensatz {key['dataset']}): p={p}, tw={tw}")
+    else:
+        p, tw, df_result = berechne_best_p_tw_long(df, cfg, start_idx, end_idx, verbose=verbose, ticker=ticker, return_table=True, extrema=extrema)
+        try:
+            store_cached_optimization(digest, key, p, tw, df_result)
+        except Exception as e:
+            print(f"⚠️ Optimierungs-Cache konnte nicht geschrieben werden: {e}")
+
+    if return_table:
+        return p, tw, df_result
+    return p, tw
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+PAPER EXECUTION SIMULATOR (lokale Matching-Engine)
+- Füllt Market-/Limit-Orders gegen gespeicherte Minutenbars (price_store 1m),
+  aufgezeichnete Quotes (bid/ask) oder den gecachten Live-Feed (price_feed)
+- Konfigurierbar: Slippage (bps, nur Market-Orders), Latenz (Order aktiv ab
+  Zeitstempel + Latenz), Teilausführungen (max. Anteil am Bar-Volumen bzw. an der
+  Quote-Größe) und Gültigkeit in Bars
+- Orders werden als Batch ausgeführt: Preisreihen werden pro Symbol einmal geladen
+  und als NumPy-Arrays wiederverwendet, die Suche nach Fill-Bars ist vektorisiert
+- Orders ohne Zeitstempel werden gegen den jüngsten Datenpunkt ausgeführt (Live/Paper)
+"""
+
+import itertools
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from config import COMMISSION_RATE, MIN_COMMISSION
+from price_store import load_prices, normalize_ohlcv
+
+
+def _side_arrays(times, buy_open, buy_low, sell_open, sell_high, buy_size, sell_size):
+    return {
+        "t": np.asarray(times, dtype=np.int64),
+        "buy_open": np.asarray(buy_open, dtype=np.float64),
+        "buy_low": np.asarray(buy_low, dtype=np.float64),
+        "sell_open": np.asarray(sell_open, dtype=np.float64),
+        "sell_high": np.asarray(sell_high, dtype=np.float64),
+        "buy_size": np.asarray(buy_size, dtype=np.float64),
+        "sell_size": np.asarray(sell_size, dtype=np.float64),
+    }
+
+
+class BarStream:
+    """
+    Minutenbars je Symbol: Market-Orders zum Open, Limit-Orders sobald Low/High das
+    Limit erreicht. frames: {symbol: OHLCV-DataFrame}, sonst aus dem price_store.
+    """
+
+    def __init__(self, frames=None, interval="1m", base_dir=None):
+        self.frames = dict(frames or {})
+        self.interval = interval
+        self.base_dir = base_dir
+        self._arrays = {}
+
+    def prefetch(self, symbols):
+        for symbol in symbols:
+            self.arrays(symbol)
+
+    def arrays(self, symbol):
+        if symbol not in self._arrays:
+            df = self.frames.get(symbol)
+            if df is None:
+                df = load_prices(symbol, self.interval, self.base_dir)
+            if df is None or df.empty:
+                self._arrays[symbol] = None
+            else:
+                has_volume = "Volume" in df.columns
+                df = normalize_ohlcv(df).dropna(subset=["Open", "High", "Low"])
+                volume = df["Volume"] if has_volume else np.full(len(df), np.nan)   # fehlend = unbegrenzt
+                self._arrays[symbol] = _side_arrays(df.index.asi8, df["Open"], df["Low"], df["Open"], df["High"],
+                                                    volume, volume)
+        return self._arrays[symbol]
+
+
+class QuoteStream:
+    """
+    Aufgezeichnete Quotes je Symbol: Käufe zum Ask, Verkäufe zum Bid.
+    frames: {symbol: DataFrame mit DatetimeIndex und bid/ask (+ optional bid_size/ask_size)}.
+    """
+
+    def __init__(self, frames):
+        self.frames = dict(frames)
+        self._arrays = {}
+
+    def prefetch(self, symbols):
+        for symbol in symbols:
+            self.arrays(symbol)
+
+    def arrays(self, symbol):
+        if symbol not in self._arrays:
+            df = self.frames.get(symbol)
+            if df is None or df.empty:
+                self._arrays[symbol] = None
+            else:
+                df = df.rename(columns=str.lower).sort_index(kind="stable")
+                index = pd.DatetimeIndex(df.index)
+                if index.tz is not None:
+                    index = index.tz_localize(None)
+                bid, ask = df["bid"], df["ask"]
+                no_size = np.full(len(df), np.nan)
+                self._arrays[symbol] = _side_arrays(index.as_unit("ns").asi8, ask, ask, bid, bid,
+                                                    df["ask_size"] if "ask_size" in df else no_size,
+                                                    df["bid_size"] if "bid_size" in df else no_size)
+        return self._arrays[symbol]
+
+
+class LiveQuoteStream:
+    """Aktueller Kurs aus dem gemeinsamen PriceFeed (ein Batch-Abruf für alle Symbole, TTL-Cache)."""
+
+    def __init__(self, feed=None):
+        if feed is None:
+            from price_feed import get_price_feed
+            feed = get_price_feed()
+        self.feed = feed
+        self._arrays = {}
+
+    def prefetch(self, symbols):
+        quotes = self.feed.quotes(list(symbols))
+        now = pd.Timestamp.now().as_unit("ns").value
+        for symbol in symbols:
+            last = (quotes.get(symbol) or {}).get("last")
+            self._arrays[symbol] = None if last is None else _side_arrays([now], [last], [last], [last], [last],
+                                                                           [np.nan], [np.nan])
+
+    def arrays(self, symbol):
+        if symbol not in self._arrays:
+            self.prefetch([symbol])
+        return self._arrays[symbol]
+
+
+class PaperExecutionSimulator:
+    """
+    Matching-Engine für Paper-Trading und Replays.
+
+    - slippage_bps: Aufschlag (Kauf) bzw. Abschlag (Verkauf) auf den Fill-Preis von Market-Orders
+    - latency: Order wird erst ab Zeitstempel + latency ausführbar (Sekunden oder Timedelta)
+    - participation: max. Anteil am Bar-Volumen / an der Quote-Größe je Datenpunkt
+      (None = unbegrenzt; Datenpunkte ohne Volumen-/Größenangabe (NaN) begrenzen nicht,
+      Volumen 0 heißt keine Liquidität)
+    - max_bars: Gültigkeit einer Order in Datenpunkten ab Aktivierung (None = bis Datenende)
+
+    Orders im Batch beeinflussen sich nicht gegenseitig (keine verbrauchte Liquidität).
+    """
+
+    def __init__(self, stream=None, slippage_bps=0.0, latency=0.0, participation=None, max_bars=1440,
+                 commission_rate=COMMISSION_RATE, min_commission=MIN_COMMISSION):
+        self.stream = stream if stream is not None else BarStream()
+        self.slippage = float(slippage_bps) / 10000.0
+        self.latency_ns = (pd.Timedelta(seconds=latency) if isinstance(latency, (int, float)) else pd.Timedelta(latency)).value
+        self.participation = participation
+        self.max_bars = max_bars
+        self.commission_rate = commission_rate
+        self.min_commission = min_commission
+        self._ids = itertools.count(1)
+
+    def execute_batch(self, orders):
+        """
+        orders: Liste von Dicts mit symbol, action ('buy'/'sell'), quantity und optional
+        limit_price, timestamp, order_id. Gibt je Order einen Ausführungsbericht zurück
+        (gleiche Reihenfolge): status FILLED / PARTIAL / UNFILLED / REJECTED, filled_quantity,
+        avg_price, fee, fills [(timestamp, quantity, price)].
+        """
+        self.stream.prefetch({order["symbol"] for order in orders})
+        return [self._execute(order) for order in orders]
+
+    def execute(self, order):
+        return self.execute_batch([order])[0]
+
+    def _report(self, order, status, reason=None, fills=(), activated=None):
+        quantity = float(order["quantity"])
+        filled = float(sum(q for _, q, _ in fills))
+        notional = float(sum(q * p for _, q, p in fills))
+        return {
+            "order_id": order.get("order_id") or f"SIM_{next(self._ids)}",
+            "symbol": order["symbol"],
+            "action": str(order["action"]).lower(),
+            "order_type": "limit" if order.get("limit_price") is not None else "market",
+            "limit_price": order.get("limit_price"),
+            "quantity": quantity,
+            "filled_quantity": filled,
+            "remaining_quantity": max(0.0, quantity - filled),
+            "avg_price": notional / filled if filled > 0 else None,
+            "value": notional,
+            "fee": max(self.min_commission, notional * self.commission_rate) if filled > 0 else 0.0,
+            "status": status,
+            "reason": reason,
+            "submitted": order.get("timestamp"),
+            "activated": activated,
+            "fills": list(fills),
+        }
+
+    def _execute(self, order):
+        action = str(order["action"]).lower()
+        quantity = float(order["quantity"])
+        if action not in ("buy", "sell") or not quantity > 0:
+            return self._report(order, "REJECTED", "Ungültige Order (action/quantity)")
+        data = self.stream.arrays(order["symbol"])
+        if data is None:
+            return self._report(order, "REJECTED", "Keine Preisdaten")
+
+        times = data["t"]
+        timestamp = order.get("timestamp")
+        if timestamp is None:
+            start = len(times) - 1            # jüngster Datenpunkt (Live/Paper)
+        else:
+            ts = pd.Timestamp(timestamp)
+            if ts.tz is not None:
+                ts = ts.tz_localize(None)
+            start = int(np.searchsorted(times, ts.as_unit("ns").value + self.latency_ns, side="left"))
+        if start >= len(times):
+            return self._report(order, "UNFILLED", "Keine Daten nach Aktivierung")
+        end = len(times) if self.max_bars is None else min(len(times), start + int(self.max_bars))
+        activated = pd.Timestamp(times[start])
+
+        limit = order.get("limit_price")
+        if action == "buy":
+            ref, touch, size = data["buy_open"][start:end], data["buy_low"][start:end], data["buy_size"][start:end]
+            if limit is None:
+                eligible, prices = np.isfinite(ref), ref * (1 + self.slippage)
+            else:
+                eligible, prices = touch <= limit, np.minimum(ref, limit)
+        else:
+            ref, touch, size = data["sell_open"][start:end], data["sell_high"][start:end], data["sell_size"][start:end]
+            if limit is None:
+                eligible, prices = np.isfinite(ref), ref * (1 - self.slippage)
+            else:
+                eligible, prices = touch >= limit, np.maximum(ref, limit)
+
+        if self.participation is None:
+            capacity = np.full(len(ref), np.inf)
+        else:
+            capacity = np.where(np.isnan(size), np.inf, np.maximum(size, 0.0) * self.participation)
+        cumulative = np.cumsum(np.where(eligible, capacity, 0.0))
+        if not len(cumulative) or cumulative[-1] <= 0:
+            return self._report(order, "UNFILLED", "Preis/Limit nicht erreicht", activated=activated)
+
+        # Bis zum Datenpunkt füllen, an dem die kumulierte Kapazität die Ordermenge erreicht
+        last = min(int(np.searchsorted(cumulative, quantity, side="left")), len(cumulative) - 1)
+        filled = np.diff(np.minimum(cumulative[:last + 1], quantity), prepend=0.0)
+        hit = np.flatnonzero(filled > 0)
+        fills = [(pd.Timestamp(times[start + k]), float(filled[k]), float(prices[k])) for k in hit]
+        status = "FILLED" if np.isclose(filled.sum(), quantity, rtol=1e-12, atol=0.0) else "PARTIAL"
+        return self._report(order, status, fills=fills, activated=activated)
+
+
+_live_simulator = None
+
+
+def get_live_simulator():
+    """Gemeinsamer Simulator gegen den gecachten Live-Feed (für Paper-Trading ohne Replay)."""
+    global _live_simulator
+    if _live_simulator is None:
+        _live_simulator = PaperExecutionSimulator(LiveQuoteStream(), max_bars=None)
+    return _live_simulator
+
+
+if __name__ == "__main__":
+    import sys
+    symbol = sys.argv[1] if len(sys.argv) > 1 else "BTC-EUR"
+    sim = PaperExecutionSimulator(slippage_bps=5, latency=2, participation=0.1)
+    bars = sim.stream.arrays(symbol)
+    if bars is None:
+        print(f"❌ Keine Minutenbars für {symbol} im price_store")
+    else:
+        ts = pd.Timestamp(bars["t"][max(0, len(bars["t"]) - 120)])
+        start = datetime.now()
+        reports = sim.execute_batch([{"symbol": symbol, "action": "buy", "quantity": 0.5, "timestamp": ts},
+                                     {"symbol": symbol, "action": "sell", "quantity": 0.5, "timestamp": ts,
+                                      "limit_price": float(bars["sell_high"][-120:].max())}])
+        for r in reports:
+            print(f"{r['action'].upper():4} {r['status']:8} {r['filled_quantity']:.4f} @ {r['avg_price']} ({len(r['fills'])} Fills)")
+        print(f"⏱️ {(datetime.now() - start).total_seconds() * 1000:.1f} ms")
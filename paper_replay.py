@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+PAPER-TRADING REPLAY (simulierte Uhr)
+- ReplayClock: now() liefert die Replay-Zeit, sleep() springt sofort vor –
+  die 2-Wochen-Runner laufen ohne Wartezeiten so schnell wie die CPU erlaubt
+- ReplayPriceFeed: Quotes zur Replay-Zeit aus dem price_store (1m-Bars des
+  laufenden Tages, sonst Tagesbar: Open am laufenden Tag, Close für Vortage),
+  kein Netzwerk, kein Bitpanda-Ticker
+- Signale nur aus abgeschlossenen Tagesbars (clock.last_closed_day() -> end_date)
+- replay_paper_trading: ein Prozess pro Ticker, jeder Ticker schreibt dieselben
+  Trade-Logs/Session-CSVs wie der Live-Lauf nach <output_dir>/<runner>/<ticker>/,
+  Fills in einen eigenen Trade-Ledger (<ticker_dir>/trade_ledger.sqlite, pro Lauf neu)
+"""
+
+import contextlib
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from minute_pipeline import MINUTE_INTERVAL
+from price_feed import PriceFeed, _quote_from_bars
+from price_store import load_prices
+from trade_ledger import TradeLedger
+
+RUNNERS = ("daily_opening", "live", "strategy_2week")
+DAY_NS = 86_400 * 10**9
+
+
+class WallClock:
+    """Echtzeit (Live-Betrieb)."""
+
+    replay = False
+
+    def now(self):
+        return datetime.now()
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
+
+    def last_closed_day(self):
+        """Live: None = alle Daten inkl. laufender Tageskerze."""
+        return None
+
+
+class ReplayClock:
+    """Simulierte Uhr: sleep() schiebt nur die Replay-Zeit vor."""
+
+    replay = True
+
+    def __init__(self, start):
+        start = pd.Timestamp(start)
+        if start.tz is not None:
+            start = start.tz_localize(None)
+        self._now = start.to_pydatetime()
+        self.slept = 0.0
+
+    def now(self):
+        return self._now
+
+    def sleep(self, seconds):
+        seconds = max(0.0, float(seconds))
+        self._now += timedelta(seconds=seconds)
+        self.slept += seconds
+
+    def last_closed_day(self):
+        """Letzter vollständig abgeschlossener Handelstag (keine Lookahead-Tageskerze)."""
+        return (self._now - timedelta(days=1)).date()
+
+
+def _flat_quote(price, bar_time, source):
+    price = float(price)
+    return {'last': price, 'open': price, 'high': price, 'low': price, 'volume': 0.0,
+            'bar_time': str(bar_time), 'source': source}
+
+
+class HistoricalPriceSource:
+    """
+    Preisquelle für PriceFeed: Quotes zum Zeitpunkt clock.now() aus dem price_store.
+    Datensätze werden pro Symbol einmal geladen, danach nur searchsorted-Zugriffe.
+    """
+
+    name = 'replay'
+
+    def __init__(self, clock, base_dir=None):
+        self.clock = clock
+        self.base_dir = base_dir
+        self._frames = {}
+
+    def _frame(self, symbol, interval):
+        key = (symbol, interval)
+        if key not in self._frames:
+            df = load_prices(symbol, interval, self.base_dir)
+            self._frames[key] = df.dropna(subset=["Close"]) if df is not None and not df.empty else None
+        return self._frames[key]
+
+    def quote(self, symbol, now):
+        t = pd.Timestamp(now).as_unit("ns").value
+        day_start = t - t % DAY_NS
+
+        # Minutenbars des laufenden Tages bis now (Open = erster Bar, Last = letzter Bar)
+        minutes = self._frame(symbol, MINUTE_INTERVAL)
+        if minutes is not None:
+            times = minutes.index.asi8
+            if times[0] <= t < times[-1] + DAY_NS:
+                lo = int(np.searchsorted(times, day_start, side="left"))
+                hi = int(np.searchsorted(times, t, side="right"))
+                if hi > lo:
+                    return _quote_from_bars(minutes.iloc[lo:hi], self.name)
+                if hi > 0:
+                    return _flat_quote(minutes["Close"].iloc[hi - 1], minutes.index[hi - 1], self.name)
+
+        # Tagesbar: am laufenden Tag ist nur das Open bekannt, sonst letzter Close
+        daily = self._frame(symbol, "1d")
+        if daily is None:
+            return None
+        pos = int(np.searchsorted(daily.index.asi8, t, side="right")) - 1
+        if pos < 0:
+            return None
+        bar = daily.iloc[pos]
+        today = daily.index.asi8[pos] >= day_start and np.isfinite(bar["Open"])
+        return _flat_quote(bar["Open"] if today else bar["Close"], daily.index[pos], self.name)
+
+    def fetch(self, symbols):
+        now = self.clock.now()
+        quotes = {}
+        for symbol in symbols:
+            quote = self.quote(symbol, now)
+            if quote:
+                quotes[symbol] = quote
+        return quotes
+
+
+class ReplayPriceFeed(PriceFeed):
+    """PriceFeed gegen die gespeicherte Historie zur Replay-Zeit (ohne TTL-Cache und Netzwerk)."""
+
+    def __init__(self, clock, base_dir=None):
+        super().__init__(ttl=0, source=HistoricalPriceSource(clock, base_dir))
+
+    def get_json(self, url, headers=None, timeout=10, ttl=None):
+        return None     # Bitpanda-Ticker hat keine Historie -> Runner fallen auf quotes() zurück
+
+
+def replay_ticker(runner, ticker, start, days=14, output_dir=None, base_dir=None):
+    """
+    Führt einen Runner für EINEN Ticker mit ReplayClock ab start über days Tage aus.
+    runner: 'daily_opening' (DailyOpeningTrader), 'live' (LiveStrategyPaperTrader)
+    oder 'strategy_2week' (StrategySignalPaperTrading). Gibt eine Zusammenfassung zurück.
+    Fills gehen in <output_dir>/trade_ledger.sqlite (ohne output_dir: In-Memory-Ledger).
+    """
+    start = pd.Timestamp(start).normalize()
+    clock = ReplayClock(start)
+    feed = ReplayPriceFeed(clock, base_dir)
+    ledger_path = ":memory:"
+    if output_dir:
+        ledger_path = os.path.join(output_dir, "trade_ledger.sqlite")
+        for stale in (ledger_path, ledger_path + "-wal", ledger_path + "-shm"):
+            if os.path.exists(stale):
+                os.remove(stale)
+    ledger = TradeLedger(ledger_path)
+    wall_start = time.perf_counter()
+
+    if runner == "daily_opening":
+        from daily_opening_trader import DailyOpeningTrader
+        trader = DailyOpeningTrader(clock=clock, price_feed=feed, tickers=[ticker], output_dir=output_dir,
+                                    ledger=ledger)
+        trader.start_2_week_daily_trading(duration_days=days)
+        trades = trader.trade_log
+    elif runner == "live":
+        from live_strategy_paper_trading import LiveStrategyPaperTrader
+        trader = LiveStrategyPaperTrader(clock=clock, price_feed=feed, tickers=[ticker], output_dir=output_dir,
+                                         ledger=ledger)
+        trader.start_live_trading(duration_days=days)
+        trades = trader.trade_log
+    elif runner == "strategy_2week":
+        from strategy_2week_paper_trading import StrategySignalPaperTrading
+        simulation = StrategySignalPaperTrading(start_date=start.strftime('%Y-%m-%d'), days=days, clock=clock,
+                                                tickers=[ticker], output_dir=output_dir, ledger=ledger)
+        results = simulation.run_2week_simulation()
+        trades = [trade for day in results['daily_results'] for trade in day['trades']]
+    else:
+        raise ValueError(f"Unbekannter Runner '{runner}' (erlaubt: {', '.join(RUNNERS)})")
+
+    realized = float(ledger.realized_pnl().sum())
+    ledger.close()
+    return {
+        'runner': runner,
+        'ticker': ticker,
+        'start': start,
+        'end': pd.Timestamp(clock.now()),
+        'trades': len(trades),
+        'realized_pnl': realized,
+        'simulated_seconds': clock.slept,
+        'wall_seconds': time.perf_counter() - wall_start,
+        'output_dir': output_dir,
+    }
+
+
+def _replay_worker(runner, ticker, start, days, output_dir, base_dir):
+    """Worker für den Process-Pool: Ausgabe des Runners nach <ticker_dir>/replay.log."""
+    ticker_dir = os.path.join(output_dir, runner, ticker)
+    os.makedirs(ticker_dir, exist_ok=True)
+    with open(os.path.join(ticker_dir, "replay.log"), "w", encoding="utf-8") as log, contextlib.redirect_stdout(log):
+        return replay_ticker(runner, ticker, start, days, ticker_dir, base_dir)
+
+
+def replay_paper_trading(runner, start, days=14, tickers=None, output_dir="replay_output",
+                         max_workers=None, base_dir=None):
+    """
+    Replay eines Runners über gespeicherte Historie, ein Prozess pro Ticker.
+    max_workers: Default env BACKTEST_WORKERS bzw. CPU-Kerne; 1 = seriell im aktuellen Prozess.
+    Ergebnisse in Ticker-Reihenfolge {ticker: Zusammenfassung oder None bei Fehler}.
+    """
+    if runner not in RUNNERS:
+        raise ValueError(f"Unbekannter Runner '{runner}' (erlaubt: {', '.join(RUNNERS)})")
+    if tickers is None:
+        from crypto_tickers import crypto_tickers
+        tickers = list(crypto_tickers)
+    if max_workers is None:
+        env_workers = os.environ.get("BACKTEST_WORKERS")
+        max_workers = int(env_workers) if env_workers else (os.cpu_count() or 1)
+    max_workers = max(1, min(int(max_workers), len(tickers) or 1))
+
+    print(f"⏩ Replay {runner}: {len(tickers)} Ticker ab {pd.Timestamp(start).date()} über {days} Tage "
+          f"({max_workers} worker{'s' if max_workers > 1 else ''})")
+    wall_start = time.perf_counter()
+    results = {}
+    if max_workers == 1:
+        for ticker in tickers:
+            try:
+                results[ticker] = _replay_worker(runner, ticker, start, days, output_dir, base_dir)
+            except Exception as e:
+                print(f"❌ Replay {ticker}: {e}")
+                results[ticker] = None
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {ticker: executor.submit(_replay_worker, runner, ticker, start, days, output_dir, base_dir)
+                       for ticker in tickers}
+            for ticker, future in futures.items():
+                try:
+                    results[ticker] = future.result()
+                except Exception as e:
+                    print(f"❌ Replay {ticker}: Worker-Fehler: {e}")
+                    results[ticker] = None
+
+    for ticker, summary in results.items():
+        if summary:
+            print(f"   {ticker:10} | {summary['trades']:>4} Trades | PnL €{summary['realized_pnl']:>10,.2f} | "
+                  f"{summary['wall_seconds']:.1f}s | {summary['output_dir']}")
+    print(f"⚡ Replay fertig in {time.perf_counter() - wall_start:.1f}s")
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Paper-Trading-Runner über gespeicherte Historie abspielen")
+    parser.add_argument("runner", choices=RUNNERS)
+    parser.add_argument("start", help="Startdatum YYYY-MM-DD")
+    parser.add_argument("--days", type=int, default=14)
+    parser.add_argument("--tickers", nargs="*", default=None)
+    parser.add_argument("--output-dir", default="replay_output")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+    replay_paper_trading(args.runner, args.start, args.days, args.tickers, args.output_dir, args.workers)
@@ -7,7 +7,6 @@ Führt die letzten 14 Tage Trades im Paper Trading aus
 import sys
 import os
 import pandas as pd
-import time
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any
 
@@ -22,9 +21,14 @@ class TradeReplayPaperTrading:
     Replay 14-day trades in Paper Trading
     """
     
-    def __init__(self):
-        """Initialize the paper trader"""
+    def __init__(self, simulator=None):
+        """
+        Initialize the paper trader
+        simulator: optional paper_execution.PaperExecutionSimulator (fills against stored
+        minute bars/quotes from each trade's date instead of instantly at the limit price)
+        """
         self.paper_trader = BitpandaFusionPaperTrader(sandbox=True)
+        self.paper_trader.execution_simulator = simulator
         self.trade_file = "14_day_trades_report_20250810_075205.csv"
         
     def load_14_day_trades(self) -> pd.DataFrame:
@@ -65,6 +69,7 @@ class TradeReplayPaperTrading:
         
         executed_trades = 0
         total_volume = 0.0
+        orders = []
         
         for idx, trade in trades_df.iterrows():
             try:
@@ -86,28 +91,33 @@ class TradeReplayPaperTrading:
                 print(f"\n📅 {date} | {action:4} | {ticker:8} | {quantity:>10.6f} @ €{price:>10.4f}")
                 print(f"   💰 EUR Value: €{eur_value:>8.2f} | Real-time: €{realtime_price:>8.4f}")
                 
-                # Execute the trade
-                order_result = self.paper_trader.place_paper_order(
-                    ticker_name=ticker,
-                    action=action,
-                    quantity=eur_value,  # EUR value
-                    price=price,
-                    order_type="LIMIT"
-                )
-                
-                if order_result['status'] == 'FILLED':
-                    executed_trades += 1
-                    print(f"   ✅ Order executed: {order_result['order_id']}")
-                else:
-                    print(f"   ❌ Order rejected: {order_result.get('reason', 'Unknown')}")
-                
-                # Small delay between trades
-                time.sleep(0.1)
+                orders.append({
+                    'ticker_name': ticker,
+                    'action': action,
+                    'quantity': eur_value,  # EUR value
+                    'price': price,
+                    'order_type': "LIMIT",
+                    'timestamp': trade['Date'],
+                })
                 
             except Exception as e:
-                print(f"   ❌ Error executing trade: {e}")
+                print(f"   ❌ Error preparing trade: {e}")
                 continue
         
+        # Execute all trades in one batch (chronological order preserved)
+        try:
+            order_results = self.paper_trader.place_paper_orders(orders)
+        except Exception as e:
+            print(f"   ❌ Error executing trades: {e}")
+            order_results = []
+        
+        for order_result in order_results:
+            if order_result['status'] in ('FILLED', 'PARTIALLY_FILLED'):
+                executed_trades += 1
+                print(f"   ✅ Order executed: {order_result['order_id']}")
+            else:
+                print(f"   ❌ Order rejected: {order_result.get('reason', 'Unknown')}")
+        
         print(f"\n{'=' * 60}")
         print(f"📊 TRADE EXECUTION SUMMARY")
         print(f"✅ Executed: {executed_trades}/{len(trades_df)} trades")
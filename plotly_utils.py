@@ -2,9 +2,11 @@ import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import plotly.io as pio
 import pandas as pd
+import numpy as np
 import os
 import webbrowser
 import time
+from config import COMMISSION_RATE
 def display_extended_trades_table(ext_signals, symbol):
     """
     KORRIGIERT: Verwende 'Long Action' statt 'Action'
@@ -835,20 +837,149 @@ def open_all_charts_in_sequence():
     
     print(f"🎯 All {len(chart_files)} charts opened!")
 
-def create_equity_curve_from_matched_trades(matched_trades, initial_capital, df_bt, trade_on="Close"):
+def _equity_day_numbers(values):
+    """Kalendertage (int64) für Index/Datumswerte; NaT -> kleinster int64 (trifft nie)."""
+    if not isinstance(values, pd.DatetimeIndex):
+        # Einzeln parsen wie pd.to_datetime(trade['buy_date']) in der Schleife
+        stamps = [pd.to_datetime(v) for v in values]
+        values = pd.DatetimeIndex([ts.tz_localize(None) if pd.notna(ts) and ts.tz is not None else ts for ts in stamps])
+    if values.tz is not None:
+        values = values.tz_localize(None)
+    return values.values.astype('datetime64[D]').astype(np.int64)
+
+def create_equity_curve_from_matched_trades(matched_trades, initial_capital, df_bt, trade_on="Close", commission_rate=None, verbose=False):
+    """
+    EXCEL-VALIDATED DAILY EQUITY CURVE - DYNAMIC FEE CALCULATION (vektorisiert):
+    
+    Trade on Close:
+    - BUY day: capital = capital - fees (fees = Close*shares*commission_rate)
+    - During LONG positions: capital = capital + shares * (Close - previous_Close) DAILY
+    - SELL day: capital = capital + shares * (Close - previous_Close) - fees (fees = Close*shares*commission_rate)
+    - After SELL: capital bleibt CONSTANT bis zum nächsten BUY
+    
+    Trade on Open:
+    - BUY day: capital = capital + shares * (Close - Open) - fees (fees = Open*shares*commission_rate)
+    - During LONG positions: capital = capital + shares * (Close - previous_Close) DAILY
+    - SELL day: capital = capital + shares * (Open - previous_Close) - fees (fees = Open*shares*commission_rate)
+    - After SELL: capital bleibt CONSTANT bis zum nächsten BUY
+    
+    Buy/Sell-Tage werden per searchsorted aus den Trades bestimmt, die Tageswerte
+    als Buchungs-Vektoren aufgebaut und per kumulativer Summe in derselben
+    Reihenfolge wie die Tages-Schleife (create_equity_curve_from_matched_trades_loop)
+    verbucht – die Werte sind identisch. commission_rate default: config.COMMISSION_RATE.
+    """
+    if commission_rate is None:
+        commission_rate = COMMISSION_RATE
+
+    # ✅ FORCE CORRECT INITIAL CAPITAL
+    if initial_capital is None or initial_capital <= 0:
+        print(f"❌ ERROR: Invalid initial_capital={initial_capital}, using 1000 fallback")
+        start_capital = 1000.0
+    else:
+        start_capital = float(initial_capital)
+
+    n = len(df_bt)
+    if n == 0:
+        return []
+
+    day = _equity_day_numbers(df_bt.index)
+    if not np.all(day[1:] >= day[:-1]):
+        # Unsortierter Index: Referenz-Schleife verwenden
+        return create_equity_curve_from_matched_trades_loop(matched_trades, initial_capital, df_bt, trade_on, commission_rate)
+
+    opens = df_bt['Open'].to_numpy(dtype=np.float64)
+    closes = df_bt['Close'].to_numpy(dtype=np.float64)
+    previous_closes = np.empty(n)
+    previous_closes[0] = opens[0]          # Allererster Tag: Open als Fallback
+    previous_closes[1:] = closes[:-1]
+    trade_on_open = trade_on.upper() == "OPEN"
+    trade_prices = opens if trade_on_open else closes
+
+    # Buchungen je Tag in Schleifen-Reihenfolge:
+    # 0/1 = BUY pnl/-fee, 2/3 = LONG- bzw. SELL-pnl/-fee, 4/5 = BUY der offenen Position
+    bookings = np.zeros((n, 6))
+    holding_shares = np.zeros(n)
+
+    def first_bar(target_day, start):
+        bar = max(int(np.searchsorted(day, target_day, side='left')), start)
+        return bar if bar < n and day[bar] == target_day else -1
+
+    def book_buy(bar, shares, slot):
+        if trade_on_open:
+            bookings[bar, slot] += shares * (closes[bar] - opens[bar])
+        bookings[bar, slot + 1] -= trade_prices[bar] * shares * commission_rate
+
+    completed_trades = [t for t in matched_trades if not t.get('is_open', False)]
+    open_trades = [t for t in matched_trades if t.get('is_open', False)]
+
+    buy_days = _equity_day_numbers([t.get('buy_date', '') for t in completed_trades]) if completed_trades else []
+    sell_days = _equity_day_numbers([t.get('sell_date', '') for t in completed_trades]) if completed_trades else []
+
+    start = 0
+    last_sell_bar = 0
+    all_completed = True
+    for k, trade in enumerate(completed_trades):
+        shares = trade.get('shares', 0)
+        buy_bar = first_bar(buy_days[k], start)
+        if buy_bar < 0:
+            # Buy-Tag nicht im Frame: wie in der Schleife keine weiteren Trades
+            all_completed = False
+            break
+        book_buy(buy_bar, shares, 0)
+
+        sell_bar = first_bar(sell_days[k], buy_bar)
+        if sell_bar < 0:
+            # Kein Sell-Tag: Position bleibt bis zum Ende offen
+            holding_shares[buy_bar + 1:] = shares
+            all_completed = False
+            break
+        holding_shares[buy_bar + 1:sell_bar] = shares
+        bookings[sell_bar, 2] += shares * (trade_prices[sell_bar] - previous_closes[sell_bar])
+        bookings[sell_bar, 3] -= trade_prices[sell_bar] * shares * commission_rate
+        start = sell_bar + 1
+        last_sell_bar = sell_bar
+
+    # ✅ OFFENE TRADES (nach allen kompletten Trades, ab dem letzten Sell-Tag)
+    if all_completed and open_trades:
+        open_days = _equity_day_numbers([t.get('buy_date', '') for t in open_trades])
+        candidates = [(first_bar(d, last_sell_bar), j) for j, d in enumerate(open_days)]
+        candidates = [(bar, j) for bar, j in candidates if bar >= 0]
+        if candidates:
+            open_bar, j = min(candidates)
+            shares = open_trades[j].get('shares', 0)
+            book_buy(open_bar, shares, 4)
+            holding_shares[open_bar + 1:] = shares
+
+    # ✅ WÄHREND LONG-POSITION: shares * (Close - previous_Close)
+    long_days = holding_shares > 0
+    bookings[long_days, 2] += holding_shares[long_days] * (closes[long_days] - previous_closes[long_days])
+
+    flat = np.concatenate([[start_capital], bookings.ravel()])
+    equity_curve = np.cumsum(flat)[6::6].tolist()
+
+    if verbose:
+        unique_vals = len(set([int(v/50)*50 for v in equity_curve]))
+        variation = (max(equity_curve) - min(equity_curve)) / start_capital * 100
+        print(f"✅ DYNAMIC FEE Equity: Start €{equity_curve[0]:.0f} → Ende €{equity_curve[-1]:.0f}")
+        print(f"📊 Variation: {variation:.1f}%, Unique Werte: {unique_vals}")
+        print(f"📊 Trade Mode: {trade_on}, Commission: {commission_rate*100:.2f}% (dynamic calculation)")
+
+    return equity_curve
+
+def create_equity_curve_from_matched_trades_loop(matched_trades, initial_capital, df_bt, trade_on="Close", commission_rate=COMMISSION_RATE):
     """
-    EXCEL-VALIDATED DAILY EQUITY CURVE - DYNAMIC FEE CALCULATION:
+    EXCEL-VALIDATED DAILY EQUITY CURVE - DYNAMIC FEE CALCULATION (Tages-Schleife, Referenz):
     
     Trade on Close:
-    - BUY day: capital = capital - fees (fees = Close*shares*0.0018)
+    - BUY day: capital = capital - fees (fees = Close*shares*commission_rate)
     - During LONG positions: capital = capital + shares * (Close - previous_Close) DAILY
-    - SELL day: capital = capital + shares * (Close - previous_Close) - fees (fees = Close*shares*0.0018)
+    - SELL day: capital = capital + shares * (Close - previous_Close) - fees (fees = Close*shares*commission_rate)
     - After SELL: capital bleibt CONSTANT bis zum nächsten BUY
     
     Trade on Open:
-    - BUY day: capital = capital + shares * (Close - Open) - fees (fees = Open*shares*0.0018)
+    - BUY day: capital = capital + shares * (Close - Open) - fees (fees = Open*shares*commission_rate)
     - During LONG positions: capital = capital + shares * (Close - previous_Close) DAILY
-    - SELL day: capital = capital + shares * (Open - previous_Close) - fees (fees = Open*shares*0.0018)
+    - SELL day: capital = capital + shares * (Open - previous_Close) - fees (fees = Open*shares*commission_rate)
     - After SELL: capital bleibt CONSTANT bis zum nächsten BUY
     
     IMPORTANT: Fees are calculated dynamically per trade day using actual Open/Close price and shares,
@@ -858,7 +989,7 @@ def create_equity_curve_from_matched_trades(matched_trades, initial_capital, df_
     print(f"🔍 DEBUG: Initial Capital = €{initial_capital} (from parameter)")
     print(f"🔍 DEBUG: Number of trades = {len(matched_trades)}")
     print(f"🔍 DEBUG: Trade Mode = {trade_on}")
-    print(f"🔍 DEBUG: Commission Rate = 0.18% (dynamic calculation)")
+    print(f"🔍 DEBUG: Commission Rate = {commission_rate*100:.2f}% (dynamic calculation)")
     
     # ✅ FORCE CORRECT INITIAL CAPITAL
     if initial_capital is None or initial_capital <= 0:
@@ -908,7 +1039,7 @@ def create_equity_curve_from_matched_trades(matched_trades, initial_capital, df_
                 # ✅ DYNAMIC FEE CALCULATION - BUY DAY
                 if trade_on.upper() == "OPEN":
                     # Trade on Open: fees = Open * shares * commission_rate
-                    buy_fees = today_open * position_shares * 0.0018  # Default commission rate
+                    buy_fees = today_open * position_shares * commission_rate
                     # capital = capital + (close - open) * shares - fees
                     daily_pnl = position_shares * (today_close - today_open)
                     current_capital = current_capital + daily_pnl - buy_fees
@@ -916,7 +1047,7 @@ def create_equity_curve_from_matched_trades(matched_trades, initial_capital, df_
                         print(f"   📈 BUY OPEN {date.date()}: {position_shares:.4f} * (€{today_close:.2f} - €{today_open:.2f}) - €{buy_fees:.2f} = €{daily_pnl - buy_fees:.2f}, Capital: €{current_capital:.0f}")
                 else:
                     # Trade on Close: fees = Close * shares * commission_rate
-                    buy_fees = today_close * position_shares * 0.0018  # Default commission rate
+                    buy_fees = today_close * position_shares * commission_rate
                     # capital = capital - fees
                     current_capital = current_capital - buy_fees
                     if i < 5 or i > len(df_bt) - 5:
@@ -935,7 +1066,7 @@ def create_equity_curve_from_matched_trades(matched_trades, initial_capital, df_
                 
                 # ✅ DYNAMIC FEE CALCULATION - SELL DAY
                 if trade_on.upper() == "OPEN":
-                    sell_fees = today_open * position_shares * 0.0018
+                    sell_fees = today_open * position_shares * commission_rate
                     # Trade on Open: capital = capital + (open - previous_close) * shares - fee
                     daily_pnl = position_shares * (today_open - previous_close)
                     current_capital = current_capital + daily_pnl - sell_fees
@@ -943,7 +1074,7 @@ def create_equity_curve_from_matched_trades(matched_trades, initial_capital, df_
                         print(f"   💰 SELL OPEN {date.date()}: Verkauf zum Open €{today_open:.2f}, Fees: €{sell_fees:.2f}, Capital: €{current_capital:.0f}")
                         print(f"   � SELL OPEN {date.date()}: {position_shares:.4f} * (€{today_open:.2f} - €{previous_close:.2f}) - €{sell_fees:.2f} = €{daily_pnl - sell_fees:.2f}, Capital: €{current_capital:.0f}")
                 else:
-                    sell_fees = today_close * position_shares * 0.0018  # Default commission rate
+                    sell_fees = today_close * position_shares * commission_rate
                     # Trade on Close: capital = capital + (close - previous_close) * shares - fees
                     daily_pnl = position_shares * (today_close - previous_close)
                     current_capital = current_capital + daily_pnl - sell_fees
@@ -973,7 +1104,7 @@ def create_equity_curve_from_matched_trades(matched_trades, initial_capital, df_
                     # ✅ DYNAMIC FEE CALCULATION - OPEN TRADE
                     if trade_on.upper() == "OPEN":
                         # Trade on Open: fees = Open * shares * commission_rate
-                        open_buy_fees = today_open * position_shares * 0.0018  # Default commission rate
+                        open_buy_fees = today_open * position_shares * commission_rate
                         # capital = capital + (close - open) * shares - fees
                         daily_pnl = position_shares * (today_close - today_open)
                         current_capital = current_capital + daily_pnl - open_buy_fees
@@ -981,7 +1112,7 @@ def create_equity_curve_from_matched_trades(matched_trades, initial_capital, df_
                             print(f"   🔓 OPEN BUY OPEN {date.date()}: {position_shares:.4f} * (€{today_close:.2f} - €{today_open:.2f}) - €{open_buy_fees:.2f}")
                     else:
                         # Trade on Close: fees = Close * shares * commission_rate
-                        open_buy_fees = today_close * position_shares * 0.0018  # Default commission rate
+                        open_buy_fees = today_close * position_shares * commission_rate
                         # capital = capital - fees
                         current_capital = current_capital - open_buy_fees
                         if i < 5 or i > len(df_bt) - 5:
@@ -1002,7 +1133,7 @@ def create_equity_curve_from_matched_trades(matched_trades, initial_capital, df_
     
     print(f"✅ DYNAMIC FEE Equity: Start €{equity_curve[0]:.0f} → Ende €{equity_curve[-1]:.0f}")
     print(f"📊 Variation: {variation:.1f}%, Unique Werte: {unique_vals}")
-    print(f"📊 Trade Mode: {trade_on}, Commission: 0.18% (dynamic calculation)")
+    print(f"📊 Trade Mode: {trade_on}, Commission: {commission_rate*100:.2f}% (dynamic calculation)")
     
     if unique_vals > 50:
         print("   ✅ Equity variiert TÄGLICH korrekt!")
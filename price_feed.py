@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+"""
+PRICE FEED - gemeinsame Preisquelle für Live-/Paper-Trading
+- HTTP-Sessions werden pro Host gepoolt (keine neue Verbindung pro Abruf)
+- Yahoo-Minutenbars für alle Symbole in EINEM Batch-Request (yf.download),
+  fehlende Symbole danach parallel einzeln
+- Kurzer TTL-Cache: wiederholte Abfragen innerhalb eines Polling-Zyklus sind gratis
+- StubPriceSource für Tests/Offline-Betrieb
+- Bitpanda-Ticker-Antworten werden einmal in ein Dict {Instrument-Code: Quote}
+  normalisiert (Formaterkennung einmal pro Antwort-Struktur)
+"""
+
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from urllib.parse import urlsplit
+
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_TTL = 15.0      # Sekunden
+DEFAULT_WORKERS = 8
+
+
+def _quote_from_bars(hist, source):
+    """Quote-Dict aus Minutenbars eines Tages (Open = erster Bar, Rest = letzter Bar)."""
+    hist = hist.dropna(subset=["Close"])
+    if hist.empty:
+        return None
+    last = hist.iloc[-1]
+    return {
+        'last': float(last['Close']),
+        'open': float(hist['Open'].iloc[0]),
+        'high': float(last['High']),
+        'low': float(last['Low']),
+        'volume': float(last['Volume']) if 'Volume' in hist.columns and pd.notna(last['Volume']) else 0.0,
+        'bar_time': str(hist.index[-1]),
+        'source': source,
+    }
+
+
+# ---------- Bitpanda Ticker-Index ----------
+CODE_FIELDS = ('instrument_code', 'symbol', 'pair', 'name')
+LAST_FIELDS = ('last_price', 'last', 'price', 'close')
+BID_FIELDS = ('best_bid', 'bid')
+ASK_FIELDS = ('best_ask', 'ask')
+VOLUME_FIELDS = ('base_volume', 'volume', 'vol')
+CHANGE_FIELDS = ('change_24h', 'change', 'price_change_percentage')
+
+_shape_parsers = {}     # Antwort-Struktur -> Parser
+
+
+def canonical_instrument_code(code):
+    """'btc-eur' / 'BTC/EUR' / 'BTC_EUR' -> 'BTC_EUR'."""
+    return str(code).strip().upper().replace('-', '_').replace('/', '_')
+
+
+def _first_field(keys, candidates):
+    return next((field for field in candidates if field in keys), None)
+
+
+def _to_float(value):
+    try:
+        return float(value) if value not in (None, '') else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _record_parser(keys):
+    """Feldnamen einmal pro Struktur auflösen, danach nur noch direkte Zugriffe."""
+    last_f = _first_field(keys, LAST_FIELDS)
+    bid_f, ask_f = _first_field(keys, BID_FIELDS), _first_field(keys, ASK_FIELDS)
+    vol_f, chg_f = _first_field(keys, VOLUME_FIELDS), _first_field(keys, CHANGE_FIELDS)
+
+    def parse(record):
+        last = _to_float(record.get(last_f)) if last_f else None
+        if last is None:
+            return None
+        bid = _to_float(record.get(bid_f)) if bid_f else None
+        ask = _to_float(record.get(ask_f)) if ask_f else None
+        return {
+            'last': last,
+            'bid': bid if bid else last * 0.999,
+            'ask': ask if ask else last * 1.001,
+            'volume': (_to_float(record.get(vol_f)) or 0.0) if vol_f else 0.0,
+            'change_24h': (_to_float(record.get(chg_f)) or 0.0) if chg_f else 0.0,
+        }
+    return parse
+
+
+def _shape_key(data):
+    if isinstance(data, list):
+        first = next((item for item in data if isinstance(item, dict)), None)
+        return ('list', frozenset(first) if first is not None else None)
+    if isinstance(data, dict) and data:
+        first = next(iter(data.values()))
+        return ('dict', type(first).__name__, frozenset(first) if isinstance(first, dict) else None)
+    return (type(data).__name__,)
+
+
+def _build_parser(shape):
+    """Parser für eine Antwort-Struktur: data -> {code: quote}."""
+    if shape[0] == 'list' and shape[1] is not None:
+        # Liste von Ticker-Objekten: Code-Feld einmal bestimmen
+        code_f = _first_field(shape[1], CODE_FIELDS)
+        parse = _record_parser(shape[1])
+
+        def parse_list(data):
+            index = {}
+            for item in data:
+                if isinstance(item, dict) and item.get(code_f):
+                    quote = parse(item)
+                    if quote:
+                        index[canonical_instrument_code(item[code_f])] = quote
+            return index
+        return parse_list
+
+    if shape[0] == 'dict' and shape[2] is not None:
+        if _first_field(shape[2], LAST_FIELDS):
+            # {code: {last/bid/ask...}}
+            parse = _record_parser(shape[2])
+
+            def parse_records(data):
+                index = {}
+                for code, record in data.items():
+                    quote = parse(record) if isinstance(record, dict) else None
+                    if quote:
+                        index[canonical_instrument_code(code)] = quote
+                return index
+            return parse_records
+
+        # {base: {quote_currency: price}} (öffentlicher Bitpanda /v1/ticker)
+        last_only = _record_parser(('last',))
+
+        def parse_nested(data):
+            index = {}
+            for base, per_currency in data.items():
+                if isinstance(per_currency, dict):
+                    for currency, price in per_currency.items():
+                        quote = last_only({'last': price})
+                        if quote:
+                            index[canonical_instrument_code(f"{base}_{currency}")] = quote
+            return index
+        return parse_nested
+
+    if shape[0] == 'dict':
+        # {code: price}
+        last_only = _record_parser(('last',))
+
+        def parse_flat(data):
+            index = {}
+            for code, price in data.items():
+                quote = last_only({'last': price})
+                if quote:
+                    index[canonical_instrument_code(code)] = quote
+            return index
+        return parse_flat
+
+    return lambda data: {}
+
+
+def parse_ticker_index(data, debug=False):
+    """Bitpanda-Ticker-Antwort -> {kanonischer Instrument-Code: {'last','bid','ask','volume','change_24h'}}."""
+    shape = _shape_key(data)
+    parser = _shape_parsers.get(shape)
+    if parser is None:
+        parser = _shape_parsers[shape] = _build_parser(shape)
+        if debug:
+            sample = data[0] if isinstance(data, list) and data else data
+            print(f"🔍 Debug: neue Ticker-Struktur {shape[:2]} - Beispiel: {str(sample)[:200]}...")
+    return parser(data)
+
+
+def lookup_ticker(index, *codes):
+    """Erster Treffer für die Kandidaten (z.B. Symbol und Ticker-Name) oder None."""
+    for code in codes:
+        quote = index.get(canonical_instrument_code(code))
+        if quote is not None:
+            return quote
+    return None
+
+
+class YahooMinuteSource:
+    """Yahoo Finance 1m-Bars: ein Batch-Download, fehlende Symbole parallel einzeln."""
+
+    name = 'yahoo'
+
+    def __init__(self, max_workers=DEFAULT_WORKERS):
+        self.max_workers = max_workers
+
+    def _fetch_batch(self, symbols):
+        import yfinance as yf
+        data = yf.download(list(symbols), period="1d", interval="1m", group_by="ticker",
+                           auto_adjust=True, progress=False, threads=True)
+        quotes = {}
+        if data is None or data.empty:
+            return quotes
+        for symbol in symbols:
+            try:
+                if isinstance(data.columns, pd.MultiIndex):
+                    if symbol not in data.columns.get_level_values(0):
+                        continue
+                    hist = data[symbol]
+                elif len(symbols) == 1:
+                    hist = data
+                else:
+                    continue
+                quote = _quote_from_bars(hist, self.name)
+                if quote:
+                    quotes[symbol] = quote
+            except Exception:
+                continue
+        return quotes
+
+    def _fetch_one(self, symbol):
+        import yfinance as yf
+        hist = yf.Ticker(symbol).history(period="1d", interval="1m")
+        return _quote_from_bars(hist, self.name) if hist is not None and not hist.empty else None
+
+    def fetch(self, symbols):
+        symbols = list(symbols)
+        quotes = {}
+        try:
+            quotes = self._fetch_batch(symbols)
+        except Exception as e:
+            print(f"⚠️ Yahoo Batch-Abruf fehlgeschlagen: {e}")
+        missing = [s for s in symbols if s not in quotes]
+        if missing:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(missing))) as pool:
+                for symbol, quote in zip(missing, pool.map(self._safe_fetch_one, missing)):
+                    if quote:
+                        quotes[symbol] = quote
+        return quotes
+
+    def _safe_fetch_one(self, symbol):
+        try:
+            return self._fetch_one(symbol)
+        except Exception as e:
+            print(f"⚠️ Yahoo {symbol}: {e}")
+            return None
+
+
+class StubPriceSource:
+    """Lokale Preisquelle für Tests: {symbol: price} oder {symbol: quote-dict}."""
+
+    name = 'stub'
+
+    def __init__(self, prices):
+        self.prices = dict(prices)
+        self.calls = []
+
+    def fetch(self, symbols):
+        symbols = list(symbols)
+        self.calls.append(symbols)
+        quotes = {}
+        for symbol in symbols:
+            value = self.prices.get(symbol)
+            if value is None:
+                continue
+            if isinstance(value, dict):
+                quotes[symbol] = dict({'source': self.name}, **value)
+            else:
+                price = float(value)
+                quotes[symbol] = {'last': price, 'open': price, 'high': price, 'low': price,
+                                  'volume': 0.0, 'bar_time': datetime.now().isoformat(timespec="seconds"),
+                                  'source': self.name}
+        return quotes
+
+
+class PriceFeed:
+    """
+    Gemeinsamer Preis-Feed mit Session-Pool und TTL-Cache.
+    quotes(symbols) liefert {symbol: {'last','open','high','low','volume','bar_time','source'}};
+    get_json(url) cached JSON-Antworten (z.B. Bitpanda /ticker) über gepoolte Sessions.
+    """
+
+    def __init__(self, ttl=DEFAULT_TTL, source=None, pool_size=DEFAULT_WORKERS):
+        self.ttl = ttl
+        self.source = source or YahooMinuteSource()
+        self.pool_size = pool_size
+        self._quotes = {}       # symbol -> (fetched_at, quote)
+        self._json = {}         # url -> (fetched_at, data)
+        self._index = {}        # url -> (data, ticker_index)
+        self._sessions = {}     # host -> requests.Session
+        self._lock = threading.Lock()
+
+    def session_for(self, url):
+        """Gepoolte requests.Session pro Host."""
+        host = urlsplit(url).netloc
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self._sessions[host] = session
+            return session
+
+    def get_json(self, url, headers=None, timeout=10, ttl=None):
+        """GET mit gepoolter Session; Antwort wird ttl Sekunden gecacht. None bei Fehler."""
+        ttl = self.ttl if ttl is None else ttl
+        now = time.monotonic()
+        with self._lock:
+            cached = self._json.get(url)
+        if cached and now - cached[0] < ttl:
+            return cached[1]
+        response = self.session_for(url).get(url, headers=headers, timeout=timeout)
+        if response.status_code != 200:
+            print(f"❌ API Error {response.status_code}: {url[:50]}...")
+            return None
+        data = response.json()
+        with self._lock:
+            self._json[url] = (now, data)
+        return data
+
+    def ticker_index(self, url, headers=None, timeout=10, ttl=None, debug=False):
+        """Normalisierter Ticker-Index ({Code: Quote}) einer JSON-Antwort, einmal pro Antwort geparst."""
+        data = self.get_json(url, headers=headers, timeout=timeout, ttl=ttl)
+        if data is None:
+            return None
+        with self._lock:
+            cached = self._index.get(url)
+        if cached is not None and cached[0] is data:
+            return cached[1]
+        index = parse_ticker_index(data, debug=debug)
+        with self._lock:
+            self._index[url] = (data, index)
+        return index
+
+    def quotes(self, symbols, ttl=None):
+        """Quotes für alle Symbole; nur abgelaufene/fehlende werden (gemeinsam) abgerufen."""
+        ttl = self.ttl if ttl is None else ttl
+        now = time.monotonic()
+        result, stale = {}, []
+        with self._lock:
+            for symbol in symbols:
+                cached = self._quotes.get(symbol)
+                if cached and now - cached[0] < ttl:
+                    result[symbol] = cached[1]
+                else:
+                    stale.append(symbol)
+        if stale:
+            fetched = self.source.fetch(stale)
+            with self._lock:
+                for symbol, quote in fetched.items():
+                    self._quotes[symbol] = (now, quote)
+            result.update(fetched)
+        return result
+
+    def prices(self, symbols, field='last', ttl=None):
+        """{symbol: float} aus quotes()."""
+        return {symbol: quote[field] for symbol, quote in self.quotes(symbols, ttl).items() if quote.get(field) is not None}
+
+    def clear(self):
+        with self._lock:
+            self._quotes.clear()
+            self._json.clear()
+            self._index.clear()
+
+
+_shared_feed = None
+_shared_lock = threading.Lock()
+
+
+def get_price_feed():
+    """Prozessweit gemeinsamer PriceFeed (Cache und Sessions werden geteilt)."""
+    global _shared_feed
+    with _shared_lock:
+        if _shared_feed is None:
+            _shared_feed = PriceFeed()
+        return _shared_feed
+
+
+def set_price_feed(feed):
+    """Ersetzt den gemeinsamen Feed (z.B. PriceFeed(source=StubPriceSource(...)) in Tests)."""
+    global _shared_feed
+    with _shared_lock:
+        _shared_feed = feed
+    return feed
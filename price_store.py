@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+"""
+Spalten-basierter OHLCV-Preisspeicher (NumPy, memory-mappable)
+- Ein Datensatz pro Symbol/Intervall: price_store/<SYMBOL>/<interval>/
+- Pro Spalte eine Binärdatei (Date = int64 ns, Open..Volume = float64) + meta.json
+- Neue Bars werden nur angehängt; Überschneidungen am Ende (z.B. künstlicher
+  Tages-Bar von heute) ersetzen nur den betroffenen Tail
+- meta.json['rows'] ist der Commit-Punkt: halb geschriebene Bytes dahinter werden ignoriert
+- Migration der bestehenden <SYMBOL>_daily.csv / <SYMBOL>_minute.csv
+- Tail-Lesen ab einem Zeitpunkt (load_since) und CSV-Append-Logs (append_csv_and_store)
+- Datensatz-Signatur (SHA1 über die Roh-Puffer) als Cache-Key für Optimierer/Reports
+"""
+
+import os
+import glob
+import json
+import hashlib
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+PRICE_STORE_DIR = os.environ.get("PRICE_STORE_DIR", "price_store")
+PRICE_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+CSV_INTERVALS = {"daily": "1d", "minute": "1m"}
+
+
+def _dataset_dir(symbol, interval="1d", base_dir=None):
+    return os.path.join(base_dir or PRICE_STORE_DIR, symbol, interval)
+
+
+def _column_path(path, column):
+    return os.path.join(path, f"{column}.i64" if column == "Date" else f"{column}.f64")
+
+
+def _read_meta(path):
+    meta_file = os.path.join(path, "meta.json")
+    if not os.path.exists(meta_file):
+        return None
+    with open(meta_file, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _write_meta(path, meta):
+    meta_file = os.path.join(path, "meta.json")
+    tmp_file = meta_file + ".tmp"
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp_file, meta_file)
+
+
+def normalize_ohlcv(df):
+    """
+    Bringt ein OHLCV-Frame in Store-Form: DatetimeIndex 'Date' (tz-naiv, sortiert,
+    ohne Duplikate – letzter Wert gewinnt) und float64-Spalten Open..Volume.
+    Akzeptiert Date als Spalte ('Date'/'date'/'Datetime') oder als Index.
+    """
+    df = df.copy()
+    df.columns = [c[0] if isinstance(c, tuple) else c for c in df.columns]
+    df.rename(columns={c: str(c).strip().title() for c in df.columns}, inplace=True)
+    for date_col in ["Date", "Datetime"]:
+        if date_col in df.columns:
+            df = df.set_index(date_col)
+            break
+    index = pd.DatetimeIndex(pd.to_datetime(df.index))
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    df.index = index.as_unit("ns")
+    df.index.name = "Date"
+    for col in PRICE_COLUMNS:
+        if col not in df.columns:
+            df[col] = 0.0 if col == "Volume" else np.nan
+    df = df[PRICE_COLUMNS].apply(pd.to_numeric, errors="coerce").astype(np.float64)
+    df = df[~df.index.isna()]
+    df = df[~df.index.duplicated(keep="last")].sort_index(kind="stable")
+    return df
+
+
+def _signature_from_arrays(date_ns, close):
+    sha = hashlib.sha1()
+    sha.update(np.int64(len(close)).tobytes())
+    sha.update(np.ascontiguousarray(date_ns, dtype="<i8").tobytes())
+    sha.update(np.ascontiguousarray(close, dtype="<f8").tobytes())
+    return sha.hexdigest()[:12]
+
+
+def dataset_signature(df, column="Close"):
+    """
+    Reproduzierbare Signatur eines OHLCV-Frames: SHA1 (12 Zeichen) über Zeilenzahl,
+    Zeitstempel (int64 ns) und den float64-Puffer der Close-Spalte – ohne
+    Python-Schleife, daher praktisch kostenlos und als Cache-Key geeignet.
+    """
+    index = pd.DatetimeIndex(df.index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return _signature_from_arrays(index.as_unit("ns").asi8, df[column].to_numpy(dtype=np.float64))
+
+
+def store_exists(symbol, interval="1d", base_dir=None):
+    return _read_meta(_dataset_dir(symbol, interval, base_dir)) is not None
+
+
+def store_info(symbol, interval="1d", base_dir=None):
+    """meta.json des Datensatzes (rows, first, last, updated, source) oder None."""
+    return _read_meta(_dataset_dir(symbol, interval, base_dir))
+
+
+def _read_columns(path, rows, start=0, mmap=False):
+    """Liest Zeilen [start, rows) aller Spalten (int64 Datum + float64 Preise)."""
+    columns = {}
+    for col in ["Date"] + PRICE_COLUMNS:
+        dtype = np.int64 if col == "Date" else np.float64
+        count = rows - start
+        if count <= 0:
+            columns[col] = np.empty(0, dtype=dtype)
+        elif mmap:
+            columns[col] = np.memmap(_column_path(path, col), dtype=dtype, mode="r", offset=start * 8, shape=(count,))
+        else:
+            with open(_column_path(path, col), "rb") as f:
+                f.seek(start * 8)
+                columns[col] = np.fromfile(f, dtype=dtype, count=count)
+    return columns
+
+
+def load_prices(symbol, interval="1d", base_dir=None, mmap=False):
+    """
+    Lädt einen Datensatz als DataFrame mit DatetimeIndex 'Date' und Spalten Open..Volume.
+    mmap=True liefert memory-mapped Spalten (nur lesen). None wenn nicht vorhanden.
+    """
+    path = _dataset_dir(symbol, interval, base_dir)
+    meta = _read_meta(path)
+    if meta is None:
+        return None
+    columns = _read_columns(path, int(meta["rows"]), mmap=mmap)
+    index = pd.DatetimeIndex(columns.pop("Date").view("datetime64[ns]"), name="Date")
+    return pd.DataFrame(columns, index=index, copy=False)
+
+
+def last_bar_time(symbol, interval="1d", base_dir=None):
+    """Zeitstempel des letzten gespeicherten Bars (aus meta.json) oder None."""
+    meta = _read_meta(_dataset_dir(symbol, interval, base_dir))
+    if meta is None or not meta.get("last"):
+        return None
+    return pd.Timestamp(meta["last"])
+
+
+def load_since(symbol, since, interval="1d", base_dir=None):
+    """
+    Lädt nur die Bars ab since (inklusive): Startzeile per searchsorted auf der
+    memory-mapped Datumsspalte, danach werden nur die Tail-Bytes gelesen.
+    None wenn der Datensatz nicht existiert.
+    """
+    path = _dataset_dir(symbol, interval, base_dir)
+    meta = _read_meta(path)
+    if meta is None:
+        return None
+    rows = int(meta["rows"])
+    start = 0
+    if rows:
+        dates = np.memmap(_column_path(path, "Date"), dtype=np.int64, mode="r", shape=(rows,))
+        start = int(np.searchsorted(dates, pd.Timestamp(since).as_unit("ns").value, side="left"))
+        del dates
+    columns = _read_columns(path, rows, start=start)
+    index = pd.DatetimeIndex(columns.pop("Date").view("datetime64[ns]"), name="Date")
+    return pd.DataFrame(columns, index=index, copy=False)
+
+
+def _append_raw(path, frame, rows):
+    """Schreibt ein normalisiertes Frame ab Zeile rows (Commit erst über _commit)."""
+    for col in ["Date"] + PRICE_COLUMNS:
+        col_path = _column_path(path, col)
+        mode = "r+b" if os.path.exists(col_path) else "wb"
+        with open(col_path, mode) as f:
+            f.truncate(rows * 8)   # Tail ersetzen bzw. unvollständige Writes verwerfen
+            f.seek(rows * 8)
+            if col == "Date":
+                f.write(frame.index.asi8.astype(np.int64).tobytes())
+            else:
+                f.write(frame[col].to_numpy(dtype=np.float64).tobytes())
+    return rows + len(frame)
+
+
+def _csv_stat(csv_path):
+    st = os.stat(csv_path)
+    return {"path": os.path.abspath(csv_path), "mtime_ns": st.st_mtime_ns, "size": st.st_size}
+
+
+def _commit(path, symbol, interval, rows, first_ns, last_ns, source_csv=None):
+    previous = _read_meta(path) or {}
+    _write_meta(path, {
+        "symbol": symbol,
+        "interval": interval,
+        "rows": int(rows),
+        "columns": ["Date"] + PRICE_COLUMNS,
+        "first": str(pd.Timestamp(first_ns)) if rows else None,
+        "last": str(pd.Timestamp(last_ns)) if rows else None,
+        "updated": datetime.now().isoformat(timespec="seconds"),
+        # Stand der CSV, mit der der Datensatz zuletzt abgeglichen wurde
+        "source": _csv_stat(source_csv) if source_csv else previous.get("source"),
+    })
+
+
+def write_prices(symbol, df, interval="1d", base_dir=None, source_csv=None):
+    """Schreibt einen Datensatz komplett neu (z.B. Migration). Gibt die Zeilenzahl zurück."""
+    frame = normalize_ohlcv(df)
+    path = _dataset_dir(symbol, interval, base_dir)
+    os.makedirs(path, exist_ok=True)
+    rows = _append_raw(path, frame, 0)
+    _commit(path, symbol, interval, rows,
+            frame.index.asi8[0] if rows else None, frame.index.asi8[-1] if rows else None, source_csv)
+    return rows
+
+
+def append_bars(symbol, new_bars, interval="1d", base_dir=None, source_csv=None):
+    """
+    Fügt neue Bars an. Bars nach dem letzten gespeicherten Zeitpunkt werden nur
+    angehängt; überschneiden sich die neuen Bars mit dem Ende (heutiger Bar
+    ersetzt, Lücke gefüllt), wird ab dem ersten betroffenen Zeitpunkt nur der
+    Tail neu geschrieben (neue Werte gewinnen). Gibt die neue Zeilenzahl zurück.
+    """
+    frame = normalize_ohlcv(new_bars)
+    path = _dataset_dir(symbol, interval, base_dir)
+    meta = _read_meta(path)
+    if meta is None:
+        return write_prices(symbol, frame, interval, base_dir, source_csv)
+    rows = int(meta["rows"])
+    if frame.empty:
+        return rows
+
+    dates = np.memmap(_column_path(path, "Date"), dtype=np.int64, mode="r", shape=(rows,)) if rows else np.empty(0, np.int64)
+    first_new = frame.index.asi8[0]
+    pos = int(np.searchsorted(dates, first_new, side="left"))
+    first_ns = dates[0] if rows else first_new
+    del dates
+
+    if pos < rows:
+        # Tail ab pos mit den neuen Bars zusammenführen
+        tail_cols = _read_columns(path, rows, start=pos)
+        tail_index = pd.DatetimeIndex(tail_cols.pop("Date").view("datetime64[ns]"), name="Date")
+        tail = pd.DataFrame(tail_cols, index=tail_index)
+        frame = pd.concat([tail, frame])
+        frame = frame[~frame.index.duplicated(keep="last")].sort_index(kind="stable")
+        first_ns = min(first_ns, frame.index.asi8[0])
+
+    rows = _append_raw(path, frame, pos)
+    _commit(path, symbol, interval, rows, first_ns, frame.index.asi8[-1], source_csv)
+    return rows
+
+
+def _csv_symbol_interval(csv_path):
+    name = os.path.basename(csv_path)[:-len(".csv")]
+    symbol, _, kind = name.rpartition("_")
+    return symbol, CSV_INTERVALS.get(kind)
+
+
+def is_synced(csv_path, base_dir=None):
+    """True wenn der Datensatz zu dieser CSV existiert und die CSV seit dem letzten Abgleich unverändert ist."""
+    symbol, interval = _csv_symbol_interval(csv_path)
+    meta = _read_meta(_dataset_dir(symbol, interval, base_dir)) if symbol and interval else None
+    if meta is None or not meta.get("source") or not os.path.exists(csv_path):
+        return False
+    source = meta["source"]
+    stat = _csv_stat(csv_path)
+    return source == stat
+
+
+def sync_from_csv(csv_path, base_dir=None, force=False):
+    """
+    Übernimmt eine <SYMBOL>_daily.csv / _minute.csv in den Store, wenn sich die CSV
+    seit dem letzten Abgleich geändert hat (andere Skripte schreiben weiterhin CSVs).
+    Gibt (symbol, interval, rows) zurück oder None.
+    """
+    symbol, interval = _csv_symbol_interval(csv_path)
+    if not symbol or interval is None or not os.path.exists(csv_path):
+        return None
+    if not force and is_synced(csv_path, base_dir):
+        return symbol, interval, int(_read_meta(_dataset_dir(symbol, interval, base_dir))["rows"])
+    rows = write_prices(symbol, pd.read_csv(csv_path), interval, base_dir, source_csv=csv_path)
+    return symbol, interval, rows
+
+
+def save_csv_and_append(csv_path, full_df, new_bars, base_dir=None, **to_csv_kwargs):
+    """
+    Für die bestehenden CSV-Updater: schreibt die CSV wie bisher und zieht den
+    Store nur mit den geänderten Bars nach (append statt Neu-Parsen). War der
+    Store vorher nicht mit der CSV abgeglichen, wird einmal voll synchronisiert.
+    """
+    symbol, interval = _csv_symbol_interval(csv_path)
+    in_sync = is_synced(csv_path, base_dir)
+    full_df.to_csv(csv_path, **to_csv_kwargs)
+    if not symbol or interval is None:
+        return None
+    if in_sync and new_bars is not None and len(new_bars):
+        return append_bars(symbol, new_bars, interval, base_dir, source_csv=csv_path)
+    return sync_from_csv(csv_path, base_dir=base_dir, force=True)[2]
+
+
+def _csv_last_tz(csv_path):
+    """Zeitzone des Zeitstempels in der letzten CSV-Zeile (erste Spalte) oder None."""
+    with open(csv_path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        f.seek(max(0, f.tell() - 4096))
+        lines = f.read().decode("utf-8", errors="ignore").strip().splitlines()
+    try:
+        return pd.Timestamp(lines[-1].split(",")[0]).tz if lines else None
+    except ValueError:
+        return None
+
+
+def append_csv_and_store(csv_path, new_bars, date_column="Date", base_dir=None):
+    """
+    Append-Variante für Logs wie <SYMBOL>_minute.csv: hängt nur new_bars an die
+    CSV an (Header nur bei neuer Datei; bei doppelten Zeitstempeln gewinnt beim
+    Einlesen der letzte) und zieht den Store mit. Eine CSV, die seit dem letzten
+    Abgleich von anderer Seite geändert wurde, wird vorher einmal voll übernommen.
+    Gibt die neue Zeilenzahl des Stores zurück.
+    """
+    symbol, interval = _csv_symbol_interval(csv_path)
+    if not symbol or interval is None:
+        raise ValueError(f"Unbekanntes CSV-Format: {csv_path}")
+    if os.path.exists(csv_path):
+        sync_from_csv(csv_path, base_dir=base_dir)
+    frame = normalize_ohlcv(new_bars)
+    if frame.empty:
+        return int((store_info(symbol, interval, base_dir) or {}).get("rows", 0))
+    out = frame.reset_index().rename(columns={"Date": date_column})
+    exists = os.path.exists(csv_path)
+    tz = _csv_last_tz(csv_path) if exists else None
+    if tz is not None:
+        # Gleiches Zeitstempel-Format wie die vorhandenen Zeilen (z.B. yfinance "+00:00")
+        out[date_column] = out[date_column].dt.tz_localize(tz)
+    out.to_csv(csv_path, mode="a", header=not exists, index=False)
+    return append_bars(symbol, frame, interval, base_dir, source_csv=csv_path)
+
+
+def load_symbol_frame(symbol, interval="1d", csv_path=None, base_dir=None):
+    """
+    Loader für Backtests: liefert das indizierte OHLCV-Frame aus dem Store und
+    synchronisiert vorher aus der CSV, falls diese neuer ist. None wenn weder
+    Store noch CSV vorhanden.
+    """
+    if csv_path is None:
+        kind = {v: k for k, v in CSV_INTERVALS.items()}.get(interval, interval)
+        csv_path = os.path.join(os.getcwd(), f"{symbol}_{kind}.csv")
+    if os.path.exists(csv_path):
+        sync_from_csv(csv_path, base_dir=base_dir)
+    return load_prices(symbol, interval, base_dir)
+
+
+def migrate_csv_files(csv_dir=".", base_dir=None, force=False):
+    """Migriert alle <SYMBOL>_daily.csv / <SYMBOL>_minute.csv aus csv_dir in den Store."""
+    migrated = {}
+    for kind in CSV_INTERVALS:
+        for csv_path in sorted(glob.glob(os.path.join(csv_dir, f"*_{kind}.csv"))):
+            try:
+                result = sync_from_csv(csv_path, base_dir=base_dir, force=force)
+                if result:
+                    symbol, interval, rows = result
+                    migrated[(symbol, interval)] = rows
+                    print(f"✅ {os.path.basename(csv_path)} → {symbol}/{interval}: {rows} Zeilen")
+            except Exception as e:
+                print(f"❌ Migration {csv_path} fehlgeschlagen: {e}")
+    return migrated
+
+
+if __name__ == "__main__":
+    print("📦 Migriere CSV-Dateien in den Preisspeicher...")
+    result = migrate_csv_files(force=True)
+    print(f"✅ {len(result)} Datensätze in {PRICE_STORE_DIR}/")
@@ -7,7 +7,8 @@ Process real Bitpanda CSV exports for proper tax reporting
 import pandas as pd
 import os
 from datetime import datetime
-import glob
+
+from file_catalog import get_file_catalog, year_bounds
 
 def find_real_bitpanda_files():
     """Find real Bitpanda export files (not paper trading)"""
@@ -24,21 +25,20 @@ def find_real_bitpanda_files():
     ]
     
     # Also check for any CSV that's NOT paper trading
-    all_csvs = glob.glob("*.csv")
     paper_trading_keywords = ['paper', 'backtest', 'strategy', 'trades_report', 'simulation']
     
-    real_files = []
+    # Only files whose catalogued date range overlaps 2024 (or without date columns)
+    catalog = get_file_catalog()
+    year_start, year_end = year_bounds(2024)
     
     # Add files matching our patterns
-    for pattern in patterns:
-        files = glob.glob(pattern, recursive=False)
-        real_files.extend(files)
+    real_files = catalog.find(patterns, year_start, year_end, min_size=0)
     
     # Add any other CSV that doesn't look like paper trading
-    for csv_file in all_csvs:
-        if not any(keyword in csv_file.lower() for keyword in paper_trading_keywords):
-            if csv_file not in real_files and os.path.getsize(csv_file) > 100:  # Non-empty
-                real_files.append(csv_file)
+    for csv_file in catalog.find(["*.csv"], year_start, year_end, min_size=101,
+                                 exclude_keywords=paper_trading_keywords):
+        if csv_file not in real_files:
+            real_files.append(csv_file)
     
     # Remove duplicates and sort
     real_files = sorted(list(set(real_files)))
@@ -60,6 +60,12 @@ def analyze_real_bitpanda_csv(csv_file):
         separators = [',', ';', '\t']
         encodings = ['utf-8', 'iso-8859-1', 'cp1252', 'utf-16']
         
+        # Schema from the file catalog first (no re-sniffing of known files)
+        entry = get_file_catalog().entry(csv_file)
+        if entry and entry['sep']:
+            separators = [entry['sep']] + [s for s in separators if s != entry['sep']]
+            encodings = [entry['encoding']] + [e for e in encodings if e != entry['encoding']]
+        
         df = None
         used_sep = None
         used_encoding = None
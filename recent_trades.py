@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+RECENT TRADES - Abfragen über die Matched-Trades-Tabelle
+- Datumsspalten werden einmal pro Tabelle typisiert (datetime64, tz-naiv, ungültig = NaT)
+  statt pro Trade geparst
+- Zeitfenster per Boolean-Maske (Datum >= now - days)
+- Order-Zeilen (BUY = Entry, SELL = Exit) der letzten N Tage für alle Ticker auf einmal,
+  aus den gecachten Backtest-Ergebnissen (Backtest-Registry) statt neuer run_backtest-Läufe
+"""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+ORDER_COLUMNS = ['date', 'ticker', 'quantity', 'price', 'order_type', 'limit_price', 'open_close',
+                 'action', 'realtime_price', 'artificial_included']
+BUY_LIMIT_FACTOR = 0.999    # Limit leicht unter Entry Price
+SELL_LIMIT_FACTOR = 1.001   # Limit leicht über Exit Price
+
+
+def empty_orders():
+    """Leere Order-Tabelle mit typisierter date-Spalte."""
+    return pd.DataFrame({c: pd.Series(dtype="datetime64[ns]" if c == 'date' else object) for c in ORDER_COLUMNS})
+
+
+def to_datetime_column(values):
+    """Datumswerte (Timestamp/date/str, gemischte Formate, mit/ohne Zeitzone) -> datetime64[ns] tz-naiv."""
+    series = pd.Series(values, copy=False)
+    if isinstance(series.dtype, pd.DatetimeTZDtype):
+        return series.dt.tz_localize(None).astype("datetime64[ns]")
+    if pd.api.types.is_datetime64_dtype(series.dtype):
+        return series.astype("datetime64[ns]")
+    series = series.where(series.astype(str).str.strip().ne(""))
+    try:
+        parsed = pd.to_datetime(series, errors="coerce", format="mixed")
+        if isinstance(parsed.dtype, pd.DatetimeTZDtype):
+            parsed = parsed.dt.tz_localize(None)
+        parsed = parsed.astype("datetime64[ns]")
+    except (TypeError, ValueError):
+        parsed = pd.Series(pd.NaT, index=series.index, dtype="datetime64[ns]")
+    # Nicht erkannte Werte (z.B. Zeitzonen gemischt mit tz-naiven Werten) einzeln auf Wandzeit bringen
+    retry = parsed.isna() & series.notna()
+    if retry.any():
+        parsed[retry] = [_wall_time(v) for v in series[retry]]
+    return parsed
+
+
+def _wall_time(value):
+    ts = pd.to_datetime(value, errors="coerce")
+    return ts.tz_localize(None) if ts is not pd.NaT and ts.tz is not None else ts
+
+
+def typed_trades(matched_trades, date_columns=('Entry Date', 'Exit Date')):
+    """Matched Trades (DataFrame oder Liste von Dicts) -> DataFrame mit typisierten Datumsspalten."""
+    if matched_trades is None:
+        return pd.DataFrame(columns=list(date_columns))
+    frame = matched_trades.copy() if isinstance(matched_trades, pd.DataFrame) else pd.DataFrame(list(matched_trades))
+    for column in date_columns:
+        frame[column] = to_datetime_column(frame[column]) if column in frame.columns else pd.Series(
+            pd.NaT, index=frame.index, dtype="datetime64[ns]")
+    return frame
+
+
+def window_start(days=14, now=None):
+    """Beginn des Zeitfensters: now - days (now Default: jetzt)."""
+    return pd.Timestamp(now if now is not None else datetime.now()) - timedelta(days=days)
+
+
+def window_mask(dates, days=14, now=None):
+    """Boolean-Maske: Datum im Fenster (>= now - days); NaT ist nie im Fenster."""
+    dates = to_datetime_column(dates)
+    return (dates >= window_start(days, now)).to_numpy(dtype=bool)
+
+
+def recent_trade_orders(matched_trades, ticker, days=14, now=None, realtime_price=0.0):
+    """
+    Order-Zeilen eines Tickers im Fenster der letzten days Tage (Spalten ORDER_COLUMNS, date typisiert):
+    - geschlossene Trades (Status CLOSED, nicht Artificial): BUY zum Entry, SELL zum Exit
+    - Artificial (offene Position): nur der eröffnende BUY
+    Reihenfolge: je Trade BUY vor SELL, Artificial zuletzt.
+    """
+    trades = typed_trades(matched_trades)
+    if trades.empty:
+        return empty_orders()
+
+    position = np.arange(len(trades))
+    kind = trades['Type'].fillna('').astype(str) if 'Type' in trades.columns else pd.Series('', index=trades.index)
+    artificial = (kind == 'Artificial').to_numpy()
+    closed = ~artificial
+    if 'Status' in trades.columns:
+        closed &= (trades['Status'].fillna('').astype(str) == 'CLOSED').to_numpy()
+
+    entry_in = window_mask(trades['Entry Date'], days, now)
+    exit_in = window_mask(trades['Exit Date'], days, now)
+    quantity = pd.to_numeric(trades.get('Quantity', 0), errors='coerce').fillna(0.0).to_numpy(dtype=np.float64)
+    entry_price = pd.to_numeric(trades.get('Entry Price', 0), errors='coerce').fillna(0.0).to_numpy(dtype=np.float64)
+    exit_price = pd.to_numeric(trades.get('Exit Price', 0), errors='coerce').fillna(0.0).to_numpy(dtype=np.float64)
+
+    def legs(mask, dates, prices, limit_factor, open_close, action, is_artificial, rank):
+        return pd.DataFrame({
+            'date': dates.to_numpy()[mask],
+            'ticker': ticker,
+            'quantity': quantity[mask],
+            'price': prices[mask],
+            'order_type': 'Limit',
+            'limit_price': prices[mask] * limit_factor,
+            'open_close': open_close,
+            'action': action,
+            'realtime_price': realtime_price,
+            'artificial_included': is_artificial,
+            '_rank': rank[mask],
+        })
+
+    orders = pd.concat([
+        legs(closed & entry_in, trades['Entry Date'], entry_price, BUY_LIMIT_FACTOR, 'Open', 'BUY', False, position * 2),
+        legs(closed & exit_in, trades['Exit Date'], exit_price, SELL_LIMIT_FACTOR, 'Close', 'SELL', False, position * 2 + 1),
+        legs(artificial & entry_in, trades['Entry Date'], entry_price, BUY_LIMIT_FACTOR, 'Open', 'BUY', True,
+             position + 2 * len(trades)),
+    ], ignore_index=True)
+    return orders.sort_values('_rank', kind='stable').drop(columns='_rank').reset_index(drop=True)
+
+
+def recent_orders_for_results(results, days=14, now=None, realtime_prices=None):
+    """
+    Order-Zeilen der letzten days Tage für alle Ticker: results {ticker: Backtest-Ergebnis}.
+    Sortiert nach Tag (neueste zuerst), innerhalb eines Tages in Ticker-/Trade-Reihenfolge.
+    """
+    realtime_prices = realtime_prices or {}
+    frames = []
+    for ticker, result in results.items():
+        matched = result.get('matched_trades') if isinstance(result, dict) else None
+        if matched is None or len(matched) == 0:
+            continue
+        frames.append(recent_trade_orders(matched, ticker, days, now, realtime_prices.get(ticker, 0.0)))
+    frames = [f for f in frames if not f.empty]
+    if not frames:
+        return empty_orders()
+    orders = pd.concat(frames, ignore_index=True)
+    day = orders['date'].dt.normalize()
+    return orders.iloc[np.argsort(-day.to_numpy().astype(np.int64), kind='stable')].reset_index(drop=True)
+
+
+def cached_backtest_results(tickers=None):
+    """{ticker: Backtest-Ergebnis} über get_backtest_result (Registry-Treffer ohne Neuberechnung)."""
+    from crypto_backtesting_module import get_backtest_result
+    if tickers is None:
+        from crypto_tickers import crypto_tickers
+        tickers = crypto_tickers
+    results = {}
+    for ticker_name, config in tickers.items():
+        try:
+            results[ticker_name] = get_backtest_result(config.get('symbol', ticker_name), config)
+        except Exception as e:
+            print(f"   ❌ Fehler bei {ticker_name}: {e}")
+            results[ticker_name] = False
+    return results
+
+
+def sort_trades_by_date(trades, column='buy_date', reverse=True):
+    """Liste von Trade-Dicts nach einem Datumsfeld sortieren (einmal typisiert; fehlend = ganz alt)."""
+    if not trades:
+        return trades
+    dates = to_datetime_column([t.get(column, '1900-01-01') for t in trades]).fillna(pd.Timestamp('1900-01-01'))
+    keys = dates.to_numpy().astype(np.int64)
+    order = np.argsort(-keys if reverse else keys, kind='stable')
+    trades[:] = [trades[i] for i in order]
+    return trades
@@ -0,0 +1,396 @@
+#!/usr/bin/env python3
+"""
+SIGNAL DAEMON - dauerhaft laufender Signal-Dienst mit warmem Zustand
+- Hält pro Ticker Preis-Frame, Extrema-Zustand (incremental_support_resistance),
+  gewählte Parameter (p, tw) und die aktuelle Strategie-Position im Speicher
+- Neu-Optimierung nur bei einem neuen Tages-Bar (über den Optimierungs-Cache)
+- Preis-Ticks (on_price) ersetzen nur den heutigen Bar, ohne CSV/Store neu zu lesen;
+  der Tick-Bar bleibt erhalten, bis sich der Store selbst ändert
+- run_forever: pro Zyklus ein gemeinsamer Quote-Abruf (price_feed) für alle Ticker -> on_price,
+  danach Abgleich mit dem Store (poll_once)
+- Optimierung läuft außerhalb des Locks, API-Abfragen blockieren nicht
+- Neueste Signale pro Ticker über eine kleine HTTP-API auf localhost:
+    GET /health            -> Status
+    GET /signals           -> alle Ticker
+    GET /signals/<TICKER>  -> ein Ticker
+"""
+
+import sys
+import os
+import json
+import time
+import threading
+import urllib.request
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+
+# Add current directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from config import backtest_years, backtesting_begin, backtesting_end
+from crypto_tickers import crypto_tickers
+from price_feed import get_price_feed
+from price_store import dataset_signature
+from signal_utils import incremental_support_resistance, build_long_signal_table
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+
+class TickerState:
+    """Warmer Zustand eines Tickers."""
+
+    def __init__(self, ticker, config):
+        self.ticker = ticker
+        self.config = config
+        self.symbol = config.get("symbol", ticker)
+        self.trade_on = str(config.get("trade_on", "Close")).title()
+        self.df = None
+        self.signature = None         # Signatur des zuletzt geladenen Store-Frames
+        self.tick_dirty = False       # df enthält einen per on_price gebauten Bar
+        self.past_window = None
+        self.trade_window = None
+        self.optimized_day = None
+        self.signal = {}
+
+
+def _default_loader(symbol):
+    from crypto_backtesting_module import load_crypto_data_yf
+    return load_crypto_data_yf(symbol, backtest_years)
+
+
+def _default_optimizer(df, symbol):
+    from crypto_backtesting_module import create_backtest_frame, optimize_parameters
+    df_bt = create_backtest_frame(df, backtesting_begin, backtesting_end)
+    result = optimize_parameters(df_bt if df_bt is not None and not df_bt.empty else df, symbol)
+    return result.get('optimal_past_window', 5), result.get('optimal_trade_window', 2)
+
+
+class SignalDaemon:
+    """
+    Signal-Dienst: warm_up() einmal, danach poll_once() / on_price() – jede
+    Abfrage der API liest nur den Speicher.
+    """
+
+    def __init__(self, tickers=None, poll_interval=60, host=DEFAULT_HOST, port=DEFAULT_PORT,
+                 data_loader=None, optimizer=None, price_feed=None, price_ticks=True):
+        self.tickers = tickers if tickers is not None else crypto_tickers
+        self.poll_interval = poll_interval
+        self.host = host
+        self.port = port
+        self.data_loader = data_loader or _default_loader
+        self.optimizer = optimizer or _default_optimizer
+        self.price_feed = price_feed          # None -> gemeinsamer Feed (get_price_feed)
+        self.price_ticks = price_ticks
+        self.states = {ticker: TickerState(ticker, cfg) for ticker, cfg in self.tickers.items()}
+        self.running = False
+        self.started = datetime.now()
+        self._lock = threading.RLock()
+        self._server = None
+
+    # ---------- Zustand aktualisieren ----------
+    def refresh_ticker(self, ticker, force_optimize=False):
+        """Lädt die Daten (Store, schnell) und bewertet neu, wenn sich der Datensatz geändert hat."""
+        state = self.states[ticker]
+        df = self.data_loader(state.symbol)
+        if df is None or df.empty:
+            print(f"⚠️ {ticker}: keine Daten")
+            return False
+        signature = dataset_signature(df)
+        if signature == state.signature and not force_optimize:
+            return False
+        with self._lock:
+            tick_df = state.df if state.tick_dirty else None
+        keep_tick = tick_df is not None and tick_df.index[-1].normalize() > df.index[-1].normalize()
+        if keep_tick:
+            df = pd.concat([df, tick_df.iloc[[-1]]])        # Store hat den Tick-Tag noch nicht
+        params = self._optimized_params(state, df, force_optimize)
+        with self._lock:
+            state.df = df
+            state.signature = signature
+            state.tick_dirty = keep_tick
+            self._apply_params(state, params)
+            self._evaluate(state)
+        return True
+
+    def on_price(self, ticker, price, timestamp=None):
+        """Preis-Tick: heutigen Bar im Speicher aktualisieren (oder anlegen) und Signal neu bewerten."""
+        state = self.states[ticker]
+        if state.df is None:
+            return None
+        timestamp = pd.Timestamp(timestamp or datetime.now())
+        if timestamp.tz is not None:
+            timestamp = timestamp.tz_convert(None)
+        day = timestamp.normalize()
+        with self._lock:
+            df = state.df
+            last_day = df.index[-1].normalize()
+            if day == last_day:
+                df = df.copy()
+                pos = len(df) - 1
+                df.iloc[pos, df.columns.get_loc("Close")] = price
+                if "High" in df.columns:
+                    df.iloc[pos, df.columns.get_loc("High")] = max(df["High"].iloc[pos], price)
+                if "Low" in df.columns:
+                    df.iloc[pos, df.columns.get_loc("Low")] = min(df["Low"].iloc[pos], price)
+            elif day > last_day:
+                row = {col: price for col in ["Open", "High", "Low", "Close"] if col in df.columns}
+                if "Volume" in df.columns:
+                    row["Volume"] = 0.0
+                new_bar = pd.DataFrame([row], index=pd.DatetimeIndex([day], name=df.index.name))
+                df = pd.concat([df, new_bar])
+            else:
+                return state.signal
+            state.df = df
+            state.tick_dirty = True  # Store-Signatur bleibt, poll_once verwirft den Tick-Bar nicht
+        params = self._optimized_params(state, df)
+        with self._lock:
+            self._apply_params(state, params)
+            self._evaluate(state)
+            return state.signal
+
+    def _optimized_params(self, state, df, force=False):
+        """Neue (p, tw, Tag) für df, falls fällig – läuft ohne Lock; sonst None."""
+        last_day = df.index[-1].normalize()
+        with self._lock:
+            due = force or state.past_window is None or last_day != state.optimized_day
+        if not due:
+            return None
+        past_window, trade_window = self.optimizer(df, state.symbol)
+        return past_window, trade_window, last_day
+
+    @staticmethod
+    def _apply_params(state, params):
+        if params is not None and (state.optimized_day is None or params[2] >= state.optimized_day):
+            state.past_window, state.trade_window, state.optimized_day = params
+
+    def _evaluate(self, state):
+        df = state.df
+        p, tw = state.past_window, state.trade_window
+        supp, res = incremental_support_resistance(state.symbol, df, p, tw)
+        table = build_long_signal_table(supp, res, df, tw, state.trade_on)
+
+        latest = None
+        position, entry_date, entry_price = "FLAT", None, None
+        if not table.empty:
+            actions = table[table["Action"].isin(["buy", "sell"])]
+            for action, trade_day, level_trade in zip(actions["Action"].astype(str), actions["Long Trade Day"], actions["Level trade"]):
+                if action == "buy" and position == "FLAT":
+                    position, entry_date, entry_price = "LONG", trade_day, level_trade
+                elif action == "sell" and position == "LONG":
+                    position, entry_date, entry_price = "FLAT", None, None
+            if not actions.empty:
+                latest = actions.iloc[-1]
+
+        state.signal = {
+            "ticker": state.ticker,
+            "symbol": state.symbol,
+            "action": str(latest["Action"]) if latest is not None else "HOLD",
+            "trade_day": _iso(latest["Long Trade Day"]) if latest is not None else None,
+            "level_date": _iso(latest["Date high/low"]) if latest is not None else None,
+            "level": _num(latest["Level high/low"]) if latest is not None else None,
+            "level_trade": _num(latest["Level trade"]) if latest is not None else None,
+            "position": position,
+            "entry_date": _iso(entry_date),
+            "entry_price": _num(entry_price),
+            "past_window": int(p),
+            "trade_window": int(tw),
+            "last_bar": _iso(df.index[-1]),
+            "last_close": _num(df["Close"].iloc[-1]),
+            "dataset_signature": state.signature,
+            "updated": datetime.now().isoformat(timespec="seconds"),
+        }
+
+    def warm_up(self):
+        print(f"🔥 Warm-up für {len(self.states)} Ticker...")
+        for ticker in self.states:
+            try:
+                self.refresh_ticker(ticker, force_optimize=True)
+                signal = self.states[ticker].signal
+                print(f"   {ticker:10} | {signal.get('action', '-'):4} | {signal.get('position', '-')} | p={signal.get('past_window')}, tw={signal.get('trade_window')}")
+            except Exception as e:
+                print(f"❌ Warm-up {ticker} fehlgeschlagen: {e}")
+
+    def poll_once(self):
+        """Gleicht alle Ticker mit dem Datenbestand ab; bewertet nur geänderte neu."""
+        changed = []
+        for ticker in self.states:
+            try:
+                if self.refresh_ticker(ticker):
+                    changed.append(ticker)
+            except Exception as e:
+                print(f"❌ Update {ticker} fehlgeschlagen: {e}")
+        return changed
+
+    def poll_prices(self):
+        """Quotes aller Ticker mit einem Feed-Abruf holen und als Preis-Ticks anwenden."""
+        symbols = {state.symbol: ticker for ticker, state in self.states.items() if state.df is not None}
+        if not symbols:
+            return []
+        try:
+            quotes = (self.price_feed or get_price_feed()).quotes(list(symbols))
+        except Exception as e:
+            print(f"⚠️ Preis-Feed nicht verfügbar: {e}")
+            return []
+        ticked = []
+        for symbol, quote in quotes.items():
+            ticker = symbols.get(symbol)
+            if ticker is None or quote.get('last') is None:
+                continue
+            try:
+                self.on_price(ticker, float(quote['last']), quote.get('bar_time'))
+                ticked.append(ticker)
+            except Exception as e:
+                print(f"❌ Preis-Tick {ticker} fehlgeschlagen: {e}")
+        return ticked
+
+    def run_cycle(self):
+        """Ein Zyklus von run_forever: Preis-Ticks, danach Abgleich mit dem Store."""
+        ticked = self.poll_prices() if self.price_ticks else []
+        return ticked, self.poll_once()
+
+    # ---------- Abfrage ----------
+    def get_signals(self):
+        with self._lock:
+            return {ticker: dict(state.signal) for ticker, state in self.states.items() if state.signal}
+
+    def get_signal(self, ticker):
+        with self._lock:
+            state = self.states.get(ticker)
+            return dict(state.signal) if state is not None and state.signal else None
+
+    # ---------- HTTP-API ----------
+    def start_api(self):
+        daemon = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = self.path.rstrip("/")
+                if path == "/health":
+                    body = {"status": "ok", "tickers": len(daemon.states), "started": daemon.started.isoformat(timespec="seconds")}
+                elif path == "/signals":
+                    body = daemon.get_signals()
+                elif path.startswith("/signals/"):
+                    body = daemon.get_signal(path.split("/", 2)[2])
+                    if body is None:
+                        return self._send(404, {"error": "unknown ticker"})
+                else:
+                    return self._send(404, {"error": "not found"})
+                self._send(200, body)
+
+            def _send(self, status, body):
+                payload = json.dumps(body, default=str).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        print(f"🌐 Signal-API: http://{self.host}:{self.port}/signals")
+        return self.port
+
+    def stop(self):
+        self.running = False
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def run_forever(self):
+        self.warm_up()
+        self.start_api()
+        self.running = True
+        print(f"⏰ Poll-Intervall: {self.poll_interval}s (Strg+C zum Beenden)")
+        try:
+            while self.running:
+                time.sleep(self.poll_interval)
+                ticked, changed = self.run_cycle()
+                if changed:
+                    print(f"🔄 {datetime.now().strftime('%H:%M:%S')} aktualisiert: {', '.join(changed)}")
+                elif ticked:
+                    print(f"💹 {datetime.now().strftime('%H:%M:%S')} Preis-Ticks: {len(ticked)} Ticker")
+        except KeyboardInterrupt:
+            print("\n🛑 Signal-Daemon gestoppt")
+        finally:
+            self.stop()
+
+
+def _iso(value):
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    return pd.Timestamp(value).strftime('%Y-%m-%d')
+
+
+def _num(value):
+    if value is None or pd.isna(value):
+        return None
+    return float(value)
+
+
+def fetch_signals(ticker=None, host=DEFAULT_HOST, port=DEFAULT_PORT, timeout=2.0):
+    """Client: neueste Signale vom laufenden Daemon (alle oder ein Ticker), None wenn nicht erreichbar."""
+    url = f"http://{host}:{port}/signals" + (f"/{ticker}" if ticker else "")
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            return json.loads(response.read().decode("utf-8"))
+    except Exception:
+        return None
+
+
+def signal_daemon_enabled():
+    """Daemon-Modus der Runner: env SIGNAL_DAEMON (1/true/yes/on), sonst config.SIGNAL_DAEMON."""
+    env = os.environ.get("SIGNAL_DAEMON")
+    if env is not None:
+        return env.strip().lower() in ("1", "true", "yes", "on")
+    import config
+    return bool(getattr(config, "SIGNAL_DAEMON", False))
+
+
+def signal_daemon_port():
+    env = os.environ.get("SIGNAL_DAEMON_PORT")
+    if env:
+        return int(env)
+    import config
+    return int(getattr(config, "SIGNAL_DAEMON_PORT", DEFAULT_PORT))
+
+
+def daemon_trade_signal(ticker, has_position, port=None):
+    """
+    Signal vom laufenden Daemon im Runner-Format {'signal', 'strength', 'reason'};
+    None, wenn der Daemon nicht erreichbar ist oder den Ticker nicht kennt (-> run_backtest).
+    Strategie-Position LONG ohne eigene Position -> BUY, FLAT mit eigener Position -> SELL.
+    """
+    data = fetch_signals(ticker, port=port or signal_daemon_port())
+    if not data or "position" not in data:
+        return None
+    position = data["position"]
+    params = f"p={data.get('past_window')}, tw={data.get('trade_window')}"
+    if position == "LONG" and not has_position:
+        return {'signal': 'BUY', 'strength': 1.0,
+                'reason': f"Daemon: LONG seit {data.get('entry_date')} @ {data.get('entry_price')} ({params})"}
+    if position == "FLAT" and has_position:
+        return {'signal': 'SELL', 'strength': 1.0,
+                'reason': f"Daemon: FLAT nach {data.get('action')} am {data.get('trade_day')} ({params})"}
+    return {'signal': 'HOLD', 'strength': 0.0, 'reason': f"Daemon: {position} ({params})"}
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Signal-Daemon mit warmem Zustand und localhost-API")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--interval", type=int, default=60, help="Poll-Intervall in Sekunden")
+    parser.add_argument("--no-ticks", action="store_true", help="Keine Preis-Ticks, nur Store-Abgleich")
+    args = parser.parse_args()
+    SignalDaemon(poll_interval=args.interval, port=args.port, price_ticks=not args.no_ticks).run_forever()
+
+
+if __name__ == "__main__":
+    main()
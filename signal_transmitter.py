@@ -17,14 +17,16 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from crypto_tickers import crypto_tickers
 from bitpanda_secure_api import get_api_key_safely
+from trade_ledger import get_trade_ledger
 
 class SignalTransmitter:
     """Extract signals from backtest and transmit to Bitpanda Paper Trading"""
     
-    def __init__(self):
+    def __init__(self, ledger=None):
         self.api_key = get_api_key_safely()
         self.base_url = "https://api.bitpanda.com/v1"
         self.trade_log = []
+        self.ledger = ledger or get_trade_ledger()
         
         print("📡 SIGNAL TRANSMITTER MODULE")
         print("=" * 50)
@@ -89,19 +91,19 @@ class SignalTransmitter:
             # Get today's date for filtering
             today = datetime.now().date()
             
-            # Try to load recent matched trades for this ticker
-            from crypto_backtesting_module import run_backtest
+            # Try to load recent matched trades for this ticker (Registry aus run_live_backtest_analysis)
+            from crypto_backtesting_module import get_backtest_result
             
             if ticker_name not in crypto_tickers:
                 return {'signal': 'HOLD', 'strength': 0.0, 'reason': 'Ticker not configured'}
             
             config = crypto_tickers[ticker_name]
             
-            # Safely run backtest to get latest trades
-            print(f"   🔍 Running backtest for {ticker_name}...")
+            # Safely get backtest result (no second run if run_live_backtest_analysis already did it)
+            print(f"   🔍 Getting backtest result for {ticker_name}...")
             
             try:
-                result = run_backtest(ticker_name, config)
+                result = get_backtest_result(ticker_name, config)
             except Exception as backtest_error:
                 print(f"   ❌ Backtest error for {ticker_name}: {backtest_error}")
                 return {'signal': 'HOLD', 'strength': 0.0, 'reason': f'Backtest failed: {str(backtest_error)[:50]}...'}
@@ -422,8 +424,11 @@ class SignalTransmitter:
             
             self.trade_log.append(trade_record)
             
-            # Save to CSV
+            # Save to CSV and trade ledger
             self.save_trade_to_csv(trade_record)
+            self.ledger.record_fill(ticker_name, signal, quantity, current_price, 'signal_transmitter',
+                                    timestamp=trade_record['timestamp'], value=position_amount,
+                                    status=trade_record['status'], note=reason)
             
             print(f"📊 {signal} {ticker_name}: €{position_amount:.2f} @ €{current_price:.4f}")
             print(f"   Quantity: {quantity:.6f} | Strength: {strength:.2f} | Reason: {reason}")
@@ -2,12 +2,13 @@
 
 import pandas as pd
 import numpy as np
-from scipy.signal import argrelextrema
 from config import COMMISSION_RATE, MIN_COMMISSION, ORDER_ROUND_FACTOR, backtesting_begin, backtesting_end, backtest_years
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
 import traceback
 from datetime import date, timedelta
+from collections import deque
+from bisect import bisect_left
 def remove_all_headers_and_set_columns(df, new_columns=None):
     """
     Entfernt alle Header und setzt neue Spalten
@@ -35,7 +36,64 @@ def remove_all_headers_and_set_columns(df, new_columns=None):
         print(f"❌ Fehler beim Setzen der Spalten: {e}")
         return df
 
-def calculate_support_resistance(df, p, tw, verbose=False, ticker=None):
+def _sliding_min(x, k):
+    """
+    min(x[j:j+k]) für alle j (Länge len(x)-k+1) – van Herk/Gil-Werman:
+    Prefix-/Suffix-Minimum je Block der Länge k, O(n) unabhängig von k.
+    NaN im Fenster ergibt NaN (wie np.minimum).
+    """
+    n = len(x)
+    blocks = -(-n // k)
+    padded = np.full(blocks * k, np.inf)
+    padded[:n] = x
+    padded = padded.reshape(blocks, k)
+    prefix = np.minimum.accumulate(padded, axis=1).ravel()
+    suffix = np.minimum.accumulate(padded[:, ::-1], axis=1)[:, ::-1].ravel()
+    return np.minimum(suffix[:n - k + 1], prefix[k - 1:n])
+
+def local_extrema(prices, order, strict=True):
+    """
+    Lokale Minima und Maxima in einem Durchlauf: (min_idx, max_idx).
+    strict=True entspricht argrelextrema(prices, np.less/np.greater, order)
+    (Plateaus sind kein Extremum), strict=False entspricht np.less_equal/
+    np.greater_equal (jeder Punkt eines flachen Tiefs/Hochs zählt).
+    Das Vergleichsfenster wird wie bei scipy an den Rändern abgeschnitten.
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    n = len(prices)
+    order = int(order)
+    if order < 1:
+        raise ValueError("order must be an int >= 1")
+    empty = np.array([], dtype=np.int64)
+    if n == 0:
+        return empty, empty
+
+    # Minimum von prices und -prices über [i-order, i-1] und [i+1, i+order]
+    # (ausserhalb der Reihe +inf); beide Seiten und beide Richtungen in einem Aufruf
+    both = np.stack([prices, -prices])
+    padded = np.full((2, n + 2 * order), np.inf)
+    padded[:, order:order + n] = both
+    window = np.stack([_sliding_min(row, order) for row in padded])
+    left = window[:, :n]
+    right = window[:, order + 1:order + 1 + n]
+
+    if strict:
+        is_extremum = (both < left) & (both < right)
+        # scipy vergleicht am Rand mit sich selbst (clip) -> nie ein striktes Extremum
+        is_extremum[:, [0, -1]] = False
+    else:
+        is_extremum = (both <= left) & (both <= right)
+    return np.flatnonzero(is_extremum[0]), np.flatnonzero(is_extremum[1])
+
+def _age_in_days(index, last_date):
+    """Kalendertage zwischen den Tagen von index und last_date (vektorisiert, lokale Zeit)."""
+    index = pd.DatetimeIndex(index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    days = index.values.astype("datetime64[D]")
+    return (np.datetime64(last_date, "D") - days).astype(np.int64)
+
+def calculate_support_resistance(df, p, tw, verbose=False, ticker=None, strict=True):
     """
     Calculates support and resistance levels using local extrema.
     Only calculates levels at actual peaks and valleys, not every day.
@@ -46,6 +104,7 @@ def calculate_support_resistance(df, p, tw, verbose=False, ticker=None):
     - tw: optimized trade window parameter
     - verbose: print debug info
     - ticker: ticker symbol for debug output
+    - strict: True = plateaus are not extrema (argrelextrema semantics), False = every bar of a flat valley/peak counts
     """
     df = df.copy()
     #df = remove_all_headers_and_set_columns(df, new_columns=["Open", "High", "Low", "Close", "Volume"])
@@ -57,12 +116,9 @@ def calculate_support_resistance(df, p, tw, verbose=False, ticker=None):
     past_window = int(p)
     prices = df["Close"].values
 
-    # Find local minima (support levels)
-    local_min_idx = argrelextrema(prices, np.less, order=past_window)[0]
+    # Find local minima (support levels) and maxima (resistance levels) in one pass
+    local_min_idx, local_max_idx = local_extrema(prices, past_window, strict=strict)
     support = pd.Series(prices[local_min_idx], index=df.index[local_min_idx])
-
-    # Find local maxima (resistance levels)
-    local_max_idx = argrelextrema(prices, np.greater, order=past_window)[0]
     resistance = pd.Series(prices[local_max_idx], index=df.index[local_max_idx])
 
     # Optional: include absolute extremes only if sufficiently in the past (>= tw days old)
@@ -85,8 +141,8 @@ def calculate_support_resistance(df, p, tw, verbose=False, ticker=None):
 
     # Filter out very recent detections (within last tw days); they are not confirmed yet
     if min_age_days > 0:
-        support = support[[ (last_date - idx.date()).days >= min_age_days for idx in support.index ]]
-        resistance = resistance[[ (last_date - idx.date()).days >= min_age_days for idx in resistance.index ]]
+        support = support[_age_in_days(support.index, last_date) >= min_age_days]
+        resistance = resistance[_age_in_days(resistance.index, last_date) >= min_age_days]
     support.sort_index(inplace=True)
     resistance.sort_index(inplace=True)
 
@@ -112,16 +168,15 @@ def assign_long_signals(support, resistance, data, tw, interval="1d"):
         signals = []
         
         # ✅ SUPPORT PROCESSING:
-        support_items = support.items() if isinstance(support, pd.Series) else support.iterrows()
+        support_items = list(support.items() if isinstance(support, pd.Series) else support.iterrows())
+        # Trade Days aller Levels in einem Lookup berechnen
+        support_trade_days = get_trade_day_offsets([d for d, _ in support_items], tw, data)
         
-        for date_idx, level in support_items:
+        for (date_idx, level), trade_day in zip(support_items, support_trade_days):
             try:
                 # Level Value extrahieren
                 level_value = level.iloc[0] if hasattr(level, 'iloc') else float(level)
                 
-                # Trade Day berechnen
-                trade_day = get_trade_day_offset(date_idx, tw, data)
-                
                 if pd.notna(trade_day) and trade_day in data.index:
                     close_price = data.at[trade_day, 'Close']
                     # Support = Buy wenn Preis über Support
@@ -148,16 +203,14 @@ def assign_long_signals(support, resistance, data, tw, interval="1d"):
                 continue
         
         # ✅ RESISTANCE PROCESSING:
-        resistance_items = resistance.items() if isinstance(resistance, pd.Series) else resistance.iterrows()
+        resistance_items = list(resistance.items() if isinstance(resistance, pd.Series) else resistance.iterrows())
+        resistance_trade_days = get_trade_day_offsets([d for d, _ in resistance_items], tw, data)
         
-        for date_idx, level in resistance_items:
+        for (date_idx, level), trade_day in zip(resistance_items, resistance_trade_days):
             try:
                 # Level Value extrahieren
                 level_value = level.iloc[0] if hasattr(level, 'iloc') else float(level)
                 
-                # Trade Day berechnen
-                trade_day = get_trade_day_offset(date_idx, tw, data)
-                
                 if pd.notna(trade_day) and trade_day in data.index:
                     close_price = data.at[trade_day, 'Close']
                     # Resistance = Sell wenn Preis unter Resistance
@@ -225,11 +278,10 @@ def assign_long_signals_base(support, resistance, data, tw):
             print(f"⚠️ Unbekannter Support-Typ: {type(support)}")
             support_items = []
         
-        # Support-Signale verarbeiten
-        for date_idx, level in support_items:
+        # Support-Signale verarbeiten (Trade-Tage per Bulk-Lookup)
+        support_trade_days = get_trade_day_offsets([d for d, _ in support_items], tw, data)
+        for (date_idx, level), trade_day in zip(support_items, support_trade_days):
             try:
-                # Finde nächsten verfügbaren Trade-Tag
-                trade_day = get_trade_day_offset(date_idx, tw, data)
                 
                 if pd.notna(trade_day) and trade_day in data.index:
                     # Support = Buy Signal (wenn Preis über Support Level)
@@ -269,11 +321,10 @@ def assign_long_signals_base(support, resistance, data, tw):
             print(f"⚠️ Unbekannter Resistance-Typ: {type(resistance)}")
             resistance_items = []
         
-        # Resistance-Signale verarbeiten
-        for date_idx, level in resistance_items:
+        # Resistance-Signale verarbeiten (Trade-Tage per Bulk-Lookup)
+        resistance_trade_days = get_trade_day_offsets([d for d, _ in resistance_items], tw, data)
+        for (date_idx, level), trade_day in zip(resistance_items, resistance_trade_days):
             try:
-                # Finde nächsten verfügbaren Trade-Tag
-                trade_day = get_trade_day_offset(date_idx, tw, data)
                 
                 if pd.notna(trade_day) and trade_day in data.index:
                     # Resistance = Sell Signal (wenn Preis unter Resistance Level)
@@ -380,6 +431,74 @@ def assign_long_signals_base(support, resistance, data, tw):
     print(df.head(3))  # Debug-Ausgabe
     return df
 
+def _index_day_numbers(index):
+    """Kalendertage eines DatetimeIndex als int64 (Tage seit 1970-01-01, lokale Wanduhrzeit)."""
+    index = pd.DatetimeIndex(index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return index.values.astype('datetime64[D]').astype(np.int64)
+
+def _parse_trade_window(tw):
+    try:
+        return int(tw)
+    except Exception:
+        return 1
+
+class TradeDayIndex:
+    """
+    Vorberechneter Kalendertag-Index für data.index.
+    Ersetzt die lineare Suche in get_trade_day_offset durch searchsorted
+    und kann von allen Signal-Buildern gemeinsam genutzt werden.
+    """
+
+    def __init__(self, index):
+        self.index = index
+        self.day_num = _index_day_numbers(index)
+        # Erster Index mit Datum >= Ziel == erster Index, an dem das laufende
+        # Maximum das Ziel erreicht (gilt auch für unsortierte Indizes)
+        self._day_cummax = np.maximum.accumulate(self.day_num) if len(self.day_num) else self.day_num
+        self._day_strings = None
+
+    @property
+    def day_strings(self):
+        """'%Y-%m-%d' je Index-Eintrag (einmal pro Index formatiert, für Sortierung/Reports)."""
+        if self._day_strings is None:
+            self._day_strings = np.asarray(pd.DatetimeIndex(self.index).strftime('%Y-%m-%d'), dtype=object)
+        return self._day_strings
+
+    def positions_for_days(self, day_numbers, tw):
+        """Positionen der Trade-Tage für Kalendertage (int64), -1 = kein Trade-Tag."""
+        day_numbers = np.asarray(day_numbers, dtype=np.int64)
+        pos = np.searchsorted(self._day_cummax, day_numbers + _parse_trade_window(tw), side='left')
+        pos[pos >= len(self.day_num)] = -1
+        return pos
+
+    def positions(self, dates, tw):
+        """Bulk-Lookup: Positionen der Trade-Tage für beliebige Datumswerte, -1 = NaT/kein Trade-Tag."""
+        dates = pd.DatetimeIndex(pd.to_datetime(pd.Index(dates, dtype=object), errors='coerce'))
+        missing = dates.isna()
+        pos = np.full(len(dates), -1, dtype=np.int64)
+        if (~missing).any():
+            pos[~missing] = self.positions_for_days(_index_day_numbers(dates[~missing]), tw)
+        return pos
+
+    def lookup_many(self, dates, tw):
+        """Bulk-Lookup: Liste der Trade-Tage (Index-Labels aus data.index, NaT wenn keiner)."""
+        return [self.index[p] if p >= 0 else pd.NaT for p in self.positions(dates, tw)]
+
+    def lookup(self, date_hl, tw):
+        return self.lookup_many([date_hl], tw)[0]
+
+_trade_day_index_cache = {"index": None, "trade_day_index": None}
+
+def get_trade_day_index(data):
+    """TradeDayIndex für data (wiederverwendet, solange data.index dasselbe Objekt ist)."""
+    index = data.index
+    if _trade_day_index_cache["index"] is not index:
+        _trade_day_index_cache["trade_day_index"] = TradeDayIndex(index)
+        _trade_day_index_cache["index"] = index
+    return _trade_day_index_cache["trade_day_index"]
+
 def get_trade_day_offset(date_hl, tw, data):
     """
     Return the first available trading day index in `data` that is on/after
@@ -397,85 +516,130 @@ def get_trade_day_offset(date_hl, tw, data):
         elif not isinstance(date_hl, date):
             date_hl = pd.to_datetime(str(date_hl)).date()
 
-        # Strictly respect the optimized trade window (tw) only
-        try:
-            tw_int = int(tw)
-        except Exception:
-            tw_int = 1
-        target_date = date_hl + timedelta(days=tw_int)
-
-        # Find first data index on/after target_date
-        data_dates = [d.date() if hasattr(d, 'date') else pd.to_datetime(d).date() for d in data.index]
-        for i, d0 in enumerate(data_dates):
-            if d0 >= target_date:
-                return data.index[i]
-
-        # No eligible date found
-        return pd.NaT
+        return get_trade_day_index(data).lookup(date_hl, tw)
 
     except Exception as e:
         print(f"⚠️ Fehler in get_trade_day_offset für {date_hl}: {e}")
         return pd.NaT
 
+def get_trade_day_offsets(dates, tw, data):
+    """
+    Bulk-Version von get_trade_day_offset: löst die Trade-Tage aller Levels
+    mit einem searchsorted-Aufruf auf. Gibt eine Liste (NaT = kein Trade-Tag) zurück.
+    """
+    try:
+        return get_trade_day_index(data).lookup_many(list(dates), tw)
+    except Exception as e:
+        print(f"⚠️ Bulk-Lookup fehlgeschlagen, nutze Einzel-Lookup: {e}")
+        return [get_trade_day_offset(d, tw, data) for d in dates]
+
+LONG_SIGNAL_COLUMNS = [
+    'Date high/low', 'Level high/low', 'Supp/Resist', 'Action', 'Long Signal Extended',
+    'Long Date detected', 'Long Trade Day', 'Level Close', 'Level trade'
+]
+
+def _first_in_run_actions(level_type):
+    """Nur der erste Level einer Support/Resistance-Serie bekommt eine Action (1=buy, -1=sell, 0=None)."""
+    first_in_run = np.ones(len(level_type), dtype=bool)
+    first_in_run[1:] = level_type[1:] != level_type[:-1]
+    return np.where(first_in_run, level_type, 0).astype(np.int8)
+
+def _trade_day_sort_order(trade_day_index, trade_pos):
+    """Reihenfolge wie sort_values('Long Trade Day') auf den Datums-Strings ("" = kein Trade-Tag zuerst)."""
+    sort_key = np.full(len(trade_pos), "", dtype=object)
+    has_trade_day = trade_pos >= 0
+    sort_key[has_trade_day] = trade_day_index.day_strings[trade_pos[has_trade_day]]
+    return sort_key.argsort(kind='quicksort')
+
+def build_long_signal_table(supp_full, res_full, df, tw, trade_on="Close"):
+    """
+    Spaltenbasierte Variante von assign_long_signals_extended.
+    Gleiche Zeilen/Reihenfolge, aber typisierte Spalten:
+      Date high/low / Long Date detected / Long Trade Day: datetime64 (NaT = kein Trade-Tag)
+      Level high/low / Level Close / Level trade: float64
+      Supp/Resist, Action: categorical
+      Trade Pos: int64 Position des Trade-Tags in df (-1 = keiner)
+    Strings entstehen erst in format_long_signal_table (Report/Anzeige).
+    """
+    price_column = "Open" if trade_on.upper() == "OPEN" else "Close"
+
+    level_dates = pd.DatetimeIndex(list(supp_full.index) + list(res_full.index))
+    level_values = np.concatenate([np.asarray(supp_full.values, dtype=np.float64),
+                                   np.asarray(res_full.values, dtype=np.float64)])
+    level_type = np.concatenate([np.ones(len(supp_full), dtype=np.int8),
+                                 -np.ones(len(res_full), dtype=np.int8)])
+
+    # Chronologisch, Support vor Resistance bei gleichem Datum (stabil wie list.sort)
+    order = np.argsort(level_dates.asi8, kind='stable')
+    level_dates = level_dates[order]
+    level_values = level_values[order]
+    level_type = level_type[order]
+    actions = _first_in_run_actions(level_type)
+
+    trade_day_index = get_trade_day_index(df)
+    trade_pos = trade_day_index.positions(level_dates, tw)
+    has_trade_day = trade_pos >= 0
+    # Kein Same-Day-Fallback: ohne Trade-Tag keine Action
+    actions[~has_trade_day] = 0
+
+    prices = np.full(len(trade_pos), np.nan)
+    prices[has_trade_day] = df[price_column].to_numpy(dtype=np.float64)[trade_pos[has_trade_day]]
+    if has_trade_day.any():
+        trade_days = pd.DatetimeIndex(df.index[np.maximum(trade_pos, 0)]).where(has_trade_day)
+    else:
+        trade_days = pd.DatetimeIndex([pd.NaT] * len(trade_pos))
+
+    row_order = _trade_day_sort_order(trade_day_index, trade_pos)
+    table = pd.DataFrame({
+        'Date high/low': level_dates[row_order],
+        'Level high/low': level_values[row_order],
+        'Supp/Resist': pd.Categorical.from_codes((level_type[row_order] < 0).astype(np.int8), ['support', 'resistance']),
+        'Action': pd.Categorical.from_codes(np.select([actions[row_order] == 1, actions[row_order] == -1], [0, 1], 2).astype(np.int8),
+                                            ['buy', 'sell', 'None']),
+        'Long Signal Extended': actions[row_order] == 1,
+        'Long Date detected': trade_days[row_order],
+        'Long Trade Day': trade_days[row_order],
+        'Level Close': prices[row_order],
+        'Level trade': prices[row_order],
+        'Trade Pos': trade_pos[row_order],
+    })
+    return table
+
+def format_long_signal_table(table):
+    """Typisierte Signaltabelle -> bisheriges String-Format von assign_long_signals_extended."""
+    if table is None or table.empty:
+        return pd.DataFrame()
+
+    def _day_strings(values):
+        values = pd.DatetimeIndex(values)
+        return [s if isinstance(s, str) else "" for s in values.strftime('%Y-%m-%d')]
+
+    trade_day_str = _day_strings(table['Long Trade Day'])
+    return pd.DataFrame({
+        'Date high/low': _day_strings(table['Date high/low']),
+        'Level high/low': table['Level high/low'].to_numpy(dtype=np.float64),
+        'Supp/Resist': table['Supp/Resist'].astype(str).tolist(),
+        'Action': table['Action'].astype(str).tolist(),
+        'Long Signal Extended': table['Long Signal Extended'].to_numpy(dtype=bool),
+        'Long Date detected': trade_day_str,
+        'Long Trade Day': trade_day_str,
+        'Level Close': table['Level Close'].to_numpy(dtype=np.float64),
+        'Level trade': table['Level trade'].to_numpy(dtype=np.float64),
+    }, columns=LONG_SIGNAL_COLUMNS)
+
 def assign_long_signals_extended(supp_full, res_full, df, tw, timeframe, trade_on="Close"):
     """
     CONSECUTIVE LOGIC: Nur erste Support/Resistance in Serie = Action
     Enforce T+2: no same-day detection or trading; signals without eligible
     trade day will be marked as None.
+    (Wrapper: build_long_signal_table + format_long_signal_table)
     """
     try:
-        signals = []
-
-        # Collect all levels chronologically
-        all_levels = []
-        for date, level in supp_full.items():
-            all_levels.append({'date': date, 'level': level, 'type': 'support', 'base_action': 'buy'})
-        for date, level in res_full.items():
-            all_levels.append({'date': date, 'level': level, 'type': 'resistance', 'base_action': 'sell'})
-        all_levels.sort(key=lambda x: x['date'])
-
-        last_type = None
-        for level_info in all_levels:
-            current_type = level_info['type']
-            # Only first in a sequence gets an action
-            if current_type != last_type:
-                action = level_info['base_action']
-                long_signal = (action == 'buy')
-            else:
-                action = 'None'
-                long_signal = False
-            last_type = current_type
-
-            trade_day = get_trade_day_offset(level_info['date'], tw, df)
-            price_column = "Open" if trade_on.upper() == "OPEN" else "Close"
-            # No same-day fallback: if tw-day not available, invalidate
-            if pd.isna(trade_day) or trade_day not in df.index:
-                close_price = np.nan
-                action = 'None'
-                long_signal = False
-                trade_day_str = ""
-            else:
-                close_price = df.loc[trade_day, price_column]
-                trade_day_str = trade_day.strftime('%Y-%m-%d')
-
-            signals.append({
-                'Date high/low': level_info['date'].strftime('%Y-%m-%d'),
-                'Level high/low': float(level_info['level']),
-                'Supp/Resist': current_type,
-                'Action': action,
-                'Long Signal Extended': long_signal,
-                'Long Date detected': trade_day_str,
-                'Long Trade Day': trade_day_str,
-                'Level Close': close_price,
-                'Level trade': close_price
-            })
-
-        ext_df = pd.DataFrame(signals)
-        if not ext_df.empty:
-            ext_df = ext_df.sort_values('Long Trade Day').reset_index(drop=True)
-        else:
+        table = build_long_signal_table(supp_full, res_full, df, tw, trade_on)
+        if table.empty:
             print("⚠️  No signals generated")
-        return ext_df
+            return pd.DataFrame()
+        return format_long_signal_table(table)
 
     except Exception as e:
         print(f"❌ Fehler: {e}")
@@ -513,6 +677,85 @@ def simulate_trades_compound_extended(signals_df, initial_capital, commission_ra
         print(f"❌ FEHLER in simulate_trades_compound_extended: {e}")
         return None
 
+def action_codes_from_signals(actions):
+    """'buy'/'sell'/sonst -> 1/-1/0 (funktioniert für str- und categorical-Spalten)."""
+    actions = pd.Series(actions).astype(object)
+    return np.select([actions == 'buy', actions == 'sell'], [1, -1], 0).astype(np.int8)
+
+def simulate_matched_trades_arrays(action_codes, prices, initial_capital, commission_rate, order_round_factor=1.0):
+    """
+    Array-Kern von simulate_matched_trades (ohne DataFrames).
+    action_codes: 1=buy, -1=sell, 0=None in Handelsreihenfolge; prices: Level Close je Zeile.
+
+    Gibt ein dict mit NumPy-Arrays zurück:
+      entry_idx, exit_idx      Zeilenindizes der geschlossenen Trades
+      quantity, pnl, commission, net_pnl
+      capital                  Kapital nach jedem geschlossenen Trade
+      open_entry_idx           Zeile der offenen Position (-1 = keine)
+      open_quantity            Menge der offenen Position (0.0 = keine)
+      final_capital            Kapital nach dem letzten geschlossenen Trade
+    """
+    codes = np.asarray(action_codes, dtype=np.int8)
+    # Python-floats wie bei iterrows, damit round() identisch bleibt
+    prices = np.asarray(prices, dtype=np.float64).tolist()
+
+    # buy nur ohne Position, sell nur mit Position:
+    # Serien gleicher Actions zusammenfassen, führende sells verwerfen -> buy/sell alternierend
+    event_idx = np.flatnonzero(codes != 0)
+    event_codes = codes[event_idx]
+    keep = np.ones(len(event_idx), dtype=bool)
+    keep[1:] = event_codes[1:] != event_codes[:-1]
+    event_idx = event_idx[keep]
+    if len(event_idx) and event_codes[keep][0] == -1:
+        event_idx = event_idx[1:]
+    entry_idx = event_idx[0::2]
+    exit_idx = event_idx[1::2]
+    open_entry_idx = int(entry_idx[len(exit_idx)]) if len(entry_idx) > len(exit_idx) else -1
+    entry_idx = entry_idx[:len(exit_idx)]
+
+    n_trades = len(exit_idx)
+    quantity = np.zeros(n_trades)
+    pnl = np.zeros(n_trades)
+    commission = np.zeros(n_trades)
+    net_pnl = np.zeros(n_trades)
+    capital_path = np.zeros(n_trades)
+
+    # Compounding ist sequentiell (Menge hängt vom Kapital ab) – nur über die Trades
+    capital = initial_capital
+    for k in range(n_trades):
+        entry_price = prices[entry_idx[k]]
+        exit_price = prices[exit_idx[k]]
+        raw_quantity = capital / entry_price
+        qty = round(raw_quantity / order_round_factor) * order_round_factor
+        trade_pnl = (exit_price - entry_price) * qty
+        trade_commission = (entry_price + exit_price) * qty * commission_rate
+        trade_net_pnl = trade_pnl - trade_commission
+        capital += trade_net_pnl
+
+        quantity[k] = qty
+        pnl[k] = trade_pnl
+        commission[k] = trade_commission
+        net_pnl[k] = trade_net_pnl
+        capital_path[k] = capital
+
+    open_quantity = 0.0
+    if open_entry_idx >= 0:
+        raw_quantity = capital / prices[open_entry_idx]
+        open_quantity = round(raw_quantity / order_round_factor) * order_round_factor
+
+    return {
+        'entry_idx': entry_idx,
+        'exit_idx': exit_idx,
+        'quantity': quantity,
+        'pnl': pnl,
+        'commission': commission,
+        'net_pnl': net_pnl,
+        'capital': capital_path,
+        'open_entry_idx': open_entry_idx,
+        'open_quantity': open_quantity,
+        'final_capital': capital,
+    }
+
 def calculate_shares(capital, price, round_factor=1):
     """
     Berechnet die Anzahl kaufbarer Einheiten für das gegebene Kapital und Rundung.
@@ -527,9 +770,21 @@ def update_level_close_long(ext, df, trade_on="Close"):
     Update Level Close column based on trade_on parameter.
     trade_on: "Open" or "Close"
     """
-    closes = []
     price_column = "Open" if trade_on.upper() == "OPEN" else "Close"
-    
+
+    # Spaltenbasiert: Datumswerte einmal parsen und per reindex nachschlagen
+    if df.index.is_unique:
+        if "Long Date detected" not in ext.columns:
+            ext["Level Close"] = np.nan
+            return ext
+        dates = ext["Long Date detected"]
+        if not pd.api.types.is_datetime64_any_dtype(dates):
+            dates = pd.to_datetime(dates, errors='coerce', format='mixed')
+        dates = pd.DatetimeIndex(dates).normalize()
+        ext["Level Close"] = df[price_column].reindex(dates).to_numpy(dtype=np.float64)
+        return ext
+
+    closes = []
     for _, row in ext.iterrows():
         dt = row.get("Long Date detected")  # Changed from "Detect Date" to "Long Date detected"
         if pd.isna(dt):
@@ -548,42 +803,406 @@ def update_level_close_long(ext, df, trade_on="Close"):
     ext["Level Close"] = closes
     return ext
 
-def berechne_best_p_tw_long(df, cfg, start_idx, end_idx, verbose=False, ticker=None):
-    """Brute‑force Optimierung für Long-Parameter.
+def get_long_param_ranges(ticker=None):
+    """Liefert (past_window_range, tw_range) für die Long-Optimierung."""
+    if isinstance(ticker, str) and ('XRP' in ticker.upper()):
+        return range(3, 11), range(1, 5)   # 3..10 / 1..4
+    return range(2, 15), range(1, 8)       # 2..14 / 1..7
 
-    Zielfunktion (aktuell): Maximierung des Endkapitals (final_capital).
-    Frühere README-Angabe zur Sharpe-Ratio wurde korrigiert.
+def _extrema_strength(prices, max_order, comparator):
     """
-    optimierungsergebnisse = []
+    Für jeden Index: größtes order (<= max_order), bei dem argrelextrema(prices,
+    comparator, order) diesen Index noch als Extremum meldet (0 = nie).
+    Gleiche clip-Semantik wie scipy, aber nur EIN Durchlauf für alle past_window.
+    """
+    n = len(prices)
+    strength = np.zeros(n, dtype=np.int64)
+    if n == 0:
+        return strength
+    locs = np.arange(n)
+    alive = np.ones(n, dtype=bool)
+    for shift in range(1, int(max_order) + 1):
+        alive &= comparator(prices, prices.take(locs + shift, mode='clip'))
+        alive &= comparator(prices, prices.take(locs - shift, mode='clip'))
+        if not alive.any():
+            break
+        strength += alive
+    return strength
 
-    # Parameterbereiche bestimmen
-    if isinstance(ticker, str) and ('XRP' in ticker.upper()):
-        past_window_range = range(3, 11)  # 3..10
-        tw_range = range(1, 5)            # 1..4
+class ExtremaStrengthCache:
+    """
+    _extrema_strength einmal über die gesamte Historie; für ein Fenster
+    df.iloc[start:end] werden nur die Ränder (max_order Bars) lokal neu
+    bewertet – innen sind die Vergleichsfenster identisch. Für Walk-Forward
+    mit vielen überlappenden Optimierungsfenstern.
+    """
+
+    def __init__(self, prices, max_order):
+        self.prices = np.asarray(prices, dtype=np.float64)
+        self.max_order = int(max_order)
+        self.min_strength = _extrema_strength(self.prices, self.max_order, np.less)
+        self.max_strength = _extrema_strength(self.prices, self.max_order, np.greater)
+
+    def window(self, start, end):
+        """(min_strength, max_strength) wie _extrema_strength auf prices[start:end]."""
+        return (self._window(self.min_strength, np.less, start, end),
+                self._window(self.max_strength, np.greater, start, end))
+
+    def _window(self, full_strength, comparator, start, end):
+        m = self.max_order
+        local = self.prices[start:end]
+        n = len(local)
+        if n <= 4 * m:
+            return _extrema_strength(local, m, comparator)
+        strength = full_strength[start:end].copy()
+        strength[:m] = _extrema_strength(local[:2 * m], m, comparator)[:m]
+        strength[n - m:] = _extrema_strength(local[n - 2 * m:], m, comparator)[m:]
+        return strength
+
+class SupportResistanceTracker:
+    """
+    Inkrementelle Extrema-Erkennung für EIN (Symbol, past_window).
+
+    Liefert dieselben Support/Resistance-Series wie calculate_support_resistance,
+    hält aber den Zustand zwischen Aufrufen:
+    - Extrema, deren Vergleichsfenster (±past_window) nur bestätigte Bars
+      enthält, werden einmal bestimmt und gemerkt
+    - nur die letzten past_window Bars (und der linke Rand nach Trimmen des
+      Datensatzes) werden pro Abfrage neu bewertet
+    - absolutes Hoch/Tief über monotone Deques (Append/Trimmen amortisiert O(1))
+    - der letzte Bar darf ersetzt werden (künstlicher Tages-Bar von heute)
+    """
+
+    def __init__(self, past_window):
+        self.past_window = int(past_window)
+        self._dates = np.empty(0, dtype=np.int64)
+        self._prices = np.empty(0, dtype=np.float64)
+        self._n = 0
+        self._offset = 0          # erster Bar des aktuellen Datensatzes
+        self._final_upto = 0      # Bars < _final_upto haben endgültigen Extrema-Status
+        self._minima = []         # bestätigte Extrema (absolute Positionen, aufsteigend)
+        self._maxima = []
+        self._min_deque = deque()  # monotone Deques über alle Bars außer dem letzten
+        self._max_deque = deque()
+        self._index = None
+
+    # ---------- Zustand ----------
+    def _grow(self, size):
+        if size > len(self._prices):
+            capacity = max(size, 2 * len(self._prices), 64)
+            dates = np.empty(capacity, dtype=np.int64)
+            prices = np.empty(capacity, dtype=np.float64)
+            dates[:self._n] = self._dates[:self._n]
+            prices[:self._n] = self._prices[:self._n]
+            self._dates, self._prices = dates, prices
+
+    def _commit_bar(self, pos):
+        """Bar pos ist nicht mehr der letzte -> in die Hoch/Tief-Deques übernehmen."""
+        value = self._prices[pos]
+        if np.isnan(value):
+            return
+        while self._min_deque and self._prices[self._min_deque[-1]] > value:
+            self._min_deque.pop()
+        self._min_deque.append(pos)
+        while self._max_deque and self._prices[self._max_deque[-1]] < value:
+            self._max_deque.pop()
+        self._max_deque.append(pos)
+
+    def _finalize(self):
+        """Extrema-Status für Bars festschreiben, deren Fenster den letzten Bar nicht mehr berührt."""
+        k = self.past_window
+        target = max(0, self._n - 1 - k)
+        if target <= self._final_upto:
+            return
+        start = max(0, self._final_upto - k)
+        window = self._prices[start:target + k]
+        for comparator, levels in ((np.less, self._minima), (np.greater, self._maxima)):
+            strength = _extrema_strength(window, k, comparator)
+            hits = np.flatnonzero(strength[self._final_upto - start:target - start] >= k)
+            levels.extend((hits + self._final_upto).tolist())
+        self._final_upto = target
+
+    def reset(self, df):
+        self.__init__(self.past_window)
+        self._append(_index_ns(df.index), df["Close"].to_numpy(dtype=np.float64))
+        self._index = df.index
+
+    def _append(self, dates, prices):
+        if len(dates) == 0:
+            return
+        self._grow(self._n + len(dates))
+        if self._n > 0:
+            self._commit_bar(self._n - 1)
+        self._dates[self._n:self._n + len(dates)] = dates
+        self._prices[self._n:self._n + len(prices)] = prices
+        for pos in range(self._n, self._n + len(dates) - 1):
+            self._commit_bar(pos)
+        self._n += len(dates)
+        self._finalize()
+
+    def update(self, df):
+        """
+        Gleicht den Zustand mit df ab: neue Bars anhängen, letzten Bar ersetzen,
+        vorne gekürzte Historie berücksichtigen. Passt df nicht zum Zustand,
+        wird komplett neu aufgebaut.
+        """
+        dates = _index_ns(df.index)
+        prices = df["Close"].to_numpy(dtype=np.float64)
+        m, n = len(dates), self._n
+        if n == 0 or m == 0:
+            return self.reset(df)
+
+        offset = int(np.searchsorted(self._dates[:n], dates[0]))
+        overlap = n - offset
+        if (offset < self._offset or offset >= n or overlap > m
+                or not np.array_equal(self._dates[offset:n], dates[:overlap])
+                or not np.array_equal(self._prices[offset:n - 1], prices[:overlap - 1], equal_nan=True)):
+            return self.reset(df)
+        if offset > max(1024, n // 2):
+            # Weit nach vorne gekürzt: Puffer neu aufbauen statt ewig zu wachsen
+            return self.reset(df)
+
+        if not np.array_equal(self._prices[n - 1:n], prices[overlap - 1:overlap], equal_nan=True):
+            self._prices[n - 1] = prices[overlap - 1]   # letzter Bar ersetzt
+        self._offset = offset
+        for deque_ in (self._min_deque, self._max_deque):
+            while deque_ and deque_[0] < offset:
+                deque_.popleft()
+        self._append(dates[overlap:], prices[overlap:])
+        self._index = df.index
+
+    # ---------- Abfrage ----------
+    def _extrema_positions(self, comparator, confirmed):
+        k, lo, hi = self.past_window, self._offset, self._n
+        prices = self._prices
+        if hi - lo <= 3 * k + 2:
+            strength = _extrema_strength(prices[lo:hi], k, comparator)
+            return np.flatnonzero(strength >= k) + lo
+        # linker Rand: clip an lo statt an der echten Historie
+        left = np.flatnonzero(_extrema_strength(prices[lo:lo + 2 * k], k, comparator)[:k] >= k) + lo
+        right_start = max(self._final_upto, lo + k)
+        middle = confirmed[bisect_left(confirmed, lo + k):bisect_left(confirmed, right_start)]
+        window_start = right_start - k
+        right = np.flatnonzero(_extrema_strength(prices[window_start:hi], k, comparator)[k:] >= k) + right_start
+        return np.concatenate([left, np.asarray(middle, dtype=np.int64), right])
+
+    def _absolute(self, deque_, better):
+        last = self._n - 1
+        best = deque_[0] if deque_ else None
+        if not np.isnan(self._prices[last]) and (best is None or better(self._prices[last], self._prices[best])):
+            best = last
+        return best
+
+    def levels(self, tw):
+        """(support, resistance) wie calculate_support_resistance(df, past_window, tw)."""
+        index = self._index
+        offset = self._offset
+        prices = self._prices
+        min_idx = self._extrema_positions(np.less, self._minima)
+        max_idx = self._extrema_positions(np.greater, self._maxima)
+        support = pd.Series(prices[min_idx], index=index[min_idx - offset])
+        resistance = pd.Series(prices[max_idx], index=index[max_idx - offset])
+
+        last_day = _index_day_numbers(index[-1:])[0]
+        min_age_days = int(tw) if pd.notna(tw) else 0
+        for series_name, deque_, better in (("support", self._min_deque, np.less), ("resistance", self._max_deque, np.greater)):
+            pos = self._absolute(deque_, better)
+            if pos is None:
+                continue
+            level_date = index[pos - offset]
+            series = support if series_name == "support" else resistance
+            if level_date not in series.index and last_day - _index_day_numbers(index[pos - offset:pos - offset + 1])[0] >= min_age_days:
+                series = pd.concat([series, pd.Series([prices[pos]], index=[level_date])])
+            if series_name == "support":
+                support = series
+            else:
+                resistance = series
+
+        if min_age_days > 0:
+            support = support[last_day - _index_day_numbers(support.index) >= min_age_days]
+            resistance = resistance[last_day - _index_day_numbers(resistance.index) >= min_age_days]
+        support.sort_index(inplace=True)
+        resistance.sort_index(inplace=True)
+        return support, resistance
+
+
+def _index_ns(index):
+    """DatetimeIndex als int64 ns (tz-aware: UTC) für Vergleiche zwischen Aufrufen."""
+    return pd.DatetimeIndex(index).as_unit("ns").asi8
+
+
+_sr_trackers = {}
+
+def incremental_support_resistance(symbol, df, p, tw, verbose=False):
+    """
+    calculate_support_resistance mit Zustand pro (symbol, past_window): bei
+    wiederholten Aufrufen mit angehängten/ersetzten Bars wird nur das Ende neu
+    bewertet. Fällt bei Fehlern auf die volle Berechnung zurück.
+    """
+    if not df.index.is_monotonic_increasing:
+        return calculate_support_resistance(df, p, tw, verbose=verbose, ticker=symbol)
+    try:
+        key = (symbol, int(p))
+        tracker = _sr_trackers.get(key)
+        if tracker is None:
+            tracker = _sr_trackers[key] = SupportResistanceTracker(p)
+        tracker.update(df)
+        support, resistance = tracker.levels(tw)
         if verbose:
-            print(f"🔧 Using constrained bounds for {ticker}: past_window={past_window_range.start}..{past_window_range.stop-1}, trade_window={tw_range.start}..{tw_range.stop-1}")
+            print(f"[{symbol}] Support levels found: {len(support)} (dates: {support.index.date.tolist()[:5]}...)")
+            print(f"[{symbol}] Resistance levels found: {len(resistance)} (dates: {resistance.index.date.tolist()[:5]}...)")
+        return support, resistance
+    except Exception as e:
+        print(f"⚠️ Inkrementelle Extrema für {symbol} fehlgeschlagen ({e}), volle Berechnung")
+        _sr_trackers.pop((symbol, int(p)), None)
+        return calculate_support_resistance(df, p, tw, verbose=verbose, ticker=symbol)
+
+def _simulate_long_compound(actions, prices, initial_capital, commission_rate, min_commission, order_round_factor):
+    """
+    Kapital-Kern von simulate_trades_compound_extended ohne DataFrames.
+    actions: 1=buy, -1=sell, 0=None (bereits in Handelsreihenfolge)
+    prices: Level Close je Zeile (Python-floats wie bei iterrows, damit round() identisch bleibt)
+    """
+    capital = initial_capital
+    position = 0
+    if order_round_factor < 1:
+        decimal_places = len(str(order_round_factor).split('.')[-1])
+
+    for action, price in zip(actions, prices):
+        if action == 1 and position == 0:
+            raw_shares = capital / price
+            if order_round_factor >= 1:
+                shares = round(raw_shares / order_round_factor) * order_round_factor
+            else:
+                shares = round(raw_shares, decimal_places)
+
+            if shares > 0:
+                cost = shares * price
+                commission = max(cost * commission_rate, min_commission)
+                total_required = cost + commission
+
+                if total_required > capital:
+                    max_cost = capital - min_commission
+                    if max_cost > 0:
+                        max_shares_unrounded = max_cost / (price * (1 + commission_rate))
+                        if order_round_factor >= 1:
+                            shares = round(max_shares_unrounded / order_round_factor) * order_round_factor
+                        else:
+                            shares = round(max_shares_unrounded, decimal_places)
+                        cost = shares * price
+                        commission = max(cost * commission_rate, min_commission)
+                        total_required = cost + commission
+
+                if shares > 0 and total_required <= capital:
+                    capital -= total_required
+                    position = shares
+
+        elif action == -1 and position > 0:
+            revenue = position * price
+            commission = max(revenue * commission_rate, min_commission)
+            capital += (revenue - commission)
+            position = 0
+
+    # Offene Position zum letzten Level Close schließen
+    if position > 0 and len(prices) > 0:
+        last_price = prices[-1]
+        revenue = position * last_price
+        commission = max(revenue * commission_rate, min_commission)
+        capital += (revenue - commission)
+
+    return capital
+
+def berechne_long_grid(df, cfg, start_idx, end_idx, past_window_range, tw_range, extrema=None):
+    """
+    Batch-Optimierer: bewertet das komplette (past_window, trade_window)-Grid
+    auf NumPy-Arrays statt pro Kombination DataFrames zu bauen.
+
+    Liefert dieselben Ergebnisse wie die Brute-Force-Schleife
+    (calculate_support_resistance -> assign_long_signals_extended ->
+    simulate_trades_compound_extended), als unsortierte Ergebnisliste.
+    extrema: optional vorberechnete (min_strength, max_strength) für den Slice
+    (ExtremaStrengthCache.window, max_order >= größtes past_window).
+    """
+    df_opt = df.iloc[start_idx:end_idx]
+    n = len(df_opt)
+    if n == 0 or "Close" not in df_opt.columns:
+        return []
+
+    closes = df_opt["Close"].to_numpy(dtype=np.float64)
+    index = df_opt.index
+    # Kalendertage als int64 (Tage seit Epoch) – ersetzt .date()-Listen
+    trade_day_index = TradeDayIndex(index)
+    day_num = trade_day_index.day_num
+    last_day = day_num.max()
+    ns = index.asi8
+
+    max_p = max(past_window_range)
+    if extrema is not None:
+        min_strength, max_strength = extrema
     else:
-        past_window_range = range(2, 15)  # 2..14
-        tw_range = range(1, 8)            # 1..7
-        if verbose:
-            print(f"🔧 Using default bounds: past_window={past_window_range.start}..{past_window_range.stop-1}, trade_window={tw_range.start}..{tw_range.stop-1}")
+        min_strength = _extrema_strength(closes, max_p, np.less)
+        max_strength = _extrema_strength(closes, max_p, np.greater)
+
+    valid_closes = ~np.isnan(closes)
+    abs_low_pos = int(np.nanargmin(closes)) if valid_closes.any() else None
+    abs_high_pos = int(np.nanargmax(closes)) if valid_closes.any() else None
 
-    # Brute-force Schleife
+    initial_capital = cfg.get("initial_capital", 10000)
+    commission_rate = cfg.get("commission_rate", 0.001)
+    min_commission = cfg.get("min_commission", 1.0)
+    order_round_factor = cfg.get("order_round_factor", 1)
+
+    def _with_absolute(pos, extreme_pos, min_age):
+        if extreme_pos is None:
+            return pos
+        if (ns[pos] == ns[extreme_pos]).any():
+            return pos
+        if last_day - day_num[extreme_pos] >= min_age:
+            return np.append(pos, extreme_pos)
+        return pos
+
+    results = []
     for past_window in past_window_range:
+        supp_all = np.flatnonzero(min_strength >= past_window)
+        res_all = np.flatnonzero(max_strength >= past_window)
+
         for tw in tw_range:
             try:
-                df_opt = df.iloc[start_idx:end_idx].copy()
-                support, resistance = calculate_support_resistance(df_opt, past_window, tw, verbose=False)
-                signal_df = assign_long_signals_extended(support, resistance, df_opt, tw, "1d")
-                final_capital, _ = simulate_trades_compound_extended(
-                    signal_df,
-                    cfg.get("initial_capital", 10000),
-                    cfg.get("commission_rate", 0.001),
-                    cfg.get("min_commission", 1.0),
-                    cfg.get("order_round_factor", 1),
-                    df_opt
+                min_age = int(tw)
+                supp = _with_absolute(supp_all, abs_low_pos, min_age)
+                res = _with_absolute(res_all, abs_high_pos, min_age)
+                if min_age > 0:
+                    supp = supp[last_day - day_num[supp] >= min_age]
+                    res = res[last_day - day_num[res] >= min_age]
+                supp = supp[np.argsort(ns[supp], kind='stable')]
+                res = res[np.argsort(ns[res], kind='stable')]
+
+                # Levels chronologisch, Support vor Resistance bei gleichem Datum
+                level_pos = np.concatenate([supp, res])
+                level_type = np.concatenate([np.ones(len(supp), dtype=np.int8),
+                                             -np.ones(len(res), dtype=np.int8)])
+                order = np.argsort(ns[level_pos], kind='stable')
+                level_pos = level_pos[order]
+                level_type = level_type[order]
+
+                # Nur erster Level einer Serie bekommt eine Action
+                actions = _first_in_run_actions(level_type)
+
+                # Trade-Tag = erster Index mit Datum >= Level-Datum + tw
+                trade_pos = trade_day_index.positions_for_days(day_num[level_pos], min_age)
+                has_trade_day = trade_pos >= 0
+                actions[~has_trade_day] = 0
+                prices = np.full(len(level_pos), np.nan)
+                prices[has_trade_day] = closes[trade_pos[has_trade_day]]
+
+                # Sortierung exakt wie sort_values('Long Trade Day') auf den Datums-Strings
+                trade_order = _trade_day_sort_order(trade_day_index, trade_pos)
+
+                final_capital = _simulate_long_compound(
+                    actions[trade_order].tolist(), prices[trade_order].tolist(),
+                    initial_capital, commission_rate, min_commission, order_round_factor
                 )
-                optimierungsergebnisse.append({
+                results.append({
                     "past_window": past_window,
                     "trade_window": tw,
                     "final_cap": final_capital
@@ -591,7 +1210,57 @@ def berechne_best_p_tw_long(df, cfg, start_idx, end_idx, verbose=False, ticker=N
             except Exception:
                 continue
 
+    return results
+
+def berechne_best_p_tw_long(df, cfg, start_idx, end_idx, verbose=False, ticker=None, batched=True, return_table=False, extrema=None):
+    """Brute‑force Optimierung für Long-Parameter.
+
+    Zielfunktion (aktuell): Maximierung des Endkapitals (final_capital).
+    Frühere README-Angabe zur Sharpe-Ratio wurde korrigiert.
+
+    batched=True nutzt den NumPy-Grid-Optimierer (berechne_long_grid),
+    batched=False die ursprüngliche Schleife über DataFrames.
+    return_table=True liefert zusätzlich die sortierte Ergebnistabelle: (p, tw, df_result).
+    extrema: vorberechnete Extrema-Stärken des Slices (nur batched, siehe ExtremaStrengthCache).
+    """
+    optimierungsergebnisse = []
+
+    # Parameterbereiche bestimmen
+    past_window_range, tw_range = get_long_param_ranges(ticker)
+    if verbose:
+        if isinstance(ticker, str) and ('XRP' in ticker.upper()):
+            print(f"🔧 Using constrained bounds for {ticker}: past_window={past_window_range.start}..{past_window_range.stop-1}, trade_window={tw_range.start}..{tw_range.stop-1}")
+        else:
+            print(f"🔧 Using default bounds: past_window={past_window_range.start}..{past_window_range.stop-1}, trade_window={tw_range.start}..{tw_range.stop-1}")
+
+    if batched:
+        optimierungsergebnisse = berechne_long_grid(df, cfg, start_idx, end_idx, past_window_range, tw_range, extrema=extrema)
+    else:
+        # Brute-force Schleife
+        for past_window in past_window_range:
+            for tw in tw_range:
+                try:
+                    df_opt = df.iloc[start_idx:end_idx].copy()
+                    support, resistance = calculate_support_resistance(df_opt, past_window, tw, verbose=False)
+                    signal_df = assign_long_signals_extended(support, resistance, df_opt, tw, "1d")
+                    final_capital, _ = simulate_trades_compound_extended(
+                        signal_df,
+                        cfg.get("initial_capital", 10000),
+                        cfg.get("commission_rate", 0.001),
+                        cfg.get("min_commission", 1.0),
+                        cfg.get("order_round_factor", 1),
+                        df_opt
+                    )
+                    optimierungsergebnisse.append({
+                        "past_window": past_window,
+                        "trade_window": tw,
+                        "final_cap": final_capital
+                    })
+                except Exception:
+                    continue
+
     # Ergebnis wählen
+    df_result = pd.DataFrame(columns=["past_window", "trade_window", "final_cap"])
     if optimierungsergebnisse:
         df_result = pd.DataFrame(optimierungsergebnisse).sort_values("final_cap", ascending=False)
         best_row = df_result.iloc[0]
@@ -608,6 +1277,8 @@ def berechne_best_p_tw_long(df, cfg, start_idx, end_idx, verbose=False, ticker=N
         if verbose:
             print("⚠️ Keine Optimierungsergebnisse, nutze Default-Werte.")
 
+    if return_table:
+        return p, tw, df_result
     return p, tw
 
 def plot_combined_chart_and_equity(df, standard, _dummy, supp, res, trend,
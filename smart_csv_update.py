@@ -11,6 +11,7 @@ import os
 from datetime import datetime, timedelta
 from crypto_tickers import crypto_tickers
 import yfinance as yf
+from price_store import save_csv_and_append
 
 def check_csv_needs_update(symbol):
     """
@@ -138,6 +139,7 @@ def smart_update_csv_files():
             continue
             
         updates_made = False
+        changed_rows = []  # nur diese Bars werden im Preisspeicher angehängt
         
         # 1. UPDATE HEUTE (Bitpanda)
         if today_needed:
@@ -161,6 +163,7 @@ def smart_update_csv_files():
                     }])
                     
                     df = pd.concat([df, new_row], ignore_index=True)
+                    changed_rows.append(new_row)
                     updates_made = True
                     print(f"      ✅ Heute: €{bitpanda_price:.2f} (Bitpanda)")
                 else:
@@ -180,6 +183,7 @@ def smart_update_csv_files():
                     df = df[df['Date'] != yesterday]
                     new_row = pd.DataFrame([yrow])
                     df = pd.concat([df, new_row], ignore_index=True)
+                    changed_rows.append(new_row)
                     updates_made = True
                     print(f"      ✅ Gestern: €{yrow['Close']:.2f} (Yahoo)")
                 else:
@@ -217,6 +221,7 @@ def smart_update_csv_files():
                             }])
                             
                             df = pd.concat([df, new_row], ignore_index=True)
+                            changed_rows.append(new_row)
                             filled_count += 1
                             
                     if filled_count > 0:
@@ -234,7 +239,7 @@ def smart_update_csv_files():
         if updates_made:
             df['Date'] = pd.to_datetime(df['Date'])
             df = df.sort_values('Date').drop_duplicates(subset=['Date'])
-            df.to_csv(csv_file, index=False)
+            save_csv_and_append(csv_file, df, pd.concat(changed_rows, ignore_index=True) if changed_rows else None, index=False)
             print(f"   💾 {csv_file} gespeichert")
         else:
             print(f"   ℹ️ Keine Updates nötig für {symbol}")
@@ -19,29 +19,42 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from bitpanda_fusion_adapter import BitpandaFusionPaperTrader
 from crypto_backtesting_module import run_backtest
 from crypto_tickers import crypto_tickers
+from paper_replay import WallClock
+from price_store import load_symbol_frame
 
 class StrategySignalPaperTrading:
     """
     2-Week Paper Trading with Strategy-Generated Signals
     """
     
-    def __init__(self, start_date: str = None, days: int = 14):
+    def __init__(self, start_date: str = None, days: int = 14, clock=None, tickers=None, output_dir=None,
+                 ledger=None):
         """
         Initialize the strategy-based paper trader
         
         Args:
             start_date: Start date for simulation (YYYY-MM-DD)
             days: Number of days to simulate (default: 14)
+            clock: WallClock (default) or paper_replay.ReplayClock (no real delays)
+            tickers: subset of crypto_tickers (default: all)
+            output_dir: directory for the simulation CSV (default: current directory)
+            ledger: TradeLedger for the paper fills (default: shared trade ledger)
         """
         self.paper_trader = BitpandaFusionPaperTrader(sandbox=True)
+        if ledger is not None:
+            self.paper_trader.ledger = ledger
         self.simulation_days = days
+        self.clock = clock or WallClock()
+        self.tickers = {t: crypto_tickers[t] for t in tickers} if tickers else crypto_tickers
+        self.output_dir = output_dir
+        self._daily_frames = {}
         
         # Set simulation period
         if start_date:
             self.start_date = datetime.strptime(start_date, '%Y-%m-%d').date()
         else:
             # Default: Start 14 days ago from today
-            self.start_date = (datetime.now() - timedelta(days=days)).date()
+            self.start_date = (self.clock.now() - timedelta(days=days)).date()
         
         self.end_date = self.start_date + timedelta(days=days)
         
@@ -78,7 +91,7 @@ class StrategySignalPaperTrading:
             # Run backtest up to the current date
             backtest_result = run_backtest(symbol, config, end_date=date)
             
-            if not backtest_result or not backtest_result.get('matched_trades'):
+            if not backtest_result or backtest_result.get('matched_trades') is None:
                 return {'action': 'HOLD', 'strength': 0.0, 'reason': 'No backtest results'}
             
             # Analyze recent trades for signal generation
@@ -172,25 +185,33 @@ class StrategySignalPaperTrading:
         
         return {'action': 'HOLD', 'strength': 0.0, 'reason': 'No clear signal'}
     
+    def get_daily_frame(self, ticker: str) -> Optional[pd.DataFrame]:
+        """
+        Daily bars for a ticker, loaded once per simulation from the price store
+        (synced from <ticker>_daily.csv if the CSV is newer)
+        """
+        if ticker not in self._daily_frames:
+            try:
+                self._daily_frames[ticker] = load_symbol_frame(ticker, "1d")
+            except Exception as e:
+                print(f"❌ Error loading daily data for {ticker}: {e}")
+                self._daily_frames[ticker] = None
+        return self._daily_frames[ticker]
+    
     def get_historical_prices(self, ticker: str, date: datetime.date) -> Dict[str, float]:
         """
-        Get historical prices for a specific date
+        Get historical prices for a specific date (or the closest date before it)
         """
-        csv_file = f"{ticker}_daily.csv"
+        df = self.get_daily_frame(ticker)
         
-        if not os.path.exists(csv_file):
+        if df is None or df.empty:
             print(f"❌ No historical data for {ticker}")
             return {}
         
         try:
-            df = pd.read_csv(csv_file)
-            df['Date'] = pd.to_datetime(df['Date']).dt.date
-            
-            # Find the exact date or closest date
-            date_mask = df['Date'] == date
-            
-            if date_mask.any():
-                row = df[date_mask].iloc[0]
+            pos = df.index.searchsorted(pd.Timestamp(date) + timedelta(days=1), side='left') - 1
+            if pos >= 0:
+                row = df.iloc[pos]
                 return {
                     'open': float(row['Open']),
                     'high': float(row['High']),
@@ -198,19 +219,6 @@ class StrategySignalPaperTrading:
                     'close': float(row['Close']),
                     'volume': float(row['Volume'])
                 }
-            else:
-                # Find closest date before the target date
-                available_dates = df[df['Date'] <= date]['Date']
-                if not available_dates.empty:
-                    closest_date = available_dates.max()
-                    row = df[df['Date'] == closest_date].iloc[0]
-                    return {
-                        'open': float(row['Open']),
-                        'high': float(row['High']),
-                        'low': float(row['Low']),
-                        'close': float(row['Close']),
-                        'volume': float(row['Volume'])
-                    }
         
         except Exception as e:
             print(f"❌ Error getting prices for {ticker} on {date}: {e}")
@@ -236,7 +244,7 @@ class StrategySignalPaperTrading:
         current_prices = {}
         
         # Process each cryptocurrency
-        for ticker_name, config in crypto_tickers.items():
+        for ticker_name, config in self.tickers.items():
             
             # Get historical price for this date
             historical_prices = self.get_historical_prices(ticker_name, current_date)
@@ -342,11 +350,11 @@ class StrategySignalPaperTrading:
                 simulation_results['total_trades'] += len(day_result['trades'])
             
             current_date += timedelta(days=1)
-            time.sleep(0.1)  # Small delay between days
+            self.clock.sleep(0.1)  # Small delay between days
         
         # Final portfolio analysis
         final_prices = {}
-        for ticker_name in crypto_tickers.keys():
+        for ticker_name in self.tickers.keys():
             historical_prices = self.get_historical_prices(ticker_name, self.end_date - timedelta(days=1))
             if historical_prices:
                 final_prices[ticker_name] = historical_prices['close']
@@ -421,8 +429,10 @@ class StrategySignalPaperTrading:
         Save simulation results to CSV
         """
         
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        timestamp = self.clock.now().strftime('%Y%m%d_%H%M%S')
         filename = f"strategy_paper_trading_2week_{timestamp}.csv"
+        if self.output_dir:
+            filename = os.path.join(self.output_dir, filename)
         
         # Prepare data for CSV
         csv_data = []
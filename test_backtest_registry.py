@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+"""Test: Backtest-Registry – Treffer nur bei gleichem Datensatz und gleichen Parametern"""
+
+from backtest_registry import register_backtest_result, lookup_backtest_result, clear_backtest_registry, registry_size
+
+def test_backtest_registry():
+    print("=== Backtest-Registry ===")
+    clear_backtest_registry()
+    config = {"symbol": "BTC-EUR", "initialCapitalLong": 5000, "order_round_factor": 0.001, "trade_on": "Close"}
+    result = {"success": True, "symbol": "BTC-EUR", "dataset_signature": "abc123", "final_capital": 5500.0}
+
+    assert register_backtest_result("BTC-EUR", config, result)
+    assert not register_backtest_result("ETH-EUR", config, False)   # fehlgeschlagene Backtests nicht eintragen
+
+    assert lookup_backtest_result("BTC-EUR", config, "abc123") is result
+    assert lookup_backtest_result("BTC-EUR", config, "neuer-bar") is None          # Datensatz geändert
+    assert lookup_backtest_result("BTC-EUR", dict(config, initialCapitalLong=1000), "abc123") is None
+    assert lookup_backtest_result("ETH-EUR", config, "abc123") is None
+
+    # Neuer Datensatz ersetzt den alten Eintrag
+    register_backtest_result("BTC-EUR", config, dict(result, dataset_signature="def456"))
+    assert registry_size() == 1
+    assert lookup_backtest_result("BTC-EUR", config, "abc123") is None
+    print(f"   Einträge: {registry_size()}")
+    clear_backtest_registry()
+    print("✅ Registry korrekt")
+
+if __name__ == "__main__":
+    test_backtest_registry()
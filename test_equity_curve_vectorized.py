@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""Test: Vektorisierte Equity-Kurve == Tages-Schleife (Close/Open, Intraday, offene Position)"""
+
+import io
+import contextlib
+import numpy as np
+import pandas as pd
+from plotly_utils import create_equity_curve_from_matched_trades, create_equity_curve_from_matched_trades_loop
+
+def make_test_df(n=200, freq="D", seed=3):
+    rng = np.random.default_rng(seed)
+    idx = pd.date_range("2024-01-01", periods=n, freq=freq)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.03, n)))
+    return pd.DataFrame({"Open": close * (1 + rng.normal(0, 0.01, n)), "Close": close}, index=idx)
+
+def test_equity_curve_vectorized():
+    print("=== Equity-Kurve: vektorisiert vs. Schleife ===")
+    trades = [
+        {'buy_date': '2024-01-05', 'sell_date': '2024-01-12', 'shares': 10.0, 'is_open': False},
+        {'buy_date': '2024-01-20', 'sell_date': '2024-01-20', 'shares': 4.5, 'is_open': False},
+        {'buy_date': '2024-02-01', 'sell_date': '2024-02-03', 'shares': 7.25, 'is_open': False},
+        {'buy_date': '2024-02-03', 'sell_date': '', 'shares': 5.0, 'is_open': True},
+    ]
+
+    for freq in ["D", "6h"]:
+        df = make_test_df(freq=freq)
+        for trade_on in ["Close", "Open"]:
+            with contextlib.redirect_stdout(io.StringIO()):
+                loop = create_equity_curve_from_matched_trades_loop(trades, 1000, df, trade_on)
+            fast = create_equity_curve_from_matched_trades(trades, 1000, df, trade_on)
+            print(f"   {freq} {trade_on}: Ende Schleife €{loop[-1]:.2f} | vektorisiert €{fast[-1]:.2f}")
+            assert [float(v) for v in loop] == fast
+
+    print("✅ Identische Equity-Kurven")
+
+if __name__ == "__main__":
+    test_equity_curve_vectorized()
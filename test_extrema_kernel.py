@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""Test: Extrema-Kernel (Minima+Maxima in einem Durchlauf) == scipy argrelextrema, strikt und mit Plateaus"""
+
+import numpy as np
+import pandas as pd
+from scipy.signal import argrelextrema
+
+from signal_utils import local_extrema, calculate_support_resistance
+
+def test_extrema_kernel():
+    print("=== Extrema-Kernel ===")
+    rng = np.random.default_rng(5)
+    checked = 0
+    for _ in range(500):
+        n = int(rng.integers(1, 120))
+        prices = np.round(np.cumsum(rng.normal(0, 1, n)), 0)     # gerundet -> viele Plateaus
+        if n > 3 and rng.random() < 0.2:
+            prices[rng.integers(0, n)] = np.nan
+        order = int(rng.integers(1, 25))
+        for strict, less, greater in ((True, np.less, np.greater), (False, np.less_equal, np.greater_equal)):
+            min_idx, max_idx = local_extrema(prices, order, strict=strict)
+            assert np.array_equal(min_idx, argrelextrema(prices, less, order=order)[0])
+            assert np.array_equal(max_idx, argrelextrema(prices, greater, order=order)[0])
+            checked += 1
+
+    # Plateau: strikt kein Extremum, nicht-strikt beide Bars
+    plateau = np.array([5.0, 3.0, 1.0, 1.0, 3.0, 5.0])
+    assert local_extrema(plateau, 2)[0].tolist() == []
+    assert local_extrema(plateau, 2, strict=False)[0].tolist() == [2, 3]
+    print(f"   {checked} Reihen identisch zu argrelextrema")
+    print("✅ Extrema-Kernel korrekt")
+
+def test_support_resistance_age_filter():
+    print("=== Altersfilter (Minutenbars, Zeitzone) ===")
+    rng = np.random.default_rng(9)
+    idx = pd.date_range("2024-03-29 20:00", periods=6000, freq="min", tz="Europe/Berlin")
+    df = pd.DataFrame({"Close": np.round(100 + np.cumsum(rng.normal(0, 0.2, len(idx))), 1)}, index=idx)
+    last_date = df.index.max().date()
+    for tw in (1, 2, 3):
+        supp, res = calculate_support_resistance(df, 30, tw)
+        assert all((last_date - d.date()).days >= tw for d in supp.index.append(res.index))
+    supp_all, _ = calculate_support_resistance(df, 30, 0, strict=False)
+    assert len(supp_all) >= len(calculate_support_resistance(df, 30, 0)[0])
+    print(f"   {len(supp_all)} Support-Levels (nicht-strikt) auf {len(df)} Minutenbars")
+    print("✅ Altersfilter korrekt")
+
+if __name__ == "__main__":
+    test_extrema_kernel()
+    test_support_resistance_age_filter()
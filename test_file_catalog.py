@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""Test: Datei-Katalog für Report-Generatoren (Datumsbereiche, inkrementelle Indexierung)"""
+
+import os
+import tempfile
+
+import file_catalog
+from file_catalog import FileCatalog, date_columns_of, set_file_catalog, year_bounds
+
+def _write(path, text, encoding="utf-8"):
+    with open(path, "w", encoding=encoding) as f:
+        f.write(text)
+
+def _files(tmp):
+    _write(os.path.join(tmp, "14_day_trades_report_a.csv"),
+           "Entry Date,Exit Date,Price\n2023-12-20,2024-01-03,1.0\n2023-12-28,2023-12-30,2.0\n")
+    _write(os.path.join(tmp, "paper_trading_2025.csv"), "timestamp,ticker,price\n2025-02-01 10:00:00,BTC-EUR,1\n")
+    _write(os.path.join(tmp, "bitpanda_export.csv"),
+           "Transaction ID;Created Date;Asset;Betrag\n1;15.03.2024;BTC;0,5\n2;31.12.2024;ETH;1,0\n",
+           encoding="cp1252")
+    _write(os.path.join(tmp, "trades_notes.csv"), "ticker,comment\nBTC-EUR,kein Datum\n")
+    _write(os.path.join(tmp, "empty_trades.csv"), "")
+
+def test_find_by_period():
+    print("=== Katalog: Dateien nach Zeitraum ===")
+    with tempfile.TemporaryDirectory() as tmp:
+        _files(tmp)
+        catalog = FileCatalog(":memory:")
+        pattern = os.path.join(tmp, "*.csv")
+        names = lambda files: sorted(os.path.basename(f) for f in files)
+
+        assert names(catalog.find([pattern], *year_bounds(2024))) == [
+            "14_day_trades_report_a.csv", "bitpanda_export.csv", "trades_notes.csv"]
+        assert names(catalog.find([pattern], *year_bounds(2024), include_undated=False)) == [
+            "14_day_trades_report_a.csv", "bitpanda_export.csv"]
+        assert names(catalog.find([pattern], "2025-01-01", exclude_keywords=["notes"])) == ["paper_trading_2025.csv"]
+
+        entry = catalog.entry(os.path.join(tmp, "bitpanda_export.csv"))
+        assert entry["sep"] == ";" and entry["date_columns"] == ["Created Date"] and entry["rows"] == 2
+        assert entry["min_date"][:4] == "2024" and entry["max_date"].startswith("2024-12-31")
+        entry = catalog.entry(os.path.join(tmp, "14_day_trades_report_a.csv"))
+        assert (entry["min_date"], entry["max_date"]) == ("2023-12-20 00:00:00", "2024-01-03 00:00:00")
+        assert catalog.entry(os.path.join(tmp, "empty_trades.csv"))["size"] == 0
+    print("✅ Nur überschneidende Dateien")
+
+def test_incremental_reindex():
+    print("=== Katalog: nur geänderte Dateien neu indexieren ===")
+    scanned = []
+    original = file_catalog.scan_file
+    file_catalog.scan_file = lambda path, stat=None: scanned.append(os.path.basename(path)) or original(path, stat)
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            _files(tmp)
+            db = os.path.join(tmp, "catalog", "file_catalog.sqlite")
+            pattern = os.path.join(tmp, "*.csv")
+            catalog = FileCatalog(db)
+            catalog.find([pattern])
+            assert len(scanned) == 5
+            catalog.close()
+
+            scanned.clear()
+            catalog = FileCatalog(db)                        # persistent über Läufe
+            assert len(catalog.find([pattern], *year_bounds(2024))) == 3 and scanned == []
+
+            path = os.path.join(tmp, "paper_trading_2025.csv")
+            _write(path, "timestamp,ticker,price\n2024-06-01 10:00:00,BTC-EUR,1\n2025-02-01 10:00:00,BTC-EUR,1\n")
+            os.utime(path, ns=(10**18, 10**18))
+            os.remove(os.path.join(tmp, "trades_notes.csv"))
+            found = catalog.find([pattern], *year_bounds(2024))
+            assert scanned == ["paper_trading_2025.csv"] and len(found) == 3
+            assert catalog.entry(os.path.join(tmp, "trades_notes.csv")) is None
+            catalog.close()
+    finally:
+        file_catalog.scan_file = original
+    print("✅ Inkrementell und persistent")
+
+def test_date_columns_whole_words():
+    print("=== Katalog: Datumsspalten nur über ganze Wörter ===")
+    assert date_columns_of(["Transaction ID", "Created Date", "created_at", "Timestamp", "Realtime Price Bitpanda",
+                            "Timezone", "Price Time", "Amount Fiat"]) == ["Created Date", "created_at", "Timestamp"]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bitpanda_realtime.csv")
+        _write(path, "Date,Asset,Realtime Price Bitpanda\n2024-05-01,BTC,2500\n2024-05-02,BTC,2600\n")
+        entry = FileCatalog(":memory:").refresh([path])[os.path.abspath(path)]
+        assert entry["date_columns"] == ["Date"]
+        assert (entry["min_date"], entry["max_date"]) == ("2024-05-01 00:00:00", "2024-05-02 00:00:00")
+    print("✅ Preisspalten zählen nicht als Datum")
+
+def test_report_discovery():
+    print("=== Katalog in TradingSummary2024 ===")
+    from trading_summary_2024 import TradingSummary2024
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        _files(tmp)
+        set_file_catalog(FileCatalog(":memory:"))
+        try:
+            os.chdir(tmp)
+            assert sorted(TradingSummary2024().find_trading_files()) == ["14_day_trades_report_a.csv"]
+        finally:
+            os.chdir(cwd)
+            set_file_catalog(None)
+    print("✅ Nur Dateien mit 2024-Daten")
+
+if __name__ == "__main__":
+    test_find_by_period()
+    test_incremental_reindex()
+    test_date_columns_whole_words()
+    test_report_discovery()
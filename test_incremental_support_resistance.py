@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""Test: Inkrementelle Support/Resistance-Erkennung == calculate_support_resistance (Append, heutiger Bar, Trimmen)"""
+
+import numpy as np
+import pandas as pd
+from signal_utils import calculate_support_resistance, incremental_support_resistance
+
+def test_incremental_support_resistance():
+    print("=== Inkrementelle Support/Resistance ===")
+    rng = np.random.default_rng(11)
+    idx = pd.date_range("2024-01-01", periods=420, freq="D")
+    close = np.round(100 * np.exp(np.cumsum(rng.normal(0, 0.03, len(idx)))), 1)
+    full = pd.DataFrame({"Close": close}, index=idx)
+
+    start, end = 0, 365
+    for step in range(40):
+        if step % 3 == 0:
+            end += 1                     # neuer Tages-Bar
+        elif step % 3 == 1:
+            full.iloc[end - 1, 0] = np.round(full.iloc[end - 1, 0] * (1 + rng.normal(0, 0.05)), 1)  # heutiger Bar ersetzt
+        else:
+            start += 1                   # Historie vorne gekürzt (backtest_years)
+        df = full.iloc[start:end]
+        for p, tw in [(3, 1), (8, 2), (14, 5)]:
+            supp_ref, res_ref = calculate_support_resistance(df, p, tw)
+            supp, res = incremental_support_resistance("TEST-EUR", df, p, tw)
+            assert supp.equals(supp_ref) and supp.index.equals(supp_ref.index)
+            assert res.equals(res_ref) and res.index.equals(res_ref.index)
+
+    print(f"   Letzter Stand: {len(supp)} Support / {len(res)} Resistance Levels")
+    print("✅ Identische Levels")
+
+if __name__ == "__main__":
+    test_incremental_support_resistance()
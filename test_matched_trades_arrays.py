@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""Test: Array-Kern simulate_matched_trades_arrays (buy/sell-Paarung, Compounding, offene Position)"""
+
+from signal_utils import simulate_matched_trades_arrays
+
+def test_matched_trades_arrays():
+    print("=== simulate_matched_trades_arrays ===")
+    # sell ohne Position, doppelter buy, doppelter sell, offene Position am Ende
+    codes = [-1, 1, 0, 1, -1, -1, 1, -1, 1]
+    prices = [90.0, 100.0, 101.0, 102.0, 110.0, 111.0, 105.0, 100.0, 120.0]
+
+    sim = simulate_matched_trades_arrays(codes, prices, 1000, 0.0018, order_round_factor=0.1)
+
+    print(f"   Entries: {sim['entry_idx'].tolist()} | Exits: {sim['exit_idx'].tolist()}")
+    assert sim['entry_idx'].tolist() == [1, 6]
+    assert sim['exit_idx'].tolist() == [4, 7]
+    assert sim['open_entry_idx'] == 8
+
+    # Erster Trade von Hand: 10 Stück zu 100 -> 110
+    assert abs(sim['quantity'][0] - 10.0) < 1e-9
+    assert abs(sim['pnl'][0] - 100.0) < 1e-9
+    assert abs(sim['commission'][0] - (100.0 + 110.0) * 10.0 * 0.0018) < 1e-9
+    assert abs(sim['capital'][0] - (1000 + sim['net_pnl'][0])) < 1e-9
+    assert abs(sim['final_capital'] - sim['capital'][-1]) < 1e-9
+    assert sim['open_quantity'] > 0
+
+    print(f"   Final Capital: €{sim['final_capital']:.2f}")
+    print("✅ Array-Kern korrekt")
+
+if __name__ == "__main__":
+    test_matched_trades_arrays()
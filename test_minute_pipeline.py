@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""Test: Minuten-Pipeline – Append-only Speicher, inkrementeller Tages-Roll-up, CSV-Log, laufende Tageskerze"""
+
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from minute_pipeline import MinuteBarPipeline, rollup_daily
+from price_store import is_synced, load_prices, write_prices
+
+def _minute_bars(start, periods, rng):
+    idx = pd.date_range(start, periods=periods, freq="min", tz="UTC")
+    close = 100 + np.cumsum(rng.normal(0, 0.1, periods))
+    return pd.DataFrame({"DateTime": idx, "Open": close + 0.05, "High": close + 0.2, "Low": close - 0.2,
+                         "Close": close, "Volume": rng.integers(1, 50, periods).astype(float)})
+
+def test_minute_pipeline():
+    print("=== Minuten-Pipeline ===")
+    rng = np.random.default_rng(4)
+    tmp = tempfile.mkdtemp()
+    store_dir = os.path.join(tmp, "store")
+
+    # Bestehende Voll-CSV (altes update_minute_csv) wird einmal übernommen
+    _minute_bars("2025-01-01 20:00", 600, rng).to_csv(os.path.join(tmp, "TEST-EUR_minute.csv"), index=False)
+    write_prices("TEST-EUR", pd.DataFrame({"Date": pd.to_datetime(["2024-12-31", "2025-01-01"]), "Close": [99.0, 99.5]}),
+                 "1d", base_dir=store_dir)
+    pipeline = MinuteBarPipeline("TEST-EUR", csv_dir=tmp, base_dir=store_dir)
+    assert pipeline.last_timestamp() == pd.Timestamp("2025-01-02 05:59")
+
+    # Überlappende Batches: alter Bar ignoriert, letzter Bar ersetzt, Tageswechsel
+    batch1 = _minute_bars("2025-01-02 05:59", 900, rng)
+    batch1.loc[0, "Volume"] = 1000.0
+    assert pipeline.ingest(batch1) == 900
+    batch2 = _minute_bars("2025-01-02 20:58", 300, rng)
+    assert pipeline.ingest(batch2) == 300
+    assert pipeline.ingest(batch2.iloc[:10]) == 0
+
+    minutes = load_prices("TEST-EUR", "1m", base_dir=store_dir)
+    assert len(minutes) == 600 + 899 + 299 and minutes.index.is_unique
+    assert minutes.loc["2025-01-02 05:59", "Volume"] == 1000.0
+    pd.testing.assert_frame_equal(pipeline.daily(), rollup_daily(minutes), check_freq=False)
+
+    # CSV-Log enthält alle Bars (letzter Wert je Zeitstempel gewinnt), Store gilt als synchron
+    csv = pd.read_csv(os.path.join(tmp, "TEST-EUR_minute.csv"))
+    assert csv["DateTime"].str.endswith("+00:00").all()
+    assert len(csv.drop_duplicates("DateTime", keep="last")) == len(minutes)
+    assert is_synced(os.path.join(tmp, "TEST-EUR_minute.csv"), base_dir=store_dir)
+
+    candle = pipeline.current_candle()
+    assert candle.name == pd.Timestamp("2025-01-03") and candle["Close"] == minutes["Close"].iloc[-1]
+    assert MinuteBarPipeline("TEST-EUR", base_dir=store_dir).current_candle().equals(candle)
+
+    # Veröffentlichen: ab dem letzten Tag des Tagesdatensatzes (01.01. ersetzt, 02./03. neu)
+    assert pipeline.publish_daily() == 3
+    daily = load_prices("TEST-EUR", "1d", base_dir=store_dir)
+    assert daily.loc["2024-12-31", "Close"] == 99.0 and daily["Close"].iloc[-1] == candle["Close"]
+    print(f"   {len(minutes)} Minutenbars, {len(pipeline.daily())} Tage, laufende Kerze {candle.name.date()}: "
+          f"O={candle['Open']:.2f} H={candle['High']:.2f} L={candle['Low']:.2f} C={candle['Close']:.2f}")
+    print("✅ Minuten-Pipeline korrekt")
+
+if __name__ == "__main__":
+    test_minute_pipeline()
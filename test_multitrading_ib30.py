@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""Test: MultiTradingIB30_IB_Crypto ohne IB-Verbindung (Scheduler, Timeframe-Matrix, Long/Short-Kern)"""
+
+import datetime
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor
+import sys
+import types
+
+import numpy as np
+import pandas as pd
+
+def _stub_missing_modules():
+    """ib_insync, pandas_market_calendars und mplfinance nur für den Import ersetzen, falls nicht installiert."""
+    if importlib.util.find_spec("pandas_market_calendars") is None:
+        class Calendar:
+            def schedule(self, start_date, end_date):
+                days = pd.bdate_range(start_date, end_date)
+                return pd.DataFrame({"market_open": days, "market_close": days}, index=days)
+        sys.modules["pandas_market_calendars"] = types.SimpleNamespace(get_calendar=lambda name: Calendar())
+    if importlib.util.find_spec("ib_insync") is None:
+        sys.modules["ib_insync"] = types.SimpleNamespace(
+            IB=object, Stock=lambda *args: args, LimitOrder=object, MarketOrder=object, util=None)
+    if importlib.util.find_spec("mplfinance") is None:
+        sys.modules["mplfinance"] = types.ModuleType("mplfinance")
+
+_stub_missing_modules()
+import MultiTradingIB30_IB_Crypto as mt
+
+def _daily_frame(seed=7, n=160):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    return pd.DataFrame({"Close": close}, index=pd.date_range("2024-01-01", periods=n, freq="D"))
+
+def test_bar_close_schedule():
+    print("=== Bar-Close- und Order-Zeitpunkte ===")
+    now = datetime.datetime(2025, 3, 3, 10, 7, 30, tzinfo=mt.NY_TZ)           # Montag
+    assert mt.next_bar_close(now, "5 mins") == now.replace(minute=10, second=0)
+    assert mt.next_bar_close(now, "1 hour") == now.replace(hour=11, minute=0, second=0)
+    assert mt.interval_minutes("30 mins") == 30 and mt.interval_label("1 hour") == "1h"
+
+    assert mt.next_order_time(now) == now.replace(hour=15, minute=45, second=0)
+    late = now.replace(hour=15, minute=47)                                     # im Order-Fenster
+    assert mt.next_order_time(late) == late.replace(minute=45, second=0)
+    assert mt.next_order_time(now.replace(hour=15, minute=50)) == now.replace(day=4, hour=15, minute=45, second=0)
+
+    assert mt.is_rth_bar_close(now.replace(hour=16, minute=0, second=0))
+    assert not mt.is_rth_bar_close(now.replace(hour=9, minute=30, second=0))
+    assert not mt.is_rth_bar_close(now.replace(day=1, hour=12, minute=0))     # Samstag
+    print("✅ Bar-Close und Order-Fenster korrekt")
+
+def test_timeframe_cell_default_capital():
+    print("=== Timeframe-Matrix-Zelle ohne Kapital-Konfiguration ===")
+    df = _daily_frame()
+    row = mt.backtest_timeframe_cell("TEST", "1 day", df, {"symbol": "TEST", "long": True, "short": True})
+    for side in ["long", "short"]:
+        assert row[f"{side}_p"] in mt.LONG_P_RANGE and row[f"{side}_trades"] >= 1
+        assert np.isclose(row[f"{side}_return_pct"], (row[f"{side}_final_cap"] / 10000 - 1) * 100, atol=0.01)
+    row = mt.backtest_timeframe_cell("TEST", "1 day", df, {"initialCapitalLong": 5000, "short": False})
+    assert "short_p" not in row and np.isclose(row["long_return_pct"], (row["long_final_cap"] / 5000 - 1) * 100, atol=0.01)
+    print("✅ Default-Kapital 10000, abgeschaltete Seite fehlt")
+
+def _loop_engines(df, p, tw, interval="1d", capital=10000):
+    """Referenz: assign_*_signals + simulate_*_compound je Seite."""
+    supp, res = mt.calculate_support_resistance(df, p, tw)
+    long_cap, long_trades = mt.simulate_trades_compound(
+        mt.assign_long_signals(supp, res, df, tw, interval), df, starting_capital=capital)
+    short_cap, short_trades = mt.simulate_short_trades_compound(
+        mt.assign_short_signals(supp, res, df, tw, interval), df, starting_capital=capital)
+    return long_cap, long_trades, short_cap, short_trades
+
+def test_long_short_kernel_matches_loops():
+    print("=== Long/Short-Kern gegen assign_* + simulate_*_compound ===")
+    frames = [(_daily_frame(seed), "1d") for seed in range(4)]
+    intraday = _daily_frame(11, 300)
+    intraday.index = pd.date_range("2024-03-01 09:30", periods=300, freq="5min")
+    frames.append((intraday, "5min"))
+    for df, interval in frames:
+        for p in [3, 6, 9]:
+            for tw in [1, 3, 5]:
+                supp, res = mt.calculate_support_resistance(df, p, tw)
+                fast = mt.simulate_long_short_levels(supp, res, df, tw, interval)
+                slow = _loop_engines(df, p, tw, interval)
+                assert np.isclose(fast[0], slow[0]) and np.isclose(fast[2], slow[2]), (interval, p, tw)
+                assert fast[1] == slow[1] and fast[3] == slow[3], (interval, p, tw)
+    supp, res = mt.calculate_support_resistance(frames[0][0], 3, 1)
+    only_short = mt.simulate_long_short_levels(supp, res, frames[0][0], 1, "1d", long=False)
+    assert only_short[0] is None and only_short[1] is None and only_short[2] is not None
+    print("✅ Gleiche Kapitalkurven und Trades")
+
+def test_joint_optimizer_matches_grid():
+    print("=== Gemeinsame Optimierung gegen Grid-Suche ===")
+    df = _daily_frame(3, 240)
+    config = {"initialCapitalLong": 10000, "initialCapitalShort": 8000}
+    mt._long_short_cache.clear()
+    result = mt.berechne_best_p_tw_long_short(df, config, 0, 75)
+
+    df_opt = mt.get_backtesting_slice(df, 0, 75)
+    best = {"long": (None, -np.inf), "short": (None, -np.inf)}
+    for p in mt.LONG_P_RANGE:
+        for tw in mt.LONG_TW_RANGE:
+            supp, res = mt.calculate_support_resistance(df_opt, p, tw)
+            long_cap, _ = mt.simulate_trades_compound(
+                mt.assign_long_signals(supp, res, df_opt, tw, "1d"), df_opt, starting_capital=10000)
+            if long_cap > best["long"][1]:
+                best["long"] = ((p, tw), long_cap)
+            if tw in mt.SHORT_TW_RANGE:
+                short_cap, _ = mt.simulate_short_trades_compound(
+                    mt.assign_short_signals(supp, res, df_opt, tw, "1d"), df_opt, starting_capital=8000)
+                if short_cap > best["short"][1]:
+                    best["short"] = ((p, tw), short_cap)
+    for side in ["long", "short"]:
+        assert (result[f"best_p_{side}"], result[f"best_tw_{side}"]) == best[side][0]
+        assert np.isclose(result[f"final_cap_{side}"], best[side][1])
+    assert np.isclose(result["combined_final_cap"], best["long"][1] + best["short"][1])
+    assert mt.berechne_best_p_tw_long(df, config, 0, 75) == best["long"][0]
+    assert mt.berechne_best_p_tw_short(df, config, 0, 75) == best["short"][0]
+    print("✅ Gleiche besten p/tw wie die Schleifen-Engines")
+
+def test_long_short_cache_threads():
+    print("=== Optimierungs-Cache aus mehreren Threads ===")
+    mt._long_short_cache.clear()
+    frames = [_daily_frame(seed, 120) for seed in range(70)]
+    config = {"initialCapitalLong": 10000, "initialCapitalShort": 10000}
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda df: mt.berechne_best_p_tw_long_short(df, config), frames + frames[-8:]))
+    assert len(mt._long_short_cache) <= 64 and all("best_p_long" in r for r in results)
+    size = len(mt._long_short_cache)
+    again = mt.berechne_best_p_tw_long_short(frames[-1], config)
+    assert len(mt._long_short_cache) == size and again["combined_final_cap"] == results[-1]["combined_final_cap"]
+    print("✅ Cache begrenzt, keine Fehler bei parallelem Zugriff")
+
+if __name__ == "__main__":
+    test_bar_close_schedule()
+    test_timeframe_cell_default_capital()
+    test_long_short_kernel_matches_loops()
+    test_joint_optimizer_matches_grid()
+    test_long_short_cache_threads()
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""Test: Persistenter Optimierungs-Cache – Miss schreibt Tabelle, Treffer liefert identisches Ergebnis"""
+
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+import optimization_cache
+from signal_utils import berechne_best_p_tw_long
+
+def make_test_df(n=250, seed=5):
+    rng = np.random.default_rng(seed)
+    idx = pd.date_range("2024-01-01", periods=n, freq="D")
+    close = np.round(100 * np.exp(np.cumsum(rng.normal(0, 0.03, n))), 2)
+    return pd.DataFrame({"Open": close, "High": close, "Low": close, "Close": close, "Volume": 1.0}, index=idx)
+
+def test_optimization_cache():
+    print("=== Optimierungs-Cache ===")
+    cfg = {"initial_capital": 3000, "commission_rate": 0.0018, "min_commission": 1.0, "order_round_factor": 0.01}
+    df = make_test_df()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["OPT_CACHE_DIR"] = tmp
+        try:
+            p_ref, tw_ref, table_ref = berechne_best_p_tw_long(df, cfg, 0, len(df), ticker="BTC-EUR", return_table=True)
+
+            p1, tw1, table1 = optimization_cache.cached_best_p_tw_long(df, cfg, 0, len(df), ticker="BTC-EUR", return_table=True)
+            assert len(os.listdir(tmp)) == 1
+            p2, tw2, table2 = optimization_cache.cached_best_p_tw_long(df, cfg, 0, len(df), ticker="BTC-EUR", return_table=True)
+            print(f"   Referenz p={p_ref}, tw={tw_ref} | Miss p={p1}, tw={tw1} | Treffer p={p2}, tw={tw2}")
+            assert (p_ref, tw_ref) == (p1, tw1) == (p2, tw2)
+            assert table2.equals(table_ref.reset_index(drop=True))
+
+            # Anderer Datensatz / andere Kommission -> eigener Eintrag
+            optimization_cache.cached_best_p_tw_long(df.iloc[:-1], cfg, 0, len(df) - 1, ticker="BTC-EUR")
+            optimization_cache.cached_best_p_tw_long(df, dict(cfg, commission_rate=0.001), 0, len(df), ticker="BTC-EUR")
+            assert len(os.listdir(tmp)) == 3
+
+            # Eviction auf Größe 0 leert den Cache
+            assert optimization_cache.evict_optimization_cache(max_bytes=0) == 3
+        finally:
+            os.environ.pop("OPT_CACHE_DIR", None)
+
+    print("✅ Cache liefert identische Optimierung")
+
+if __name__ == "__main__":
+    test_optimization_cache()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""Test: Paper-Matching-Engine – Market/Limit, Slippage, Latenz, Teilausführungen, Batch über gecachte Bars"""
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from paper_execution import BarStream, QuoteStream, PaperExecutionSimulator
+from trade_execution import execute_trades
+from trade_ledger import TradeLedger
+
+def _bars():
+    idx = pd.date_range("2025-01-02 10:00", periods=6, freq="min")
+    return pd.DataFrame({"Open": [100, 101, 102, 99, 98, 103], "High": [101, 102, 103, 100, 99, 104],
+                         "Low": [99, 100, 101, 97, 96, 102], "Close": [101, 102, 99, 98, 103, 103],
+                         "Volume": [10, 20, 0, 30, 40, 50]}, index=idx).astype(float)
+
+def test_paper_execution():
+    print("=== Paper-Matching-Engine ===")
+    t0 = pd.Timestamp("2025-01-02 10:00:20")
+    sim = PaperExecutionSimulator(BarStream({"TEST-EUR": _bars()}), slippage_bps=10, latency=30,
+                                  commission_rate=0.001, min_commission=0.0)
+
+    market, limit_buy, limit_sell, never = sim.execute_batch([
+        {"symbol": "TEST-EUR", "action": "buy", "quantity": 2, "timestamp": t0},
+        {"symbol": "TEST-EUR", "action": "buy", "quantity": 1, "limit_price": 97.5, "timestamp": t0},
+        {"symbol": "TEST-EUR", "action": "sell", "quantity": 1, "limit_price": 102.5, "timestamp": t0},
+        {"symbol": "TEST-EUR", "action": "buy", "quantity": 1, "limit_price": 50, "timestamp": t0},
+    ])
+    # Latenz 30s -> erster Bar ab 10:00:50 ist 10:01; Market zum Open + 10 bps
+    assert market["status"] == "FILLED" and market["fills"][0][0] == pd.Timestamp("2025-01-02 10:01")
+    assert np.isclose(market["avg_price"], 101 * 1.001) and np.isclose(market["fee"], market["value"] * 0.001)
+    # Limit: erster Bar mit Low <= Limit (10:03), Fill zum Limit; Open unter Limit -> Open
+    assert limit_buy["fills"] == [(pd.Timestamp("2025-01-02 10:03"), 1.0, 97.5)]
+    assert limit_sell["fills"][0][2] == 102.5 and limit_sell["fills"][0][0] == pd.Timestamp("2025-01-02 10:02")
+    assert never["status"] == "UNFILLED" and never["filled_quantity"] == 0
+
+    # Teilausführung: max. 10% des Bar-Volumens, Bar mit Volumen 0 füllt nichts
+    partial_sim = PaperExecutionSimulator(BarStream({"TEST-EUR": _bars()}), participation=0.1, max_bars=2)
+    partial = partial_sim.execute({"symbol": "TEST-EUR", "action": "buy", "quantity": 5, "timestamp": t0})
+    assert partial["status"] == "PARTIAL" and partial["filled_quantity"] == 2.0
+    full = PaperExecutionSimulator(BarStream({"TEST-EUR": _bars()}), participation=0.1).execute(
+        {"symbol": "TEST-EUR", "action": "buy", "quantity": 5, "timestamp": t0})
+    assert full["status"] == "FILLED" and [(ts.minute, q) for ts, q, _ in full["fills"]] == [(1, 2.0), (3, 3.0)]
+    # Ohne Volumenangabe (NaN) keine Begrenzung
+    for no_volume in [_bars().assign(Volume=np.nan), _bars().drop(columns="Volume")]:
+        unlimited = PaperExecutionSimulator(BarStream({"TEST-EUR": no_volume}), participation=0.1, max_bars=1).execute(
+            {"symbol": "TEST-EUR", "action": "buy", "quantity": 5, "timestamp": t0})
+        assert unlimited["status"] == "FILLED" and unlimited["filled_quantity"] == 5.0
+
+    # Aufgezeichnete Quotes: Kauf zum Ask, Verkauf zum Bid, Größe begrenzt
+    quotes = pd.DataFrame({"bid": [99.0, 99.5], "ask": [100.0, 100.5], "ask_size": [1.0, 5.0]},
+                          index=pd.to_datetime(["2025-01-02 10:00:00", "2025-01-02 10:00:05"]))
+    qsim = PaperExecutionSimulator(QuoteStream({"TEST-EUR": quotes}), participation=1.0)
+    buy, sell = qsim.execute_batch([{"symbol": "TEST-EUR", "action": "buy", "quantity": 3, "timestamp": "2025-01-02 10:00"},
+                                    {"symbol": "TEST-EUR", "action": "sell", "quantity": 3}])
+    assert buy["fills"] == [(pd.Timestamp("2025-01-02 10:00"), 1.0, 100.0), (pd.Timestamp("2025-01-02 10:00:05"), 2.0, 100.5)]
+    assert sell["avg_price"] == 99.5
+
+    # Batch über trade_execution: Portfolio/Cash fortgeschrieben, ohne Download pro Order
+    portfolio = {}
+    orders = [{"symbol": "TEST-EUR", "action": "buy" if k % 2 == 0 else "sell", "quantity": 1.0,
+               "timestamp": t0 + pd.Timedelta(minutes=k % 4)} for k in range(2000)]
+    start = time.perf_counter()
+    results = execute_trades(orders, cash_balance=10000.0, portfolio=portfolio, simulator=sim)
+    elapsed = time.perf_counter() - start
+    assert all(r["status"] == "filled" for r in results) and portfolio["TEST-EUR"] == 0.0
+    print(f"   {len(orders)} Orders in {elapsed * 1000:.0f} ms, Cash danach €{results[-1]['cash_balance']:.2f}")
+    print("✅ Paper-Matching-Engine korrekt")
+
+def test_paper_orders_reject_per_row():
+    print("=== Batch: ungültige Order wird einzeln abgelehnt ===")
+    from bitpanda_fusion_adapter import BitpandaFusionPaperTrader
+    from crypto_tickers import crypto_tickers
+    trader = BitpandaFusionPaperTrader(sandbox=True)
+    trader.ledger = TradeLedger(":memory:")
+    symbol = crypto_tickers["BTC-EUR"]["symbol"]
+    trader.execution_simulator = PaperExecutionSimulator(BarStream({symbol: _bars()}))
+    t0 = pd.Timestamp("2025-01-02 10:00")
+    results = trader.place_paper_orders([
+        {"ticker_name": "BTC-EUR", "action": "BUY", "quantity": 500.0, "price": 101.0, "timestamp": t0},
+        {"ticker_name": "FOO-EUR", "action": "BUY", "quantity": 500.0, "price": 101.0, "timestamp": t0},
+        {"ticker_name": "BTC-EUR", "action": "BUY", "quantity": 500.0, "price": 0.0, "timestamp": t0},
+    ])
+    assert [r["status"] for r in results] == ["FILLED", "REJECTED", "REJECTED"]
+    assert "FOO-EUR" in results[1]["reason"] and len(trader.trade_history) == 1
+    assert len(trader.ledger.fills()) == 1
+    print("✅ Nur die fehlerhaften Orders abgelehnt")
+
+def test_current_prices_skip_missing():
+    print("=== Aktuelle Preise: fehlende Ticker ohne 0.0 ===")
+    from bitpanda_fusion_adapter import BitpandaFusionPaperTrader
+    from crypto_tickers import crypto_tickers
+    from price_feed import PriceFeed, StubPriceSource, set_price_feed
+    symbol = crypto_tickers["BTC-EUR"]["symbol"]
+    set_price_feed(PriceFeed(ttl=0, source=StubPriceSource({symbol: 101.0})))
+    try:
+        prices = BitpandaFusionPaperTrader(sandbox=True).get_current_prices()
+    finally:
+        set_price_feed(None)
+    assert prices == {"BTC-EUR": 101.0}
+    print("✅ Nur Ticker mit Preis im Ergebnis")
+
+if __name__ == "__main__":
+    test_paper_execution()
+    test_paper_orders_reject_per_row()
+    test_current_prices_skip_missing()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""Test: Replay der Paper-Trading-Runner mit simulierter Uhr über gespeicherte Historie"""
+
+import os
+import tempfile
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+import crypto_backtesting_module
+from paper_replay import ReplayClock, ReplayPriceFeed
+from price_store import append_bars
+from trade_ledger import TradeLedger
+from daily_opening_trader import DailyOpeningTrader
+from live_strategy_paper_trading import LiveStrategyPaperTrader
+
+def _store(base_dir):
+    days = pd.date_range("2025-03-01", periods=20, freq="D")
+    daily = pd.DataFrame({"Open": np.arange(20) + 100.0, "High": np.arange(20) + 105.0, "Low": np.arange(20) + 95.0,
+                          "Close": np.arange(20) + 101.0, "Volume": 1000.0}, index=days)
+    append_bars("BTC-EUR", daily, "1d", base_dir)
+    append_bars("ETH-EUR", daily * 10, "1d", base_dir)
+    minutes_idx = pd.date_range("2025-03-05 00:00", "2025-03-06 23:59", freq="min")
+    price = 200.0 + np.arange(len(minutes_idx)) * 0.01
+    minutes = pd.DataFrame({"Open": price, "High": price + 0.5, "Low": price - 0.5, "Close": price + 0.005,
+                            "Volume": 1.0}, index=minutes_idx)
+    append_bars("BTC-EUR", minutes, "1m", base_dir)
+
+def test_replay_price_feed():
+    print("=== Replay-Preisfeed ===")
+    with tempfile.TemporaryDirectory() as base_dir:
+        _store(base_dir)
+        clock = ReplayClock("2025-03-05 10:30")
+        feed = ReplayPriceFeed(clock, base_dir)
+        quotes = feed.quotes(["BTC-EUR", "ETH-EUR", "XRP-EUR"])
+        # Minutenbars: Open = erster Bar des Tages, Last = Bar 10:30 (nichts danach)
+        assert quotes["BTC-EUR"]["open"] == 200.0
+        assert np.isclose(quotes["BTC-EUR"]["last"], 200.0 + 630 * 0.01 + 0.005)
+        # Nur Tagesbars: am laufenden Tag nur das Open bekannt
+        assert quotes["ETH-EUR"]["last"] == 1040.0 and "XRP-EUR" not in quotes
+        assert feed.ticker_index("https://api.bitpanda.com/v1/ticker") is None
+
+        clock.sleep(3 * 86400)      # 08.03.: keine Minutenbars mehr -> Tagesbar
+        assert feed.prices(["BTC-EUR"])["BTC-EUR"] == 107.0
+        assert clock.last_closed_day() == pd.Timestamp("2025-03-07").date()
+    print("✅ Quotes ohne Lookahead")
+
+def test_daily_opening_replay():
+    print("=== Replay DailyOpeningTrader (14 Tage) ===")
+    with tempfile.TemporaryDirectory() as base_dir:
+        _store(base_dir)
+        clock = ReplayClock("2025-03-02")
+        trader = DailyOpeningTrader(clock=clock, price_feed=ReplayPriceFeed(clock, base_dir),
+                                    tickers=["BTC-EUR"], output_dir=base_dir, ledger=TradeLedger(":memory:"))
+        # Signal-Logik isoliert: Kauf am ersten Tag, danach Verkauf
+        trader.run_strategy_for_ticker = lambda ticker: (
+            {'signal': 'SELL', 'strength': 0.9, 'reason': 'test'} if trader.positions.get(ticker, {}).get('quantity')
+            else {'signal': 'BUY', 'strength': 0.9, 'reason': 'test'})
+
+        start = time.perf_counter()
+        trader.start_2_week_daily_trading(duration_days=14)
+        elapsed = time.perf_counter() - start
+
+        stamps = [order['timestamp'] for order in trader.trade_log]
+        assert len(stamps) == 14 and stamps[0] == pd.Timestamp("2025-03-02") and stamps[-1] == pd.Timestamp("2025-03-15")
+        assert [o['action'] for o in trader.trade_log[:2]] == ['BUY', 'SELL']
+        assert trader.trade_log[0]['price'] == 101.0                    # Open 02.03.
+        assert os.path.exists(os.path.join(base_dir, "daily_opening_trades_20250315_0000.csv"))
+        assert clock.slept >= 13 * 86400 and elapsed < 10
+        booked = trader.ledger.fills(source="daily_opening")
+        assert len(booked) == sum(o['status'] != 'REJECTED' for o in trader.trade_log)
+        assert booked['ts'].iloc[0] == pd.Timestamp("2025-03-02") and booked['price'].iloc[0] == 101.0
+    print(f"✅ 14 Handelstage in {elapsed:.2f}s")
+
+def test_live_replay_trading_hours():
+    print("=== Replay LiveStrategyPaperTrader (1 Tag) ===")
+    with tempfile.TemporaryDirectory() as base_dir:
+        _store(base_dir)
+        clock = ReplayClock("2025-03-05")
+        trader = LiveStrategyPaperTrader(clock=clock, price_feed=ReplayPriceFeed(clock, base_dir),
+                                         tickers=["BTC-EUR"], output_dir=base_dir, ledger=TradeLedger(":memory:"))
+        trader.run_strategy_analysis = lambda ticker: {'signal': 'BUY', 'strength': 1.0, 'reason': 'test'}
+        trader.start_live_trading(duration_days=1)
+
+        stamps = pd.DatetimeIndex([entry['timestamp'] for entry in trader.trade_log])
+        assert len(stamps) > 100
+        assert stamps.min() >= pd.Timestamp("2025-03-05 09:00") and stamps.max() <= pd.Timestamp("2025-03-05 21:00")
+        first = trader.trade_log[0]
+        assert np.isclose(first['price'], 200.0 + 540 * 0.01 + 0.005)   # Minutenbar 09:00
+        assert any(name.startswith("live_paper_trading_log_20250306") for name in os.listdir(base_dir))
+        assert len(trader.ledger.fills(ticker="BTC-EUR")) == len(stamps)
+    print(f"✅ {len(stamps)} Orders innerhalb der Handelszeit")
+
+def test_loader_download_respects_end_date():
+    print("=== load_crypto_data_yf ohne CSV mit end_date ===")
+    days = pd.date_range("2025-01-01", "2025-03-20", freq="D", name="Date")
+    bars = pd.DataFrame({"Open": 1.0, "High": 2.0, "Low": 0.5, "Close": np.arange(len(days)) + 1.0,
+                         "Volume": 10.0}, index=days)
+    requested = {}
+
+    def download(symbol, start=None, end=None, **kwargs):
+        requested.update(start=start, end=end)
+        return bars.copy()
+
+    cwd, yf = os.getcwd(), crypto_backtesting_module.yf
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            os.chdir(tmp)
+            crypto_backtesting_module.yf = SimpleNamespace(download=download)
+            df = crypto_backtesting_module.load_crypto_data_yf("ZZZ-EUR", backtest_years=1, end_date="2025-03-10")
+        finally:
+            crypto_backtesting_module.yf = yf
+            os.chdir(cwd)
+    assert df is not None and df.index.max() == pd.Timestamp("2025-03-10")     # keine Bars nach end_date
+    assert requested["start"] == (pd.Timestamp("2025-03-10") - pd.Timedelta(days=370)).strftime("%Y-%m-%d")
+    assert requested["end"] >= "2025-03-20"                                     # Cache bis heute
+    print("✅ Download-Pfad ohne Lookahead")
+
+if __name__ == "__main__":
+    test_replay_price_feed()
+    test_daily_opening_replay()
+    test_live_replay_trading_hours()
+    test_loader_download_respects_end_date()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""Test: run_backtests_parallel – Ticker-Reihenfolge, Fehler und Timeout pro Ticker"""
+
+import os
+import time
+from crypto_backtesting_module import run_backtests_parallel
+
+def fake_backtest(symbol, config):
+    time.sleep(config.get('sleep', 0))
+    if config.get('crash'):
+        os._exit(3)
+    if config.get('fail'):
+        raise RuntimeError(f"Backtest {symbol} fehlgeschlagen")
+    return {'success': True, 'symbol': symbol, 'final_capital': config['initialCapitalLong'] * 1.1}
+
+def test_parallel_backtest_runner():
+    print("=== Paralleler Multi-Ticker-Runner ===")
+    tickers = {
+        'BTC-EUR': {'initialCapitalLong': 5000, 'sleep': 0.3},
+        'ETH-EUR': {'initialCapitalLong': 3000, 'sleep': 0.0},
+        'XRP-EUR': {'initialCapitalLong': 1000, 'fail': True},
+        'SOL-EUR': {'initialCapitalLong': 2000, 'sleep': 0.1},
+    }
+
+    results = run_backtests_parallel(tickers, max_workers=3, backtest_func=fake_backtest)
+    print(f"   Reihenfolge: {list(results)}")
+    assert list(results) == list(tickers)
+    assert results['XRP-EUR'] is False
+    assert results['ETH-EUR']['final_capital'] == 3000 * 1.1
+
+    serial = run_backtests_parallel(tickers, max_workers=1, backtest_func=lambda s, c: s)
+    assert list(serial.values()) == list(tickers)
+
+    slow = {'BTC-EUR': {'initialCapitalLong': 1000, 'sleep': 10}, 'ETH-EUR': {'initialCapitalLong': 1000}}
+    start = time.time()
+    results = run_backtests_parallel(slow, max_workers=2, timeout=1, backtest_func=fake_backtest)
+    print(f"   Timeout-Lauf: {time.time() - start:.1f}s")
+    assert results['BTC-EUR'] is False and results['ETH-EUR']['success']
+    assert time.time() - start < 8
+
+    # Timeout zählt ab Start im Worker: wartende Ticker verlieren keine Zeit in der Queue,
+    # ein langsamer Ticker bekommt keine Zeit von früheren Tickern geschenkt
+    queued = {f'T{i}-EUR': {'initialCapitalLong': 1000, 'sleep': 0.8} for i in range(4)}
+    results = run_backtests_parallel(queued, max_workers=2, timeout=1.5, backtest_func=fake_backtest)
+    assert all(result['success'] for result in results.values())
+    late = {'BTC-EUR': {'initialCapitalLong': 1000, 'sleep': 1.2},
+            'ETH-EUR': {'initialCapitalLong': 1000, 'sleep': 2.5}}
+    results = run_backtests_parallel(late, max_workers=2, timeout=1.5, backtest_func=fake_backtest)
+    assert results['BTC-EUR']['success'] and results['ETH-EUR'] is False
+
+    # Hängende Ticker belegen alle Worker -> werden beendet, der Rest läuft danach;
+    # ein abgestürzter Prozess liefert False
+    hung = {'A-EUR': {'initialCapitalLong': 1000, 'sleep': 30}, 'B-EUR': {'initialCapitalLong': 1000, 'sleep': 30},
+            'C-EUR': {'initialCapitalLong': 1000}, 'D-EUR': {'initialCapitalLong': 1000, 'crash': True}}
+    start = time.time()
+    results = run_backtests_parallel(hung, max_workers=2, timeout=1, backtest_func=fake_backtest)
+    assert [bool(r) for r in results.values()] == [False, False, True, False] and time.time() - start < 8
+
+    print("✅ Runner liefert Ergebnisse in Ticker-Reihenfolge")
+
+if __name__ == "__main__":
+    test_parallel_backtest_runner()
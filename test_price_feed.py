@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""Test: PriceFeed – TTL-Cache, Stub-Quelle und paralleler Einzel-Fallback"""
+
+import time
+import threading
+
+import pandas as pd
+
+from price_feed import PriceFeed, StubPriceSource, YahooMinuteSource, _quote_from_bars, parse_ticker_index, lookup_ticker
+
+def test_price_feed():
+    print("=== PriceFeed ===")
+    stub = StubPriceSource({"BTC-EUR": 50000.0, "ETH-EUR": {"last": 3000.0, "open": 2950.0, "high": 3010.0, "low": 2940.0, "volume": 12.0}})
+    feed = PriceFeed(ttl=60, source=stub)
+
+    prices = feed.prices(["BTC-EUR", "ETH-EUR", "XXX-EUR"])
+    assert prices == {"BTC-EUR": 50000.0, "ETH-EUR": 3000.0}
+    assert feed.prices(["ETH-EUR"], field="open") == {"ETH-EUR": 2950.0}
+    assert feed.prices(["BTC-EUR", "XXX-EUR"]) == {"BTC-EUR": 50000.0}
+    # BTC/ETH aus dem Cache, nur das unbekannte Symbol wird erneut angefragt
+    assert stub.calls == [["BTC-EUR", "ETH-EUR", "XXX-EUR"], ["XXX-EUR"]]
+
+    stub.prices["BTC-EUR"] = 51000.0
+    assert feed.prices(["BTC-EUR"])["BTC-EUR"] == 50000.0      # TTL noch gültig
+    assert feed.prices(["BTC-EUR"], ttl=0)["BTC-EUR"] == 51000.0
+    print(f"   Stub-Abrufe: {len(stub.calls)}")
+
+    # Quote aus Minutenbars: Open = erster Bar, Close/High/Low = letzter gültiger Bar
+    idx = pd.date_range("2025-01-01 00:00", periods=3, freq="1min")
+    bars = pd.DataFrame({"Open": [1.0, 2.0, 3.0], "High": [1.5, 2.5, 3.5], "Low": [0.5, 1.5, 2.5],
+                         "Close": [1.2, 2.2, float("nan")], "Volume": [10, 20, 30]}, index=idx)
+    quote = _quote_from_bars(bars, "yahoo")
+    assert (quote["open"], quote["last"], quote["high"], quote["volume"]) == (1.0, 2.2, 2.5, 20.0)
+
+    # Batch liefert nur einen Teil -> Rest parallel einzeln
+    class FakeYahoo(YahooMinuteSource):
+        def __init__(self):
+            super().__init__(max_workers=4)
+            self.threads = set()
+
+        def _fetch_batch(self, symbols):
+            return {"A": {"last": 1.0}}
+
+        def _fetch_one(self, symbol):
+            self.threads.add(threading.get_ident())
+            time.sleep(0.2)
+            if symbol == "BAD":
+                raise ValueError("kein Listing")
+            return {"last": 2.0}
+
+    source = FakeYahoo()
+    start = time.perf_counter()
+    quotes = source.fetch(["A", "B", "C", "D", "BAD"])
+    elapsed = time.perf_counter() - start
+    assert set(quotes) == {"A", "B", "C", "D"}
+    assert elapsed < 0.6, elapsed                      # seriell wären es 0.8s
+    print(f"   Fallback für 4 Symbole: {elapsed:.2f}s in {len(source.threads)} Threads")
+    print("✅ PriceFeed korrekt")
+
+def test_ticker_index():
+    print("=== Bitpanda Ticker-Index ===")
+    records = [{"instrument_code": "BTC_EUR", "last_price": "50000", "best_bid": "49990", "best_ask": "50010", "base_volume": "3.5"},
+               {"instrument_code": "ETH_EUR", "last_price": "3000", "best_bid": None, "best_ask": None, "base_volume": "10"}]
+    index = parse_ticker_index(records)
+    assert lookup_ticker(index, "BTC-EUR")["bid"] == 49990.0
+    assert lookup_ticker(index, "eth/eur")["ask"] == 3000 * 1.001     # fehlender Ask -> geschätzt
+    assert lookup_ticker(index, "XRP-EUR") is None
+
+    # Andere Feldnamen / Strukturen
+    assert lookup_ticker(parse_ticker_index([{"symbol": "BTC-EUR", "price": 1.5}]), "BTC-EUR")["last"] == 1.5
+    assert lookup_ticker(parse_ticker_index({"BTC_EUR": {"last": 2.0, "vol": 7}}), "BTC-EUR")["volume"] == 7.0
+    nested = parse_ticker_index({"BTC": {"EUR": "50000.5", "USD": "54000"}, "ETH": {"EUR": "3000"}})
+    assert lookup_ticker(nested, "BTC-USD")["last"] == 54000.0 and len(nested) == 3
+    assert parse_ticker_index({"BTC_EUR": 3.0}) == {"BTC_EUR": {"last": 3.0, "bid": 3.0 * 0.999, "ask": 3.0 * 1.001, "volume": 0.0, "change_24h": 0.0}}
+    assert parse_ticker_index("unerwartet") == {}
+
+    # Ticker-Index wird pro Antwort nur einmal aufgebaut
+    feed = PriceFeed(ttl=60, source=StubPriceSource({}))
+    feed.get_json = lambda url, headers=None, timeout=10, ttl=None: records
+    assert feed.ticker_index("https://example.invalid/ticker") is feed.ticker_index("https://example.invalid/ticker")
+    print(f"   {len(index)} Instrumente, {len(nested)} aus verschachteltem Format")
+    print("✅ Ticker-Index korrekt")
+
+if __name__ == "__main__":
+    test_price_feed()
+    test_ticker_index()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""Test: Spalten-Preisspeicher – CSV-Migration, Append, Tail-Ersatz (heutiger Bar), Loader und Signatur"""
+
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+import price_store
+
+def test_price_store():
+    print("=== Preisspeicher (price_store) ===")
+    with tempfile.TemporaryDirectory() as tmp:
+        store_dir = os.path.join(tmp, "store")
+        csv_path = os.path.join(tmp, "BTC-EUR_daily.csv")
+
+        idx = pd.date_range("2024-01-01", periods=60, freq="D")
+        close = np.round(100 + np.cumsum(np.random.default_rng(7).normal(0, 1, 60)), 4)
+        csv_df = pd.DataFrame({"Date": idx.strftime("%Y-%m-%d"), "Open": close, "High": close + 1,
+                               "Low": close - 1, "Close": close, "Volume": 1000.0})
+        csv_df.to_csv(csv_path, index=False)
+
+        # Migration + Loader entsprechen pd.read_csv
+        df = price_store.load_symbol_frame("BTC-EUR", "1d", csv_path=csv_path, base_dir=store_dir)
+        ref = pd.read_csv(csv_path, parse_dates=["Date"]).set_index("Date")
+        assert np.array_equal(df.to_numpy(), ref.to_numpy(dtype=float))
+        assert (df.index == ref.index).all()
+        assert price_store.is_synced(csv_path, base_dir=store_dir)
+
+        # Heutigen (künstlichen) Bar ersetzen und neuen Bar anhängen
+        today = pd.DataFrame({"Date": [idx[-1], idx[-1] + pd.Timedelta(days=1)],
+                              "Open": [1.0, 2.0], "High": [1.0, 2.0], "Low": [1.0, 2.0],
+                              "Close": [1.5, 2.5], "Volume": [0.0, 0.0]})
+        rows = price_store.append_bars("BTC-EUR", today, base_dir=store_dir)
+        df = price_store.load_prices("BTC-EUR", base_dir=store_dir, mmap=True)
+        print(f"   Zeilen nach Append: {rows} | letzte Closes: {df['Close'].tail(3).tolist()}")
+        assert rows == 61 and df.index.is_unique and df.index.is_monotonic_increasing
+        assert df["Close"].tolist()[-2:] == [1.5, 2.5]
+        assert df["Close"].iloc[-3] == close[-2]
+
+        # Store-Bars bleiben erhalten, solange die CSV unverändert ist
+        df = price_store.load_symbol_frame("BTC-EUR", "1d", csv_path=csv_path, base_dir=store_dir)
+        assert len(df) == 61
+
+        # Signatur reproduzierbar über Ladewege, ändert sich mit den Daten
+        signature = price_store.dataset_signature(df)
+        print(f"   Signatur: {signature}")
+        assert price_store.dataset_signature(price_store.load_prices("BTC-EUR", base_dir=store_dir, mmap=True)) == signature
+        assert price_store.dataset_signature(df.iloc[:-1]) != signature
+
+    print("✅ Preisspeicher korrekt")
+
+if __name__ == "__main__":
+    test_price_store()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""Test: Recent-Trades-Abfrage (typisierte Datumsspalten, Masken-Filter, alle Ticker auf einmal)"""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from recent_trades import recent_trade_orders, recent_orders_for_results, to_datetime_column, sort_trades_by_date
+from trades_weekly_display import get_last_week_trades
+
+NOW = datetime(2025, 3, 20, 10, 30)
+
+def _matched(n=300, seed=3):
+    rng = np.random.default_rng(seed)
+    entry = pd.Timestamp("2024-03-01") + pd.to_timedelta(np.sort(rng.integers(0, 380, n)), unit="D")
+    exit_ = entry + pd.to_timedelta(rng.integers(0, 6, n), unit="D")
+    trades = pd.DataFrame({"Entry Date": entry, "Entry Price": rng.uniform(10, 20, n).round(2),
+                           "Exit Date": exit_, "Exit Price": rng.uniform(10, 20, n).round(2),
+                           "Quantity": rng.uniform(1, 5, n).round(4), "Status": "CLOSED"})
+    artificial = {"Entry Date": pd.Timestamp("2025-03-18"), "Entry Price": 15.0, "Exit Date": "2025-03-20",
+                  "Exit Price": 16.0, "Quantity": 2.0, "Status": "OPEN", "Type": "Artificial"}
+    return pd.concat([trades, pd.DataFrame([artificial])], ignore_index=True)
+
+def _reference(matched, ticker, cutoff):
+    """Bisherige Zeile-für-Zeile-Logik aus get_14_day_trades."""
+    rows = []
+    for _, t in matched[matched["Type"].fillna("") != "Artificial"].iterrows():
+        entry, exit_ = pd.to_datetime(str(t["Entry Date"])), pd.to_datetime(str(t["Exit Date"]))
+        if entry >= cutoff:
+            rows.append((entry.strftime("%Y-%m-%d"), ticker, "BUY", t["Entry Price"], t["Quantity"]))
+        if exit_ >= cutoff:
+            rows.append((exit_.strftime("%Y-%m-%d"), ticker, "SELL", t["Exit Price"], t["Quantity"]))
+    for _, t in matched[matched["Type"].fillna("") == "Artificial"].iterrows():
+        entry = pd.to_datetime(str(t["Entry Date"]))
+        if entry >= cutoff:
+            rows.append((entry.strftime("%Y-%m-%d"), ticker, "BUY", t["Entry Price"], t["Quantity"]))
+    return rows
+
+def test_recent_orders_match_row_loop():
+    print("=== Recent Orders == Zeilen-Schleife ===")
+    results = {"AAA-EUR": {"matched_trades": _matched(seed=1)}, "BBB-EUR": {"matched_trades": _matched(seed=2)},
+               "CCC-EUR": False}
+    cutoff = NOW - timedelta(days=14)
+    expected = []
+    for ticker in ("AAA-EUR", "BBB-EUR"):
+        expected += _reference(results[ticker]["matched_trades"], ticker, cutoff)
+    expected.sort(key=lambda r: r[0], reverse=True)
+
+    orders = recent_orders_for_results(results, days=14, now=NOW, realtime_prices={"AAA-EUR": 1.5})
+    assert pd.api.types.is_datetime64_dtype(orders["date"])
+    got = list(zip(orders["date"].dt.strftime("%Y-%m-%d"), orders["ticker"], orders["action"], orders["price"], orders["quantity"]))
+    assert got == expected and len(got) > 0
+    assert orders["artificial_included"].sum() == 2
+    assert np.allclose(orders.loc[orders["action"] == "BUY", "limit_price"], orders.loc[orders["action"] == "BUY", "price"] * 0.999)
+    assert set(orders.loc[orders["ticker"] == "AAA-EUR", "realtime_price"]) == {1.5}
+    assert recent_trade_orders(pd.DataFrame(), "X", now=NOW).empty
+    print(f"   {len(orders)} Orders identisch")
+    print("✅ Recent Orders korrekt")
+
+def test_weekly_filter_and_dates():
+    print("=== Weekly-Filter / Datumsspalten ===")
+    dates = to_datetime_column(["2025-03-01", pd.Timestamp("2025-03-02 10:00"), "2025-03-03T12:00:00",
+                                pd.Timestamp("2025-03-04", tz="Europe/Berlin"), "", None, "nan"])
+    assert dates.iloc[:4].tolist() == [pd.Timestamp("2025-03-01"), pd.Timestamp("2025-03-02 10:00"),
+                                       pd.Timestamp("2025-03-03 12:00"), pd.Timestamp("2025-03-04")]
+    assert dates.iloc[4:].isna().all()
+
+    today = pd.Timestamp(datetime.now().date())
+    trades = [{"buy_date": today - timedelta(days=30), "sell_date": today - timedelta(days=20)},
+              {"buy_date": today - timedelta(days=30), "sell_date": (today - timedelta(days=14)).strftime("%Y-%m-%d")},
+              {"buy_date": (today - timedelta(days=3)).strftime("%Y-%m-%d"), "sell_date": ""},
+              {"buy_date": today - timedelta(days=15), "sell_date": None}]
+    data_df = pd.DataFrame({"Open": [1.0], "Close": [1.0]}, index=[today - timedelta(days=40)])
+    recent = get_last_week_trades(trades, data_df, days_back=14)
+    assert recent == [trades[1], trades[2]]
+    assert sort_trades_by_date(list(trades))[0] is trades[2]
+    print("✅ Weekly-Filter korrekt")
+
+if __name__ == "__main__":
+    test_recent_orders_match_row_loop()
+    test_weekly_filter_and_dates()
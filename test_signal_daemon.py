@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""Test: Signal-Daemon – Warm-up, Preis-Tick ohne Neuladen, Neu-Optimierung nur bei neuem Tag, localhost-API"""
+
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+from price_feed import PriceFeed, StubPriceSource
+from signal_daemon import SignalDaemon, fetch_signals
+
+def make_test_df(n=300, seed=2):
+    rng = np.random.default_rng(seed)
+    idx = pd.date_range("2025-01-01", periods=n, freq="D")
+    close = np.round(100 * np.exp(np.cumsum(rng.normal(0, 0.03, n))), 2)
+    return pd.DataFrame({"Open": close, "High": close, "Low": close, "Close": close, "Volume": 1.0}, index=idx)
+
+def test_signal_daemon():
+    print("=== Signal-Daemon ===")
+    data = {"BTC-EUR": make_test_df(seed=2), "ETH-EUR": make_test_df(seed=3)}
+    loads, optimizations = [], []
+
+    def loader(symbol):
+        loads.append(symbol)
+        return data[symbol]
+
+    def optimizer(df, symbol):
+        optimizations.append((symbol, df.index[-1]))
+        return 5, 2
+
+    tickers = {"BTC-EUR": {"symbol": "BTC-EUR", "trade_on": "Close"}, "ETH-EUR": {"symbol": "ETH-EUR", "trade_on": "Close"}}
+    daemon = SignalDaemon(tickers, port=0, data_loader=loader, optimizer=optimizer)
+    daemon.warm_up()
+    assert len(optimizations) == 2 and set(daemon.get_signals()) == {"BTC-EUR", "ETH-EUR"}
+
+    # Unveränderte Daten -> keine Neubewertung
+    assert daemon.poll_once() == []
+
+    # Preis-Tick für heute: kein Laden, keine Neu-Optimierung
+    last_day = data["BTC-EUR"].index[-1]
+    signal = daemon.on_price("BTC-EUR", 123.45, last_day + pd.Timedelta(hours=10))
+    assert signal["last_close"] == 123.45 and len(loads) == 4 and len(optimizations) == 2
+
+    # Neuer Tag -> ein neuer Bar + Neu-Optimierung
+    signal = daemon.on_price("BTC-EUR", 124.0, last_day + pd.Timedelta(days=1, hours=1))
+    assert signal["last_bar"] == (last_day + pd.Timedelta(days=1)).strftime("%Y-%m-%d")
+    assert len(optimizations) == 3
+
+    # Unveränderter Store -> Tick-Bar bleibt erhalten
+    assert daemon.poll_once() == [] and daemon.get_signal("BTC-EUR")["last_close"] == 124.0
+
+    # Store ändert sich (älterer Tag) -> Store-Frame plus Tick-Bar des neueren Tages
+    data["BTC-EUR"] = data["BTC-EUR"].copy()
+    data["BTC-EUR"].iloc[-1, data["BTC-EUR"].columns.get_loc("Close")] = 120.0
+    assert daemon.poll_once() == ["BTC-EUR"]
+    df = daemon.states["BTC-EUR"].df
+    assert df["Close"].iloc[-2] == 120.0 and df["Close"].iloc[-1] == 124.0 and len(df) == len(data["BTC-EUR"]) + 1
+
+    # Store holt den Tick-Tag ein -> Store gewinnt
+    data["BTC-EUR"] = pd.concat([data["BTC-EUR"], df.iloc[[-1]].assign(Close=125.0)])
+    assert daemon.poll_once() == ["BTC-EUR"] and daemon.get_signal("BTC-EUR")["last_close"] == 125.0
+    assert not daemon.states["BTC-EUR"].tick_dirty
+
+    # Optimierer läuft ohne Lock: Abfragen blockieren währenddessen nicht
+    blocked = []
+    def slow_optimizer(df, symbol):
+        reader = threading.Thread(target=daemon.get_signals)
+        reader.start()
+        reader.join(timeout=2)
+        blocked.append(reader.is_alive())
+        return 5, 2
+    daemon.optimizer = slow_optimizer
+    daemon.on_price("ETH-EUR", 99.0, data["ETH-EUR"].index[-1] + pd.Timedelta(days=1))
+    assert blocked == [False]
+
+    port = daemon.start_api()
+    try:
+        all_signals = fetch_signals(port=port)
+        one = fetch_signals("ETH-EUR", port=port)
+        print(f"   API: {sorted(all_signals)} | ETH: {one['action']} / {one['position']} (p={one['past_window']}, tw={one['trade_window']})")
+        assert set(all_signals) == {"BTC-EUR", "ETH-EUR"} and one["ticker"] == "ETH-EUR"
+        assert fetch_signals("XXX-EUR", port=port) is None
+    finally:
+        daemon.stop()
+
+    print("✅ Signal-Daemon korrekt")
+
+def test_signal_daemon_price_ticks():
+    print("=== Signal-Daemon: Preis-Ticks aus dem Feed ===")
+    data = {"BTC-EUR": make_test_df(seed=2), "ETH-EUR": make_test_df(seed=3)}
+    last_day = data["BTC-EUR"].index[-1]
+    source = StubPriceSource({"BTC-EUR": {"last": 150.0, "bar_time": str((last_day + pd.Timedelta(hours=9)).tz_localize("UTC"))}})
+    tickers = {"BTC-EUR": {"symbol": "BTC-EUR"}, "ETH-EUR": {"symbol": "ETH-EUR"}}
+    daemon = SignalDaemon(tickers, port=0, data_loader=lambda symbol: data[symbol], optimizer=lambda df, symbol: (5, 2),
+                          price_feed=PriceFeed(ttl=0, source=source))
+    daemon.warm_up()
+
+    ticked, changed = daemon.run_cycle()
+    assert ticked == ["BTC-EUR"] and changed == [] and source.calls == [["BTC-EUR", "ETH-EUR"]]
+    signal = daemon.get_signal("BTC-EUR")
+    assert signal["last_close"] == 150.0 and signal["last_bar"] == last_day.strftime("%Y-%m-%d")
+    assert daemon.get_signal("ETH-EUR")["last_close"] == data["ETH-EUR"]["Close"].iloc[-1]
+
+    daemon.price_ticks = False
+    assert daemon.run_cycle() == ([], []) and len(source.calls) == 1
+    print("✅ Ein Feed-Abruf pro Zyklus, Ticks vor dem Store-Abgleich")
+
+def test_runners_daemon_mode():
+    print("=== Runner im Daemon-Modus ===")
+    import daily_opening_trader
+    import live_strategy_paper_trading
+    from paper_replay import ReplayClock
+    from trade_ledger import TradeLedger
+
+    data = {"BTC-EUR": make_test_df(seed=2)}
+    daemon = SignalDaemon({"BTC-EUR": {"symbol": "BTC-EUR"}}, port=0, data_loader=lambda symbol: data[symbol],
+                          optimizer=lambda df, symbol: (5, 2), price_ticks=False)
+    daemon.warm_up()
+    backtests = []
+    originals = (live_strategy_paper_trading.get_backtest_result, daily_opening_trader.get_backtest_result)
+    fake_backtest = lambda symbol, config, end_date=None: backtests.append(symbol)
+    live_strategy_paper_trading.get_backtest_result = daily_opening_trader.get_backtest_result = fake_backtest
+    try:
+        os.environ["SIGNAL_DAEMON"] = "1"
+        os.environ["SIGNAL_DAEMON_PORT"] = str(daemon.start_api())
+        runners = [live_strategy_paper_trading.LiveStrategyPaperTrader(tickers=["BTC-EUR"], ledger=TradeLedger(":memory:")),
+                   daily_opening_trader.DailyOpeningTrader(tickers=["BTC-EUR"], ledger=TradeLedger(":memory:"))]
+        assert all(runner.use_signal_daemon for runner in runners)
+        assert not live_strategy_paper_trading.LiveStrategyPaperTrader(clock=ReplayClock("2025-03-05"), tickers=["BTC-EUR"],
+                                                                      ledger=TradeLedger(":memory:")).use_signal_daemon
+        expected = "BUY" if daemon.get_signal("BTC-EUR")["position"] == "LONG" else "HOLD"
+        analyses = [runners[0].run_strategy_analysis, runners[1].run_strategy_for_ticker]
+        for analyse in analyses:
+            signal = analyse("BTC-EUR")
+            assert signal["signal"] == expected and signal["reason"].startswith("Daemon:")
+        assert backtests == []
+
+        daemon.stop()                                   # nicht erreichbar -> Backtest
+        for analyse in analyses:
+            assert analyse("BTC-EUR")["signal"] == "HOLD"
+        assert backtests == ["BTC-EUR", "BTC-EUR"]
+    finally:
+        daemon.stop()
+        os.environ.pop("SIGNAL_DAEMON", None)
+        os.environ.pop("SIGNAL_DAEMON_PORT", None)
+        live_strategy_paper_trading.get_backtest_result, daily_opening_trader.get_backtest_result = originals
+    print("✅ Signale vom Daemon, Backtest nur als Fallback")
+
+if __name__ == "__main__":
+    test_signal_daemon()
+    test_signal_daemon_price_ticks()
+    test_runners_daemon_mode()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""Test: Append-only Trade-Ledger (Fills, Positionen, realisierter PnL, Perioden)"""
+
+import os
+import sqlite3
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from trade_ledger import TradeLedger, PREPARED
+
+def _fills():
+    return [
+        {'ticker': 'BTC-EUR', 'action': 'BUY', 'quantity': 1.0, 'price': 100.0, 'fee': 1.0, 'source': 'daily_opening',
+         'timestamp': '2025-03-01 10:00', 'order_id': 'A1'},
+        {'ticker': 'BTC-EUR', 'action': 'BUY', 'quantity': 1.0, 'price': 120.0, 'fee': 1.0, 'source': 'daily_opening',
+         'timestamp': '2025-03-02 10:00', 'order_id': 'A2'},
+        {'ticker': 'ETH-EUR', 'action': 'buy', 'quantity': 10.0, 'price': 10.0, 'source': 'live_strategy',
+         'timestamp': pd.Timestamp('2025-03-02 12:00', tz='UTC')},
+        {'ticker': 'BTC-EUR', 'action': 'SELL', 'quantity': 1.5, 'price': 130.0, 'fee': 2.0, 'source': 'daily_opening',
+         'timestamp': '2025-03-09 10:00', 'order_id': 'A3'},
+        {'ticker': 'ETH-EUR', 'action': 'SELL', 'quantity': 10.0, 'price': 9.0, 'source': 'live_strategy',
+         'timestamp': '2025-03-10 12:00'},
+    ]
+
+def test_ledger_queries():
+    print("=== Trade-Ledger Abfragen ===")
+    ledger = TradeLedger(":memory:")
+    assert ledger.record_fills(_fills()) == 5
+    assert not ledger.record_fill('BTC-EUR', 'BUY', 1.0, 100.0, 'daily_opening', order_id='A1')   # Duplikat
+    assert ledger.record_fill('BTC-EUR', 'BUY', 1.0, 100.0, 'live_strategy', order_id='A1')      # andere Quelle
+    assert ledger.record_fills([{'ticker': 'X', 'action': 'HOLD', 'quantity': 1, 'price': 1}]) == 0
+
+    frame = ledger.fills(ticker='BTC-EUR', source='daily_opening')
+    assert list(frame['action']) == ['BUY', 'BUY', 'SELL'] and pd.api.types.is_datetime64_dtype(frame['ts'])
+    assert len(ledger.fills(start='2025-03-02', end='2025-03-09')) == 2
+    assert ledger.fills(mode='live').empty
+
+    # Durchschnittskosten: (100 + 1 + 120 + 1) / 2 = 111 je BTC
+    positions = ledger.positions(source='daily_opening')
+    assert list(positions.index) == ['BTC-EUR']
+    assert np.isclose(positions.loc['BTC-EUR', 'quantity'], 0.5)
+    assert np.isclose(positions.loc['BTC-EUR', 'avg_price'], 111.0)
+    before_sell = ledger.positions(as_of='2025-03-05', source=['daily_opening', 'live_strategy'])
+    assert np.isclose(before_sell.loc['BTC-EUR', 'quantity'], 2.0) and np.isclose(before_sell.loc['ETH-EUR', 'quantity'], 10.0)
+
+    pnl = ledger.realized_pnl(end='2025-04-01', source=['daily_opening', 'live_strategy'])
+    assert np.isclose(pnl['BTC-EUR'], 1.5 * 130.0 - 2.0 - 1.5 * 111.0) and np.isclose(pnl['ETH-EUR'], -10.0)
+    assert ledger.realized_pnl(start='2025-03-10', source='live_strategy').index.tolist() == ['ETH-EUR']
+
+    weekly = ledger.period_summary('W', end='2025-04-01', source=['daily_opening', 'live_strategy'])
+    assert weekly['fills'].tolist() == [3, 1, 1] and weekly['sells'].sum() == 2
+    assert np.isclose(weekly['realized_pnl'].sum(), pnl.sum()) and np.isclose(weekly['bought'].iloc[0], 320.0)
+    print("✅ Positionen, PnL und Perioden korrekt")
+
+def test_ledger_append_only_and_indexed():
+    print("=== Trade-Ledger append-only / Indizes ===")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "ledger", "trade_ledger.sqlite")
+        ledger = TradeLedger(path)
+        assert not os.path.exists(path)                 # Datei erst beim ersten Zugriff
+        ledger.record_fills(_fills())
+        ledger.close()
+
+        reopened = TradeLedger(path)
+        assert len(reopened.fills()) == 5
+        conn = reopened._connection()
+        for statement in ("UPDATE fills SET price = 0", "DELETE FROM fills"):
+            try:
+                conn.execute(statement)
+                assert False, statement
+            except sqlite3.DatabaseError as e:
+                assert "append-only" in str(e)
+        plan = " ".join(str(row) for row in conn.execute(
+            "EXPLAIN QUERY PLAN SELECT * FROM fills WHERE ticker = ? AND ts >= ?", ("BTC-EUR", "2025-03-01")))
+        assert "idx_fills_ticker_ts" in plan
+        plan = " ".join(str(row) for row in conn.execute(
+            "EXPLAIN QUERY PLAN SELECT * FROM fills WHERE source = ? AND ts >= ?", ("live_strategy", "2025-03-01")))
+        assert "idx_fills_source_ts" in plan
+        reopened.close()
+    print("✅ Append-only, Abfragen über Indizes")
+
+def test_summary_report_from_ledger():
+    print("=== TradingSummary2024 aus dem Ledger ===")
+    from trading_summary_2024 import TradingSummary2024
+    ledger = TradeLedger(":memory:")
+    fills = _fills()
+    for fill in fills:
+        fill['timestamp'] = pd.Timestamp(fill['timestamp']).replace(year=2024)
+    ledger.record_fills(fills + [
+        {'ticker': 'BTC-EUR', 'action': 'Buy', 'quantity': 5.0, 'price': 1.0, 'source': 'direct_today_orders',
+         'timestamp': '2024-03-03', 'status': PREPARED, 'order_id': 'DIRECT_1'},
+        {'ticker': 'BTC-EUR', 'action': 'BUY', 'quantity': 1.0, 'price': 1.0, 'source': 'daily_opening',
+         'timestamp': '2025-01-02'}])
+    assert len(ledger.fills(include_prepared=True)) == 7 and len(ledger.fills()) == 6
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            os.chdir(tmp)
+            summary = TradingSummary2024(ledger=ledger)
+            assert summary.load_ledger_trades() and len(summary.trades) == 5
+            summary.calculate_performance()
+            report = open(summary.generate_summary_report(), encoding="utf-8").read()
+        finally:
+            os.chdir(cwd)
+    pnl = ledger.realized_pnl("2024-01-01", "2025-01-01")
+    assert np.isclose(summary.performance['net_pnl'], pnl.sum())
+    assert np.isclose(summary.performance['ticker_performance']['BTC-EUR']['quantity_held'], 0.5)
+    assert summary.performance['monthly']['fills'].tolist() == [5] and "2024-03: 5 fills" in report
+    assert TradingSummary2024(ledger=TradeLedger(os.path.join(tmp, "missing.sqlite"))).load_ledger_trades() is False
+    assert not os.path.exists(os.path.join(tmp, "missing.sqlite"))
+    print("✅ Report aus indizierten Ledger-Abfragen")
+
+if __name__ == "__main__":
+    test_ledger_queries()
+    test_ledger_append_only_and_indexed()
+    test_summary_report_from_ledger()
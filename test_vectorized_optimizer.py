@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""Test: Batch-Optimierer (berechne_long_grid) liefert dieselbe Tabelle wie die Brute-Force-Schleife"""
+
+import io
+import contextlib
+import numpy as np
+import pandas as pd
+from signal_utils import berechne_best_p_tw_long
+
+def make_test_df(n=300, seed=1, freq="D", gaps=False):
+    rng = np.random.default_rng(seed)
+    idx = pd.date_range("2024-01-01", periods=n, freq=freq)
+    if gaps:
+        idx = idx[rng.random(n) > 0.05]
+    close = np.round(100 * np.exp(np.cumsum(rng.normal(0, 0.03, len(idx)))), 1)
+    return pd.DataFrame({"Open": close, "High": close, "Low": close, "Close": close, "Volume": 1.0}, index=idx)
+
+def test_vectorized_optimizer():
+    print("=== Batch-Optimierer vs. Brute-Force ===")
+    cfg = {"initial_capital": 3000, "commission_rate": 0.0018, "min_commission": 1.0, "order_round_factor": 0.01}
+
+    for freq, gaps in [("D", False), ("D", True), ("6h", False)]:
+        df = make_test_df(freq=freq, gaps=gaps)
+        start_idx, end_idx = int(len(df) * 0.25), int(len(df) * 0.9)
+        with contextlib.redirect_stdout(io.StringIO()):
+            p_old, tw_old, table_old = berechne_best_p_tw_long(df, cfg, start_idx, end_idx, batched=False, return_table=True)
+            p_new, tw_new, table_new = berechne_best_p_tw_long(df, cfg, start_idx, end_idx, batched=True, return_table=True)
+
+        print(f"   {freq} gaps={gaps}: Brute-Force p={p_old}, tw={tw_old} | Batch p={p_new}, tw={tw_new}")
+        assert (p_old, tw_old) == (p_new, tw_new)
+        assert table_old.reset_index(drop=True).equals(table_new.reset_index(drop=True))
+
+    print("✅ Identische Ergebnisse")
+
+if __name__ == "__main__":
+    test_vectorized_optimizer()
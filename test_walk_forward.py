@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""Test: Walk-Forward – Fold-Grenzen, Extrema-Cache pro Fenster und verbundene OOS-Equity"""
+
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from signal_utils import ExtremaStrengthCache, _extrema_strength
+from walk_forward import walk_forward_folds, run_walk_forward, _optimizer_config
+
+def test_walk_forward_folds():
+    print("=== Walk-Forward Folds ===")
+    assert walk_forward_folds(100, 50, 20) == [(0, 50, 50, 70), (20, 70, 70, 90), (40, 90, 90, 100)]
+    assert walk_forward_folds(100, 50, 20, anchored=True)[-1] == (0, 90, 90, 100)
+    assert walk_forward_folds(40, 50, 20) == []
+    print("✅ Fold-Grenzen korrekt")
+
+def test_extrema_cache_windows():
+    print("=== Extrema-Cache pro Fenster ===")
+    rng = np.random.default_rng(3)
+    prices = np.round(100 + np.cumsum(rng.normal(0, 1, 600)), 1)   # gerundet -> Plateaus
+    cache = ExtremaStrengthCache(prices, 14)
+    checked = 0
+    for start, end in [(0, 600), (0, 100), (37, 300), (250, 600), (590, 600), (100, 140)]:
+        lows, highs = cache.window(start, end)
+        assert np.array_equal(lows, _extrema_strength(prices[start:end], 14, np.less))
+        assert np.array_equal(highs, _extrema_strength(prices[start:end], 14, np.greater))
+        checked += 1
+    print(f"   {checked} Fenster identisch zur direkten Berechnung")
+    print("✅ Extrema-Cache korrekt")
+
+def test_walk_forward_run():
+    print("=== Walk-Forward Lauf ===")
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["OPT_CACHE_DIR"] = tmp
+        try:
+            rng = np.random.default_rng(7)
+            n = 400
+            close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+            idx = pd.date_range("2023-01-01", periods=n, freq="D")
+            df = pd.DataFrame({"Open": close * (1 + rng.normal(0, 0.005, n)), "High": close * 1.01,
+                               "Low": close * 0.99, "Close": close, "Volume": 1.0}, index=idx)
+            cfg = {"initialCapitalLong": 1000, "order_round_factor": 0.01, "trade_on": "Close"}
+
+            serial = run_walk_forward("TEST-EUR", df, cfg, train_bars=120, test_bars=40, max_workers=1)
+            parallel = run_walk_forward("TEST-EUR", df, cfg, train_bars=120, test_bars=40, max_workers=2)
+            folds = serial["folds"]
+            assert len(folds) == 7
+            assert serial["equity_curve"].index.equals(idx[120:])
+            # Kapital wird fortgeschrieben, die Kurve ist durchgehend
+            assert (folds["oos_start_capital"].iloc[1:].to_numpy() == folds["oos_end_capital"].iloc[:-1].to_numpy()).all()
+            assert abs(serial["final_capital"] - serial["equity_curve"].iloc[-1]) < 1e-9
+            pd.testing.assert_frame_equal(folds, parallel["folds"])
+            # Optimierung und OOS-Bewertung mit derselben Kommission
+            assert _optimizer_config(dict(cfg, commission_rate=0.001))["commission_rate"] == 0.001
+            print(f"   OOS: €1000 -> €{serial['final_capital']:.2f}, Parameter je Fold: "
+                  f"{list(zip(folds['past_window'], folds['trade_window']))}")
+        finally:
+            os.environ.pop("OPT_CACHE_DIR", None)
+
+    print("✅ Walk-Forward korrekt")
+
+if __name__ == "__main__":
+    test_walk_forward_folds()
+    test_extrema_cache_windows()
+    test_walk_forward_run()
@@ -1,22 +1,21 @@
 # trade_execution.py
 import os
-import yfinance as yf
 import pandas as pd
 import numpy as np
 import requests
 from datetime import datetime
 from config import COMMISSION_RATE, MIN_COMMISSION
+from price_feed import get_price_feed
+from paper_execution import get_live_simulator
 
 # Simuliertes Portfolio
 
 def get_live_price(symbol: str) -> float:
     """
-    Holt den aktuellen Spotpreis von Yahoo Finance für das Symbol.
+    Aktueller Spotpreis (letzter Minuten-Close) aus dem gemeinsamen PriceFeed
+    (TTL-Cache, kein Download pro Order).
     """
-    df = yf.download(symbol, period="1d", interval="1m", progress=False)
-    if df is None or df.empty or "Close" not in df.columns:
-        return None
-    return float(df["Close"].dropna().iloc[-1])
+    return get_price_feed().prices([symbol]).get(symbol)
 
 
 def calculate_fee(amount: float) -> float:
@@ -31,60 +30,85 @@ def execute_trade(symbol: str,
                   quantity: float,
                   limit_price: float = None,
                   cash_balance: float = 10000.0,
-                  portfolio: dict = None) -> dict:
+                  portfolio: dict = None,
+                  simulator=None,
+                  timestamp=None,
+                  ledger=None) -> dict:
     """
     Simuliert einen Trade (buy/sell) mit Preisabfrage & Gebührenberechnung.
     Gibt ein Transaktionsobjekt zurück.
     """
-    if portfolio is None:
-        portfolio = {}
-
-    spot = get_live_price(symbol)
-    if spot is None:
-        return {"status": "error", "reason": "Price not available."}
-
-    price = spot
-    now = pd.Timestamp.now()
-
-    # Limit Order prüfen
-    if limit_price is not None:
-        if action == "buy" and spot > limit_price:
-            return {"status": "rejected", "reason": f"Spotpreis {spot:.2f} > Limit {limit_price:.2f}"}
-        if action == "sell" and spot < limit_price:
-            return {"status": "rejected", "reason": f"Spotpreis {spot:.2f} < Limit {limit_price:.2f}"}
-        price = limit_price
-
-    turnover = quantity * price
-    fee = calculate_fee(turnover)
+    order = {"symbol": symbol, "action": action, "quantity": quantity,
+             "limit_price": limit_price, "timestamp": timestamp}
+    return execute_trades([order], cash_balance, portfolio, simulator, ledger)[0]
 
-    # Simulation für BUY
-    if action == "buy":
-        if turnover + fee > cash_balance:
-            return {"status": "rejected", "reason": "Nicht genug Kapital für Kauf."}
 
-        portfolio.setdefault(symbol, 0.0)
-        portfolio[symbol] += quantity
-        cash_balance -= (turnover + fee)
+def execute_trades(orders: list,
+                   cash_balance: float = 10000.0,
+                   portfolio: dict = None,
+                   simulator=None,
+                   ledger=None) -> list:
+    """
+    Führt mehrere Orders in einem Aufruf über die Paper-Matching-Engine aus
+    (Default: gecachter Live-Feed; für Replays ein PaperExecutionSimulator mit
+    BarStream/QuoteStream). Teilausführungen werden mit der gefüllten Menge gebucht.
+    Gibt je Order ein Transaktionsobjekt zurück; cash_balance wird fortgeschrieben.
+    ledger: optional trade_ledger.TradeLedger, gebuchte Fills werden als Batch angehängt.
+    """
+    if portfolio is None:
+        portfolio = {}
+    simulator = simulator or get_live_simulator()
 
-    # Simulation für SELL
-    elif action == "sell":
-        if portfolio.get(symbol, 0.0) < quantity:
-            return {"status": "rejected", "reason": "Nicht genug Bestand zum Verkauf."}
-        portfolio[symbol] -= quantity
-        cash_balance += (turnover - fee)
+    results, fills = [], []
+    for order, report in zip(orders, simulator.execute_batch(orders)):
+        symbol, action = order["symbol"], order["action"]
+        if report["status"] == "REJECTED":
+            results.append({"status": "error", "reason": "Price not available."})
+            continue
+        if report["status"] == "UNFILLED":
+            results.append({"status": "rejected", "reason": report["reason"]})
+            continue
 
-    return {
-        "status": "filled",
-        "symbol": symbol,
-        "action": action,
-        "quantity": quantity,
-        "price": round(price, 2),
-        "fee": round(fee, 2),
-        "value": round(turnover, 2),
-        "timestamp": now,
-        "cash_balance": round(cash_balance, 2),
-        "remaining_position": round(portfolio.get(symbol, 0.0), 4)
-    }
+        quantity, price = report["filled_quantity"], report["avg_price"]
+        turnover = report["value"]
+        fee = calculate_fee(turnover)
+
+        # Simulation für BUY
+        if action == "buy":
+            if turnover + fee > cash_balance:
+                results.append({"status": "rejected", "reason": "Nicht genug Kapital für Kauf."})
+                continue
+            portfolio.setdefault(symbol, 0.0)
+            portfolio[symbol] += quantity
+            cash_balance -= (turnover + fee)
+
+        # Simulation für SELL
+        elif action == "sell":
+            if portfolio.get(symbol, 0.0) < quantity:
+                results.append({"status": "rejected", "reason": "Nicht genug Bestand zum Verkauf."})
+                continue
+            portfolio[symbol] -= quantity
+            cash_balance += (turnover - fee)
+
+        results.append({
+            "status": "filled" if report["status"] == "FILLED" else "partial",
+            "symbol": symbol,
+            "action": action,
+            "quantity": quantity,
+            "requested_quantity": order["quantity"],
+            "price": round(price, 2),
+            "fee": round(fee, 2),
+            "value": round(turnover, 2),
+            "timestamp": report["fills"][-1][0] if order.get("timestamp") is not None else pd.Timestamp.now(),
+            "cash_balance": round(cash_balance, 2),
+            "remaining_position": round(portfolio.get(symbol, 0.0), 4)
+        })
+        fills.append({"ticker": symbol, "action": action, "quantity": quantity, "price": price,
+                      "value": turnover, "fee": fee, "timestamp": results[-1]["timestamp"],
+                      "status": report["status"], "order_id": order.get("order_id"), "source": "trade_execution"})
+    if ledger is not None:
+        ledger.record_fills(fills)
+    return results
 
 def prepare_orders_from_trades(trade_csv_path, symbol, order_type="sell"):
     """
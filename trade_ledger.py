@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+TRADE LEDGER - Append-only Journal aller Paper- und Live-Fills (SQLite)
+- Eine Tabelle fills, Zeilen werden nur angehängt (kein UPDATE/DELETE)
+- Indizes auf (ticker, ts), (source, ts) und ts: Abfragen nach Ticker,
+  Zeitraum und Quelle lesen nur die betroffenen Zeilen statt aller CSV-Logs
+- (source, order_id) ist eindeutig: derselbe Fill wird nicht doppelt gebucht
+  (z.B. erneutes Replay in dieselbe Datei)
+- Abfragen: Fills, Positionen (Durchschnittskosten), realisierter PnL und
+  Perioden-Zusammenfassungen als DataFrames
+- Vorbereitete, nicht gesendete Orders (status PREPARED) werden mitjournalisiert,
+  zählen aber nicht für Positionen/PnL/Perioden
+- Gemeinsame Instanz über get_trade_ledger() / set_trade_ledger()
+"""
+
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+LEDGER_PATH = os.environ.get("TRADE_LEDGER_PATH", "trade_ledger.sqlite")
+TS_FORMAT = "%Y-%m-%d %H:%M:%S.%f"      # fixe Breite -> lexikografisch = chronologisch
+PREPARED = 'PREPARED'                   # Order vorbereitet, nicht ausgeführt
+
+FILL_COLUMNS = ['ts', 'ticker', 'source', 'mode', 'action', 'quantity', 'price', 'value', 'fee',
+                'status', 'order_id', 'note']
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS fills (
+    id INTEGER PRIMARY KEY,
+    ts TEXT NOT NULL,
+    ticker TEXT NOT NULL,
+    source TEXT NOT NULL,
+    mode TEXT NOT NULL DEFAULT 'paper',
+    action TEXT NOT NULL CHECK (action IN ('BUY', 'SELL')),
+    quantity REAL NOT NULL,
+    price REAL NOT NULL,
+    value REAL NOT NULL,
+    fee REAL NOT NULL DEFAULT 0,
+    status TEXT NOT NULL DEFAULT 'FILLED',
+    order_id TEXT,
+    note TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_fills_ticker_ts ON fills (ticker, ts);
+CREATE INDEX IF NOT EXISTS idx_fills_source_ts ON fills (source, ts);
+CREATE INDEX IF NOT EXISTS idx_fills_ts ON fills (ts);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_fills_order ON fills (source, order_id) WHERE order_id IS NOT NULL;
+CREATE TRIGGER IF NOT EXISTS fills_no_update BEFORE UPDATE ON fills
+BEGIN SELECT RAISE(ABORT, 'trade ledger is append-only'); END;
+CREATE TRIGGER IF NOT EXISTS fills_no_delete BEFORE DELETE ON fills
+BEGIN SELECT RAISE(ABORT, 'trade ledger is append-only'); END;
+"""
+
+
+def _ts_text(value):
+    """Zeitstempel (datetime/Timestamp/str, mit/ohne Zeitzone) -> ISO-Text (Wandzeit, tz-naiv)."""
+    ts = pd.Timestamp(value if value is not None else datetime.now())
+    if ts.tz is not None:
+        ts = ts.tz_localize(None)
+    return ts.strftime(TS_FORMAT)
+
+
+def _fill_row(fill):
+    """Fill-Dict -> Tupel in FILL_COLUMNS-Reihenfolge (value Default: quantity * price)."""
+    action = str(fill['action']).upper()
+    if action not in ('BUY', 'SELL'):
+        raise ValueError(f"Ungültige action '{fill['action']}' (erlaubt: BUY, SELL)")
+    quantity, price = float(fill['quantity']), float(fill['price'])
+    value = fill.get('value')
+    order_id = fill.get('order_id')
+    return (_ts_text(fill.get('timestamp')), str(fill['ticker']), str(fill.get('source', 'unknown')),
+            str(fill.get('mode', 'paper')), action, quantity, price,
+            float(value) if value is not None else quantity * price, float(fill.get('fee') or 0.0),
+            str(fill.get('status', 'FILLED')), str(order_id) if order_id is not None else None, fill.get('note'))
+
+
+def _average_cost(frame):
+    """
+    Durchschnittskosten-Methode über chronologisch sortierte Fills.
+    Kaufgebühren erhöhen die Kostenbasis, Verkaufsgebühren mindern den realisierten PnL.
+    Verkäufe über den Bestand hinaus realisieren nur den gehaltenen Anteil.
+    Gibt (realized je Zeile, {ticker: (Menge, Kostenbasis)}) zurück.
+    """
+    realized = np.zeros(len(frame))
+    books = {}
+    tickers = frame['ticker'].to_numpy()
+    buys = (frame['action'] == 'BUY').to_numpy()
+    quantity = frame['quantity'].to_numpy(dtype=np.float64)
+    value = frame['value'].to_numpy(dtype=np.float64)
+    fee = frame['fee'].to_numpy(dtype=np.float64)
+    for i in range(len(frame)):
+        held, cost = books.get(tickers[i], (0.0, 0.0))
+        if buys[i]:
+            books[tickers[i]] = (held + quantity[i], cost + value[i] + fee[i])
+            continue
+        matched = min(quantity[i], held)
+        basis = cost * matched / held if held > 0 else 0.0
+        share = matched / quantity[i] if quantity[i] > 0 else 0.0
+        realized[i] = (value[i] - fee[i]) * share - basis
+        held -= matched
+        books[tickers[i]] = (held, cost - basis if held > 1e-12 else 0.0)
+    return realized, books
+
+
+class TradeLedger:
+    """
+    Append-only SQLite-Journal für Fills aller Executoren.
+    path: Datei (Default env TRADE_LEDGER_PATH bzw. trade_ledger.sqlite) oder ":memory:".
+    Die Verbindung wird beim ersten Zugriff geöffnet (kein leeres File ohne Fills).
+    """
+
+    def __init__(self, path=None):
+        self.path = path or LEDGER_PATH
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connection(self):
+        if self._conn is None:
+            if self.path != ":memory:":
+                directory = os.path.dirname(os.path.abspath(self.path))
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            if self.path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+        return self._conn
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # ------------------------------------------------------------------ Schreiben
+
+    def record_fill(self, ticker, action, quantity, price, source, timestamp=None, value=None, fee=0.0,
+                    status='FILLED', order_id=None, mode='paper', note=None):
+        """Einen Fill anhängen. Gibt True zurück, wenn er neu gebucht wurde."""
+        return self.record_fills([{
+            'ticker': ticker, 'action': action, 'quantity': quantity, 'price': price, 'source': source,
+            'timestamp': timestamp, 'value': value, 'fee': fee, 'status': status, 'order_id': order_id,
+            'mode': mode, 'note': note,
+        }]) == 1
+
+    def record_fills(self, fills):
+        """
+        Mehrere Fills in einer Transaktion anhängen (Keys wie record_fill).
+        Bereits gebuchte (source, order_id) werden übersprungen.
+        Fehler werden ausgegeben und brechen den Trading-Lauf nicht ab; Rückgabe: Anzahl neuer Zeilen.
+        """
+        try:
+            rows = [_fill_row(fill) for fill in fills]
+            if not rows:
+                return 0
+            with self._lock:
+                conn = self._connection()
+                before = conn.total_changes
+                with conn:
+                    conn.executemany(f"INSERT OR IGNORE INTO fills ({', '.join(FILL_COLUMNS)}) "
+                                     f"VALUES ({', '.join('?' * len(FILL_COLUMNS))})", rows)
+                return conn.total_changes - before
+        except (sqlite3.Error, ValueError, TypeError, KeyError) as e:
+            print(f"❌ Trade-Ledger: Fills nicht gebucht: {e}")
+            return 0
+
+    # ------------------------------------------------------------------ Abfragen
+
+    def fills(self, ticker=None, source=None, mode=None, start=None, end=None, include_prepared=False):
+        """
+        Fills als DataFrame (ts als datetime64, chronologisch).
+        ticker/source: Einzelwert oder Liste; start inklusiv, end exklusiv.
+        include_prepared: auch nur vorbereitete Orders (status PREPARED) liefern.
+        Eine noch nicht existierende Ledger-Datei wird nicht angelegt (leeres Ergebnis).
+        """
+        if self._conn is None and self.path != ":memory:" and not os.path.exists(self.path):
+            frame = pd.DataFrame({c: pd.Series(dtype=float if c in ('quantity', 'price', 'value', 'fee') else object)
+                                  for c in FILL_COLUMNS})
+            frame['ts'] = frame['ts'].astype("datetime64[ns]")
+            return frame
+        clauses, params = [], []
+        for column, wanted in (('ticker', ticker), ('source', source), ('mode', mode)):
+            if wanted is None:
+                continue
+            wanted = [wanted] if isinstance(wanted, str) else list(wanted)
+            clauses.append(f"{column} IN ({', '.join('?' * len(wanted))})")
+            params += wanted
+        if not include_prepared:
+            clauses.append("status != ?")
+            params.append(PREPARED)
+        if start is not None:
+            clauses.append("ts >= ?")
+            params.append(_ts_text(start))
+        if end is not None:
+            clauses.append("ts < ?")
+            params.append(_ts_text(end))
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            frame = pd.read_sql_query(f"SELECT {', '.join(FILL_COLUMNS)} FROM fills{where} ORDER BY ts, id",
+                                      self._connection(), params=params)
+        frame['ts'] = pd.to_datetime(frame['ts'], format=TS_FORMAT).astype("datetime64[ns]")
+        return frame
+
+    def positions(self, as_of=None, ticker=None, source=None, mode=None):
+        """
+        Offene Positionen zum Zeitpunkt as_of (exklusiv; Default: alle Fills).
+        Spalten: quantity, cost_basis, avg_price, realized_pnl (Index: ticker).
+        """
+        frame = self.fills(ticker=ticker, source=source, mode=mode, end=as_of)
+        realized, books = _average_cost(frame)
+        result = pd.DataFrame(
+            [(t, q, c) for t, (q, c) in books.items() if q > 1e-12],
+            columns=['ticker', 'quantity', 'cost_basis']).set_index('ticker')
+        result['avg_price'] = result['cost_basis'] / result['quantity']
+        pnl = pd.Series(realized, index=frame['ticker']).groupby(level=0).sum()
+        result['realized_pnl'] = pnl.reindex(result.index).fillna(0.0)
+        return result.sort_index()
+
+    def realized_pnl(self, start=None, end=None, ticker=None, source=None, mode=None):
+        """
+        Realisierter PnL je Ticker für Verkäufe in [start, end).
+        Die Kostenbasis wird aus der gesamten Historie vor end berechnet.
+        """
+        frame = self.fills(ticker=ticker, source=source, mode=mode, end=end)
+        realized, _ = _average_cost(frame)
+        in_window = (frame['action'] == 'SELL').to_numpy()
+        if start is not None:
+            in_window = in_window & (frame['ts'] >= pd.Timestamp(_ts_text(start))).to_numpy()
+        return pd.Series(realized[in_window], index=frame['ticker'].to_numpy()[in_window],
+                         dtype=np.float64).groupby(level=0).sum().rename('realized_pnl')
+
+    def period_summary(self, freq='D', start=None, end=None, ticker=None, source=None, mode=None):
+        """
+        Zusammenfassung je Periode (freq wie pandas: 'D', 'W', 'MS', ...):
+        fills, buys, sells, bought, sold, fees, realized_pnl.
+        """
+        frame = self.fills(ticker=ticker, source=source, mode=mode, end=end)
+        frame['realized_pnl'], _ = _average_cost(frame)
+        if start is not None:
+            frame = frame[frame['ts'] >= pd.Timestamp(_ts_text(start))]
+        buy = frame['action'] == 'BUY'
+        frame = frame.assign(buys=buy.astype(int), sells=(~buy).astype(int),
+                             bought=frame['value'].where(buy, 0.0), sold=frame['value'].where(~buy, 0.0))
+        summary = frame.groupby(pd.Grouper(key='ts', freq=freq)).agg(
+            fills=('ticker', 'size'), buys=('buys', 'sum'), sells=('sells', 'sum'), bought=('bought', 'sum'),
+            sold=('sold', 'sum'), fees=('fee', 'sum'), realized_pnl=('realized_pnl', 'sum'))
+        summary.index.name = 'period'
+        return summary
+
+
+_ledger = None
+
+
+def get_trade_ledger():
+    """Gemeinsamer Trade-Ledger (LEDGER_PATH) für alle Executoren."""
+    global _ledger
+    if _ledger is None:
+        _ledger = TradeLedger()
+    return _ledger
+
+
+def set_trade_ledger(ledger):
+    """Ersetzt den gemeinsamen Ledger (z.B. TradeLedger(':memory:') in Tests/Replays)."""
+    global _ledger
+    _ledger = ledger
+    return ledger
+
+
+if __name__ == "__main__":
+    import sys
+    ledger = TradeLedger(sys.argv[1] if len(sys.argv) > 1 else None)
+    print(f"📒 Trade-Ledger: {ledger.path}")
+    print("\n📊 Positionen:")
+    print(ledger.positions().to_string())
+    print("\n💰 Realisierter PnL:")
+    print(ledger.realized_pnl().to_string())
+    print("\n📅 Wochen:")
+    print(ledger.period_summary('W').to_string())
@@ -6,11 +6,14 @@ Zeigt Trades der letzten Woche sortiert nach Datum an.
 - Artificial Open, Close für heute
 """
 
+import numpy as np
 import pandas as pd
 import os
 from datetime import datetime, timedelta
 from typing import List, Dict, Any
 
+from recent_trades import typed_trades, window_mask, sort_trades_by_date
+
 def get_last_week_trades(matched_trades: List[Dict], data_df: pd.DataFrame, days_back: int = 14) -> List[Dict]:
     """
     Filtert Trades der letzten 2 Wochen (14 Tage)
@@ -27,33 +30,14 @@ def get_last_week_trades(matched_trades: List[Dict], data_df: pd.DataFrame, days
         if not matched_trades:
             return []
         
-        # Cutoff Date berechnen
-        today = datetime.now().date()
-        cutoff_date = today - timedelta(days=days_back)
-        
-        last_week_trades = []
+        # Cutoff Date berechnen (Fenster ab Tagesbeginn, ganze Tage)
+        today = pd.Timestamp(datetime.now().date())
         
-        for trade in matched_trades:
-            # Buy Date prüfen
-            buy_date_str = trade.get('buy_date', '')
-            if buy_date_str:
-                try:
-                    buy_date = pd.to_datetime(buy_date_str).date()
-                    if buy_date >= cutoff_date:
-                        last_week_trades.append(trade)
-                        continue
-                except:
-                    pass
-            
-            # Sell Date prüfen für offene Trades
-            sell_date_str = trade.get('sell_date', '')
-            if sell_date_str:
-                try:
-                    sell_date = pd.to_datetime(sell_date_str).date()
-                    if sell_date >= cutoff_date:
-                        last_week_trades.append(trade)
-                except:
-                    pass
+        # Buy- oder Sell-Date im Fenster: Datumsspalten einmal typisiert, Filter per Maske
+        trades = typed_trades(matched_trades, date_columns=('buy_date', 'sell_date'))
+        in_window = (window_mask(trades['buy_date'], days_back, today)
+                     | window_mask(trades['sell_date'], days_back, today))
+        last_week_trades = [matched_trades[i] for i in np.flatnonzero(in_window)]
         
         print(f"📅 Gefiltert: {len(last_week_trades)} Trades der letzten {days_back} Tage")
         
@@ -250,7 +234,7 @@ def display_weekly_trades_console(matched_trades: List[Dict], data_df: pd.DataFr
             return
 
         # Nach Datum sortieren (neueste zuerst)
-        last_week_trades.sort(key=lambda t: pd.to_datetime(t.get('buy_date', '1900-01-01')), reverse=True)
+        sort_trades_by_date(last_week_trades, 'buy_date', reverse=True)
         
         # Heute bestimmen
         today = datetime.now().date()
@@ -323,7 +307,7 @@ def create_weekly_trades_html(matched_trades: List[Dict], data_df: pd.DataFrame,
             """
 
         # Nach Datum sortieren (neueste zuerst)
-        last_week_trades.sort(key=lambda t: pd.to_datetime(t.get('buy_date', '1900-01-01')), reverse=True)
+        sort_trades_by_date(last_week_trades, 'buy_date', reverse=True)
         
         # HTML Table erstellen
         html_content = f"""
@@ -8,26 +8,54 @@ import pandas as pd
 import os
 import sys
 from datetime import datetime
-import glob
 
 # Add current directory to path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from crypto_tickers import crypto_tickers
+from file_catalog import get_file_catalog, year_bounds
+from trade_ledger import get_trade_ledger
 
 class TradingSummary2024:
     """Generate actual trading performance summary for 2024"""
     
-    def __init__(self):
+    def __init__(self, ledger=None):
         self.year = 2024
         self.trades = []
         self.performance = {}
+        self.ledger = ledger or get_trade_ledger()
+        self.ledger_used = False
         
         print("📊 TRADING SUMMARY 2024")
         print("=" * 60)
         print("📈 Analyzing actual buy/sell transactions and performance")
         print("=" * 60)
     
+    def load_ledger_trades(self):
+        """Load the year's fills from the trade ledger (indexed query instead of scanning CSV files)"""
+        print("\n📒 LOADING TRADES FROM TRADE LEDGER...")
+        
+        year_start, year_end = year_bounds(self.year)
+        fills = self.ledger.fills(start=year_start, end=year_end)
+        if fills.empty:
+            print(f"   ⚠️ No ledger fills for {self.year} - falling back to trading files")
+            return False
+        
+        self.trades = [{
+            'date': ts.strftime('%Y-%m-%d %H:%M:%S'),
+            'source': f"ledger:{source}",
+            'ticker': ticker,
+            'action': action,
+            'quantity': quantity,
+            'price': price,
+            'value': value
+        } for ts, source, ticker, action, quantity, price, value in zip(
+            fills['ts'], fills['source'], fills['ticker'], fills['action'],
+            fills['quantity'], fills['price'], fills['value'])]
+        self.ledger_used = True
+        print(f"   📄 {len(self.trades)} fills from {fills['source'].nunique()} source(s)")
+        return True
+    
     def find_trading_files(self):
         """Find all files that contain actual trading data"""
         print("\n🔍 SEARCHING FOR TRADING FILES...")
@@ -41,13 +69,10 @@ class TradingSummary2024:
             "*live_trading*.csv"
         ]
         
-        found_files = []
-        for pattern in trading_patterns:
-            files = glob.glob(pattern)
-            for file in files:
-                if '2024' in file or self._contains_2024_data(file):
-                    found_files.append(file)
-                    print(f"   📄 Found: {file}")
+        # Catalogued date ranges instead of re-reading every match
+        found_files = get_file_catalog().find(trading_patterns, *year_bounds(self.year), include_undated=False)
+        for file in found_files:
+            print(f"   📄 Found: {file}")
         
         if not found_files:
             print("   ⚠️ No trading files found - checking backtest modules...")
@@ -55,18 +80,6 @@ class TradingSummary2024:
         
         return found_files
     
-    def _contains_2024_data(self, filename):
-        """Check if file contains 2024 trading data"""
-        try:
-            df = pd.read_csv(filename, nrows=10)  # Check first 10 rows
-            date_cols = [col for col in df.columns if 'date' in col.lower()]
-            if date_cols:
-                df[date_cols[0]] = pd.to_datetime(df[date_cols[0]], errors='coerce')
-                return df[date_cols[0]].dt.year.eq(2024).any()
-        except:
-            pass
-        return False
-    
     def _extract_from_backtest_modules(self):
         """Extract trading data from backtest modules"""
         print("   🔧 Extracting from backtest modules...")
@@ -223,6 +236,19 @@ class TradingSummary2024:
             perf['realized_pnl'] = perf['sell_value'] - perf['buy_value']
             perf['avg_buy_price'] = perf['buy_value'] / max(perf['buys'], 1)
             perf['avg_sell_price'] = perf['sell_value'] / max(perf['sells'], 1)
+        net_pnl = total_sell_value - total_buy_value
+        monthly = None
+        
+        # Ledger: realized P&L (average cost incl. fees), holdings at year end and monthly summary
+        if self.ledger_used:
+            year_start, year_end = year_bounds(self.year)
+            pnl = self.ledger.realized_pnl(year_start, year_end)
+            held = self.ledger.positions(as_of=year_end)['quantity']
+            for ticker, perf in ticker_performance.items():
+                perf['realized_pnl'] = float(pnl.get(ticker, 0.0))
+                perf['quantity_held'] = float(held.get(ticker, 0.0))
+            net_pnl = float(pnl.sum())
+            monthly = self.ledger.period_summary('MS', year_start, year_end)
         
         self.performance = {
             'total_trades': len(self.trades),
@@ -230,8 +256,9 @@ class TradingSummary2024:
             'total_sells': total_sells,
             'total_buy_value': total_buy_value,
             'total_sell_value': total_sell_value,
-            'net_pnl': total_sell_value - total_buy_value,
-            'ticker_performance': ticker_performance
+            'net_pnl': net_pnl,
+            'ticker_performance': ticker_performance,
+            'monthly': monthly
         }
         
         print(f"   📊 Total Trades: {self.performance['total_trades']}")
@@ -283,6 +310,15 @@ class TradingSummary2024:
                     if perf['sells'] > 0:
                         f.write(f"  Avg Sell Price: €{perf['avg_sell_price']:.2f}\n")
             
+            # Monthly summary (trade ledger)
+            if self.performance.get('monthly') is not None:
+                f.write("\nMONTHLY SUMMARY (TRADE LEDGER)\n")
+                f.write("-" * 40 + "\n")
+                for period, row in self.performance['monthly'].iterrows():
+                    f.write(f"{period.strftime('%Y-%m')}: {int(row['fills'])} fills, "
+                            f"bought €{row['bought']:.2f}, sold €{row['sold']:.2f}, "
+                            f"fees €{row['fees']:.2f}, realized P&L €{row['realized_pnl']:.2f}\n")
+            
             # Detailed Transaction Log
             f.write("\n" + "=" * 60 + "\n")
             f.write("DETAILED TRANSACTION LOG\n")
@@ -308,9 +344,10 @@ def main():
         # Create trading summary instance
         summary = TradingSummary2024()
         
-        # Find and analyze trading files
-        trading_files = summary.find_trading_files()
-        summary.analyze_trading_files(trading_files)
+        # Trade ledger first; scan trading files only if it has no fills for the year
+        if not summary.load_ledger_trades():
+            trading_files = summary.find_trading_files()
+            summary.analyze_trading_files(trading_files)
         
         # Calculate performance
         summary.calculate_performance()
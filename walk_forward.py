@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+WALK-FORWARD BACKTEST
+- Rollendes Optimierungsfenster (train) + Out-of-Sample-Fenster (test) über die Historie
+- Pro Fold: Long-Optimierung auf dem train-Fenster, Anwendung auf das test-Fenster
+- Extrema-Stärken werden einmal über die gesamte Historie berechnet und pro
+  Fenster nur an den Rändern neu bewertet (ExtremaStrengthCache)
+- Fold-Optimierungen laufen parallel und über den persistenten Optimierungs-Cache
+  (ein erneuter Lauf mit unveränderter Historie optimiert nichts neu)
+- Out-of-Sample-Folds werden mit fortgeschriebenem Kapital zu einer Equity-Kurve verbunden;
+  offene Positionen werden am Ende jedes test-Fensters geschlossen
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import config
+from config import COMMISSION_RATE, MIN_COMMISSION
+from optimization_cache import cached_best_p_tw_long
+from price_store import dataset_signature
+from signal_utils import (
+    ExtremaStrengthCache,
+    calculate_support_resistance,
+    build_long_signal_table,
+    get_long_param_ranges,
+    simulate_matched_trades_arrays,
+)
+from plotly_utils import create_equity_curve_from_matched_trades
+
+
+def walk_forward_folds(n_bars, train_bars, test_bars, step=None, anchored=False):
+    """
+    Fold-Grenzen als Liste von (train_start, train_end, test_start, test_end) (iloc, end exklusiv).
+    anchored=True: train beginnt immer bei 0 (wachsendes Fenster).
+    """
+    step = step or test_bars
+    folds = []
+    test_start = train_bars
+    while test_start < n_bars:
+        test_end = min(test_start + test_bars, n_bars)
+        train_start = 0 if anchored else test_start - train_bars
+        folds.append((train_start, test_start, test_start, test_end))
+        test_start += step
+    return folds
+
+
+def _optimizer_config(cfg):
+    return {
+        'initial_capital': cfg.get('initialCapitalLong', 10000),
+        'commission_rate': cfg.get('commission_rate', COMMISSION_RATE),
+        'min_commission': MIN_COMMISSION,
+        'order_round_factor': cfg.get('order_round_factor', 0.01),
+    }
+
+
+def _optimize_fold(args):
+    """Worker: optimiert ein train-Fenster (mit vorberechneten Extrema) -> (p, tw, in-sample final_cap)."""
+    symbol, train_df, opt_cfg, extrema = args
+    p, tw, table = cached_best_p_tw_long(train_df, opt_cfg, 0, len(train_df), verbose=False,
+                                         ticker=symbol, return_table=True, extrema=extrema)
+    final_cap = float(table["final_cap"].iloc[0]) if not table.empty else None
+    return p, tw, final_cap
+
+
+def evaluate_oos_fold(df, train_start, test_start, test_end, p, tw, capital, commission_rate,
+                      order_round_factor=1.0, trade_on="Close"):
+    """
+    Wendet (p, tw) auf das test-Fenster an: Extrema auf train+test (Historie bis test_end),
+    gehandelt werden nur Signale mit Trade-Tag im test-Fenster; eine offene Position wird
+    am letzten Bar des Fensters geschlossen. Gibt (trades, equity) zurück.
+    """
+    df_ctx = df.iloc[train_start:test_end]
+    df_test = df.iloc[test_start:test_end]
+    supp, res = calculate_support_resistance(df_ctx, p, tw)
+    table = build_long_signal_table(supp, res, df_ctx, tw, trade_on)
+
+    offset = test_start - train_start
+    if not table.empty:
+        trade_pos = table["Trade Pos"].to_numpy()
+        # Nur Trade-Tage im test-Fenster; ein Kauf am letzten Bar würde sofort zwangsverkauft
+        last_bar_buy = (trade_pos == len(df_ctx) - 1) & (table["Action"].astype(object) == "buy").to_numpy()
+        table = table[(trade_pos >= offset) & ~last_bar_buy]
+    codes = np.select([table["Action"].astype(object) == "buy", table["Action"].astype(object) == "sell"], [1, -1], 0)
+    prices = table["Level trade"].to_numpy(dtype=np.float64).tolist()
+    dates = list(table["Long Trade Day"])
+
+    # Zwangsverkauf am letzten Bar des test-Fensters
+    price_column = "Open" if trade_on.upper() == "OPEN" else "Close"
+    codes = np.append(codes, -1).astype(np.int8)
+    prices.append(float(df_test[price_column].iloc[-1]))
+    dates.append(df_test.index[-1])
+
+    sim = simulate_matched_trades_arrays(codes, prices, capital, commission_rate, order_round_factor)
+    trades = []
+    for k in range(len(sim['exit_idx'])):
+        entry, exit_ = sim['entry_idx'][k], sim['exit_idx'][k]
+        trades.append({
+            'buy_date': dates[entry],
+            'sell_date': dates[exit_],
+            'buy_price': prices[entry],
+            'sell_price': prices[exit_],
+            'shares': float(sim['quantity'][k]),
+            'pnl': float(sim['net_pnl'][k]),
+            'is_open': False,
+        })
+    equity = create_equity_curve_from_matched_trades(trades, capital, df_test, trade_on, commission_rate=commission_rate)
+    return trades, pd.Series(equity, index=df_test.index, dtype=np.float64)
+
+
+def run_walk_forward(symbol, df, cfg, train_bars=None, test_bars=None, step=None, anchored=None, max_workers=None):
+    """
+    Walk-Forward-Backtest auf df. Gibt ein Result-Dict mit
+    'folds' (Parameter und Ergebnis je Fold), 'equity_curve' (verbundene OOS-Kurve),
+    'matched_trades' und 'final_capital' zurück.
+    """
+    train_bars = int(train_bars or getattr(config, "WALK_FORWARD_TRAIN_DAYS", 180))
+    test_bars = int(test_bars or getattr(config, "WALK_FORWARD_TEST_DAYS", 30))
+    anchored = getattr(config, "WALK_FORWARD_ANCHORED", False) if anchored is None else anchored
+    if max_workers is None:
+        env_workers = os.environ.get("BACKTEST_WORKERS")
+        max_workers = int(env_workers) if env_workers else getattr(config, "BACKTEST_WORKERS", None)
+
+    initial_capital = cfg.get('initialCapitalLong', 10000)
+    commission_rate = cfg.get('commission_rate', COMMISSION_RATE)
+    order_round_factor = cfg.get('order_round_factor', 0.01)
+    trade_on = str(cfg.get('trade_on', 'Close')).title()
+
+    folds = walk_forward_folds(len(df), train_bars, test_bars, step, anchored)
+    if not folds:
+        print(f"❌ Walk-Forward {symbol}: zu wenig Daten ({len(df)} Bars, train={train_bars})")
+        return False
+    print(f"\n🚶 Walk-Forward {symbol}: {len(folds)} Folds (train={train_bars}, test={test_bars}, "
+          f"{'anchored' if anchored else 'rolling'})")
+
+    # Extrema einmal über die gesamte Historie, pro Fenster nur die Ränder neu
+    past_window_range, _ = get_long_param_ranges(symbol)
+    extrema_cache = ExtremaStrengthCache(df["Close"].to_numpy(dtype=np.float64), max(past_window_range))
+    opt_cfg = _optimizer_config(cfg)
+    jobs = [(symbol, df.iloc[train_start:train_end], opt_cfg, extrema_cache.window(train_start, train_end))
+            for train_start, train_end, _, _ in folds]
+
+    if max_workers == 1 or len(jobs) == 1:
+        params = [_optimize_fold(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            params = list(pool.map(_optimize_fold, jobs))
+
+    # Out-of-Sample sequentiell: Kapital wird von Fold zu Fold fortgeschrieben
+    capital = initial_capital
+    rows, curves, all_trades = [], [], []
+    for k, ((train_start, train_end, test_start, test_end), (p, tw, is_cap)) in enumerate(zip(folds, params)):
+        trades, equity = evaluate_oos_fold(df, train_start, test_start, test_end, p, tw, capital,
+                                           commission_rate, order_round_factor, trade_on)
+        end_capital = float(equity.iloc[-1]) if len(equity) else capital
+        rows.append({
+            'fold': k + 1,
+            'train_start': df.index[train_start].date(),
+            'train_end': df.index[train_end - 1].date(),
+            'test_start': df.index[test_start].date(),
+            'test_end': df.index[test_end - 1].date(),
+            'past_window': p,
+            'trade_window': tw,
+            'in_sample_final_cap': is_cap,
+            'oos_start_capital': round(capital, 2),
+            'oos_end_capital': round(end_capital, 2),
+            'oos_return_pct': round((end_capital / capital - 1) * 100, 2) if capital else 0.0,
+            'trades': len(trades),
+        })
+        curves.append(equity)
+        all_trades.extend(dict(t, fold=k + 1) for t in trades)
+        capital = end_capital
+
+    folds_df = pd.DataFrame(rows)
+    equity_curve = pd.concat(curves) if curves else pd.Series(dtype=np.float64)
+    print(folds_df.to_string(index=False))
+    print(f"💼 OOS Final Capital: €{capital:,.2f} (Start €{initial_capital:,.2f}, "
+          f"{(capital / initial_capital - 1) * 100:.2f}%)")
+
+    return {
+        'success': True,
+        'mode': 'walk_forward',
+        'symbol': symbol,
+        'config': cfg,
+        'dataset_signature': dataset_signature(df),
+        'train_bars': train_bars,
+        'test_bars': test_bars,
+        'anchored': anchored,
+        'folds': folds_df,
+        'equity_curve': equity_curve,
+        'matched_trades': pd.DataFrame(all_trades),
+        'initial_capital': initial_capital,
+        'final_capital': capital,
+        'oos_return_pct': round((capital / initial_capital - 1) * 100, 2),
+    }
+
+
+def run_walk_forward_backtest(symbol, cfg, end_date=None, **kwargs):
+    """Walk-Forward für ein Symbol mit denselben Daten wie run_backtest (optional nur bis end_date)."""
+    try:
+        from crypto_backtesting_module import load_crypto_data_yf
+        df = load_crypto_data_yf(symbol, config.backtest_years, end_date=end_date)
+        if df is None or df.empty:
+            print(f"Keine Daten für {symbol}")
+            return False
+        return run_walk_forward(symbol, df, cfg, **kwargs)
+    except Exception as e:
+        print(f"❌ Walk-Forward für {symbol} fehlgeschlagen: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+if __name__ == "__main__":
+    import sys
+    from crypto_tickers import crypto_tickers
+    for ticker in (sys.argv[1:] or list(crypto_tickers)):
+        run_walk_forward_backtest(crypto_tickers[ticker]["symbol"], crypto_tickers[ticker])